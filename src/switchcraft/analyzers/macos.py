@@ -1,3 +1,4 @@
+import io
 import logging
 import zipfile
 import subprocess
@@ -10,6 +11,9 @@ from typing import Optional, List, Dict
 
 from switchcraft.analyzers.base import BaseAnalyzer
 from switchcraft.models import InstallerInfo
+from switchcraft.utils.tracing import span
+from switchcraft.utils.udif import UdifImage, open_hfs_volume, is_app_info_plist
+from switchcraft.utils.xar import XarArchive, XarError
 
 logger = logging.getLogger(__name__)
 
@@ -62,30 +66,43 @@ class MacOSAnalyzer(BaseAnalyzer):
     def _analyze_pkg(self, file_path: Path, info: InstallerInfo):
         """Analyze .pkg (xar archive)"""
         info.installer_type = "MacOS PKG"
-        # We need 7z to extract Distribution or PackageInfo
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # 1. Try to extract Distribution file (xml)
-            # 7z x archive.pkg Distribution -oOutDir
-            if self._extract_with_7z(file_path, temp_path, ["Distribution", "PackageInfo", "*.plist"]):
-
-                # Check Distribution
-                dist_file = temp_path / "Distribution"
-                if dist_file.exists():
-                    self._parse_distribution_xml(dist_file, info)
-
-                # Check PackageInfo
-                pkg_info_file = temp_path / "PackageInfo"
-                if pkg_info_file.exists():
-                    self._parse_package_info_xml(pkg_info_file, info)
+        try:
+            with XarArchive(file_path) as xar:
+                self._read_pkg_metadata(xar, info)
+        except XarError as e:
+            logger.warning(f"Not a readable PKG archive {file_path}: {e}")
+            return
 
         if info.bundle_id:
             info.confidence = 1.0
 
+    def _read_pkg_metadata(self, xar: XarArchive, info: InstallerInfo, depth: int = 0):
+        """Reads Distribution/PackageInfo straight from the archive heap, including nested component packages."""
+        # Product archive
+        if xar.get("Distribution"):
+            self._parse_distribution_xml(io.BytesIO(xar.read("Distribution")), info)
+
+        # Component package (PackageInfo at the root) or components of a product archive (Foo.pkg/PackageInfo)
+        for member in xar.find("PackageInfo") + xar.find("*.pkg/PackageInfo"):
+            self._parse_package_info_xml(io.BytesIO(xar.read(member)), info)
+
+        # Component packages embedded as flat .pkg files
+        if depth < 2:
+            for member in xar.find("*.pkg"):
+                if not member.is_file:
+                    continue
+                try:
+                    with xar.open_package(member) as nested:
+                        self._read_pkg_metadata(nested, info, depth + 1)
+                except XarError as e:
+                    logger.debug(f"Skipping nested package {member.name}: {e}")
+
     def _analyze_dmg(self, file_path: Path, info: InstallerInfo):
         """Analyze .dmg (HFS+ image usually)"""
         info.installer_type = "MacOS DMG"
+        if self._analyze_dmg_native(file_path, info):
+            return
+
         # 7z can open DMG
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
@@ -114,6 +131,39 @@ class MacOSAnalyzer(BaseAnalyzer):
                         if not info.bundle_id:
                              self._populate_from_plist(data, info)
 
+    def _analyze_dmg_native(self, file_path: Path, info: InstallerInfo) -> bool:
+        """
+        Reads Info.plist straight from the HFS+ catalog inside the UDIF image, inflating only
+        the chunks that back the catalog and the plist. Returns False when the image needs
+        the 7z fallback (APFS, unsupported codec, not UDIF).
+        """
+        try:
+            with UdifImage(file_path) as image:
+                volume = open_hfs_volume(image)
+                plists = volume.find_files(is_app_info_plist)
+                for path, entry in plists:
+                    data = plistlib.loads(volume.read_file(entry))
+                    # Heuristic: the one with CFBundlePackageType APPL is likely the main app
+                    if data.get('CFBundlePackageType') == 'APPL':
+                        self._populate_from_plist(data, info)
+                        info.confidence = 1.0
+                        return True
+                    if not info.bundle_id:
+                        self._populate_from_plist(data, info)
+
+                # Installer DMGs often ship a .pkg instead of an .app
+                if not plists:
+                    for path, entry in volume.find_files(lambda p: p.lower().endswith(".pkg")):
+                        with volume.open_file(entry) as f, XarArchive(f) as xar:
+                            self._read_pkg_metadata(xar, info)
+                        if info.bundle_id:
+                            info.confidence = 1.0
+                            break
+                return True
+        except Exception as e:
+            logger.debug(f"Native DMG parsing not possible for {file_path}: {e}")
+            return False
+
     def _analyze_zip(self, file_path: Path, info: InstallerInfo):
          """Analyze zip containing .app or .ipa"""
          info.installer_type = "MacOS App Archive"
@@ -158,7 +208,8 @@ class MacOSAnalyzer(BaseAnalyzer):
 
         try:
             # Suppress output
-            subprocess.run(args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            with span("7z.extract", file=archive.name):
+                subprocess.run(args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             return True
         except subprocess.CalledProcessError:
             return False
@@ -193,9 +244,9 @@ class MacOSAnalyzer(BaseAnalyzer):
         info.product_name = data.get('CFBundleName') or data.get('CFBundleDisplayName')
         info.min_os_version = data.get('LSMinimumSystemVersion')
 
-    def _parse_distribution_xml(self, path: Path, info: InstallerInfo):
+    def _parse_distribution_xml(self, source, info: InstallerInfo):
         try:
-            tree = ET.parse(path)
+            tree = ET.parse(source)
             root = tree.getroot()
             # <pkg-ref id="com.example.pkg" ...>
             for pkg_ref in root.findall(".//pkg-ref"):
@@ -213,9 +264,9 @@ class MacOSAnalyzer(BaseAnalyzer):
         except Exception as e:
             logger.debug(f"Failed to parse Distribution xml: {e}")
 
-    def _parse_package_info_xml(self, path: Path, info: InstallerInfo):
+    def _parse_package_info_xml(self, source, info: InstallerInfo):
         try:
-            tree = ET.parse(path)
+            tree = ET.parse(source)
             root = tree.getroot()
             # <pkg-info identifier="com.example.pkg" version="1.0" ...>
             if root.tag == 'pkg-info':
@@ -3,6 +3,7 @@ from pathlib import Path
 import olefile
 from switchcraft.analyzers.base import BaseAnalyzer
 from switchcraft.models import InstallerInfo
+from switchcraft.utils.msi_database import MsiDatabase, MsiDatabaseError
 
 logger = logging.getLogger(__name__)
 
@@ -24,17 +25,9 @@ class MsiAnalyzer(BaseAnalyzer):
         info.properties = {} # Initialize properties dictionary
 
         try:
-            # Try using msilib on Windows for full property access
-            import msilib
-            db = msilib.OpenDatabase(str(file_path), msilib.MSIDBOPEN_READONLY)
-            view = db.OpenView("SELECT Property, Value FROM Property")
-            view.Execute(None)
-            record = view.Fetch()
-            while record:
-                prop = record.GetString(1)
-                val = record.GetString(2)
-                info.properties[prop] = val
-                record = view.Fetch()
+            # Native table reader (works on every platform, no msilib required)
+            with MsiDatabase(file_path) as db:
+                info.properties = db.get_properties()
 
             info.product_name = info.properties.get("ProductName")
             info.product_version = info.properties.get("ProductVersion")
@@ -46,14 +39,14 @@ class MsiAnalyzer(BaseAnalyzer):
                  # Standard MSI uninstall string
                 info.uninstall_switches = ["msiexec.exe", "/x", product_code, "/qn", "/norestart"]
 
-            info.confidence = 1.0
-            return info
+            if info.properties:
+                info.confidence = 1.0
+                return info
 
-        except ImportError:
-            # Fallback for non-Windows or if msilib is missing
-            pass
+        except MsiDatabaseError as e:
+            logger.debug(f"Not a readable MSI database: {e}")
         except Exception as e:
-            logger.warning(f"msilib parsing failed: {e}")
+            logger.warning(f"MSI table parsing failed: {e}")
 
         try:
             with olefile.OleFileIO(file_path) as ole:
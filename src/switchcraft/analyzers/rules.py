@@ -0,0 +1,468 @@
+"""
+Declarative installer signature rules for ExeAnalyzer.
+
+A rule file is JSON ({"rules": [...]} or a plain list):
+
+    {"id": "inno", "installer_type": "Inno Setup", "confidence": 0.9,
+     "install_switches": ["/VERYSILENT"], "uninstall_switches": ["/VERYSILENT"],
+     "conditions": [{"marker": "Inno Setup", "encoding": "both"}]}
+
+Conditions (top-level ones may carry a "weight", default 1):
+    marker    text, or a list of alternatives, in the file ("hex" for raw bytes); "encoding"
+              ascii | utf-16le | both; "within" bytes from the start (default 1 MB) or "at" an
+              exact offset (negative counts from the end)
+    section   a PE section name contains the text (or one of a list)
+    version   a PE version resource value contains the text; "field" limits it to e.g. CompanyName
+    filename  regular expression searched in the lower-case file name
+    any/all   groups of conditions ("min": at least N of an any-group); "within" and "encoding"
+              on a group apply to its markers
+
+A rule's score is the sum of the weights of its matching conditions and it applies once that
+reaches "min_score" (default 1). Every rule is scored; the highest score wins, ties go to the
+higher "priority" and then to the rule defined first (the bundled rules keep the historic check
+order). All markers of all rules are found in a single regex pass over one shared head buffer.
+
+Rules come from the bundled data/rules/exe.json, *.json files in the user rules folder and
+community DB entries with a "rule" key. Later sources replace rules with the same id
+("enabled": false removes one); get_rule_engine() recompiles when a source changes.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from switchcraft.services.fingerprint_service import get_fingerprint_service
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_RULES_PATH = Path(__file__).resolve().parent.parent / "data" / "rules" / "exe.json"
+DEFAULT_WINDOW = 1024 * 1024
+# Rule sources are re-checked (a stat per file, the community DB revision) at most this often
+RELOAD_CHECK_SECONDS = 5.0
+
+_ENCODINGS = ("ascii", "utf-16le", "both")
+
+
+class RuleError(ValueError):
+    """A rule definition is invalid."""
+
+
+# --- Scan context (everything the conditions look at, read once per file) ---
+
+def pe_version_strings(pe) -> Dict[str, str]:
+    """String values of the PE version resource (ProductName, CompanyName, ...)."""
+    strings = {}
+    try:
+        for file_info in getattr(pe, "FileInfo", None) or []:
+            for entry in file_info:
+                for st in getattr(entry, "StringTable", []):
+                    for key, value in st.entries.items():
+                        strings[key.decode("utf-8", errors="ignore")] = value.decode("utf-8", errors="ignore")
+    except Exception as e:
+        logger.debug(f"Failed to read PE version resource: {e}")
+    return strings
+
+
+@dataclass
+class ScanContext:
+    file_name: str
+    head: bytes
+    tail: bytes = b""
+    hits: Dict[bytes, int] = field(default_factory=dict)  # marker -> first offset in head
+    sections: List[bytes] = field(default_factory=list)
+    version: Dict[str, str] = field(default_factory=dict)
+    size: int = 0
+
+
+# --- Conditions ---
+
+class _Condition(ABC):
+    weight = 1.0
+
+    @abstractmethod
+    def matches(self, ctx: ScanContext) -> bool:
+        pass
+
+    def patterns(self) -> Iterable["_Marker"]:
+        return ()
+
+
+class _Marker(_Condition):
+    def __init__(self, needles: List[bytes], within: int, at: Optional[int], label: str):
+        self.needles = needles
+        self.within = within
+        self.at = at
+        self.label = label
+
+    def matches(self, ctx: ScanContext) -> bool:
+        for needle in self.needles:
+            if self.at is None:
+                offset = ctx.hits.get(needle)
+                if offset is not None and offset + len(needle) <= self.within:
+                    return True
+            elif self.at >= 0:
+                if ctx.head[self.at:self.at + len(needle)] == needle:
+                    return True
+            elif ctx.size + self.at >= 0 and len(ctx.tail) >= -self.at:
+                start = len(ctx.tail) + self.at
+                if ctx.tail[start:start + len(needle)] == needle:
+                    return True
+        return False
+
+    def patterns(self):
+        return (self,)
+
+    def __repr__(self):
+        return f"marker {self.label}"
+
+
+class _Section(_Condition):
+    def __init__(self, names: List[bytes]):
+        self.names = names
+
+    def matches(self, ctx):
+        return any(name in section for section in ctx.sections for name in self.names)
+
+    def __repr__(self):
+        return f"section {b'|'.join(self.names).decode('ascii', errors='replace')}"
+
+
+class _Version(_Condition):
+    def __init__(self, texts: List[str], field_name: Optional[str]):
+        self.texts = texts
+        self.field_name = field_name
+
+    def matches(self, ctx):
+        values = [ctx.version.get(self.field_name, "")] if self.field_name else ctx.version.values()
+        return any(text in value for value in values for text in self.texts)
+
+    def __repr__(self):
+        return f"version {self.field_name or '*'} ~ {'|'.join(self.texts)}"
+
+
+class _Filename(_Condition):
+    def __init__(self, pattern: str):
+        try:
+            self.regex = re.compile(pattern)
+        except re.error as e:
+            raise RuleError(f"invalid filename pattern {pattern!r}: {e}")
+
+    def matches(self, ctx):
+        return bool(self.regex.search(ctx.file_name.lower()))
+
+    def __repr__(self):
+        return f"filename /{self.regex.pattern}/"
+
+
+class _Group(_Condition):
+    def __init__(self, children: List[_Condition], minimum: Optional[int]):
+        self.children = children
+        self.minimum = minimum  # None: all must match
+
+    def matches(self, ctx):
+        if self.minimum is None:
+            return all(c.matches(ctx) for c in self.children)
+        return sum(1 for c in self.children if c.matches(ctx)) >= self.minimum
+
+    def patterns(self):
+        for child in self.children:
+            yield from child.patterns()
+
+    def __repr__(self):
+        kind = "all" if self.minimum is None else f"any(min={self.minimum})"
+        return f"{kind}[{', '.join(map(repr, self.children))}]"
+
+
+def _as_list(value) -> list:
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _encode(text: str, encoding: str) -> List[bytes]:
+    if encoding == "ascii":
+        return [text.encode("latin-1")]
+    if encoding == "utf-16le":
+        return [text.encode("utf-16-le")]
+    return [text.encode("latin-1"), text.encode("utf-16-le")]
+
+
+def _compile_condition(spec: Dict, within: int = DEFAULT_WINDOW, encoding: str = "ascii") -> _Condition:
+    if not isinstance(spec, dict):
+        raise RuleError(f"condition must be an object, got {spec!r}")
+    within = int(spec.get("within", within))
+    encoding = spec.get("encoding", encoding)
+    if encoding not in _ENCODINGS:
+        raise RuleError(f"unknown encoding {encoding!r}")
+
+    if "any" in spec or "all" in spec:
+        children = [_compile_condition(c, within, encoding) for c in _as_list(spec.get("any") or spec.get("all"))]
+        if not children:
+            raise RuleError("empty condition group")
+        condition = _Group(children, int(spec.get("min", 1)) if "any" in spec else None)
+    elif "marker" in spec or "hex" in spec:
+        at = spec.get("at")
+        if "hex" in spec:
+            texts = _as_list(spec["hex"])
+            try:
+                needles = [bytes.fromhex(h) for h in texts]
+            except ValueError as e:
+                raise RuleError(f"invalid hex marker: {e}")
+        else:
+            texts = _as_list(spec["marker"])
+            needles = [n for text in texts for n in _encode(str(text), encoding)]
+        if not all(needles):
+            raise RuleError("empty marker")
+        condition = _Marker(needles, within, int(at) if at is not None else None, "|".join(map(str, texts)))
+    elif "section" in spec:
+        condition = _Section([str(s).encode("latin-1") for s in _as_list(spec["section"])])
+    elif "version" in spec:
+        condition = _Version([str(v) for v in _as_list(spec["version"])], spec.get("field"))
+    elif "filename" in spec:
+        condition = _Filename(str(spec["filename"]))
+    else:
+        raise RuleError(f"unknown condition {sorted(spec)}")
+
+    condition.weight = float(spec.get("weight", 1.0))
+    return condition
+
+
+# --- Rules ---
+
+@dataclass
+class Rule:
+    id: str
+    installer_type: str
+    conditions: List[_Condition]
+    install_switches: List[str] = field(default_factory=list)
+    uninstall_switches: List[str] = field(default_factory=list)
+    confidence: float = 0.8
+    min_score: float = 1.0
+    priority: int = 0
+    source: str = ""
+
+
+@dataclass
+class RuleMatch:
+    rule: Rule
+    score: float
+    matched: List[str]  # descriptions of the matching conditions
+
+
+def compile_rule(definition: Dict, source: str = "") -> Rule:
+    rule_id = definition.get("id")
+    if not rule_id or not definition.get("installer_type"):
+        raise RuleError("rule needs an 'id' and an 'installer_type'")
+    conditions = [_compile_condition(c) for c in _as_list(definition.get("conditions") or [])]
+    if not conditions:
+        raise RuleError(f"rule {rule_id!r} has no conditions")
+    return Rule(
+        id=str(rule_id),
+        installer_type=definition["installer_type"],
+        conditions=conditions,
+        install_switches=list(definition.get("install_switches") or []),
+        uninstall_switches=list(definition.get("uninstall_switches") or []),
+        confidence=float(definition.get("confidence", 0.8)),
+        min_score=float(definition.get("min_score", 1.0)),
+        priority=int(definition.get("priority", 0)),
+        source=source,
+    )
+
+
+class RuleEngine:
+    """A compiled rule set: one marker regex, one head read and one tail read per file."""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        markers = [m for rule in rules for c in rule.conditions for m in c.patterns()]
+
+        scanned = {n for m in markers if m.at is None for n in m.needles}
+        self.window = max([m.within for m in markers if m.at is None] +
+                          [m.at + len(n) for m in markers if m.at is not None and m.at >= 0 for n in m.needles] + [0])
+        self.tail_size = max([-m.at for m in markers if m.at is not None and m.at < 0] + [0])
+        # Longest first so the alternation prefers "NVIDIA Corporation" over "NVIDIA"; the shorter
+        # needles starting inside a hit are credited through _contained instead of a second pass
+        ordered = sorted(scanned, key=lambda n: (-len(n), n))
+        self._scanner = re.compile(b"|".join(re.escape(n) for n in ordered)) if ordered else None
+        self._contained: Dict[bytes, List[Tuple[bytes, int]]] = {
+            n: [(other, n.find(other)) for other in ordered if other != n and other in n] for n in ordered
+        }
+
+    def scan(self, file_path: Path, pe=None) -> ScanContext:
+        try:
+            size = file_path.stat().st_size
+        except OSError:
+            size = 0
+        ctx = ScanContext(file_name=file_path.name, head=self._read_head(file_path), size=size)
+        if self.tail_size and size:
+            ctx.tail = self._read_tail(file_path, min(self.tail_size, size))
+
+        if self._scanner is not None:
+            # Resume one byte after each hit (not after its end) so overlapping needles are found too
+            hits, search, head = ctx.hits, self._scanner.search, ctx.head
+            m = search(head)
+            while m is not None:
+                needle, offset = m.group(), m.start()
+                if needle not in hits:
+                    hits[needle] = offset
+                for other, index in self._contained[needle]:
+                    if other not in hits:
+                        hits[other] = offset + index
+                m = search(head, offset + 1)
+
+        if pe is not None:
+            try:
+                ctx.sections = [s.Name.rstrip(b"\x00") for s in pe.sections]
+            except Exception as e:
+                logger.debug(f"Failed to read PE sections: {e}")
+            ctx.version = pe_version_strings(pe)
+        return ctx
+
+    def _read_head(self, file_path: Path) -> bytes:
+        if not self.window:
+            return b""
+        try:
+            return get_fingerprint_service().read_head(file_path, self.window)
+        except Exception:
+            return b""
+
+    @staticmethod
+    def _read_tail(file_path: Path, size: int) -> bytes:
+        try:
+            with open(file_path, "rb") as f:
+                f.seek(-size, os.SEEK_END)
+                return f.read(size)
+        except OSError:
+            return b""
+
+    def evaluate(self, file_path: Path, pe=None, scan: Optional[ScanContext] = None) -> List[RuleMatch]:
+        """All applicable rules for the file, best first."""
+        ctx = scan or self.scan(file_path, pe)
+        matches = []
+        for order, rule in enumerate(self.rules):
+            matched = [c for c in rule.conditions if c.matches(ctx)]
+            score = sum(c.weight for c in matched)
+            if matched and score >= rule.min_score:
+                matches.append((-score, -rule.priority, order, RuleMatch(rule, score, [repr(c) for c in matched])))
+        return [m for *_, m in sorted(matches, key=lambda t: t[:3])]
+
+
+# --- Sources and hot reload ---
+
+def user_rules_dir() -> Path:
+    app_data = os.getenv('APPDATA')
+    if app_data:
+        return Path(app_data) / "FaserF" / "SwitchCraft" / "rules"
+    return Path.home() / ".switchcraft" / "rules"
+
+
+def load_rule_file(path: Path) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    rules = data.get("rules", []) if isinstance(data, dict) else data
+    if not isinstance(rules, list):
+        raise RuleError(f"{path}: 'rules' must be a list")
+    return rules
+
+
+def compile_rules(definitions: Iterable[Tuple[str, Dict]]) -> RuleEngine:
+    """
+    Builds an engine from (source, definition) pairs in load order. A later definition with the
+    same id replaces the earlier one in place; invalid definitions are logged and skipped.
+    """
+    merged: Dict[str, Rule] = {}
+    for source, definition in definitions:
+        rule_id = str(definition.get("id", "")) if isinstance(definition, dict) else ""
+        if isinstance(definition, dict) and definition.get("enabled") is False:
+            merged.pop(rule_id, None)
+            continue
+        try:
+            rule = compile_rule(definition, source)
+        except (RuleError, TypeError, ValueError, AttributeError) as e:
+            logger.warning(f"Skipping invalid installer rule {rule_id or '?'} from {source}: {e}")
+            continue
+        merged[rule.id] = rule
+    return RuleEngine(list(merged.values()))
+
+
+class RuleSet:
+    """Rule sources with change detection; engine() returns an up-to-date compiled engine."""
+
+    def __init__(self, bundled_path: Optional[Path] = BUNDLED_RULES_PATH, user_dir: Optional[Path] = None,
+                 community_db=None):
+        self.bundled_path = bundled_path
+        self.user_dir = user_dir
+        self.community_db = community_db
+        self._lock = threading.Lock()
+        self._engine: Optional[RuleEngine] = None
+        self._state = None
+        self._checked = 0.0
+
+    def _files(self) -> List[Path]:
+        files = [self.bundled_path] if self.bundled_path else []
+        if self.user_dir and self.user_dir.is_dir():
+            files += sorted(self.user_dir.glob("*.json"))
+        return files
+
+    def _current_state(self, files: List[Path]):
+        stamps = []
+        for path in files:
+            try:
+                stat = path.stat()
+                stamps.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append((str(path), None, None))
+        revision = self.community_db.rules_revision() if self.community_db is not None else None
+        return tuple(stamps), revision
+
+    def _definitions(self, files: List[Path]) -> Iterable[Tuple[str, Dict]]:
+        for path in files:
+            try:
+                for definition in load_rule_file(path):
+                    yield path.name, definition
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to load installer rules from {path}: {e}")
+        if self.community_db is not None:
+            for definition in self.community_db.get_rules():
+                yield "community", definition
+
+    def engine(self) -> RuleEngine:
+        now = time.monotonic()
+        with self._lock:
+            if self._engine is not None and now - self._checked < RELOAD_CHECK_SECONDS:
+                return self._engine
+            self._checked = now
+            files = self._files()
+            state = self._current_state(files)
+            if self._engine is None or state != self._state:
+                self._engine = compile_rules(self._definitions(files))
+                self._state = state
+                logger.debug(f"Compiled {len(self._engine.rules)} installer rules")
+            return self._engine
+
+    def reload(self) -> RuleEngine:
+        with self._lock:
+            self._engine = None
+        return self.engine()
+
+
+_rule_set: Optional[RuleSet] = None
+_rule_set_lock = threading.Lock()
+
+
+def get_rule_set() -> RuleSet:
+    """Process-wide rule set: bundled rules, the user rules folder and community DB rules."""
+    global _rule_set
+    with _rule_set_lock:
+        if _rule_set is None:
+            from switchcraft.services.community_db_service import get_community_db
+            _rule_set = RuleSet(user_dir=user_rules_dir(), community_db=get_community_db())
+        return _rule_set
+
+
+def get_rule_engine() -> RuleEngine:
+    return get_rule_set().engine()
@@ -0,0 +1,559 @@
+"""
+Synthetic installer corpus for the analyzer benchmarks.
+
+Every sample is generated from code (seeded filler, no third-party installers), so the
+corpus is byte-identical on every machine and is rebuilt instead of checked in:
+
+    PE executables with NSIS / Inno Setup / InstallShield / WiX Burn / 7-Zip SFX markers
+      at the start, middle or end of files from 1 MB up to 4 GB (sparse)
+    MSI databases (OLE compound files with Property and File tables, optional cabinet)
+    MSI wrappers (EXE with an embedded MSI; .7z when py7zr is installed)
+    macOS flat packages (XAR), UDIF disk images (DMG) and zipped .app bundles
+
+    switchcraft bench corpus <dir> [--profile quick|standard|full]
+"""
+import json
+import logging
+import plistlib
+import random
+import struct
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from switchcraft.utils import udif
+
+logger = logging.getLogger(__name__)
+
+try:
+    import py7zr
+except ImportError:  # Optional: 7z wrapper samples are skipped
+    py7zr = None
+
+MB = 1024 * 1024
+GB = 1024 * MB
+MANIFEST_NAME = "corpus.json"
+# Bump when a builder changes, so stale corpora are regenerated
+CORPUS_VERSION = 1
+SEED = 20240501
+# Files beyond this size are sparse: seeded filler up front, a hole after it
+FILLER_LIMIT = 8 * MB
+
+PROFILES = ("quick", "standard", "full")
+
+
+@dataclass
+class CorpusCase:
+    name: str
+    analyzer: str  # exe | msi | macos | universal
+    file: str  # relative to the corpus directory
+    size: int = 0
+
+
+def _filler(size: int, seed: int = SEED) -> bytes:
+    return random.Random(seed + size).randbytes(size)
+
+
+def _resolve_offset(offset: Union[str, int], size: int, head_end: int) -> int:
+    if offset == "head":
+        return head_end
+    if offset == "mid":
+        return size // 2
+    if offset == "tail":
+        return size - 4096
+    return int(offset)
+
+
+# --- PE ---
+
+# family -> (section names, markers)
+PE_FAMILIES: Dict[str, Tuple[Tuple[str, ...], Tuple[bytes, ...]]] = {
+    "nsis": ((".text", ".ndata"), (b"NullsoftInst",)),
+    "inno": ((".text", ".itext"), (b"Inno Setup Setup Data (6.2.2)",)),
+    "installshield": ((".text", ".rsrc"), (b"InstallShield",)),
+    "wix": ((".text", ".rdata"), (b"WixBundleManifest",)),
+    "7zsfx": ((".text",), (b"7z\xBC\xAF\x27\x1C",)),
+    "plain": ((".text", ".rdata"), ()),  # no framework markers: every probe runs to the end
+}
+
+_SECTION_RAW = 0x200
+_HEADERS_SIZE = 0x400
+
+
+def build_pe_headers(sections: Sequence[str]) -> bytes:
+    """DOS + PE32 headers followed by one zeroed 512-byte raw block per section."""
+    dos = bytearray(0x80)
+    dos[0:2] = b"MZ"
+    struct.pack_into("<I", dos, 0x3C, 0x80)
+
+    coff = struct.pack("<HHIIIHH", 0x14C, len(sections), 0, 0, 0, 0xE0, 0x0102)
+    size_of_image = 0x1000 * (len(sections) + 1)
+    optional = struct.pack(
+        "<HBB" + "I" * 9 + "H" * 6 + "I" * 4 + "HH" + "I" * 6,
+        0x10B, 14, 0, _SECTION_RAW, _SECTION_RAW * (len(sections) - 1), 0,
+        0x1000, 0x1000, 0x2000, 0x400000, 0x1000, 0x200,
+        6, 0, 0, 0, 6, 0,
+        0, size_of_image, _HEADERS_SIZE, 0,
+        2, 0x8140,
+        0x100000, 0x1000, 0x100000, 0x1000, 0, 16,
+    ) + b"\0" * (16 * 8)
+
+    table = b""
+    for i, name in enumerate(sections):
+        characteristics = 0x60000020 if name == ".text" else 0xC0000040
+        table += struct.pack("<8sIIIIIIHHI", name.encode(), _SECTION_RAW, 0x1000 * (i + 1), _SECTION_RAW,
+                             _HEADERS_SIZE + _SECTION_RAW * i, 0, 0, 0, 0, characteristics)
+
+    headers = (bytes(dos) + b"PE\0\0" + coff + optional + table).ljust(_HEADERS_SIZE, b"\0")
+    return headers + b"\0" * (_SECTION_RAW * len(sections))
+
+
+def write_pe(path: Path, size: int, sections: Sequence[str] = (".text",),
+             markers: Iterable[Tuple[Union[str, int], bytes]] = ()):
+    """PE file of `size` bytes with markers at 'head', 'mid', 'tail' or absolute offsets."""
+    headers = build_pe_headers(sections)
+    with open(path, "wb") as f:
+        f.write(headers)
+        f.write(_filler(min(size, FILLER_LIMIT) - len(headers)))
+        for offset, marker in markers:
+            f.seek(_resolve_offset(offset, size, len(headers)))
+            f.write(marker)
+        f.truncate(size)  # sparse beyond FILLER_LIMIT
+
+
+# --- OLE compound file (MSI) ---
+
+_FREESECT = 0xFFFFFFFF
+_ENDOFCHAIN = 0xFFFFFFFE
+_FATSECT = 0xFFFFFFFD
+_DIFSECT = 0xFFFFFFFC
+_NOSTREAM = 0xFFFFFFFF
+_SECTOR = 512
+_MINI_SECTOR = 64
+_MINI_CUTOFF = 4096
+_DIR_ENTRY = struct.Struct("<64sHBBIII16sIQQIQ")
+
+
+def _sectors(n: int, size: int = _SECTOR) -> int:
+    return -(-n // size)
+
+
+def _dir_entry(name: str, kind: int, start: int, size: int, left=_NOSTREAM, right=_NOSTREAM, child=_NOSTREAM) -> bytes:
+    encoded = name.encode("utf-16-le")
+    if len(encoded) > 62:
+        raise ValueError(f"Compound file names are limited to 31 characters: {name!r}")
+    return _DIR_ENTRY.pack(encoded, len(encoded) + 2, kind, 1, left, right, child, b"", 0, 0, 0, start, size)
+
+
+def build_compound_file(streams: Dict[str, bytes]) -> bytes:
+    """
+    Minimal OLE compound file (version 3, 512-byte sectors) with the given root-level streams.
+    Streams under 4 KB live in the mini stream, like in files written by Windows.
+    """
+    names = sorted(streams, key=lambda n: (len(n), n.upper()))  # directory order of the red-black tree
+    big = [n for n in names if len(streams[n]) >= _MINI_CUTOFF]
+    small = [n for n in names if 0 < len(streams[n]) < _MINI_CUTOFF]
+
+    # Mini stream and its allocation table
+    mini_start, mini_data, minifat = {}, b"", []
+    for n in small:
+        data = streams[n]
+        first = len(mini_data) // _MINI_SECTOR
+        count = _sectors(len(data), _MINI_SECTOR)
+        mini_start[n] = first
+        minifat += list(range(first + 1, first + count)) + [_ENDOFCHAIN]
+        mini_data += data.ljust(count * _MINI_SECTOR, b"\0")
+
+    # Regular sectors: big streams, mini stream, mini FAT, directory
+    runs: List[Tuple[str, bytes]] = [(n, streams[n]) for n in big]
+    runs.append(("<mini>", mini_data))
+    runs.append(("<minifat>", struct.pack(f"<{len(minifat)}I", *minifat)))
+    dir_count = len(names) + 1
+    runs.append(("<dir>", b"\0" * (_sectors(dir_count, 4) * _SECTOR)))
+
+    start, fat, pos = {}, [], 0
+    for key, data in runs:
+        count = _sectors(len(data))
+        start[key] = pos if count else _ENDOFCHAIN
+        fat += list(range(pos + 1, pos + count)) + ([_ENDOFCHAIN] if count else [])
+        pos += count
+    data_sectors = pos
+
+    fat_count = difat_count = 0
+    while True:
+        total = data_sectors + fat_count + difat_count
+        need_fat = _sectors(total, 128)
+        need_difat = _sectors(max(0, need_fat - 109), 127)
+        if (need_fat, need_difat) == (fat_count, difat_count):
+            break
+        fat_count, difat_count = need_fat, need_difat
+    fat_ids = list(range(data_sectors, data_sectors + fat_count))
+    difat_ids = list(range(data_sectors + fat_count, data_sectors + fat_count + difat_count))
+    fat += [_FATSECT] * fat_count + [_DIFSECT] * difat_count
+    fat += [_FREESECT] * (fat_count * 128 - len(fat))
+
+    # Directory: root entry + a balanced tree of the streams (all black)
+    ids = {n: i + 1 for i, n in enumerate(names)}
+    links: Dict[str, Tuple[int, int]] = {}
+
+    def tree(lo: int, hi: int) -> int:
+        if lo >= hi:
+            return _NOSTREAM
+        mid = (lo + hi) // 2
+        links[names[mid]] = (tree(lo, mid), tree(mid + 1, hi))
+        return ids[names[mid]]
+
+    root_child = tree(0, len(names))
+    directory = _dir_entry("Root Entry", 5, start["<mini>"] if mini_data else _ENDOFCHAIN, len(mini_data), child=root_child)
+    for n in names:
+        data = streams[n]
+        first = start[n] if n in start else mini_start.get(n, _ENDOFCHAIN)
+        directory += _dir_entry(n, 2, first, len(data), *links[n])
+    # Unused entries must not look like tree links
+    unused = _DIR_ENTRY.pack(b"", 0, 0, 0, _NOSTREAM, _NOSTREAM, _NOSTREAM, b"", 0, 0, 0, 0, 0)
+    directory += unused * (_sectors(dir_count, 4) * 4 - dir_count)
+
+    header_difat = fat_ids[:109] + [_FREESECT] * (109 - len(fat_ids[:109]))
+    header = struct.pack(
+        "<8s16sHHHHH6sIIIIIIIII",
+        b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1", b"", 0x3E, 3, 0xFFFE, 9, 6, b"",
+        0, fat_count, start["<dir>"], 0, _MINI_CUTOFF,
+        start["<minifat>"], _sectors(len(minifat) * 4), difat_ids[0] if difat_ids else _ENDOFCHAIN, difat_count,
+    ) + struct.pack("<109I", *header_difat)
+
+    body = bytearray()
+    for key, data in runs:
+        body += (directory if key == "<dir>" else data).ljust(_sectors(len(data)) * _SECTOR, b"\0")
+    body += struct.pack(f"<{len(fat)}I", *fat)
+    rest = fat_ids[109:]
+    for i, sector in enumerate(difat_ids):
+        chunk = rest[i * 127:(i + 1) * 127]
+        chunk += [_FREESECT] * (127 - len(chunk))
+        body += struct.pack("<128I", *chunk, difat_ids[i + 1] if i + 1 < len(difat_ids) else _ENDOFCHAIN)
+    return header + bytes(body)
+
+
+_NAME_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz._"
+MSI_STRING_KEY = 0x0100 | 0x0800 | 0x2000 | 72
+MSI_STRING = 0x0100 | 0x0800 | 0x1000 | 255
+MSI_INT4 = 0x0100 | 0x1000 | 4
+MSI_INT2 = 0x0100 | 0x1000 | 2
+
+
+def encode_stream_name(name: str, table: bool = True) -> str:
+    """Inverse of msi_database.decode_stream_name."""
+    out = [chr(0x4840)] if table else []
+    i = 0
+    while i < len(name):
+        c1 = _NAME_CHARSET.index(name[i])
+        if i + 1 < len(name) and name[i + 1] in _NAME_CHARSET:
+            out.append(chr(0x3800 + c1 + (_NAME_CHARSET.index(name[i + 1]) << 6)))
+            i += 2
+        else:
+            out.append(chr(0x4800 + c1))
+            i += 1
+    return "".join(out)
+
+
+def build_msi_streams(properties: Dict[str, str], files: int = 10, cabinet: int = 0) -> Dict[str, bytes]:
+    """Streams of an MSI database with Property and File tables (and an embedded cabinet stream)."""
+    tables = {
+        "Property": ([("Property", MSI_STRING_KEY), ("Value", MSI_STRING)], list(properties.items())),
+        "File": (
+            [("File", MSI_STRING_KEY), ("FileName", MSI_STRING), ("FileSize", MSI_INT4), ("Sequence", MSI_INT2)],
+            [(f"file{i}", f"FILE{i}~1.DLL|File{i}.dll", 1000 + i, i + 1) for i in range(files)],
+        ),
+    }
+    strings: Dict[str, int] = {}
+
+    def ref(value):
+        if value is None:
+            return 0
+        return strings.setdefault(value, len(strings) + 1)
+
+    columns = [(t, i, col, typ) for t, (cols, _) in tables.items() for i, (col, typ) in enumerate(cols, 1)]
+
+    def pack(cols, rows):
+        out = bytearray()
+        for idx, (_, typ) in enumerate(cols):
+            for row in rows:
+                value = row[idx]
+                if typ & 0x0800:
+                    out += ref(value).to_bytes(2, "little")
+                elif (typ & 0xFF) == 4:
+                    out += struct.pack("<I", 0 if value is None else value + 0x80000000)
+                else:
+                    out += struct.pack("<H", 0 if value is None else value + 0x8000)
+        return bytes(out)
+
+    streams = {encode_stream_name("_Columns"): pack(
+        [("Table", MSI_STRING_KEY), ("Number", MSI_INT2), ("Name", MSI_STRING), ("Type", MSI_INT2)], columns)}
+    for table, (cols, rows) in tables.items():
+        streams[encode_stream_name(table)] = pack(cols, rows)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    if len(encoded) > 0xFFFF:
+        raise ValueError("Too many strings for 2-byte string references")
+    pool = struct.pack("<HH", 65001, 0) + b"".join(struct.pack("<HH", len(b), 1) for b in encoded)
+    streams[encode_stream_name("_StringPool")] = pool
+    streams[encode_stream_name("_StringData")] = b"".join(encoded)
+    if cabinet:
+        streams[encode_stream_name("Data1.cab", table=False)] = b"MSCF" + _filler(cabinet - 4)
+    return streams
+
+
+SAMPLE_PROPERTIES = {
+    "ProductName": "Contoso Bench",
+    "ProductVersion": "1.2.3",
+    "Manufacturer": "Contoso",
+    "ProductCode": "{0B1E5C3A-0000-4000-8000-00000000BE7C}",
+    "UpgradeCode": "{0B1E5C3A-0000-4000-8000-0000000C0DE5}",
+}
+
+
+# --- macOS ---
+
+PACKAGE_INFO = b'<pkg-info identifier="com.contoso.bench" version="1.2.3"/>'
+DISTRIBUTION = (b'<?xml version="1.0" encoding="utf-8"?><installer-gui-script minSpecVersion="1">'
+                b'<title>Contoso Bench</title><pkg-ref id="com.contoso.bench"/></installer-gui-script>')
+INFO_PLIST = plistlib.dumps({
+    "CFBundleIdentifier": "com.contoso.bench",
+    "CFBundleShortVersionString": "1.2.3",
+    "CFBundleName": "Contoso Bench",
+    "CFBundlePackageType": "APPL",
+})
+
+
+def build_xar(entries: Sequence[Tuple[str, Optional[bytes], bool]]) -> bytes:
+    """entries: (path, data or None for a directory, zlib-compress) -> XAR archive."""
+    heap = bytearray()
+    tree: Dict = {}
+    for path, data, compress in entries:
+        node = tree
+        parts = path.split("/")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {"children": {}})["children"]
+        entry = node.setdefault(parts[-1], {"children": {}})
+        if data is not None:
+            stored = zlib.compress(data) if compress else data
+            entry["data"] = (len(heap), len(stored), len(data),
+                             "application/x-gzip" if compress else "application/octet-stream")
+            heap += stored
+
+    counter = [0]
+
+    def render(nodes) -> str:
+        xml = ""
+        for name, entry in nodes.items():
+            counter[0] += 1
+            xml += f'<file id="{counter[0]}"><name>{name}</name>'
+            if "data" in entry:
+                offset, length, size, style = entry["data"]
+                xml += (f'<type>file</type><data><offset>{offset}</offset><length>{length}</length>'
+                        f'<size>{size}</size><encoding style="{style}"/></data>')
+            else:
+                xml += "<type>directory</type>"
+            xml += render(entry["children"]) + "</file>"
+        return xml
+
+    toc = f'<?xml version="1.0" encoding="UTF-8"?><xar><toc>{render(tree)}</toc></xar>'.encode()
+    toc_c = zlib.compress(toc)
+    return struct.pack(">4sHHQQI", b"xar!", 28, 1, len(toc_c), len(toc), 1) + toc_c + bytes(heap)
+
+
+_HFS_BLOCK = 4096
+
+
+def build_hfs(files: Dict[str, bytes]) -> bytes:
+    """HFS+ volume with the catalog in blocks 1-2 (one leaf node) and file data after it."""
+    folders = {"": 2}
+    next_cnid = [16]
+    records = [(1, "Volume", "folder", 2, None)]
+    data = bytearray()
+
+    def folder_id(path):
+        if path not in folders:
+            parent, _, name = path.rpartition("/")
+            pid = folder_id(parent)
+            folders[path] = next_cnid[0]
+            next_cnid[0] += 1
+            records.append((pid, name, "folder", folders[path], None))
+        return folders[path]
+
+    for path, content in files.items():
+        parent, _, name = path.rpartition("/")
+        pid = folder_id(parent)
+        blocks = max(1, _sectors(len(content), _HFS_BLOCK))
+        records.append((pid, name, "file", next_cnid[0], (len(content), 3 + len(data) // _HFS_BLOCK, blocks)))
+        next_cnid[0] += 1
+        data += content.ljust(blocks * _HFS_BLOCK, b"\0")
+
+    records.sort(key=lambda r: (r[0], r[1]))
+    leaf = bytearray(_HFS_BLOCK)
+    offsets, pos = [], 14
+    for parent, name, kind, cnid, fork in records:
+        key = struct.pack(">HIH", 6 + 2 * len(name), parent, len(name)) + name.encode("utf-16-be")
+        if kind == "folder":
+            body = struct.pack(">hHII", 1, 0, 0, cnid).ljust(88, b"\0")
+        else:
+            size, start, blocks = fork
+            body = struct.pack(">hHII", 2, 0, 0, cnid).ljust(88, b"\0")
+            body += struct.pack(">QII", size, 0, blocks) + struct.pack(">II", start, blocks) + b"\0" * 56
+            body += b"\0" * 80
+        offsets.append(pos)
+        leaf[pos:pos + len(key + body)] = key + body
+        pos += len(key + body)
+    offsets.append(pos)
+    struct.pack_into(">IIbBH", leaf, 0, 0, 0, -1, 1, len(records))
+    for i, off in enumerate(offsets):
+        struct.pack_into(">H", leaf, _HFS_BLOCK - 2 * (i + 1), off)
+
+    header_node = bytearray(_HFS_BLOCK)
+    struct.pack_into(">IIbBH", header_node, 0, 0, 0, 1, 0, 3)
+    struct.pack_into(">HIIIIH", header_node, 14, 1, 1, len(records), 1, 1, _HFS_BLOCK)
+
+    volume_header = bytearray(512)
+    volume_header[0:2] = b"H+"
+    struct.pack_into(">I", volume_header, 40, _HFS_BLOCK)
+    struct.pack_into(">QII", volume_header, 272, 2 * _HFS_BLOCK, 0, 2)
+    struct.pack_into(">II", volume_header, 288, 1, 2)
+    block0 = bytearray(_HFS_BLOCK)
+    block0[1024:1536] = volume_header
+    return bytes(block0) + bytes(header_node) + bytes(leaf) + bytes(data)
+
+
+def build_udif(disk: bytes, chunk_sectors: int = 2048) -> bytes:
+    """zlib-compressed UDIF image (.dmg) of a raw disk; all-zero chunks are stored as holes."""
+    data_fork = bytearray()
+    chunks = []
+    total_sectors = len(disk) // 512
+    for sector in range(0, total_sectors, chunk_sectors):
+        count = min(chunk_sectors, total_sectors - sector)
+        piece = disk[sector * 512:(sector + count) * 512]
+        if not piece.strip(b"\0"):
+            chunks.append((udif.CHUNK_ZERO, sector, count, len(data_fork), 0))
+            continue
+        stored = zlib.compress(piece, 1)
+        chunks.append((udif.CHUNK_ZLIB, sector, count, len(data_fork), len(stored)))
+        data_fork += stored
+    chunks.append((udif.CHUNK_END, total_sectors, 0, len(data_fork), 0))
+
+    mish = struct.pack(">4sIQQQII24s136sI", b"mish", 1, 0, total_sectors, 0, 0, 0, b"", b"", len(chunks))
+    for ctype, sector, count, offset, length in chunks:
+        mish += struct.pack(">IIQQQQ", ctype, 0, sector, count, offset, length)
+    xml = plistlib.dumps({"resource-fork": {"blkx": [
+        {"Name": "disk image (Apple_HFS : 1)", "ID": "0", "Attributes": "0x0050", "Data": mish},
+    ]}})
+    koly = struct.pack(">4sIII QQQQQ II16s II128s QQ", b"koly", 4, 512, 1, 0, 0, len(data_fork), 0, 0,
+                       1, 1, b"", 0, 0, b"", len(data_fork), len(xml)).ljust(512, b"\0")
+    return bytes(data_fork) + xml + koly
+
+
+# --- Corpus ---
+
+def _size_label(size: int) -> str:
+    return f"{size // GB}g" if size >= GB else f"{size // MB}m"
+
+
+def corpus_cases(profile: str = "quick") -> List[Tuple[CorpusCase, Dict]]:
+    """(case, builder spec) pairs of a profile; 'standard' and 'full' extend the smaller ones."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown corpus profile: {profile}")
+    specs: List[Tuple[CorpusCase, Dict]] = []
+
+    def add(analyzer, file, size, **spec):
+        name = f"{analyzer}-{Path(file).stem}" if analyzer == "universal" else Path(file).stem
+        specs.append((CorpusCase(name, analyzer, file, size), spec))
+
+    for family in PE_FAMILIES:
+        add("exe", f"exe-{family}-head-1m.exe", MB, kind="pe", family=family, offset="head")
+    add("exe", "exe-msiwrap-1m.exe", MB, kind="wrapper")
+    add("msi", "msi-small.msi", 0, kind="msi", files=10, cabinet=0)
+    add("macos", "pkg-small.pkg", 0, kind="pkg", payload=MB)
+    add("macos", "dmg-app-1m.dmg", 0, kind="dmg", payload=MB)
+    add("macos", "zip-app-1m.zip", 0, kind="zip_app", payload=MB)
+    add("universal", "exe-plain-head-1m.exe", MB, kind="shared")
+    add("universal", "exe-msiwrap-1m.exe", MB, kind="shared")
+    if py7zr is not None:
+        add("universal", "msiwrap.7z", 0, kind="sevenzip")
+
+    if profile in ("standard", "full"):
+        for size in (64 * MB, 512 * MB):
+            for family in ("inno", "7zsfx"):
+                for offset in ("head", "mid"):
+                    add("exe", f"exe-{family}-{offset}-{_size_label(size)}.exe", size, kind="pe", family=family, offset=offset)
+            add("exe", f"exe-plain-head-{_size_label(size)}.exe", size, kind="pe", family="plain", offset="head")
+        add("universal", "exe-plain-head-512m.exe", 512 * MB, kind="shared")
+        add("msi", "msi-large.msi", 0, kind="msi", files=5000, cabinet=32 * MB)
+        add("macos", "dmg-app-64m.dmg", 0, kind="dmg", payload=64 * MB)
+        add("macos", "zip-app-64m.zip", 0, kind="zip_app", payload=64 * MB)
+
+    if profile == "full":
+        add("exe", "exe-inno-mid-4g.exe", 4 * GB, kind="pe", family="inno", offset="mid")
+        add("exe", "exe-plain-head-4g.exe", 4 * GB, kind="pe", family="plain", offset="head")
+        add("universal", "exe-plain-head-4g.exe", 4 * GB, kind="shared")
+    return specs
+
+
+def _build(path: Path, spec: Dict, size: int):
+    kind = spec["kind"]
+    if kind == "pe":
+        sections, markers = PE_FAMILIES[spec["family"]]
+        write_pe(path, size, sections, [(spec["offset"], m) for m in markers])
+    elif kind == "msi":
+        path.write_bytes(build_compound_file(build_msi_streams(SAMPLE_PROPERTIES, spec["files"], spec["cabinet"])))
+    elif kind == "wrapper":
+        msi = build_compound_file(build_msi_streams(SAMPLE_PROPERTIES))
+        write_pe(path, size, (".text", ".rsrc"), [(256 * 1024, msi)])
+    elif kind == "pkg":
+        path.write_bytes(build_xar([
+            ("Distribution", DISTRIBUTION, True),
+            ("Bench.pkg/PackageInfo", PACKAGE_INFO, True),
+            ("Bench.pkg/Payload", _filler(spec["payload"]), False),
+        ]))
+    elif kind == "dmg":
+        path.write_bytes(build_udif(build_hfs({
+            "Contoso Bench.app/Contents/Info.plist": INFO_PLIST,
+            "Contoso Bench.app/Contents/MacOS/Contoso Bench": _filler(spec["payload"]),
+        })))
+    elif kind == "zip_app":
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as z:
+            z.writestr("Contoso Bench.app/Contents/MacOS/Contoso Bench", _filler(spec["payload"]))
+            z.writestr("Contoso Bench.app/Contents/Info.plist", INFO_PLIST)
+    elif kind == "sevenzip":
+        msi = build_compound_file(build_msi_streams(SAMPLE_PROPERTIES))
+        with py7zr.SevenZipFile(path, "w") as z:
+            z.writestr(msi, "setup.msi")
+    else:
+        raise ValueError(f"Unknown corpus sample kind: {kind}")
+
+
+def generate_corpus(directory: Union[str, Path], profile: str = "quick") -> List[CorpusCase]:
+    """Builds (or reuses) the samples of a profile in `directory` and writes the manifest."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_path = directory / MANIFEST_NAME
+    built = {}
+    if manifest_path.exists():
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("version") == CORPUS_VERSION:
+                built = manifest.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    cases = []
+    for case, spec in corpus_cases(profile):
+        path = directory / case.file
+        if spec["kind"] != "shared":
+            if not (path.exists() and built.get(case.file) == path.stat().st_size):
+                logger.info(f"Building {case.file}")
+                _build(path, spec, case.size)
+            built[case.file] = path.stat().st_size
+        case.size = built[case.file]
+        cases.append(case)
+
+    manifest_path.write_text(json.dumps({"version": CORPUS_VERSION, "files": built}, indent=2), encoding="utf-8")
+    return cases
@@ -0,0 +1,308 @@
+"""
+Analyzer benchmark runner.
+
+Each corpus case runs in a fresh (spawned) process so peak memory and cold-start costs are
+per case: one discarded warm-up run, then `repeat` measured runs with the file head cache
+cleared before each. Per run we record wall time, bytes read and read calls (OS I/O
+counters; mmap access shows up as page faults instead) and page faults; per case the peak
+RSS growth over the process baseline and a short result string, so a "faster" analyzer
+that stopped detecting something is caught as well.
+
+Results are compared against a stored baseline JSON: `switchcraft bench run --baseline
+bench.json --save-baseline` records one, `--check` exits non-zero on regressions (CI).
+"""
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from switchcraft.benchmarks.corpus import CorpusCase
+
+logger = logging.getLogger(__name__)
+
+BASELINE_VERSION = 1
+DEFAULT_REPEAT = 5
+
+# metric -> (allowed relative growth, absolute slack). Wall time is noisy on shared CI runners;
+# bytes read and read calls are deterministic for a given corpus and platform.
+DEFAULT_TOLERANCES = {
+    "wall_ms": (0.5, 5.0),
+    "bytes_read": (0.1, 64 * 1024),
+    "read_calls": (0.1, 8),
+    "page_faults": (0.5, 256),
+    "peak_rss_mb": (0.25, 8.0),
+}
+
+SKIPPED = "skipped"
+
+
+class BenchSkip(Exception):
+    """The case cannot run in this installation (e.g. optional addon missing)."""
+
+
+@dataclass
+class CaseResult:
+    name: str
+    analyzer: str
+    size: int
+    result: str
+    runs: int = 0
+    wall_ms: Optional[float] = None
+    wall_ms_min: Optional[float] = None
+    bytes_read: Optional[int] = None
+    read_calls: Optional[int] = None
+    page_faults: Optional[int] = None
+    peak_rss_mb: Optional[float] = None
+    samples: List[Dict] = field(default_factory=list)
+
+
+# --- Analyzer entry points (return a short, stable description of the result) ---
+
+def _exe_runner() -> Callable[[Path], str]:
+    from switchcraft.analyzers.exe import ExeAnalyzer
+    return lambda path: ExeAnalyzer().analyze(path).installer_type
+
+
+def _msi_runner() -> Callable[[Path], str]:
+    from switchcraft.analyzers.msi import MsiAnalyzer
+
+    def run(path):
+        info = MsiAnalyzer().analyze(path)
+        return f"{info.installer_type}|{info.product_name}|{info.product_version}"
+    return run
+
+
+def _macos_runner() -> Callable[[Path], str]:
+    from switchcraft.analyzers.macos import MacOSAnalyzer
+
+    def run(path):
+        info = MacOSAnalyzer().analyze(path)
+        return f"{info.installer_type}|{info.bundle_id}|{info.product_version}"
+    return run
+
+
+def _universal_runner() -> Callable[[Path], str]:
+    from switchcraft.analyzers import universal
+    if universal._real_module is None:
+        raise BenchSkip("advanced addon not installed")
+
+    def run(path):
+        analyzer = universal.UniversalAnalyzer()
+        corrupted, _ = analyzer.check_corruption(path)
+        return f"corrupted={corrupted}|{analyzer.check_wrapper(path)}"
+    return run
+
+
+ANALYZERS: Dict[str, Callable[[], Callable[[Path], str]]] = {
+    "exe": _exe_runner,
+    "msi": _msi_runner,
+    "macos": _macos_runner,
+    "universal": _universal_runner,
+}
+
+
+# --- Process counters (None where the platform has no equivalent) ---
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    class _IoCounters(ctypes.Structure):
+        _fields_ = [(name, ctypes.c_ulonglong) for name in (
+            "ReadOperationCount", "WriteOperationCount", "OtherOperationCount",
+            "ReadTransferCount", "WriteTransferCount", "OtherTransferCount")]
+
+    class _MemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+    _kernel32 = ctypes.WinDLL("kernel32")
+    _kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+
+    def _memory_counters() -> _MemoryCounters:
+        counters = _MemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        _kernel32.K32GetProcessMemoryInfo(_kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+        return counters
+
+    def io_counters() -> Dict[str, Optional[int]]:
+        io = _IoCounters()
+        _kernel32.GetProcessIoCounters(_kernel32.GetCurrentProcess(), ctypes.byref(io))
+        return {"bytes_read": io.ReadTransferCount, "read_calls": io.ReadOperationCount,
+                "page_faults": _memory_counters().PageFaultCount}
+
+    def current_rss() -> Optional[int]:
+        return _memory_counters().WorkingSetSize
+
+    def peak_rss() -> Optional[int]:
+        return _memory_counters().PeakWorkingSetSize
+else:
+    import resource
+
+    def io_counters() -> Dict[str, Optional[int]]:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        counters = {"bytes_read": None, "read_calls": None, "page_faults": usage.ru_minflt + usage.ru_majflt}
+        try:
+            with open("/proc/self/io", "rb") as f:  # Linux; rchar includes page-cache hits
+                fields = dict(line.split(b":") for line in f.read().splitlines())
+            counters["bytes_read"] = int(fields[b"rchar"])
+            counters["read_calls"] = int(fields[b"syscr"])
+        except (OSError, KeyError, ValueError):
+            pass
+        return counters
+
+    def current_rss() -> Optional[int]:
+        try:
+            with open("/proc/self/statm", "rb") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def peak_rss() -> Optional[int]:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def _delta(before: Dict, after: Dict, key: str) -> Optional[int]:
+    if before[key] is None or after[key] is None:
+        return None
+    return after[key] - before[key]
+
+
+def _median(values) -> Optional[int]:
+    values = [v for v in values if v is not None]
+    return statistics.median_low(values) if values else None  # an observed count, not an average
+
+
+def measure_case(case: CorpusCase, corpus_dir: str, repeat: int = DEFAULT_REPEAT) -> CaseResult:
+    """Runs one case in the current process. Use run_benchmarks() for per-case processes."""
+    from switchcraft.services.fingerprint_service import get_fingerprint_service
+
+    path = Path(corpus_dir) / case.file
+    try:
+        run = ANALYZERS[case.analyzer]()
+    except BenchSkip as e:
+        return CaseResult(case.name, case.analyzer, case.size, f"{SKIPPED}: {e}")
+
+    cache = get_fingerprint_service()
+    rss_before = current_rss()
+    samples, result = [], ""
+    for i in range(repeat + 1):  # run 0 warms up lazy imports and is discarded
+        cache.clear()
+        before = io_counters()
+        start = time.perf_counter()
+        result = run(path)
+        wall = (time.perf_counter() - start) * 1000
+        after = io_counters()
+        if i:
+            samples.append({"wall_ms": round(wall, 3), **{k: _delta(before, after, k) for k in before}})
+
+    peak = peak_rss()
+    walls = [s["wall_ms"] for s in samples]
+    return CaseResult(
+        name=case.name,
+        analyzer=case.analyzer,
+        size=case.size,
+        result=result,
+        runs=len(samples),
+        wall_ms=round(statistics.median(walls), 3),
+        wall_ms_min=min(walls),
+        bytes_read=_median(s["bytes_read"] for s in samples),
+        read_calls=_median(s["read_calls"] for s in samples),
+        page_faults=_median(s["page_faults"] for s in samples),
+        peak_rss_mb=round(max(0, peak - rss_before) / (1024 * 1024), 2) if peak and rss_before else None,
+        samples=samples,
+    )
+
+
+def run_benchmarks(cases: List[CorpusCase], corpus_dir, repeat: int = DEFAULT_REPEAT, isolate: bool = True,
+                   on_result: Optional[Callable[[CaseResult], None]] = None) -> List[CaseResult]:
+    """Measures every case; with isolate=True each one gets a freshly spawned interpreter."""
+    results = []
+    for case in cases:
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                result = pool.submit(measure_case, case, str(corpus_dir), repeat).result()
+        else:
+            result = measure_case(case, str(corpus_dir), repeat)
+        results.append(result)
+        if on_result:
+            on_result(result)
+    return results
+
+
+# --- Baselines ---
+
+def environment() -> Dict[str, str]:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": str(os.cpu_count()),
+    }
+
+
+def save_baseline(path, results: List[CaseResult], profile: str = ""):
+    data = {
+        "version": BASELINE_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "profile": profile,
+        "environment": environment(),
+        "results": {r.name: {k: v for k, v in asdict(r).items() if k != "samples"} for r in results},
+    }
+    Path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def load_baseline(path) -> Dict:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version in {path}")
+    return data
+
+
+def compare(results: List[CaseResult], baseline: Dict, tolerances: Optional[Dict] = None) -> List[Dict]:
+    """
+    One row per case and metric: status is 'ok', 'improved', 'regression', 'changed' (different
+    analysis result) or 'new' (not in the baseline). Metrics missing on either side are skipped.
+    """
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    rows = []
+    base_results = baseline.get("results", {})
+    for r in results:
+        if r.result.startswith(SKIPPED):
+            continue
+        base = base_results.get(r.name)
+        if base is None:
+            rows.append({"case": r.name, "metric": "", "baseline": None, "current": None, "ratio": None, "status": "new"})
+            continue
+        if base.get("result") != r.result:
+            rows.append({"case": r.name, "metric": "result", "baseline": base.get("result"), "current": r.result,
+                         "ratio": None, "status": "changed"})
+        for metric, (relative, slack) in tolerances.items():
+            old, new = base.get(metric), getattr(r, metric, None)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + relative) + slack:
+                status = "regression"
+            elif new < old / (1 + relative) - slack:
+                status = "improved"
+            else:
+                status = "ok"
+            rows.append({"case": r.name, "metric": metric, "baseline": old, "current": new,
+                         "ratio": round(new / old, 3) if old else None, "status": status})
+    return rows
+
+
+def has_failures(rows: List[Dict]) -> bool:
+    return any(row["status"] in ("regression", "changed") for row in rows)
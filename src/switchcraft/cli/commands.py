@@ -113,6 +113,56 @@ def analyze(filepath, output_json):
     """
     _run_analysis(filepath, output_json)
 
+@cli.command()
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('-o', '--output', type=click.Path(file_okay=False), help="Folder for JSON results (default: DIRECTORY/.switchcraft)")
+@click.option('--workers', default=2, show_default=True, help="Parallel analyses")
+@click.option('--settle', default=2.0, show_default=True, help="Seconds a file must stay unchanged before it is analyzed")
+@click.option('--recursive/--no-recursive', default=True, help="Watch sub-folders")
+@click.option('--once', is_flag=True, help="Process the files currently in DIRECTORY and exit")
+@click.option('--no-history', is_flag=True, help="Do not add results to the analysis history")
+def watch(directory, output, workers, settle, recursive, once, no_history):
+    """
+    Watch a folder and analyze every installer dropped into it.
+
+    \b
+    DESCRIPTION:
+        Runs as a daemon (Ctrl+C to stop). New or changed installers are
+        picked up via filesystem notifications (inotify on Linux, polling
+        elsewhere), analyzed once their writes have finished and written
+        to the output folder as JSON. Files with identical content are
+        analyzed only once; progress survives restarts.
+
+    \b
+    EXAMPLES:
+        switchcraft watch \\\\fileserver\\inbox -o D:\\Results
+        switchcraft watch ./inbox --workers 4
+        switchcraft watch ./inbox --once
+    """
+    from switchcraft.services.watch_service import HotFolderWatcher
+
+    def on_result(path, document):
+        info = document.get("info") or {}
+        if document.get("error"):
+            print(f"[red]x {path.name}: {document['error']}[/red]")
+        else:
+            switches = " ".join(info.get("install_switches") or []) or "no silent switches"
+            print(f"[green]+ {path.name}[/green]: {info.get('installer_type')} - {switches}")
+
+    watcher = HotFolderWatcher(
+        directory, output_dir=output, workers=workers, settle_seconds=settle,
+        recursive=recursive, record_history=not no_history, on_result=on_result
+    )
+    if not once:
+        print(f"Watching [bold]{watcher.watch_dir}[/bold] (Ctrl+C to stop)")
+    try:
+        stats = watcher.run(once=once)
+    except KeyboardInterrupt:
+        watcher.stop()
+        stats = watcher.stats
+    print(f"Analyzed: {stats.analyzed}, duplicates: {stats.duplicates}, unchanged: {stats.skipped}, failed: {stats.failed}")
+    print(f"Results: {watcher.output_dir}")
+
 # --- Configuration Group ---
 @cli.group()
 def config():
@@ -705,6 +755,269 @@ def logs_export(output):
         print("[red]Failed to export logs.[/red]")
         sys.exit(1)
 
+# --- Community Database ---
+@cli.group()
+def community():
+    """
+    Manage the community switch database.
+
+    \b
+    SUBCOMMANDS:
+        pull    Apply new entries and installer rules from the feed
+
+    \b
+    EXAMPLES:
+        switchcraft community pull
+        switchcraft community pull --feed-url https://example.com/switchcraft/feed
+    """
+    pass
+
+@community.command('pull')
+@click.option('--feed-url', default=None, help="Feed URL (default: the CommunityDBFeedUrl setting)")
+@click.option('--json', 'output_json', is_flag=True, help="Output in JSON format")
+def community_pull(feed_url, output_json):
+    """
+    Apply new entries and installer rules from the feed.
+
+    \b
+    DESCRIPTION:
+        Requests the deltas newer than the local feed version, applies
+        them and appends them to the local journal, so they survive
+        restarts. Installer rules shipped with the entries are picked up
+        by the EXE analyzer automatically. Suitable for a scheduled task.
+
+    \b
+    OPTIONS:
+        --feed-url URL    Feed to pull from (default: CommunityDBFeedUrl)
+        --json            Output the result in JSON format
+
+    \b
+    EXAMPLES:
+        switchcraft community pull
+        switchcraft community pull --json
+    """
+    from switchcraft.services.community_db_service import get_community_db
+
+    feed_url = feed_url or SwitchCraftConfig.get_value("CommunityDBFeedUrl")
+    if not feed_url:
+        print("[red]No feed configured. Set CommunityDBFeedUrl or pass --feed-url.[/red]")
+        sys.exit(1)
+
+    db = get_community_db()
+    try:
+        applied = db.pull_updates(feed_url)
+    except Exception as e:
+        print(f"[red]Failed to pull community updates: {e}[/red]")
+        sys.exit(1)
+
+    result = {"applied": applied, "version": db.feed_version, "entries": len(db.entries), "rules": len(db.get_rules())}
+    if output_json:
+        print(json.dumps(result))
+        return
+    print(f"[green]Applied {applied} update(s).[/green] Feed version {result['version']}, "
+          f"{result['entries']} entries, {result['rules']} installer rules.")
+
+# --- Stats ---
+@cli.command()
+@click.option('--store', 'store_url', default=None, help="Shared store URL (default: SC_SHARED_STORE or the server's store)")
+@click.option('--json', 'output_json', is_flag=True, help="Output in JSON format")
+@click.option('--prometheus', is_flag=True, help="Output in Prometheus text format")
+def stats(store_url, output_json, prometheus):
+    """
+    Show performance metrics published by the SwitchCraft server.
+
+    \b
+    DESCRIPTION:
+        Every server worker and analysis worker process publishes its
+        counters and timings (analysis phases, external tools, Graph/Intune
+        calls, Winget backends, uploads, request latency) to the shared
+        store. This command merges them and prints count, average and
+        p50/p95 per metric.
+
+    \b
+    OPTIONS:
+        --store URL     Shared store to read, e.g. sqlite:////data/shared_state.db
+        --json          Output rows in JSON format
+        --prometheus    Output in Prometheus text format
+
+    \b
+    EXAMPLES:
+        switchcraft stats
+        switchcraft stats --store sqlite:////data/shared_state.db --json
+    """
+    from switchcraft.server.shared_store import default_store_url, open_store
+    from switchcraft.utils import metrics
+
+    store = open_store(store_url or default_store_url())
+    try:
+        snapshot = metrics.collect_published(store, registry=None)
+    finally:
+        store.close()
+
+    if prometheus:
+        click.echo(metrics.render_prometheus(snapshot), nl=False)
+        return
+    rows = metrics.summarize(snapshot)
+    if output_json:
+        print(json.dumps(rows, default=str))
+        return
+    if not rows:
+        print("[yellow]No metrics published yet.[/yellow]")
+        return
+
+    table = Table(title="SwitchCraft Metrics")
+    for column in ("Metric", "Labels", "Count", "Avg (s)", "p50 (s)", "p95 (s)", "Value"):
+        table.add_column(column)
+    fmt = lambda v: "" if v is None else str(v)  # noqa: E731
+    for row in rows:
+        table.add_row(
+            row["metric"], row["labels"], fmt(row.get("count")), fmt(row.get("avg_s")),
+            fmt(row.get("p50_s")), fmt(row.get("p95_s")), fmt(row.get("value")),
+        )
+    print(table)
+
+# --- Benchmarks ---
+@cli.group()
+def bench():
+    """
+    Benchmark the analyzers on a synthetic installer corpus.
+
+    \b
+    DESCRIPTION:
+        Generates reproducible PE, MSI, PKG, DMG, ZIP and 7z samples and
+        measures wall time, bytes read, read calls, page faults and peak
+        memory per analyzer. Results can be stored as a baseline and
+        compared in CI.
+
+    \b
+    SUBCOMMANDS:
+        corpus    Generate the sample corpus
+        run       Run the benchmarks (and compare with a baseline)
+
+    \b
+    EXAMPLES:
+        switchcraft bench run
+        switchcraft bench run --baseline bench.json --save-baseline
+        switchcraft bench run --baseline bench.json --check
+    """
+    pass
+
+def _default_corpus_dir() -> Path:
+    import tempfile
+    return Path(tempfile.gettempdir()) / "switchcraft_bench_corpus"
+
+@bench.command('corpus')
+@click.argument('directory', type=click.Path(file_okay=False), required=False)
+@click.option('--profile', type=click.Choice(['quick', 'standard', 'full']), default='quick', show_default=True,
+              help="quick: 1 MB samples; standard: up to 512 MB; full: adds 4 GB sparse files")
+def bench_corpus(directory, profile):
+    """
+    Generate the benchmark corpus.
+
+    \b
+    DESCRIPTION:
+        Samples are built from code, so every machine gets the same bytes.
+        Large executables are sparse files and use little disk space.
+        Existing samples are reused.
+
+    \b
+    EXAMPLES:
+        switchcraft bench corpus
+        switchcraft bench corpus ./corpus --profile full
+    """
+    from switchcraft.benchmarks.corpus import generate_corpus
+    directory = Path(directory) if directory else _default_corpus_dir()
+    cases = generate_corpus(directory, profile)
+    print(f"[green]{len(cases)} benchmark cases ready in {directory}[/green]")
+
+@bench.command('run')
+@click.option('--corpus', 'corpus_dir', type=click.Path(file_okay=False), help="Corpus folder (generated if needed)")
+@click.option('--profile', type=click.Choice(['quick', 'standard', 'full']), default='quick', show_default=True,
+              help="Corpus profile")
+@click.option('-k', 'pattern', help="Only run cases whose name contains this text")
+@click.option('--repeat', default=5, show_default=True, help="Measured runs per case")
+@click.option('--in-process', is_flag=True, help="Run all cases in this process (faster; peak memory is not per case)")
+@click.option('--baseline', type=click.Path(dir_okay=False), help="Baseline JSON file")
+@click.option('--save-baseline', is_flag=True, help="Write the results to --baseline instead of comparing")
+@click.option('--check', is_flag=True, help="Exit with code 1 on regressions or changed results (CI)")
+@click.option('--time-tolerance', type=float, default=None, help="Allowed wall time growth (0.5 = +50%)")
+@click.option('--json', 'output_json', is_flag=True, help="Output in JSON format")
+def bench_run(corpus_dir, profile, pattern, repeat, in_process, baseline, save_baseline, check, time_tolerance, output_json):
+    """
+    Run the analyzer benchmarks.
+
+    \b
+    DESCRIPTION:
+        Each case runs in its own process: one warm-up run, then REPEAT
+        measured runs. Reported values are medians. With --baseline the
+        results are compared against a stored run; --check turns
+        regressions into a non-zero exit code.
+
+    \b
+    EXAMPLES:
+        switchcraft bench run -k exe --repeat 10
+        switchcraft bench run --profile standard --baseline bench.json --save-baseline
+        switchcraft bench run --baseline bench.json --check --json
+    """
+    from dataclasses import asdict
+    from switchcraft.benchmarks.corpus import generate_corpus
+    from switchcraft.benchmarks import runner
+
+    if (save_baseline or check) and not baseline:
+        raise click.UsageError("--save-baseline and --check need --baseline FILE")
+
+    corpus_dir = Path(corpus_dir) if corpus_dir else _default_corpus_dir()
+    cases = generate_corpus(corpus_dir, profile)
+    if pattern:
+        cases = [c for c in cases if pattern in c.name]
+
+    results = runner.run_benchmarks(
+        cases, corpus_dir, repeat=repeat, isolate=not in_process,
+        on_result=None if output_json else lambda r: print(f"[dim]{r.name}: {r.result if r.wall_ms is None else f'{r.wall_ms} ms'}[/dim]"),
+    )
+
+    if save_baseline:
+        runner.save_baseline(baseline, results, profile)
+
+    rows = []
+    if baseline and not save_baseline:
+        tolerances = {"wall_ms": (time_tolerance, runner.DEFAULT_TOLERANCES["wall_ms"][1])} if time_tolerance is not None else None
+        rows = runner.compare(results, runner.load_baseline(baseline), tolerances)
+
+    if output_json:
+        print(json.dumps({
+            "environment": runner.environment(),
+            "results": [{k: v for k, v in asdict(r).items() if k != "samples"} for r in results],
+            "comparison": rows,
+        }, default=str))
+    else:
+        table = Table(title="Analyzer Benchmarks")
+        for column in ("Case", "Result", "Wall (ms)", "Bytes read", "Reads", "Faults", "Peak RSS (MB)"):
+            table.add_column(column)
+        fmt = lambda v: "-" if v is None else str(v)  # noqa: E731
+        for r in results:
+            table.add_row(r.name, r.result, fmt(r.wall_ms), fmt(r.bytes_read), fmt(r.read_calls),
+                          fmt(r.page_faults), fmt(r.peak_rss_mb))
+        print(table)
+
+        flagged = [row for row in rows if row["status"] != "ok"]
+        if flagged:
+            cmp_table = Table(title=f"Compared with {baseline}")
+            for column in ("Case", "Metric", "Baseline", "Current", "Ratio", "Status"):
+                cmp_table.add_column(column)
+            for row in flagged:
+                color = "red" if row["status"] in ("regression", "changed") else "green"
+                cmp_table.add_row(row["case"], row["metric"], fmt(row["baseline"]), fmt(row["current"]),
+                                  fmt(row["ratio"]), f"[{color}]{row['status']}[/{color}]")
+            print(cmp_table)
+        elif rows:
+            print(f"[green]No regressions compared with {baseline}.[/green]")
+        if save_baseline:
+            print(f"[green]Baseline written to {baseline}[/green]")
+
+    if check and runner.has_failures(rows):
+        sys.exit(1)
+
 # --- History Group ---
 @cli.group()
 def history():
@@ -839,15 +1152,86 @@ def detection():
     \b
     SUBCOMMANDS:
         test        Test a detection rule
+        suggest     Propose detection rules for installers
 
     \b
     EXAMPLES:
         switchcraft detection test --type registry --key "HKLM\\SOFTWARE\\MyApp" --value "Version"
         switchcraft detection test --type msi --product-code "{GUID}"
         switchcraft detection test --type file --path "C:\\App\\app.exe" --version "2.0"
+        switchcraft detection suggest setup.msi
     """
     pass
 
+@detection.command('suggest')
+@click.argument('target', type=click.Path(exists=True))
+@click.option('--top', default=3, show_default=True, help="Candidates to show per installer")
+@click.option('--recursive/--no-recursive', default=True, help="Scan sub-folders when TARGET is a folder")
+@click.option('-o', '--output', type=click.Path(), help="Write all candidates to a JSON file")
+@click.option('--json', 'output_json', is_flag=True, help="Output in JSON format")
+def detection_suggest(target, top, recursive, output, output_json):
+    """
+    Propose ranked Intune detection rules for an installer or a folder.
+
+    \b
+    DESCRIPTION:
+        Mines MSI tables (ProductCode, File, Registry, Component) and
+        EXE version resources and ranks candidate rules by how uniquely
+        they identify the product. Pass a folder to backfill rules for
+        many installers in one run.
+
+    \b
+    EXAMPLES:
+        switchcraft detection suggest setup.msi
+        switchcraft detection suggest D:\\Packages --output rules.json
+        switchcraft detection suggest app.exe --json
+    """
+    from switchcraft.services.detection_rule_service import DetectionRuleSynthesizer
+
+    synthesizer = DetectionRuleSynthesizer()
+    if Path(target).is_dir():
+        results = synthesizer.synthesize_folder(target, recursive=recursive)
+    else:
+        results = {str(Path(target)): synthesizer.synthesize(target)}
+
+    data = {path: [c.to_dict() for c in candidates] for path, candidates in results.items()}
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        print(f"[green]Wrote detection candidates for {len(data)} installers to {output}[/green]")
+        return
+
+    if output_json:
+        print(json.dumps({path: items[:top] for path, items in data.items()}))
+        return
+
+    if not data:
+        print("[yellow]No installers found.[/yellow]")
+        return
+
+    for path, items in data.items():
+        if not items:
+            print(f"[yellow]{Path(path).name}: no detection rule candidates[/yellow]")
+            continue
+        table = Table(title=Path(path).name)
+        table.add_column("Score")
+        table.add_column("Type")
+        table.add_column("Rule")
+        table.add_column("Reason")
+        for item in items[:top]:
+            rule = item["rule"]
+            if item["kind"] == "msi":
+                summary = rule["productCode"]
+            elif item["kind"] == "file":
+                summary = f"{rule['path']}\\{rule['fileOrFolderName']}"
+            else:
+                summary = f"{rule['keyPath']} ({rule['valueName'] or 'default'})"
+            if rule.get("comparisonValue") or rule.get("productVersion"):
+                summary += f" >= {rule.get('comparisonValue') or rule.get('productVersion')}"
+            table.add_row(f"{item['score']:.2f}", item["kind"], summary, item["reason"])
+        print(table)
+
 @detection.command('test')
 @click.option('--type', 'rule_type', required=True,
               type=click.Choice(['registry', 'msi', 'file', 'script']),
@@ -1633,7 +2017,8 @@ def stacks_deploy(name, dry_run):
 
 # --- Library Group ---
 @cli.group()
-def library():
+@click.pass_context
+def library(ctx):
     """
     Manage local .intunewin package library.
 
@@ -1644,7 +2029,8 @@ def library():
 
     \b
     SUBCOMMANDS:
-        scan    Scan directories for .intunewin files
+        scan    Scan directories for .intunewin files (incremental index)
+        search  Search the package index by name, version or product code
         info    Show package details
 
     \b
@@ -1653,7 +2039,9 @@ def library():
         switchcraft library scan -d "C:\\Packages"
         switchcraft library info myapp.intunewin
     """
-    pass
+    from switchcraft.services.library_index_service import close_library_index
+
+    ctx.call_on_close(close_library_index)
 
 @library.command('scan')
 @click.option('--dirs', '-d', multiple=True, type=click.Path(exists=True), help="Directories to scan")
@@ -1664,7 +2052,9 @@ def library_scan(dirs, output_json):
 
     \b
     DESCRIPTION:
-        Recursively scans directories for .intunewin package files.
+        Recursively scans directories for .intunewin package files and
+        updates the persistent library index. Unchanged packages (same
+        size and modification time) are not re-read.
         By default, scans Downloads and Desktop folders.
 
     \b
@@ -1678,7 +2068,7 @@ def library_scan(dirs, output_json):
         switchcraft library scan -d "C:\\Packages" -d "D:\\IntuneApps"
         switchcraft library scan --json
     """
-    from datetime import datetime
+    from switchcraft.services.library_index_service import get_library_index
 
     # Default directories
     scan_dirs = list(dirs) if dirs else []
@@ -1691,41 +2081,86 @@ def library_scan(dirs, output_json):
         if desktop.exists():
             scan_dirs.append(str(desktop))
 
-    files = []
-    for d in scan_dirs:
-        dir_path = Path(d)
-        for f in dir_path.rglob("*.intunewin"):
-            stat = f.stat()
-            files.append({
-                "path": str(f),
-                "name": f.name,
-                "size": stat.st_size,
-                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
-            })
-
-    # Sort by modification time (newest first)
-    files.sort(key=lambda x: x['modified'], reverse=True)
+    if not scan_dirs:
+        # An empty dirs filter would list the whole shared index
+        if output_json:
+            print(json.dumps([]))
+        else:
+            print("[yellow]No directories to scan (no --dirs given, no Downloads or Desktop folder).[/yellow]")
+        return
+
+    # Incremental: only new or changed packages are re-read
+    index = get_library_index()
+    index.scan(scan_dirs)
+    files = [_library_item_to_dict(item) for item in index.query(dirs=scan_dirs)]
 
     if output_json:
         print(json.dumps(files, default=str))
     else:
-        if not files:
-            print("[yellow]No .intunewin files found.[/yellow]")
-            return
+        _print_library_table(files)
 
-        table = Table(title=f"IntuneWin Library ({len(files)} files)")
-        table.add_column("Name")
-        table.add_column("Size")
-        table.add_column("Modified")
+@library.command('search')
+@click.argument('text', required=False)
+@click.option('--name', help="Filter by app name (substring)")
+@click.option('--version', 'product_version', help="Filter by exact MSI product version")
+@click.option('--product-code', help="Filter by MSI product code")
+@click.option('--json', 'output_json', is_flag=True, help="Output in JSON format")
+def library_search(text, name, product_version, product_code, output_json):
+    """
+    Search the library index without rescanning.
 
-        for f in files[:30]:  # Limit display
-            size_mb = f['size'] / (1024 * 1024)
-            table.add_row(
-                f['name'][:40],
-                f"{size_mb:.1f} MB",
-                f['modified'][:10]
-            )
-        print(table)
+    \b
+    DESCRIPTION:
+        Queries the package index built by 'library scan'. TEXT matches
+        file name or app name; the options filter on Detection.xml metadata.
+
+    \b
+    EXAMPLES:
+        switchcraft library search chrome
+        switchcraft library search --product-code {23170F69-40C1-2702-2201-000001000000}
+        switchcraft library search --name 7-Zip --version 22.01 --json
+    """
+    from switchcraft.services.library_index_service import get_library_index
+
+    items = get_library_index().query(text=text, name=name, version=product_version, product_code=product_code)
+    files = [_library_item_to_dict(item) for item in items]
+
+    if output_json:
+        print(json.dumps(files, default=str))
+    else:
+        _print_library_table(files)
+
+def _library_item_to_dict(item):
+    return {
+        "path": item["path"],
+        "name": item["filename"],
+        "size": item["size"],
+        "modified": item["modified"].isoformat(),
+        "app_name": item.get("name"),
+        "product_code": item.get("product_code"),
+        "product_version": item.get("product_version"),
+    }
+
+def _print_library_table(files):
+    if not files:
+        print("[yellow]No .intunewin files found.[/yellow]")
+        return
+
+    table = Table(title=f"IntuneWin Library ({len(files)} files)")
+    table.add_column("Name")
+    table.add_column("Version")
+    table.add_column("Size")
+    table.add_column("Modified")
+
+    for f in files[:30]:  # Limit display
+        size_mb = f['size'] / (1024 * 1024)
+        table.add_row(
+            f['name'][:40],
+            f.get('product_version') or "",
+            f"{size_mb:.1f} MB",
+            f['modified'][:10]
+        )
+    print(table)
 
 @library.command('info')
 @click.argument('intunewin_file', type=click.Path(exists=True))
@@ -1752,8 +2187,7 @@ def library_info(intunewin_file, output_json):
         switchcraft library info myapp.intunewin
         switchcraft library info C:\\Packages\\app.intunewin --json
     """
-    import zipfile
-    from defusedxml import ElementTree as ET
+    from switchcraft.services.library_index_service import read_intunewin_metadata
 
     path = Path(intunewin_file)
     info = {
@@ -1765,32 +2199,13 @@ def library_info(intunewin_file, output_json):
     }
 
     try:
-        with zipfile.ZipFile(path, 'r') as zf:
-            # Look for Detection.xml
-            for name in zf.namelist():
-                if name.endswith('Detection.xml'):
-                    with zf.open(name) as f:
-                        tree = ET.parse(f)
-                        root = tree.getroot()
-
-                        # Extract info
-                        name_elem = root.find('.//Name')
-                        if name_elem is not None:
-                            info['name'] = name_elem.text
-
-                        setup_elem = root.find('.//SetupFile')
-                        if setup_elem is not None:
-                            info['setup_file'] = setup_elem.text
-
-                        # MSI info if available
-                        product_code = root.find('.//MsiProductCode')
-                        if product_code is not None:
-                            info['msi_info']['product_code'] = product_code.text
-
-                        product_version = root.find('.//MsiProductVersion')
-                        if product_version is not None:
-                            info['msi_info']['product_version'] = product_version.text
-                    break
+        meta = read_intunewin_metadata(path)
+        info['name'] = meta['name']
+        info['setup_file'] = meta['setup_file']
+        if meta['product_code']:
+            info['msi_info']['product_code'] = meta['product_code']
+        if meta['product_version']:
+            info['msi_info']['product_version'] = meta['product_version']
     except Exception as e:
         info['error'] = str(e)
 
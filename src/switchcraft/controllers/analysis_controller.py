@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Optional, Dict, Callable
 from pathlib import Path
@@ -8,12 +9,23 @@ from switchcraft.analyzers.msi import MsiAnalyzer
 from switchcraft.analyzers.exe import ExeAnalyzer
 from switchcraft.analyzers.macos import MacOSAnalyzer
 from switchcraft.analyzers.universal import UniversalAnalyzer
-from switchcraft.services.community_db_service import CommunityDBService
+from switchcraft.services.community_db_service import get_community_db
 from switchcraft.models import InstallerInfo
 from switchcraft.utils.config import SwitchCraftConfig
+from switchcraft.utils import metrics, tracing
 
 logger = logging.getLogger(__name__)
 
+PHASE_SECONDS = metrics.histogram("switchcraft_analysis_phase_seconds", "Duration of each analysis phase", ["phase"])
+ANALYSES_TOTAL = metrics.counter("switchcraft_analyses_total", "Completed analyses", ["outcome"])
+
+
+@contextmanager
+def _phase(name: str):
+    """Times one pipeline phase for the metrics and as a span of the analysis trace."""
+    with PHASE_SECONDS.time(phase=name), tracing.span(f"phase.{name}"):
+        yield
+
 
 @dataclass
 class AnalysisResult:
@@ -26,6 +38,41 @@ class AnalysisResult:
     silent_disabled_info: Optional[Dict] = None
     community_match: bool = False
     error: Optional[str] = None
+    trace: Optional[Dict] = None  # OTLP/JSON spans of the run, see switchcraft.utils.tracing
+
+    def to_dict(self) -> Dict:
+        return {
+            "info": self.info.to_dict() if self.info is not None else None,
+            "winget_url": self.winget_url,
+            "winget_id": self.winget_id,
+            "winget_reason": self.winget_reason,
+            "brute_force_data": self.brute_force_data,
+            "nested_data": _map_nested(self.nested_data, lambda a: a.to_dict() if isinstance(a, InstallerInfo) else a),
+            "silent_disabled_info": self.silent_disabled_info,
+            "community_match": self.community_match,
+            "error": self.error,
+            "trace": self.trace,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AnalysisResult":
+        data = dict(data)
+        info = data.pop("info", None)
+        fields = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        fields["nested_data"] = _map_nested(fields.get("nested_data"), lambda a: InstallerInfo(**a) if isinstance(a, dict) else a)
+        return cls(info=InstallerInfo(**info) if info else None, **fields)
+
+
+def _map_nested(nested_data: Optional[Dict], convert: Callable) -> Optional[Dict]:
+    """Applies convert to the 'analysis' of every nested executable (InstallerInfo <-> dict)."""
+    if not nested_data or not nested_data.get("nested_executables"):
+        return nested_data
+    nested = dict(nested_data)
+    nested["nested_executables"] = [
+        {**item, "analysis": convert(item["analysis"])} if item.get("analysis") is not None else item
+        for item in nested_data["nested_executables"]
+    ]
+    return nested
 
 
 class AnalysisController:
@@ -36,7 +83,8 @@ class AnalysisController:
 
     def __init__(self, ai_service=None):
         self.ai_service = ai_service
-        self.community_db = CommunityDBService()
+        # Shared across controllers; the DB is indexed once per process
+        self.community_db = get_community_db()
 
     def analyze_file(
         self, file_path_str: str, progress_callback: Callable[[float, str, Optional[float]], None] = None
@@ -63,8 +111,18 @@ class AnalysisController:
                 - silent_disabled_info: Optional[Dict] data about silent/disabled detection.
                 - community_match: bool indicating whether community DB switches were applied.
                 - error: Optional[str] error message when analysis could not complete.
+                - trace: Optional[Dict] OTLP/JSON trace with a span per phase, analyzer call and probe.
         """
-        path = Path(file_path_str)
+        with tracing.start_trace("AnalysisController.analyze_file", file=Path(file_path_str).name) as trace:
+            result = self._analyze_file(Path(file_path_str), progress_callback)
+            tracing.annotate(
+                installer_type=result.info.installer_type if result.info else None,
+                error=result.error,
+            )
+        result.trace = trace.to_otlp()
+        return result
+
+    def _analyze_file(self, path: Path, progress_callback) -> AnalysisResult:
         if not path.exists():
             return AnalysisResult(info=None, error="File not found")
 
@@ -82,50 +140,63 @@ class AnalysisController:
             total_analyzers = len(analyzers)
 
             # Phase 1: Standard Analyzers
-            for idx, analyzer in enumerate(analyzers):
-                report(0.1 + (0.3 * (idx / total_analyzers)), f"Running {analyzer.__class__.__name__}...")
-                if analyzer.can_analyze(path):
-                    try:
-                        info = analyzer.analyze(path)
-                        break
-                    except Exception as e:
-                        logger.error(f"Analysis failed for {analyzer.__class__.__name__}: {e}")
+            with _phase("analyzers"):
+                for idx, analyzer in enumerate(analyzers):
+                    name = analyzer.__class__.__name__
+                    report(0.1 + (0.3 * (idx / total_analyzers)), f"Running {name}...")
+                    with tracing.span(f"{name}.can_analyze"):
+                        supported = analyzer.can_analyze(path)
+                        tracing.annotate(supported=supported)
+                    if supported:
+                        try:
+                            with tracing.span(f"{name}.analyze"):
+                                info = analyzer.analyze(path)
+                                tracing.annotate(installer_type=info.installer_type if info else None)
+                            break
+                        except Exception as e:
+                            logger.error(f"Analysis failed for {name}: {e}")
 
             # Phase 2: Universal / Brute Force
             brute_force_data = None
             nested_data = None
             silent_disabled = None
-            uni = UniversalAnalyzer()
-            wrapper = uni.check_wrapper(path)
-
-            if not info or info.installer_type == "Unknown" or "Unknown" in (info.installer_type or "") or wrapper:
-                logger.info("Starting Universal Analysis...")
-                report(0.5, "Running Universal Analysis...")
-
-                if not info or "Unknown" in (info.installer_type or ""):
-                    report(0.6, "Attempting Brute Force Analysis...")
-                    bf_results = uni.brute_force_help(path)
-
-                    if bf_results.get("detected_type"):
+            with _phase("universal"):
+                uni = UniversalAnalyzer()
+                with tracing.span("UniversalAnalyzer.check_wrapper"):
+                    wrapper = uni.check_wrapper(path)
+                    tracing.annotate(wrapper=wrapper)
+
+                if not info or info.installer_type == "Unknown" or "Unknown" in (info.installer_type or "") or wrapper:
+                    logger.info("Starting Universal Analysis...")
+                    report(0.5, "Running Universal Analysis...")
+
+                    if not info or "Unknown" in (info.installer_type or ""):
+                        report(0.6, "Attempting Brute Force Analysis...")
+                        with tracing.span("UniversalAnalyzer.brute_force_help"):
+                            bf_results = uni.brute_force_help(path)
+                            tracing.annotate(detected_type=bf_results.get("detected_type"))
+
+                        if bf_results.get("detected_type"):
+                            if not info:
+                                info = InstallerInfo(file_path=str(path), installer_type=bf_results["detected_type"])
+                            else:
+                                info.installer_type = bf_results["detected_type"]
+
+                            info.install_switches = bf_results["suggested_switches"]
+                            if "MSI" in bf_results["detected_type"]:
+                                info.uninstall_switches = ["/x", "{ProductCode}"]
+
+                        brute_force_data = bf_results.get("output", "")
+                        with tracing.span("UniversalAnalyzer.detect_silent_disabled"):
+                            silent_disabled = uni.detect_silent_disabled(path, brute_force_data)
+
+                    if wrapper:
                         if not info:
-                            info = InstallerInfo(file_path=str(path), installer_type=bf_results["detected_type"])
-                        else:
-                            info.installer_type = bf_results["detected_type"]
+                            info = InstallerInfo(file_path=str(path), installer_type="Wrapper")
+                        info.installer_type += f" ({wrapper})"
 
-                        info.install_switches = bf_results["suggested_switches"]
-                        if "MSI" in bf_results["detected_type"]:
-                            info.uninstall_switches = ["/x", "{ProductCode}"]
-
-                    brute_force_data = bf_results.get("output", "")
-                    silent_disabled = uni.detect_silent_disabled(path, brute_force_data)
-
-                if wrapper:
-                    if not info:
-                        info = InstallerInfo(file_path=str(path), installer_type="Wrapper")
-                    info.installer_type += f" ({wrapper})"
-
-            if not info:
-                info = InstallerInfo(file_path=str(path), installer_type="Unknown")
+                if not info:
+                    info = InstallerInfo(file_path=str(path), installer_type="Unknown")
 
             # Phase 3: Nested Extraction
             if not info.install_switches and path.suffix.lower() == '.exe':
@@ -141,47 +212,59 @@ class AnalysisController:
                         eta = max(0, total_est - elapsed)
                     report(global_pct, message, eta)
 
-                nested_data = uni.extract_and_analyze_nested(path, progress_callback=nested_progress_handler)
+                with _phase("nested"):
+                    nested_data = uni.extract_and_analyze_nested(path, progress_callback=nested_progress_handler)
                 report(0.9, "Deep Analysis Complete")
 
             community_match = False
             # Phase 3.5: Community DB Lookup (Enhancement)
             report(0.9, "Checking Community DB...")
-            try:
-                # Use cached service instance
-                db_switches = self.community_db.get_switches_by_hash(path)
-                if not db_switches:
-                    # Fallback to name
-                    db_switches = self.community_db.get_switches_by_name(path.name)
-
-                if db_switches:
-                    if not info.install_switches:
-                        info.install_switches = db_switches
-                        community_match = True
-                    else:
-                        # Log if we found alternatives but ignored them because analyzer succeeded
-                        logger.info(f"Community DB found alternative switches: {db_switches}, but using analyzer result: {info.install_switches}")
-            except Exception as e:
-                logger.error(f"Community DB Lookup failed: {e}")
+            with _phase("community_db"):
+                try:
+                    # Use cached service instance
+                    with tracing.span("community_db.by_hash"):
+                        db_switches = self.community_db.get_switches_by_hash(path)
+                    if not db_switches and info.product_code:
+                        with tracing.span("community_db.by_product_code"):
+                            db_switches = self.community_db.get_switches_by_product_code(info.product_code)
+                    if not db_switches:
+                        # Fallback to name
+                        with tracing.span("community_db.by_name"):
+                            db_switches = self.community_db.get_switches_by_name(path.name)
+
+                    if db_switches:
+                        if not info.install_switches:
+                            info.install_switches = db_switches
+                            community_match = True
+                        else:
+                            # Log if we found alternatives but ignored them because analyzer succeeded
+                            logger.info(f"Community DB found alternative switches: {db_switches}, but using analyzer result: {info.install_switches}")
+                except Exception as e:
+                    logger.error(f"Community DB Lookup failed: {e}")
+                tracing.annotate(match=community_match)
 
             # Phase 4: Winget Search
             report(0.9, "Searching Winget...")
             winget_url = None
+            winget_id = None
+            winget_reason = None
             if SwitchCraftConfig.get_value("EnableWinget", True):
-                try:
-                    from switchcraft.services.addon_service import AddonService
-                    addon_service = AddonService()
-                    winget_mod = addon_service.import_addon_module("winget", "utils.winget")
-                    if winget_mod and info.product_name:
-                        winget = winget_mod.WingetHelper()
-                        results = winget.search_packages(info.product_name)
-                        if results:
-                            first = results[0]
-                            winget_id = first.get("Id")
-                            winget_url = winget.search_by_name(info.product_name)
-                            winget_reason = f"matched by name '{info.product_name}'"
-                except Exception as e:
-                    logger.error(f"Winget search failed: {e}")
+                with _phase("winget"):
+                    try:
+                        from switchcraft.services.addon_service import AddonService
+                        addon_service = AddonService()
+                        winget_mod = addon_service.import_addon_module("winget", "utils.winget")
+                        if winget_mod and info.product_name:
+                            winget = winget_mod.WingetHelper()
+                            results = winget.search_packages(info.product_name)
+                            if results:
+                                first = results[0]
+                                winget_id = first.get("Id")
+                                winget_url = winget.search_by_name(info.product_name)
+                                winget_reason = f"matched by name '{info.product_name}'"
+                    except Exception as e:
+                        logger.error(f"Winget search failed: {e}")
+                    tracing.annotate(winget_id=winget_id)
             else:
                 logger.info("Winget search disabled in settings.")
 
@@ -195,11 +278,14 @@ class AnalysisController:
             }
             if self.ai_service:
                 try:
-                    self.ai_service.update_context(context_data)
+                    with tracing.span("ai.update_context"):
+                        self.ai_service.update_context(context_data)
                 except Exception as e:
                     logger.error(f"AI Context update failed: {e}")
 
             report(1.0, "Analysis Complete")
+            PHASE_SECONDS.observe(time.time() - start_time, phase="total")
+            ANALYSES_TOTAL.inc(outcome="ok")
 
             return AnalysisResult(
                 info=info,
@@ -214,4 +300,5 @@ class AnalysisController:
 
         except Exception as e:
             logger.exception("Controller Analysis Error")
+            ANALYSES_TOTAL.inc(outcome="error")
             return AnalysisResult(info=None, error=str(e))
\ No newline at end of file
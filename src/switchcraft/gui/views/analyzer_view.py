@@ -13,6 +13,7 @@ import time
 # WingetHelper imported dynamically from addon
 from switchcraft.utils.i18n import i18n
 from switchcraft.utils.config import SwitchCraftConfig
+from switchcraft.utils.tracing import summarize
 from switchcraft.services.notification_service import NotificationService
 from switchcraft.services.signing_service import SigningService
 from switchcraft.utils.templates import TemplateGenerator
@@ -247,7 +248,9 @@ class AnalyzerView(ctk.CTkFrame):
                         "filename": path.name,
                         "filepath": str(path),
                         "product": result.info.product_name or "Unknown",
-                        "type": result.info.installer_type
+                        "type": result.info.installer_type,
+                        "trace_summary": summarize(result.trace),
+                        "trace_file": self.app.history_service.save_trace(result.trace)
                     })
                 except Exception:
                     logger.exception("Failed to save history")
@@ -1,9 +1,9 @@
 import customtkinter as ctk
-import hashlib
 import threading
 from pathlib import Path
 from tkinter import messagebox
 from switchcraft.services.winget_manifest_service import WingetManifestService
+from switchcraft.services.fingerprint_service import get_fingerprint_service
 
 class ManifestDialog(ctk.CTkToplevel):
     def __init__(self, parent, installer_info):
@@ -93,11 +93,7 @@ class ManifestDialog(ctk.CTkToplevel):
     def _calc_sha(self):
         try:
             path = Path(self.info.file_path)
-            h = hashlib.sha256()
-            with open(path, "rb") as f:
-                while chunk := f.read(8192):
-                    h.update(chunk)
-            sha = h.hexdigest().upper()
+            sha = get_fingerprint_service().fingerprint(path).sha256.upper()
             self.sha_val.configure(state="normal")
             self.sha_val.delete(0, "end")
             self.sha_val.insert(0, sha)
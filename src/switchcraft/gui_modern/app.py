@@ -442,7 +442,7 @@ class ModernApp:
                     items.append(
                         ft.ListTile(
                             leading=ft.Icon(icon, color=color),
-                            title=ft.Text(n["title"], weight=ft.FontWeight.BOLD if not n.get("read") else ft.FontWeight.NORMAL),
+                            title=ft.Text(n["title"] + (f" ({n['count']})" if n.get("count", 1) > 1 else ""), weight=ft.FontWeight.BOLD if not n.get("read") else ft.FontWeight.NORMAL),
                             subtitle=ft.Text(n.get("message", ""), size=12),
                             trailing=ft.Text(n["timestamp"].strftime("%H:%M") if "timestamp" in n and n.get("timestamp") else "", size=10, color="GREY_400"),
                             on_click=lambda _, nid=n["id"]: self._mark_notification_read(nid)
@@ -981,6 +981,11 @@ class ModernApp:
             return
 
         if e.data == "close":
+            try:
+                from switchcraft.services.library_index_service import close_library_index
+                close_library_index()
+            except Exception as ex:
+                logger.debug(f"Failed to close library index: {ex}")
             try:
                 # Handle Flet API evolution (old vs new properties)
                 if hasattr(self.page, "window"):
@@ -1296,7 +1301,7 @@ class ModernApp:
                 items.append(
                     ft.ListTile(
                         leading=ft.Icon(icon, color=color),
-                        title=ft.Text(n["title"], weight=ft.FontWeight.BOLD if not n.get("read") else ft.FontWeight.NORMAL),
+                        title=ft.Text(n["title"] + (f" ({n['count']})" if n.get("count", 1) > 1 else ""), weight=ft.FontWeight.BOLD if not n.get("read") else ft.FontWeight.NORMAL),
                         subtitle=ft.Text(n["message"]),
                         trailing=ft.Text(n["timestamp"].strftime("%H:%M") if "timestamp" in n else "", size=10),
                         on_click=lambda _, nid=n["id"]: self._mark_read(nid)
@@ -0,0 +1,54 @@
+import json
+
+import flet as ft
+
+from switchcraft.utils.i18n import i18n
+from switchcraft.utils.tracing import timeline
+
+# Timeline bars are scaled to this width; spans shorter than a pixel still get a sliver
+TRACE_WIDTH = 520
+TRACE_MAX_ROWS = 300
+
+
+def build_trace_timeline(trace, on_copy):
+    """
+    Flame-style timeline: one bar per span, indented by nesting, offset and sized by time.
+    on_copy receives the trace as OTLP/JSON text for the "Copy Trace (JSON)" button.
+    """
+    rows = timeline(trace)
+    total = max((r["start_ms"] + r["duration_ms"] for r in rows), default=0) or 1
+    scale = TRACE_WIDTH / total
+    colors = ["BLUE_700", "TEAL_700", "INDIGO_400", "CYAN_700", "BLUE_GREY_500"]
+
+    bars = []
+    for r in rows[:TRACE_MAX_ROWS]:
+        details = ", ".join(f"{k}={v}" for k, v in r["attributes"].items())
+        tooltip = f"{r['name']}: {r['duration_ms']:.1f} ms" + (f"\n{details}" if details else "")
+        if r["error"]:
+            tooltip += f"\n{r['error']}"
+        bars.append(ft.Row([
+            ft.Container(width=r["start_ms"] * scale),
+            ft.Container(
+                width=max(2, r["duration_ms"] * scale), height=14, border_radius=2, tooltip=tooltip,
+                bgcolor="RED_700" if r["error"] else colors[r["depth"] % len(colors)],
+            ),
+            ft.Text(f"{'  ' * r['depth']}{r['name']}  {r['duration_ms']:.0f} ms", size=11, font_family="Consolas",
+                    color="RED_200" if r["error"] else None),
+        ], spacing=6))
+    if len(rows) > TRACE_MAX_ROWS:
+        bars.append(ft.Text(f"... {len(rows) - TRACE_MAX_ROWS} more", size=11, italic=True, color="GREY_400"))
+
+    return ft.ExpansionTile(
+        title=ft.Row([ft.Icon(ft.Icons.TIMELINE), ft.Text(i18n.get("analysis_trace") or "Analysis Timeline")], alignment=ft.MainAxisAlignment.START),
+        subtitle=ft.Text(i18n.get("analysis_trace_summary", count=len(rows), total=int(total)) or f"{len(rows)} steps, {int(total)} ms in total", size=12),
+        controls=[
+            ft.Container(
+                content=ft.Column(bars, spacing=2, scroll=ft.ScrollMode.AUTO),
+                height=min(400, 18 * len(bars) + 20), bgcolor="BLACK26", padding=10, border_radius=5, width=float("inf")
+            ),
+            ft.TextButton(
+                i18n.get("copy_trace_json") or "Copy Trace (JSON)", icon=ft.Icons.COPY,
+                on_click=lambda _: on_copy(json.dumps(trace))
+            ),
+        ]
+    )
@@ -4,6 +4,7 @@ import logging
 import asyncio
 import inspect
 from switchcraft.utils.i18n import i18n
+from switchcraft.utils.task_scheduler import POOL_INTERACTIVE, get_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -440,19 +441,23 @@ class ViewMixin:
         finally:
             pass
 
-    def _run_in_background(self, target, *args, **kwargs):
+    def _run_in_background(self, target, *args, task_key=None, pool=POOL_INTERACTIVE, **kwargs):
         """
         Run a function in the background, handling web/desktop differences.
-        On Desktop: Starts a new daemon thread.
+        On Desktop: Queues it on the shared bounded task scheduler.
         On Web: Uses page.run_task (which is async safe in WASM).
 
         Parameters:
             target: The function to run
             *args: Arguments for the function
+            task_key: Optional key; a newer task with the same key on this view supersedes
+                this one (dropped if queued, current_token() cancelled if running)
+            pool: Scheduler pool (POOL_INTERACTIVE, POOL_BACKGROUND or POOL_IO)
             **kwargs: Keyword arguments for the function
-        """
-        import threading
 
+        Returns:
+            TaskHandle on desktop, None on web.
+        """
         page = getattr(self, "app_page", None) or getattr(self, "page", None)
 
         if IS_WEB and page and hasattr(page, "run_task"):
@@ -474,9 +479,14 @@ class ViewMixin:
                 # Fallback to sync call if run_task is missing on web (shouldn't happen)
                 target(*args, **kwargs)
             else:
-                # Desktop: Use traditional threading
-                logger.debug(f"Desktop mode: Starting thread for '{target.__name__}'")
-                threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True).start()
+                # Desktop: bounded shared pools instead of a thread per call
+                logger.debug(f"Desktop mode: Scheduling '{target.__name__}' on {pool} pool")
+                return get_scheduler().submit(target, *args, owner=self, key=task_key, pool=pool, **kwargs)
+        return None
+
+    def _cancel_background(self, task_key=None):
+        """Cancel this view's background task for task_key, or all of them (e.g. when the view is left)."""
+        return get_scheduler().cancel(self, task_key)
 
     def _open_dialog_safe(self, dlg):
         """
@@ -3,20 +3,24 @@ import threading
 import logging
 import shutil
 import ctypes
+import json
 
 import requests
+import secrets
 import tempfile
 from pathlib import Path
 
 from switchcraft.controllers.analysis_controller import AnalysisController, AnalysisResult
 from switchcraft.utils.i18n import i18n
 from switchcraft.utils.config import SwitchCraftConfig
+from switchcraft.utils.tracing import summarize
 from switchcraft.services.notification_service import NotificationService
 from switchcraft.services.signing_service import SigningService
 from switchcraft.utils.templates import TemplateGenerator
 from switchcraft.services.intune_service import IntuneService
 from switchcraft.services.winget_manifest_service import WingetManifestService
 from switchcraft.services.addon_service import AddonService
+from switchcraft.gui_modern.controls.trace_timeline import build_trace_timeline
 from switchcraft.gui_modern.utils.file_picker_helper import FilePickerHelper
 from switchcraft.gui_modern.utils.flet_compat import create_tabs
 from switchcraft.gui_modern.utils.view_utils import ViewMixin
@@ -43,6 +47,8 @@ class ModernAnalyzerView(ft.Column, ViewMixin):
 
         # State holder for current analysis info (needed for save callbacks)
         self.current_info = None
+        # Sent with web uploads so the upload registry only hands this session its own files
+        self._upload_token = secrets.token_urlsafe(16)
 
         # UI Components
         self.drop_text = ft.Text(i18n.get("drag_drop") or "Drag & Drop Installer Here", size=20, weight=ft.FontWeight.BOLD)
@@ -234,7 +240,7 @@ class ModernAnalyzerView(ft.Column, ViewMixin):
                 # Web Mode: Upload first
                 self._show_snack("Uploading for analysis...", "BLUE")
                 # Flet file picker upload - endpoint in app.py is /upload
-                self.file_picker.upload(e.files, upload_url="/upload", method="POST")
+                self.file_picker.upload(e.files, upload_url=f"/upload?token={self._upload_token}", method="POST")
 
     def _on_file_upload(self, e):
         if e.error:
@@ -264,25 +270,17 @@ class ModernAnalyzerView(ft.Column, ViewMixin):
             except Exception as ex:
                 logger.warning(f"Failed to parse server upload response: {ex}")
 
-        # Fallback to local reconstruction if server response missing/invalid
-            # Reconstruct (Basic cleanup matching app.py logic)
-            import uuid
-            fname = e.file_name
-            clean_name = "".join(x for x in fname if x.isalnum() or x in "-_.").lstrip(".")
-            # Add short UUID to avoid local collisions if multiple uploads happen rapidly
-            if clean_name:
-                parts = clean_name.rsplit(".", 1)
-                if len(parts) > 1:
-                    clean_name = f"{parts[0]}_{uuid.uuid4().hex[:8]}.{parts[1]}"
-                else:
-                    clean_name = f"{clean_name}_{uuid.uuid4().hex[:8]}"
-            else:
-                clean_name = f"upload_{uuid.uuid4().hex[:8]}.bin"
-
-            analysis_path = str(Path(tempfile.gettempdir()) / "switchcraft_uploads" / clean_name)
-            logger.info(f"Falling back to reconstructed path (with UUID): {analysis_path}")
+        # Fallback: the upload may have been handled by another server worker; look it up
+        # in the shared upload registry by its browser-side name and this session's token
+        if not analysis_path:
+            try:
+                from switchcraft.server.shared_store import find_upload
+                analysis_path = find_upload(e.file_name, self._upload_token)
+                logger.info(f"Falling back to registered upload path: {analysis_path}")
+            except Exception as ex:
+                logger.warning(f"Upload registry lookup failed: {ex}")
 
-        if Path(analysis_path).exists():
+        if analysis_path and Path(analysis_path).exists():
             self.start_analysis(analysis_path, cleanup_path=analysis_path)
         else:
             self._show_snack("Upload finished but file path could not be verified.", "RED")
@@ -481,6 +479,24 @@ class ModernAnalyzerView(ft.Column, ViewMixin):
 
         threading.Thread(target=_run, daemon=True).start()
 
+    def _analyze(self, filepath, on_progress) -> AnalysisResult:
+        """
+        Runs the analysis in a server worker process when a job queue is available (web
+        server), polling it for progress; in-process otherwise (desktop).
+        """
+        from switchcraft.server.job_queue import get_job_queue
+        queue = get_job_queue()
+        if queue is None:
+            return self.controller.analyze_file(filepath, progress_callback=on_progress)
+
+        owner = getattr(self.app_page, "switchcraft_session", {}).get("username", "User")
+        job = queue.submit(owner, {"path": str(filepath), "file_name": Path(filepath).name})
+        logger.info(f"Submitted analysis job {job['id']} for {Path(filepath).name}")
+        job = queue.wait(job["id"], on_update=lambda j: on_progress(j["progress"], j["message"] or j["status"]))
+        if job and job["status"] == "done":
+            return AnalysisResult.from_dict(job["result"])
+        return AnalysisResult(info=None, error=(job or {}).get("error") or "Analysis job did not complete")
+
     def start_analysis(self, filepath, cleanup_path=None):
         if self.analyzing:
             return
@@ -524,7 +540,7 @@ class ModernAnalyzerView(ft.Column, ViewMixin):
                             self._safe_update()
                     self._run_task_safe(update_ui)
 
-                result = self.controller.analyze_file(filepath, progress_callback=on_progress)
+                result = self._analyze(filepath, on_progress)
 
                 def finish_analysis():
                     self.status_text.value = "Analysis Complete"
@@ -592,7 +608,10 @@ class ModernAnalyzerView(ft.Column, ViewMixin):
                  "product": info.product_name or "Unknown",
                  "version": info.product_version or "Unknown",
                  "status": "Analyzed",
-                 "manufacturer": info.manufacturer
+                 "manufacturer": info.manufacturer,
+                 # The full trace can hold thousands of spans; it goes to a side file
+                 "trace_summary": summarize(result.trace),
+                 "trace_file": h_service.save_trace(result.trace)
              }
              h_service.add_entry(entry)
         except Exception as ex:
@@ -825,6 +844,10 @@ class ModernAnalyzerView(ft.Column, ViewMixin):
             )
         )
 
+        # 12b. Analysis Timeline (where the time went)
+        if isinstance(result.trace, dict):
+            self.results_column.controls.append(build_trace_timeline(result.trace, self._copy_to_clipboard))
+
         # 13. Install Commands (Inline) (Was Manual Commands Dialog)
         path = info.file_path
         switches = " ".join(info.install_switches)
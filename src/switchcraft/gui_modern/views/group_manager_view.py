@@ -2,11 +2,11 @@ import flet as ft
 from switchcraft.utils.i18n import i18n
 from switchcraft.gui_modern.nav_constants import NavIndex
 import logging
-import threading
 import requests
 from switchcraft.services.intune_service import IntuneService
 from switchcraft.utils.config import SwitchCraftConfig
 from switchcraft.gui_modern.utils.view_utils import ViewMixin
+from switchcraft.utils.task_scheduler import current_token
 
 logger = logging.getLogger(__name__)
 
@@ -267,7 +267,7 @@ class GroupManagerView(ft.Column, ViewMixin):
                         logger.error(f"Failed to update UI with error: {ui_ex}")
                 self._run_task_safe(show_critical_error)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg, task_key="load")
 
     def _update_table(self):
         """Update the groups list UI. Must be called on UI thread."""
@@ -388,7 +388,10 @@ class GroupManagerView(ft.Column, ViewMixin):
                     escaped_query = query.replace("'", "''")
                     filter_str = f"startswith(displayName, '{escaped_query}')"
 
-                    self.groups = self.intune_service.list_groups(self.token, filter_query=filter_str)
+                    groups = self.intune_service.list_groups(self.token, filter_query=filter_str)
+                    if current_token().cancelled:
+                        return  # A newer search replaced this one
+                    self.groups = groups
                     self.filtered_groups = self.groups # Result is already filtered
 
                     self._run_task_safe(lambda: [
@@ -404,7 +407,7 @@ class GroupManagerView(ft.Column, ViewMixin):
                         self.update()
                     ])
 
-            threading.Thread(target=_bg, daemon=True).start()
+            self._run_in_background(_bg, task_key="search")
 
         except Exception as ex:
             logger.error(f"Error in search: {ex}", exc_info=True)
@@ -492,7 +495,7 @@ class GroupManagerView(ft.Column, ViewMixin):
                         # Catch all exceptions including KeyboardInterrupt to prevent unhandled thread exceptions
                         logger.exception("Unexpected error in group creation background thread")
 
-                threading.Thread(target=_bg, daemon=True).start()
+                self._run_in_background(_bg)
 
             dlg = ft.AlertDialog(
                 title=ft.Text(i18n.get("create_new_group") or "Create New Group"),
@@ -556,7 +559,7 @@ class GroupManagerView(ft.Column, ViewMixin):
                             except Exception:
                                 pass
                         self._run_task_safe(show_error)
-                threading.Thread(target=_bg, daemon=True).start()
+                self._run_in_background(_bg)
 
             group_name = self.selected_group.get('displayName', 'Unknown')
             dlg = ft.AlertDialog(
@@ -651,7 +654,7 @@ class GroupManagerView(ft.Column, ViewMixin):
                     # Marshal error UI update to main thread
                     msg = i18n.get("msg_member_remove_failed", error=ex) or f"Failed to remove member: {ex}"
                     self._run_task_safe(lambda: self._show_snack(msg, "RED"))
-            threading.Thread(target=_bg, daemon=True).start()
+            self._run_in_background(_bg)
 
         def load_members():
             """Load members list - must be called after dialog is created and opened."""
@@ -712,7 +715,7 @@ class GroupManagerView(ft.Column, ViewMixin):
                             logger.error(f"Error showing error message in members dialog: {ex2}", exc_info=True)
                     self._run_task_safe(show_error)
 
-            threading.Thread(target=_bg, daemon=True).start()
+            self._run_in_background(_bg)
 
         def show_add_dialog(e):
             """Show nested dialog for adding members."""
@@ -775,7 +778,7 @@ class GroupManagerView(ft.Column, ViewMixin):
                                 logger.error(f"Error showing search error: {ex2}", exc_info=True)
                         self._run_task_safe(show_error)
 
-                threading.Thread(target=_bg, daemon=True).start()
+                self._run_in_background(_bg)
 
             def add_user(user_id):
                 """Add a user to the group."""
@@ -796,7 +799,7 @@ class GroupManagerView(ft.Column, ViewMixin):
                         # Marshal error UI update to main thread
                         msg = i18n.get("msg_member_add_failed", error=ex) or f"Failed to add member: {ex}"
                         self._run_task_safe(lambda: self._show_snack(msg, "RED"))
-                threading.Thread(target=_bg, daemon=True).start()
+                self._run_in_background(_bg)
 
             # Create dialog first so it can be referenced in nested functions
             add_dlg = ft.AlertDialog(
@@ -1,6 +1,7 @@
 import flet as ft
 from datetime import datetime
 import logging
+from switchcraft.gui_modern.controls.trace_timeline import build_trace_timeline
 from switchcraft.services.history_service import HistoryService
 from switchcraft.utils.i18n import i18n
 from switchcraft.gui_modern.utils.view_utils import ViewMixin
@@ -105,20 +106,45 @@ class HistoryView(ft.Column, ViewMixin):
         except Exception:
             date_display = ts_str
 
+        actions = [ft.IconButton(
+            icon=ft.Icons.PLAY_ARROW,
+            tooltip=i18n.get("btn_load") or "Load",
+            on_click=self._safe_event_handler(
+                lambda e, f=filename: self._show_snack(f"{(i18n.get('loading') or 'Loading')} {f}..."),
+                f"Load history item {filename}"
+            )
+        )]
+        if item.get('trace_file') or item.get('result_file'):
+            actions.append(ft.IconButton(
+                icon=ft.Icons.TIMELINE,
+                tooltip=i18n.get("analysis_trace") or "Analysis Timeline",
+                on_click=self._safe_event_handler(
+                    lambda e, i=item: self.show_trace(i),
+                    f"Show trace of {filename}"
+                )
+            ))
+
         return ft.DataRow(cells=[
             ft.DataCell(ft.Text(filename, weight=ft.FontWeight.BOLD)),
             ft.DataCell(ft.Text(product)),
             ft.DataCell(ft.Text(date_display)),
-            ft.DataCell(ft.IconButton(
-                icon=ft.Icons.PLAY_ARROW,
-                tooltip=i18n.get("btn_load") or "Load",
-                on_click=self._safe_event_handler(
-                    lambda e, f=filename: self._show_snack(f"{(i18n.get('loading') or 'Loading')} {f}..."),
-                    f"Load history item {filename}"
-                )
-            )),
+            ft.DataCell(ft.Row(actions, spacing=0)),
         ])
 
+    def show_trace(self, item):
+        """Opens the analysis timeline of a history entry from its trace side file."""
+        trace = self.history_service.load_trace(item)
+        if not isinstance(trace, dict):
+            self._show_snack(i18n.get("analysis_trace_unavailable") or "The analysis trace is no longer available.", "ORANGE")
+            return
+
+        dlg = ft.AlertDialog(
+            title=ft.Text(item.get('filename', i18n.get("unknown") or 'Unknown')),
+            content=ft.Container(build_trace_timeline(trace, self._copy_to_clipboard), width=700),
+            actions=[ft.TextButton(i18n.get("btn_close") or "Close", on_click=lambda e: self._close_dialog(dlg))],
+        )
+        self._open_dialog_safe(dlg)
+
     def clear_history(self, e):
         """Clears the history."""
         self.history_service.clear()
@@ -1,13 +1,17 @@
 import flet as ft
+import hashlib
 import threading
 import logging
 import time
 import requests
 from switchcraft.services.intune_service import IntuneService
+from switchcraft.services.intune_catalog_service import get_intune_catalog
+from switchcraft.services.icon_cache_service import get_icon_cache
 from switchcraft.utils.config import SwitchCraftConfig
 from switchcraft.utils.i18n import i18n
 from switchcraft.gui_modern.nav_constants import NavIndex
 from switchcraft.gui_modern.utils.view_utils import ViewMixin
+from switchcraft.utils.task_scheduler import current_token, join_or_cancel
 
 logger = logging.getLogger(__name__)
 
@@ -27,12 +31,14 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
         self.search_query = ""
         self.apps_list = []
         self.selected_app = None
+        self.catalog = None
 
         # UI Components
         self.search_field = ft.TextField(
             hint_text=i18n.get("search_intune_apps") or "Search Intune Apps...",
             expand=True,
-            on_submit=self._safe_event_handler(self._run_search, "Intune Store search submit")
+            on_submit=self._safe_event_handler(self._run_search, "Intune Store search submit"),
+            on_change=self._safe_event_handler(self._on_search_change, "Intune Store search change")
         )
         self.btn_search = ft.IconButton(ft.Icons.SEARCH, on_click=self._safe_event_handler(self._run_search, "Intune Store search click"))
 
@@ -123,8 +129,36 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
             return None
         return self.intune_service.authenticate(tenant_id, client_id, client_secret)
 
+    def _get_catalog(self):
+        """Return the local catalog mirror for the configured tenant (None if not configured)."""
+        if self.catalog is None:
+            tenant_id = SwitchCraftConfig.get_value("GraphTenantId")
+            if tenant_id:
+                self.catalog = get_intune_catalog(tenant_id, self.intune_service)
+        return self.catalog
+
+    def _on_search_change(self, e):
+        """Filter as you type, but only against the local mirror (never hits Graph)."""
+        catalog = self._get_catalog()
+        if catalog and catalog.is_populated():
+            self._update_list(catalog.search(self.search_field.value or ""))
+
+    def _on_catalog_synced(self, stats):
+        catalog = self._get_catalog()
+        if catalog:
+            query = self.search_field.value or ""
+            self._run_task_safe(lambda: self._update_list(catalog.search(query)))
+
     def _run_search(self, e):
         query = self.search_field.value
+
+        # Serve from the local mirror when it has been synced; refresh it in the background
+        catalog = self._get_catalog()
+        if catalog and catalog.is_populated():
+            self._update_list(catalog.search(query or ""))
+            catalog.sync_in_background(self._get_token, on_synced=self._on_catalog_synced)
+            return
+
         self.results_list.controls.clear()
         self.results_list.controls.append(ft.ProgressBar())
         self.results_list.controls.append(ft.Text(i18n.get("msg_searching") or "Searching...", color="GREY_500", italic=True))
@@ -156,6 +190,10 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
 
                     result_holder["apps"] = apps if apps else []
                     result_holder["completed"] = True
+
+                    # Build the local mirror so the next searches are served locally
+                    if catalog:
+                        catalog.sync_in_background(lambda: token, on_synced=self._on_catalog_synced)
                 except requests.exceptions.Timeout:
                     result_holder["error"] = "Request timed out after 30 seconds. Please check your connection and try again."
                     result_holder["completed"] = True
@@ -174,8 +212,10 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
             search_thread = threading.Thread(target=_search_task, daemon=True)
             search_thread.start()
 
-            # Wait for completion with timeout (60 seconds total)
-            search_thread.join(timeout=60)
+            # Wait for completion with timeout (60 seconds total), unless a newer query supersedes this one
+            if not join_or_cancel(search_thread, timeout=60):
+                logger.debug(f"Dropping superseded Intune search for: {query}")
+                return
 
             # Check if thread is still running (timeout occurred)
             if search_thread.is_alive():
@@ -196,6 +236,11 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
                 if not result_holder["error"] and result_holder["apps"] is None:
                     result_holder["error"] = "Search failed: No response received."
 
+            if current_token().cancelled:
+                # A newer query replaced this one; its results must not overwrite the list
+                logger.debug(f"Dropping superseded Intune search for: {query}")
+                return
+
             # Update UI on main thread - use run_task to marshal UI updates to the page event loop
             def _update_ui():
                 try:
@@ -212,7 +257,7 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
             # Use run_task_safe to marshal UI updates to the page event loop
             self._run_task_safe(_update_ui)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg, task_key="search")
 
     def _show_error(self, msg):
         self.results_list.controls.clear()
@@ -243,24 +288,7 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
             self.results_list.controls.append(ft.Text(i18n.get("msg_no_apps_found") or "No apps found."))
         else:
             for app in apps:
-                # Try to get logo - robust extraction
-                logo_url = None
-                large_icon = app.get("largeIcon")
-                if isinstance(large_icon, dict):
-                    logo_url = large_icon.get("value")
-                    # If it's base64, format as data URL
-                    if logo_url and not logo_url.startswith(("http://", "https://", "data:")):
-                        logo_url = f"data:image/png;base64,{logo_url}"
-                elif not logo_url:
-                    logo_url = app.get("iconUrl") or app.get("logoUrl")
-
                 leading_widget = ft.Icon(ft.Icons.APPS)
-                if logo_url:
-                    try:
-                        leading_widget = ft.Image(src=logo_url, width=40, height=40, fit=ft.ImageFit.CONTAIN, error_content=ft.Icon(ft.Icons.APPS))
-                    except Exception as ex:
-                        logger.debug(f"Failed to load logo in list: {ex}")
-                        pass
 
                 # Create ListTile with direct lambda (like winget_view does)
                 # Capture app in lambda default argument to avoid closure issues
@@ -272,8 +300,61 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
                     on_click=self._safe_event_handler(lambda e, a=app_copy: self._handle_app_click(a), f"Intune app click: {app.get('displayName')}")
                 )
                 self.results_list.controls.append(tile)
+                self._load_icon(app, 40, lambda img, t=tile: self._set_tile_icon(t, img), fetch=False)
         self._safe_update()
 
+    def _load_icon(self, app, size, on_loaded, fetch=True):
+        """
+        Resolve an app icon into a small ft.Image and hand it to on_loaded (on the UI thread).
+
+        Base64 icons are thumbnailed through the shared icon cache (bounded pool, coalesced,
+        disk-backed) so full-resolution payloads are never embedded in controls. URL icons are
+        loaded by the client directly. Apps without an inline icon use the catalog mirror's
+        icon cache; only when fetch is True (on selection) is Graph queried for it.
+        """
+        def _deliver(src):
+            if not src:
+                return
+            img = ft.Image(src=src, width=size, height=size, fit=ft.ImageFit.CONTAIN, error_content=ft.Icon(ft.Icons.APPS, size=size))
+            self._run_task_safe(lambda: on_loaded(img))
+
+        large_icon = app.get("largeIcon")
+        value = large_icon.get("value") if isinstance(large_icon, dict) else None
+        if value and value.startswith(("http://", "https://")):
+            _deliver(value)
+            return
+        url = app.get("iconUrl") or app.get("logoUrl")
+        if not value and url:
+            _deliver(url)
+            return
+
+        app_id = app.get("id")
+        catalog = self._get_catalog()
+        if value:
+            # Coalesce inline icons by content; apps without an id must not share a key
+            key = f"intune-inline-{hashlib.sha1(value.encode()).hexdigest()[:16]}"
+            loader = lambda: value
+        elif app_id and catalog:
+            key = f"intune-{app_id}"
+
+            def loader():
+                if fetch:
+                    token = self._get_token()
+                    icon = catalog.get_icon(token, app_id) if token else None
+                else:
+                    icon = catalog.get_cached_icon(app_id)
+                return icon.get("value") if icon else None
+        else:
+            return
+        get_icon_cache().request(key, loader, _deliver)
+
+    def _set_tile_icon(self, tile, image):
+        try:
+            tile.leading = image
+            self._safe_update(tile)
+        except Exception as ex:
+            logger.debug(f"Failed to set tile icon: {ex}")
+
     def _handle_app_click(self, app):
         """
         Handle selection of an app list item and display its details.
@@ -316,17 +397,6 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
             # Force update
             self._safe_update()
 
-            # Logo and Title - robust extraction
-            logo_url = None
-            large_icon = app.get("largeIcon")
-            if isinstance(large_icon, dict):
-                logo_url = large_icon.get("value")
-                # If it's base64, format as data URL
-                if logo_url and not logo_url.startswith(("http://", "https://", "data:")):
-                    logo_url = f"data:image/png;base64,{logo_url}"
-            elif not logo_url:
-                logo_url = app.get("iconUrl") or app.get("logoUrl")
-
             # Remove progress bar and add content
             self.details_area.controls.clear()
 
@@ -341,17 +411,8 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
             )
             detail_controls.append(title_row_container)
 
-            # Load image asynchronously after UI is rendered
-            if logo_url:
-                def _load_image_async():
-                    try:
-                        img = ft.Image(src=logo_url, width=64, height=64, fit=ft.ImageFit.CONTAIN, error_content=ft.Icon(ft.Icons.APPS, size=64))
-                        # Replace icon with image in title row
-                        self._run_task_safe(lambda: self._replace_title_icon(title_row_container, img))
-                    except Exception as ex:
-                        logger.debug(f"Failed to load logo: {ex}")
-
-                threading.Thread(target=_load_image_async, daemon=True).start()
+            # Load image asynchronously after UI is rendered (thumbnailed via the icon cache)
+            self._load_icon(app, 64, lambda img: self._replace_title_icon(title_row_container, img))
 
             # Editable Title Field
             self.title_field = ft.TextField(
@@ -469,7 +530,7 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
                         self._safe_update()
                     self._run_task_safe(_show_error)
 
-            threading.Thread(target=_load_assignments, daemon=True).start()
+            self._run_in_background(_load_assignments, task_key="details")
 
             # Install Info (editable if available)
             if "installCommandLine" in app or "uninstallCommandLine" in app:
@@ -600,6 +661,8 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
                     # Update local specific object to reflect changes without full reload if possible,
                     # or just reload details.
                     app.update(update_data)
+                    if self.catalog:
+                        self.catalog.upsert_app(app)
 
                     self._run_task_safe(lambda: self._show_snack(i18n.get("save_success") or "Changes saved successfully!", "GREEN"))
                     # Reload details to ensure consistency
@@ -609,7 +672,7 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
                     msg = (i18n.get("msg_save_failed") or "Failed to save: {error}").format(error=ex)
                     self._run_task_safe(lambda: self._show_snack(msg, "RED"))
 
-            threading.Thread(target=_bg_save, daemon=True).start()
+            self._run_in_background(_bg_save)
 
         except Exception as ex:
             logger.error(f"Error preparing save: {ex}")
@@ -687,7 +750,7 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
                     groups_list.controls.append(ft.Text((i18n.get("err_failed_prefix") or "Error: {error}").format(error=ex), color="RED"))
                     self._safe_update(groups_list)
 
-            threading.Thread(target=_bg, daemon=True).start()
+            self._run_in_background(_bg, task_key="groups")
 
         def _confirm_assign(e):
             if not selected_group_id[0]:
@@ -713,7 +776,7 @@ class ModernIntuneStoreView(ft.Column, ViewMixin):
                 except Exception as ex:
                     self._show_snack((i18n.get("err_assign_failed") or "Assignment failed: {error}").format(error=ex), "RED")
 
-            threading.Thread(target=_deploy_bg, daemon=True).start()
+            self._run_in_background(_deploy_bg)
 
         dlg = ft.AlertDialog(
             title=ft.Text(i18n.get("deploy_app_title") or f"Deploy '{app.get('displayName')}'"),
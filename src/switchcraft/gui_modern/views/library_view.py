@@ -1,25 +1,31 @@
 import flet as ft
 from switchcraft.utils.config import SwitchCraftConfig
 from switchcraft.utils.i18n import i18n
+from switchcraft.services.library_index_service import get_library_index
 from switchcraft.gui_modern.utils.view_utils import ViewMixin
+from switchcraft.utils.task_scheduler import POOL_BACKGROUND
 
 import logging
 from datetime import datetime
 from pathlib import Path
 import os
 import sys
-import threading
 
 logger = logging.getLogger(__name__)
 
 
 class LibraryView(ft.Column, ViewMixin):
-    """Library view that displays recent .intunewin packages."""
+    """Library view that displays indexed .intunewin packages."""
+
+    PAGE_SIZE = 200
 
     def __init__(self, page: ft.Page):
         super().__init__(expand=True, scroll=ft.ScrollMode.AUTO)
         self.app_page = page
         self.all_files = []
+        self.total_count = 0
+        self.visible_count = self.PAGE_SIZE
+        self.index = None
 
         # Get configured directories to scan
         self.scan_dirs = self._get_scan_directories()
@@ -132,10 +138,15 @@ class LibraryView(ft.Column, ViewMixin):
                 seen.add(key)
                 unique_dirs.append(d)
 
-        return unique_dirs[:5]  # Limit to 5 directories to avoid slow scanning
+        return unique_dirs
+
+    def _get_index(self):
+        if self.index is None:
+            self.index = get_library_index()
+        return self.index
 
     def _load_data(self, e):
-        """Load .intunewin files from scan directories."""
+        """Show the indexed .intunewin files, then refresh the index incrementally."""
         logger.info("_load_data called - starting scan")
         try:
             # Update dir_info to show loading state - use _run_task_safe to avoid RuntimeError
@@ -150,73 +161,20 @@ class LibraryView(ft.Column, ViewMixin):
             # Run scanning in background thread to avoid blocking UI
             def scan_files():
                 try:
-                    logger.info("Scanning directories for .intunewin files...")
-                    all_files = []
+                    index = self._get_index()
 
-                    for scan_dir in self.scan_dirs:
-                        try:
-                            path = Path(scan_dir)
-                            if not path.exists():
-                                logger.debug(f"Scan directory does not exist: {scan_dir}")
-                                continue
-
-                            # Non-recursive scan of the directory
-                            for file in path.glob("*.intunewin"):
-                                if file.is_file():
-                                    stat = file.stat()
-                                    all_files.append({
-                                        'path': str(file),
-                                        'filename': file.name,
-                                        'size': stat.st_size,
-                                        'modified': datetime.fromtimestamp(stat.st_mtime),
-                                        'directory': scan_dir
-                                    })
-
-                            # Also check one level down (common structure), limit to first 20 subdirs
-                            try:
-                                subdirs = [x for x in path.iterdir() if x.is_dir()]
-                                for subdir in subdirs[:20]: # Limit subdirectory scan
-                                    for file in subdir.glob("*.intunewin"):
-                                        if file.is_file():
-                                            stat = file.stat()
-                                            all_files.append({
-                                                'path': str(file),
-                                                'filename': file.name,
-                                                'size': stat.st_size,
-                                                'modified': datetime.fromtimestamp(stat.st_mtime),
-                                                'directory': str(subdir)
-                                            })
-                            except Exception as ex:
-                                logger.debug(f"Error scanning subdirectories in {scan_dir}: {ex}")
-                        except Exception as ex:
-                            if isinstance(ex, PermissionError):
-                                logger.debug(f"Permission denied scanning {scan_dir}")
-                            else:
-                                logger.warning(f"Failed to scan {scan_dir}: {ex}", exc_info=True)
-
-                    # Sort by modification time (newest first)
-                    all_files.sort(key=lambda x: x['modified'], reverse=True)
-
-                    # Limit to 50 most recent files
-                    all_files = all_files[:50]
-                    logger.info(f"Found {len(all_files)} .intunewin files")
-
-                    # Update UI on main thread
-                    def update_ui():
-                        try:
-                            self.all_files = all_files
-                            self.dir_info.value = f"{i18n.get('scanning') or 'Scanning'}: {len(self.scan_dirs)} {i18n.get('directories') or 'directories'} - {len(self.all_files)} {i18n.get('files_found') or 'files found'}"
-                            self.dir_info.update()
-                            self._refresh_grid()
-                        except (RuntimeError, AttributeError) as e:
-                            logger.debug(f"UI not ready for update: {e}")
-                            # Try to refresh grid anyway
-                            try:
-                                self.all_files = all_files
-                                self._refresh_grid()
-                            except Exception:
-                                pass
-                    self._run_task_safe(update_ui)
+                    # Show what is already indexed right away, the incremental scan below
+                    # only re-reads packages whose size or mtime changed.
+                    self._query_index()
+                    self._run_task_safe(self._update_after_scan)
+
+                    logger.info("Updating library index for .intunewin files...")
+                    index.scan(self.scan_dirs)
+                    self._query_index()
+                    logger.info(f"Found {self.total_count} .intunewin files")
+                    self._run_task_safe(self._update_after_scan)
+
+                    index.start_watching(self.scan_dirs, on_change=lambda stats: self._on_index_changed(), owner=self)
                 except Exception as ex:
                     logger.error(f"Error scanning library data: {ex}", exc_info=True)
                     def show_error(err=ex):
@@ -231,13 +189,47 @@ class LibraryView(ft.Column, ViewMixin):
                     self._run_task_safe(show_error)
 
             # Start scanning in background thread
-            threading.Thread(target=scan_files, daemon=True).start()
+            self._run_in_background(scan_files, task_key="scan", pool=POOL_BACKGROUND)
         except Exception as ex:
             logger.error(f"Error starting library scan: {ex}", exc_info=True)
             self._show_snack(f"Failed to start library scan: {ex}", "RED")
 
+    def will_unmount(self):
+        self._cancel_background()
+        if self.index is not None:
+            self.index.stop_watching(self)
+
+    def _on_index_changed(self):
+        self._query_index()
+        self._run_task_safe(self._update_after_scan)
+
+    def _query_index(self):
+        """Fetch the currently visible page of results from the index."""
+        index = self._get_index()
+        search = self.search_val or None
+        self.total_count = index.count(text=search, dirs=self.scan_dirs)
+        self.all_files = index.query(text=search, dirs=self.scan_dirs, limit=self.visible_count)
+
+    def _update_after_scan(self):
+        try:
+            self.dir_info.value = f"{i18n.get('scanning') or 'Scanning'}: {len(self.scan_dirs)} {i18n.get('directories') or 'directories'} - {self.total_count} {i18n.get('files_found') or 'files found'}"
+            self.dir_info.update()
+        except (RuntimeError, AttributeError) as e:
+            logger.debug(f"UI not ready for update: {e}")
+        self._refresh_grid()
+
     def _on_search_change(self, e):
         self.search_val = e.control.value.lower()
+        self.visible_count = self.PAGE_SIZE
+        if self.index is None:
+            self._refresh_grid()
+            return
+        self._query_index()
+        self._refresh_grid()
+
+    def _on_show_more(self, e):
+        self.visible_count += self.PAGE_SIZE
+        self._query_index()
         self._refresh_grid()
 
     def _refresh_grid(self):
@@ -245,7 +237,7 @@ class LibraryView(ft.Column, ViewMixin):
         try:
             self.grid.controls.clear()
 
-            if not self.all_files:
+            if not self.all_files and not self.search_val:
                 self.grid.controls.append(
                     ft.Container(
                         content=ft.Column([
@@ -272,10 +264,10 @@ class LibraryView(ft.Column, ViewMixin):
                     logger.debug("Grid not attached to page yet, skipping update")
                 return
 
-            # Filter files based on search
+            # Filter files based on search (the index already filtered; this covers the pre-index state)
             filtered_files = []
             for item in self.all_files:
-                name = item.get('filename', '').lower()
+                name = f"{item.get('filename', '')} {item.get('name') or ''}".lower()
                 if not self.search_val or self.search_val in name:
                     filtered_files.append(item)
 
@@ -294,6 +286,17 @@ class LibraryView(ft.Column, ViewMixin):
             else:
                 for item in filtered_files:
                     self.grid.controls.append(self._create_tile(item))
+                if self.total_count > len(filtered_files):
+                    self.grid.controls.append(
+                        ft.Container(
+                            content=ft.TextButton(
+                                f"{i18n.get('btn_show_more') or 'Show more'} ({len(filtered_files)}/{self.total_count})",
+                                icon=ft.Icons.EXPAND_MORE,
+                                on_click=self._safe_event_handler(self._on_show_more, "Show more button")
+                            ),
+                            alignment=ft.Alignment(0, 0)
+                        )
+                    )
 
             try:
                 self.grid.update()
@@ -313,7 +316,6 @@ class LibraryView(ft.Column, ViewMixin):
         filename = item.get('filename', 'Unknown')
         size_bytes = item.get('size', 0)
         modified = item.get('modified', datetime.now())
-        directory = item.get('directory', '')
 
         # Format size
         if size_bytes < 1024:
@@ -365,13 +367,20 @@ class LibraryView(ft.Column, ViewMixin):
     def _on_tile_click(self, item):
         # Show details in a dialog
         path = item.get('path', '')
+        details = [
+            ft.Text(f"📁 {i18n.get('location') or 'Location'}: {item.get('directory', '')}"),
+            ft.Text(f"📏 {i18n.get('size') or 'Size'}: {item.get('size', 0) / (1024*1024):.2f} MB"),
+            ft.Text(f"📅 {i18n.get('modified') or 'Modified'}: {item.get('modified', datetime.now()).strftime('%Y-%m-%d %H:%M')}"),
+        ]
+        if item.get('name'):
+            details.append(ft.Text(f"🏷️ {i18n.get('library_app_name') or 'App name'}: {item['name']}"))
+        if item.get('product_version'):
+            details.append(ft.Text(f"🔢 {i18n.get('library_product_version') or 'Product version'}: {item['product_version']}"))
+        if item.get('product_code'):
+            details.append(ft.Text(f"🔑 {i18n.get('library_product_code') or 'Product code'}: {item['product_code']}", selectable=True))
         dlg = ft.AlertDialog(
             title=ft.Text(item.get('filename', 'Unknown')),
-            content=ft.Column([
-                ft.Text(f"📁 {i18n.get('location') or 'Location'}: {item.get('directory', '')}"),
-                ft.Text(f"📏 {i18n.get('size') or 'Size'}: {item.get('size', 0) / (1024*1024):.2f} MB"),
-                ft.Text(f"📅 {i18n.get('modified') or 'Modified'}: {item.get('modified', datetime.now()).strftime('%Y-%m-%d %H:%M')}"),
-            ], tight=True, spacing=10),
+            content=ft.Column(details, tight=True, spacing=10),
             actions=[
                 ft.TextButton(i18n.get("btn_cancel") or "Close", on_click=lambda e: self._close_dialog(dlg)),
                 ft.FilledButton(
@@ -1,6 +1,5 @@
 import flet as ft
 import logging
-import threading
 import requests
 import tempfile
 import subprocess
@@ -12,6 +11,7 @@ from switchcraft.gui_modern.utils.file_picker_helper import FilePickerHelper
 from switchcraft.utils.config import SwitchCraftConfig
 from switchcraft.utils.i18n import i18n
 from switchcraft.gui_modern.utils.view_utils import ViewMixin
+from switchcraft.utils.task_scheduler import current_token
 
 logger = logging.getLogger(__name__)
 
@@ -346,7 +346,7 @@ class PackagingWizardView(ft.Column, ViewMixin):
 
             self._run_task_safe(self._safe_update)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg)
 
     def _pick_file(self, e):
         path = FilePickerHelper.pick_file(allowed_extensions=["exe", "msi", "ps1", "bat", "cmd", "vbs", "msp"])
@@ -490,7 +490,7 @@ class PackagingWizardView(ft.Column, ViewMixin):
                     self._safe_update()
                 self._run_task_safe(handle_final_error)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg, task_key="analysis")
 
     # --- Step 2: Script ---
     def _step_script_ui(self):
@@ -708,7 +708,7 @@ Start-Process -FilePath "$PSScriptRoot\\$Installer" -ArgumentList $Args -Wait -P
                     self._safe_update()
                 self._run_task_safe(finalize_pkg)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg)
 
     # --- Step 4: Upload ---
     def _step_upload_ui(self):
@@ -789,7 +789,7 @@ Start-Process -FilePath "$PSScriptRoot\\$Installer" -ArgumentList $Args -Wait -P
                     self._safe_update()
                 self._run_task_safe(handle_auth_fail)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg)
 
     def _build_supersedence_ui(self):
         self.search_supersede_field = ft.TextField(label=i18n.get("wiz_search_supersede") or "Search App to Replace", height=40, expand=True)
@@ -822,6 +822,8 @@ Start-Process -FilePath "$PSScriptRoot\\$Installer" -ArgumentList $Args -Wait -P
 
         def _bg():
             apps = self.intune_service.search_apps(self.token, query)
+            if current_token().cancelled:
+                return  # A newer search replaced this one
             self.found_apps = apps # list of dicts {id, displayName, ...}
 
             options = [ft.dropdown.Option(app['id'], f"{app['displayName']} ({app.get('appVersion','Unknown')})") for app in apps]
@@ -835,7 +837,7 @@ Start-Process -FilePath "$PSScriptRoot\\$Installer" -ArgumentList $Args -Wait -P
                 self.supersede_status.value = f"Found {len(apps)} apps"
             self.update()
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg, task_key="supersedence")
 
     def _on_supersede_select(self, e):
         self.supersede_app_id = self.supersede_option.value
@@ -891,9 +893,15 @@ Start-Process -FilePath "$PSScriptRoot\\$Installer" -ArgumentList $Args -Wait -P
                     "productVersion": None
                 })
                 self.upload_status.value = (i18n.get("upload_start_auth_rule") or "Starting upload... (Auto-Detected MSI Rule: {code})").format(code=info.product_code)
-            elif info and info.product_name:
-                 # Fallback to File detection?
-                 pass
+            elif info and info.file_path:
+                # Derive a file/registry rule from the installer's tables or version resource
+                try:
+                    from switchcraft.services.detection_rule_service import DetectionRuleSynthesizer, best_rule
+                    rule = best_rule(DetectionRuleSynthesizer().synthesize(info.file_path))
+                    if rule:
+                        detection_rules.append(rule)
+                except Exception as e:
+                    logger.warning(f"Detection rule synthesis failed: {e}")
 
             if detection_rules:
                 app_info["detectionRules"] = detection_rules
@@ -943,7 +951,7 @@ Start-Process -FilePath "$PSScriptRoot\\$Installer" -ArgumentList $Args -Wait -P
                 self.btn_upload.disabled = False
                 self.update()
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg)
 
     def _run_autopilot(self, e):
         """
@@ -1091,7 +1099,7 @@ Start-Process -FilePath "$PSScriptRoot\\$Installer" -ArgumentList $Args -Wait -P
                         pass
                 logger.error(f"Autopilot error: {ex}")
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg)
 
     def _close_autopilot(self, e=None):
         """Close the autopilot dialog."""
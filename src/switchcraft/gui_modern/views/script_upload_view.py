@@ -1,11 +1,11 @@
 import flet as ft
 from switchcraft.services.intune_service import IntuneService
+from switchcraft.services.script_import_service import SCRIPT_EXTENSIONS, ScriptImportService
 from switchcraft.utils.config import SwitchCraftConfig
 from switchcraft.utils.i18n import i18n
 from switchcraft.gui_modern.utils.flet_compat import create_tabs
 import logging
 from pathlib import Path
-import threading
 import requests
 from switchcraft.gui_modern.utils.view_utils import ViewMixin
 
@@ -207,7 +207,7 @@ class ScriptUploadView(ft.Column, ViewMixin):
                     self._safe_update()
                 self._run_task_safe(finalize_ps)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg)
 
     # --- Remediation Tab ---
     def _build_remediation_tab(self):
@@ -345,7 +345,7 @@ class ScriptUploadView(ft.Column, ViewMixin):
                     self._safe_update()
                 self._run_task_safe(finalize_rem)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg)
 
     # --- GitHub Import Tab ---
     def _build_github_tab(self):
@@ -505,17 +505,17 @@ class ScriptUploadView(ft.Column, ViewMixin):
                 response.raise_for_status()
                 data = response.json()
 
-                # Filter for .ps1 files
+                # Filter for .ps1/.sh files
                 ps_files = [
                     item["path"] for item in data.get("tree", [])
-                    if item["path"].endswith(".ps1") and item["type"] == "blob"
+                    if item["path"].lower().endswith(SCRIPT_EXTENSIONS) and item["type"] == "blob"
                 ]
 
                 self.github_script_list.controls.clear()
                 if not ps_files:
                     self.github_script_list.controls.append(
                         ft.Text(
-                            i18n.get("no_scripts_found") or "No .ps1 scripts found in repository",
+                            i18n.get("no_scripts_found") or "No .ps1 or .sh scripts found in repository",
                             italic=True,
                             color="GREY_500"
                         )
@@ -560,20 +560,15 @@ class ScriptUploadView(ft.Column, ViewMixin):
                     self._safe_update()
                 self._run_task_safe(finalize_browse)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg, task_key="browse")
 
-    def _fetch_github_content(self, path, branch):
+    def _fetch_github_scripts(self, paths, branch):
+        """Reads the selected scripts from one branch archive download (instead of one API call per file)."""
         if not self.current_owner or not self.current_repo:
             raise ValueError("Repository info missing")
-
-        url = f"https://api.github.com/repos/{self.current_owner}/{self.current_repo}/contents/{path}?ref={branch}"
-        headers = {"Accept": "application/vnd.github.v3.raw"}
-        if self.github_pat.value:
-            headers["Authorization"] = f"token {self.github_pat.value}"
-
-        resp = requests.get(url, headers=headers, timeout=30)
-        resp.raise_for_status()
-        return resp.text
+        return ScriptImportService().fetch_repo_scripts(
+            self.current_owner, self.current_repo, branch, paths=paths, token=self.github_pat.value or None
+        )
 
     def _import_github_scripts(self, e):
         selected = [item["path"] for item in self.repo_script_items if item["checkbox"].value]
@@ -592,26 +587,19 @@ class ScriptUploadView(ft.Column, ViewMixin):
         self.update()
 
         def _bg():
-            count = 0
-            errors = []
             try:
                 dest = Path(dest_path)
                 branch = self.github_branch.value or "main"
-                for script_path in selected:
-                    try:
-                        content = self._fetch_github_content(script_path, branch)
-                        # Flattening is safer for now, using filename
-                        filename = Path(script_path).name
-                        with open(dest / filename, "w", encoding="utf-8") as f:
-                            f.write(content)
-                        count += 1
-                    except Exception as sub_ex:
-                        errors.append(f"{script_path}: {sub_ex}")
-
-                if errors:
-                    self.github_status.value = f"Downloaded {count}. Errors: {len(errors)}"
+                scripts = self._fetch_github_scripts(selected, branch)
+                for script_path, content in scripts.items():
+                    # Flattening is safer for now, using filename
+                    (dest / Path(script_path).name).write_bytes(content)
+                count = len(scripts)
+                missing = len(selected) - count
+
+                if missing:
+                    self.github_status.value = f"Downloaded {count}. Errors: {missing}"
                     self.github_status.color = "ORANGE"
-                    logger.error(f"Import errors: {errors}")
                 else:
                     self.github_status.value = f"Successfully imported {count} scripts!"
                     self.github_status.color = "GREEN"
@@ -623,7 +611,7 @@ class ScriptUploadView(ft.Column, ViewMixin):
                     self._safe_update()
                 self._run_task_safe(finalize_import)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg)
 
     def _deploy_github_scripts(self, e):
         selected = [item["path"] for item in self.repo_script_items if item["checkbox"].value]
@@ -645,31 +633,30 @@ class ScriptUploadView(ft.Column, ViewMixin):
         self.update()
 
         def _bg():
-            count = 0
-            errors = []
             try:
                 token = self.intune_service.authenticate(tenant, client, secret)
                 branch = self.github_branch.value or "main"
+                scripts = self._fetch_github_scripts(selected, branch)
+                source = f"{self.current_owner}/{self.current_repo}"
 
-                for script_path in selected:
-                    try:
-                        content = self._fetch_github_content(script_path, branch)
-                        name = Path(script_path).stem
-                        desc = f"Imported from {self.current_owner}/{self.current_repo} ({script_path})"
+                def _progress(done, total):
+                    self.github_status.value = f"Deploying {done}/{total} scripts..."
+                    self._run_task_safe(self._safe_update)
 
-                        self.intune_service.upload_powershell_script(
-                            token, name, desc, content, run_as_account="system"
-                        )
-                        count += 1
-                    except Exception as sub_ex:
-                        errors.append(f"{script_path}: {sub_ex}")
+                results = ScriptImportService(self.intune_service).deploy_scripts(
+                    token, scripts, lambda p: f"Imported from {source} ({p})", progress=_progress
+                )
+                uploaded = sum(1 for r in results if r.status == "uploaded")
+                unchanged = sum(1 for r in results if r.status == "unchanged")
+                errors = [f"{r.path}: {r.message}" for r in results if not r.ok]
+                errors += [f"{p}: not found" for p in selected if p not in scripts]
 
                 if errors:
-                    self.github_status.value = f"Deployed {count}. Errors: {len(errors)}"
+                    self.github_status.value = f"Deployed {uploaded}, unchanged {unchanged}. Errors: {len(errors)}"
                     self.github_status.color = "ORANGE"
                     logger.error(f"Deploy errors: {errors}")
                 else:
-                    self.github_status.value = f"Successfully deployed {count} scripts to Intune!"
+                    self.github_status.value = f"Successfully deployed {uploaded} scripts to Intune! ({unchanged} unchanged)"
                     self.github_status.color = "GREEN"
 
             except Exception as ex:
@@ -680,4 +667,4 @@ class ScriptUploadView(ft.Column, ViewMixin):
                     self._safe_update()
                 self._run_task_safe(finalize_deploy)
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg)
@@ -1199,8 +1199,7 @@ class ModernSettingsView(ft.Column, ViewMixin):
         source_path = None
 
         if handler.current_log_path and handler.current_log_path.exists():
-            if handler.file_handler:
-                handler.file_handler.flush()
+            handler.flush()
             source_path = handler.current_log_path
         else:
             # Find in log dir
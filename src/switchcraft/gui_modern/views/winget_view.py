@@ -8,6 +8,7 @@ from switchcraft.utils.i18n import i18n
 from pathlib import Path
 from switchcraft.services.notification_service import NotificationService
 from switchcraft.gui_modern.utils.view_utils import ViewMixin
+from switchcraft.utils.task_scheduler import join_or_cancel
 from switchcraft.gui_modern.utils.file_picker_helper import FilePickerHelper
 
 logger = logging.getLogger(__name__)
@@ -233,7 +234,11 @@ class ModernWingetView(ft.Row, ViewMixin):
 
                 t = threading.Thread(target=target)
                 t.start()
-                t.join(timeout=60)  # Increased to 60 seconds to allow PowerShell/API/CLI fallbacks
+                # Up to 60 seconds to allow PowerShell/API/CLI fallbacks, unless superseded earlier
+                if not join_or_cancel(t, timeout=60):
+                    # A newer query replaced this one; its results must not overwrite the list
+                    logger.debug(f"Dropping superseded winget search for: {query}")
+                    return
 
                 if t.is_alive():
                     logger.warning(f"Winget search timeout after 60s for query: {query}")
@@ -280,7 +285,7 @@ class ModernWingetView(ft.Row, ViewMixin):
                     self._safe_update()
                 self._run_task_safe(_show_error)
 
-        threading.Thread(target=_search, daemon=True).start()
+        self._run_in_background(_search, task_key="search")
 
     def _show_list(self, results, filter_by="all", query=""):
         """
@@ -471,7 +476,7 @@ class ModernWingetView(ft.Row, ViewMixin):
                 self._run_ui_update(_show_error_ui)
 
 
-        threading.Thread(target=_fetch, daemon=True).start()
+        self._run_in_background(_fetch, task_key="details")
 
     def _run_ui_update(self, ui_func):
         """
@@ -813,7 +818,8 @@ class ModernWingetView(ft.Row, ViewMixin):
                 except Exception as ex:
                     logger.debug(f"Failed to load logo: {ex}")
 
-            threading.Thread(target=_load_image_async, daemon=True).start()
+            # Only builds a URL-backed control (the client fetches the image), no thread needed
+            _load_image_async()
 
     def _replace_header_icon(self, header_row, image):
         """Replace the icon in header_row with the loaded image."""
@@ -954,7 +960,7 @@ class ModernWingetView(ft.Row, ViewMixin):
             except Exception as ex:
                 self._show_snack((i18n.get("err_failed_prefix") or "Download failed: {error}").format(error=ex), "RED")
 
-        threading.Thread(target=_bg, daemon=True).start()
+        self._run_in_background(_bg)
 
     def _deploy_script(self, info):
         self._create_script_click(None) # Re-use existing simple script or enhance it?
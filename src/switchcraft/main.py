@@ -293,10 +293,8 @@ def main(page: ft.Page):
                 sess_lang = page.switchcraft_session.get('browser_language')
                 if sess_lang and sess_lang in ['de', 'en']:
                     print(f"Applying session language: {sess_lang}")
-                    SwitchCraftConfig.set_value("Language", sess_lang)
-                    # Force update i18n immediate
-                    from switchcraft.utils.i18n import i18n
-                    i18n.set_language(sess_lang)
+                    # Binds the language to this session only (not the process-wide default)
+                    SwitchCraftConfig.set_user_preference("Language", sess_lang)
 
             print("Config Backend: ClientStorageBackend (Web/Persistent)")
 
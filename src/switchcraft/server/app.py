@@ -1,15 +1,19 @@
+import asyncio
 import logging
 import os
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Optional
 
 from fastapi import FastAPI, Request, Form, Depends, HTTPException, status, UploadFile
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from itsdangerous import URLSafeTimedSerializer
 import httpx
 import tempfile
 import shutil
+import secrets
 
 import flet as ft
 import pyotp
@@ -19,6 +23,15 @@ from switchcraft.server.auth_config import AuthConfigManager
 from switchcraft.server.user_manager import UserManager
 import switchcraft
 from switchcraft.server.update_checker import check_for_updates
+from switchcraft.server.shared_store import (
+    default_store_url, get_shared_store, open_store, record_upload, set_shared_store
+)
+from switchcraft.server.static_assets import DEFAULT_MAX_AGE, STATIC_EXTENSIONS, AssetIndex
+from switchcraft.server.job_queue import (
+    DEFAULT_USER_LIMIT, DEFAULT_WORKERS, JobQueue, JobRunner, set_job_queue
+)
+from switchcraft.services.library_index_service import close_library_index
+from switchcraft.utils import metrics
 
 # Configuration
 auth_manager = AuthConfigManager()
@@ -28,12 +41,21 @@ user_manager = UserManager(auth_manager.config_dir)
 config = auth_manager.load_config()
 SECRET_KEY = auth_manager.get_secret_key()
 serializer = URLSafeTimedSerializer(SECRET_KEY)
+SESSION_MAX_AGE = 86400
+
+# State shared by all workers (uvicorn --workers / WEB_CONCURRENCY): sessions, uploads, caches
+set_shared_store(open_store(default_store_url(auth_manager.config_dir)))
+
+# Analysis jobs run in worker processes; the queue persists next to the config
+job_queue = JobQueue(auth_manager.config_dir / "jobs.db")
 
 # Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SwitchCraftServer")
 
 ASSETS_DIR = Path(__file__).parent.parent / "assets"
+# Built at startup (see _build_asset_index); None until then
+asset_index = None
 
 def _ensure_pwa_manifest():
     """
@@ -97,6 +119,63 @@ def _ensure_pwa_manifest():
         logger.error(f"Failed to write manifest.json: {e}")
 
 
+def _flet_web_dir():
+    try:
+        import flet_web
+        return Path(flet_web.__path__[0]) / "web"
+    except ImportError:
+        return None
+
+def _build_asset_index():
+    """Resolves all public assets once, in the order the request handlers look them up."""
+    global asset_index
+    flet_web_dir = _flet_web_dir()
+    mounts = [("/assets", ASSETS_DIR), ("", ASSETS_DIR)]
+    if flet_web_dir:
+        mounts[1:1] = [("/assets", flet_web_dir / "assets")]
+        mounts.append(("", flet_web_dir))
+    asset_index = AssetIndex(mounts, max_age=int(os.environ.get("SC_ASSET_MAX_AGE", DEFAULT_MAX_AGE)))
+    logger.info(f"Indexed {len(asset_index)} static assets")
+
+# --- Metrics ---
+METRICS_PUBLISH_INTERVAL = 15
+HTTP_SERVER_SECONDS = metrics.histogram(
+    "switchcraft_http_server_request_seconds", "Server request latency", ["method", "route", "status"]
+)
+UPLOAD_BYTES = metrics.counter("switchcraft_upload_bytes_total", "Uploaded bytes")
+UPLOAD_SECONDS = metrics.histogram("switchcraft_upload_seconds", "Time to store an uploaded file")
+
+def _publish_metrics():
+    try:
+        metrics.publish(get_shared_store())
+    except Exception as e:
+        logger.debug(f"Failed to publish metrics: {e}")
+
+async def _publish_metrics_loop():
+    """Each worker publishes its snapshot so /metrics on any worker reports all of them."""
+    while True:
+        await asyncio.sleep(METRICS_PUBLISH_INTERVAL)
+        await asyncio.to_thread(_publish_metrics)
+
+# --- Community Database ---
+# Seconds between feed pulls (only when CommunityDBFeedUrl is set)
+COMMUNITY_REFRESH_INTERVAL = int(os.environ.get("SC_COMMUNITY_REFRESH", 6 * 3600))
+
+def _pull_community_updates():
+    try:
+        from switchcraft.services.community_db_service import get_community_db
+        applied = get_community_db().pull_updates()
+        if applied:
+            logger.info(f"Applied {applied} community database update(s)")
+    except Exception as e:
+        logger.warning(f"Community database refresh failed: {e}")
+
+async def _community_refresh_loop():
+    """Keeps this worker's community entries and installer rules current."""
+    while True:
+        await asyncio.to_thread(_pull_community_updates)
+        await asyncio.sleep(COMMUNITY_REFRESH_INTERVAL)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting SwitchCraft Server...")
@@ -113,14 +192,53 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Failed to generate PWA manifest: {e}")
 
+    try:
+        _build_asset_index()
+    except Exception as e:
+        logger.warning(f"Failed to index static assets: {e}")
+
+    # Share winget search results between workers and drop expired sessions/uploads
+    try:
+        store = get_shared_store()
+        logger.info(f"Purged {store.purge_expired()} expired shared store entries")
+        from switchcraft_winget.utils.winget import WingetHelper
+        WingetHelper.shared_cache = store.namespace("winget")
+    except Exception as e:
+        logger.warning(f"Shared store setup incomplete: {e}")
+
+    # Flet sessions of this process hand their analyses to the queue from now on.
+    # SC_JOB_WORKERS=0 makes this process submit jobs only (another process runs them)
+    set_job_queue(job_queue)
+    runner = None
+    job_workers = int(os.environ.get("SC_JOB_WORKERS", DEFAULT_WORKERS))
+    if job_workers > 0:
+        runner = JobRunner(job_queue, workers=job_workers,
+                           user_limit=int(os.environ.get("SC_JOB_USER_LIMIT", DEFAULT_USER_LIMIT)))
+        runner.start()
+
+    publisher = asyncio.create_task(_publish_metrics_loop())
+    community_refresh = asyncio.create_task(_community_refresh_loop())
+
     yield
     logger.info("Shutting down SwitchCraft Server...")
+    publisher.cancel()
+    community_refresh.cancel()
+    set_job_queue(None)
+    if runner:
+        runner.stop()
+    _publish_metrics()
+    close_library_index()
 
 app = FastAPI(lifespan=lifespan)
 
 # Asset redirection to fix Flet engine looking in /assets/ for its own files
 @app.get("/assets/{path:path}")
-async def catch_all_assets(path: str):
+async def catch_all_assets(path: str, request: Request):
+    # 0. Startup index (normally answered by static_asset_middleware already)
+    entry = asset_index.get(f"/assets/{path}") if asset_index else None
+    if entry:
+        return asset_index.response(request, entry)
+
     # 1. Try local user assets first
     local_file = ASSETS_DIR / path
     if local_file.exists() and local_file.is_file():
@@ -167,6 +285,30 @@ async def get_font_manifest():
     return JSONResponse(content=[])
 
 # --- Auth Helpers ---
+def _set_session_cookie(resp, username: str, **extra):
+    """
+    Sets the signed session cookie. The session id is registered in the shared store so
+    every worker accepts it and a logout on any worker revokes it everywhere.
+    """
+    sid = secrets.token_urlsafe(16)
+    get_shared_store().set("sessions", sid, {"username": username, **extra}, ttl=SESSION_MAX_AGE)
+    token = serializer.dumps({"username": username, "sid": sid, **extra})
+    secure_flag = auth_manager.load_config().get("session_cookie_secure", False)
+    resp.set_cookie("sc_session", token, httponly=True, max_age=SESSION_MAX_AGE, secure=secure_flag)
+    return resp
+
+def _load_session(token: str):
+    """Decoded session cookie, or None if invalid, expired or logged out."""
+    try:
+        data = serializer.loads(token, max_age=SESSION_MAX_AGE)
+    except Exception:
+        return None
+    sid = data.get("sid")
+    # Cookies issued before session ids existed carry no sid and stay valid until they expire
+    if sid is not None and get_shared_store().get("sessions", sid) is None:
+        return None
+    return data
+
 def get_current_user(request: Request):
     """Retrieve user from session cookie."""
     token = request.cookies.get("sc_session")
@@ -176,11 +318,8 @@ def get_current_user(request: Request):
             return "admin" # Auto-login as admin
         return None
 
-    try:
-        data = serializer.loads(token, max_age=86400)
-        return data.get("username")
-    except Exception:
-        return None
+    data = _load_session(token)
+    return data.get("username") if data else None
 
 def login_required(request: Request):
     user = get_current_user(request)
@@ -423,9 +562,7 @@ async def login_page(request: Request, sso_failed: bool = False):
     conf = auth_manager.load_config()
     if conf.get("auth_disabled"):
         resp = RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
-        token = serializer.dumps({"username": "admin"})
-        secure_flag = auth_manager.load_config().get("session_cookie_secure", False)
-        resp.set_cookie("sc_session", token, httponly=True, max_age=86400, secure=secure_flag)
+        _set_session_cookie(resp, "admin")
         return resp
 
     # Auto-redirect to Entra SSO if configured and not returning from a failed SSO attempt
@@ -647,9 +784,7 @@ async def oauth_callback(code: str, state: str, request: Request):
 
     # Convert to session cookie
     resp = RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
-    token = serializer.dumps({"username": username})
-    secure_flag = auth_manager.load_config().get("session_cookie_secure", False)
-    resp.set_cookie("sc_session", token, httponly=True, max_age=86400, secure=secure_flag)
+    _set_session_cookie(resp, username)
     return resp
 
 # --- SSO Test Endpoints ---
@@ -704,15 +839,11 @@ async def login(request: Request, username: str = Form(...), password: str = For
             if user_info and user_info.get("must_change_password"):
                 logger.info(f"User '{username}' must change password. Redirecting to Admin.")
                 resp = RedirectResponse(url="/admin?force_pw_change=1", status_code=status.HTTP_303_SEE_OTHER)
-                token = serializer.dumps({"username": username})
-                secure_flag = auth_manager.load_config().get("session_cookie_secure", False)
-                resp.set_cookie("sc_session", token, httponly=True, max_age=86400, secure=secure_flag)
+                _set_session_cookie(resp, username)
                 return resp
 
             resp = RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
-            token = serializer.dumps({"username": username})
-            secure_flag = auth_manager.load_config().get("session_cookie_secure", False)
-            resp.set_cookie("sc_session", token, httponly=True, max_age=86400, secure=secure_flag)
+            _set_session_cookie(resp, username)
             return resp
     else:
         error = "Invalid Credentials"
@@ -751,7 +882,11 @@ async def login(request: Request, username: str = Form(...), password: str = For
     )
 
 @app.get("/logout")
-async def logout():
+async def logout(request: Request):
+    token = request.cookies.get("sc_session")
+    data = _load_session(token) if token else None
+    if data and data.get("sid"):
+        get_shared_store().delete("sessions", data["sid"])
     resp = RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
     resp.delete_cookie("sc_session")
     return resp
@@ -814,9 +949,7 @@ async def entra_callback(code: str, request: Request):
 
             # Login
             resp = RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
-            token = serializer.dumps({"username": email, "auth_method": "entra"})
-            secure_flag = auth_manager.load_config().get("session_cookie_secure", False)
-            resp.set_cookie("sc_session", token, httponly=True, max_age=86400, secure=secure_flag)
+            _set_session_cookie(resp, email, auth_method="entra")
             return resp
     except Exception as e:
         logger.error(f"Entra SSO Error: {e}")
@@ -850,9 +983,7 @@ async def github_callback(code: str, request: Request):
                user_manager.create_user(login, password=None, role="user", auto_hash=False)
 
           resp = RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
-          token = serializer.dumps({"username": login, "auth_method": "github"})
-          secure_flag = auth_manager.load_config().get("session_cookie_secure", False)
-          resp.set_cookie("sc_session", token, httponly=True, max_age=86400, secure=secure_flag)
+          _set_session_cookie(resp, login, auth_method="github")
           return resp
     except Exception as e:
         logger.error(f"GitHub SSO Error: {e}")
@@ -1161,7 +1292,10 @@ async def admin_reset(user: str = Depends(admin_required)):
     except Exception as e:
         logger.error(f"Failed to recreate default admin during reset: {e}")
 
-    # Force logout
+    # Force logout (all sessions, on every worker)
+    store = get_shared_store()
+    for sid in store.items("sessions"):
+        store.delete("sessions", sid)
     resp = RedirectResponse("/login", status_code=303)
     resp.delete_cookie("sc_session")
     return resp
@@ -1182,11 +1316,7 @@ async def flet_auth_middleware(request: Request, call_next):
 
     # 1. Broad whitelist for static/engine assets to prevent "FormatException"
     # This MUST be extremely permissive for anyone to load the engine
-    static_exts = [
-        ".js", ".mjs", ".json", ".wasm", ".png", ".ico", ".txt",
-        ".webmanifest", ".woff", ".woff2", ".ttf", ".svg", ".jpg",
-        ".jpeg", ".map", ".otf", ".cur"
-    ]
+    static_exts = STATIC_EXTENSIONS
 
     # If it looks like a static asset, let it through
     if (
@@ -1205,7 +1335,7 @@ async def flet_auth_middleware(request: Request, call_next):
         return await call_next(request)
 
     # 2. Whitelist explicit UI paths
-    whitelist = ["/login", "/logout", "/admin", "/api", "/oauth_callback", "/favicon.ico"]
+    whitelist = ["/login", "/logout", "/admin", "/api", "/metrics", "/oauth_callback", "/favicon.ico"]
     if any(path.startswith(p) for p in whitelist):
         return await call_next(request)
 
@@ -1235,62 +1365,194 @@ async def flet_auth_middleware(request: Request, call_next):
 
 app.middleware("http")(flet_auth_middleware)
 
+async def static_asset_middleware(request: Request, call_next):
+    """Serves indexed assets before any other middleware (auth checks, Flet) runs."""
+    if asset_index is not None and request.method in ("GET", "HEAD"):
+        entry = asset_index.get(request.url.path)
+        if entry is not None:
+            return asset_index.response(request, entry)
+    return await call_next(request)
+
+app.middleware("http")(static_asset_middleware)
+
+async def request_metrics_middleware(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Route template (not the raw path) keeps the label set small
+        route = getattr(request.scope.get("route"), "path", None) or "other"
+        HTTP_SERVER_SECONDS.observe(time.perf_counter() - start, method=request.method, route=route, status=status_code)
+
+# Registered last so it runs first (and times everything, including indexed assets)
+app.middleware("http")(request_metrics_middleware)
+
 # --- Upload Handler ---
-UPLOAD_DIR = Path(tempfile.gettempdir()) / "switchcraft_uploads"
+# Must be the same directory for all workers; SC_UPLOAD_DIR points it at a shared volume
+UPLOAD_DIR = Path(os.environ.get("SC_UPLOAD_DIR") or Path(tempfile.gettempdir()) / "switchcraft_uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
-@app.post("/upload")
-async def upload_endpoint(files: list[UploadFile]):
-    saved_files = []
-    for file in files:
-        if not file.filename:
-            continue
-
-        # Keep only alphanumeric, dots, dashes, underscores
-        clean_name = "".join(x for x in file.filename if x.isalnum() or x in "-_.")
+def _save_upload(file: UploadFile, owner: Optional[str] = None):
+    """
+    Stores an uploaded file under a unique name in UPLOAD_DIR. Returns the path (None for nameless parts).
+    owner: upload token of the Flet session that sent it (see shared_store.find_upload).
+    """
+    if not file.filename:
+        return None
 
-        # Prevent hidden files (leading dots) and ensure it's not empty after cleaning
-        clean_name = clean_name.lstrip(".")
-        if not clean_name:
-            import uuid
-            clean_name = f"upload_{uuid.uuid4().hex[:8]}.bin"
+    # Keep only alphanumeric, dots, dashes, underscores
+    clean_name = "".join(x for x in file.filename if x.isalnum() or x in "-_.")
 
-        # Append short UUID and ensure uniqueness
+    # Prevent hidden files (leading dots) and ensure it's not empty after cleaning
+    clean_name = clean_name.lstrip(".")
+    if not clean_name:
         import uuid
-        uid = uuid.uuid4().hex[:8]
-        parts = clean_name.rsplit(".", 1)
+        clean_name = f"upload_{uuid.uuid4().hex[:8]}.bin"
+
+    # Append short UUID and ensure uniqueness
+    import uuid
+    uid = uuid.uuid4().hex[:8]
+    parts = clean_name.rsplit(".", 1)
+
+    candidate_name = clean_name
+    if len(parts) > 1:
+        candidate_name = f"{parts[0]}_{uid}.{parts[1]}"
+    else:
+        candidate_name = f"{clean_name}_{uid}"
 
-        candidate_name = clean_name
+    path = UPLOAD_DIR / candidate_name
+    # Final collision safety loop (backup in case of rapid concurrent identical uploads)
+    while path.exists():
+        uid = uuid.uuid4().hex[:4]
+        parts = candidate_name.rsplit("_", 1) # Split by our own suffix
         if len(parts) > 1:
-            candidate_name = f"{parts[0]}_{uid}.{parts[1]}"
+            # Re-try with new suffix
+            base = parts[0]
+            ext_parts = parts[1].rsplit(".", 1)
+            if len(ext_parts) > 1:
+                candidate_name = f"{base}_{uid}.{ext_parts[1]}"
+            else:
+                candidate_name = f"{base}_{uid}"
         else:
-            candidate_name = f"{clean_name}_{uid}"
-
+            candidate_name = f"{candidate_name}_{uid}"
         path = UPLOAD_DIR / candidate_name
-        # Final collision safety loop (backup in case of rapid concurrent identical uploads)
-        while path.exists():
-            uid = uuid.uuid4().hex[:4]
-            parts = candidate_name.rsplit("_", 1) # Split by our own suffix
-            if len(parts) > 1:
-                # Re-try with new suffix
-                base = parts[0]
-                ext_parts = parts[1].rsplit(".", 1)
-                if len(ext_parts) > 1:
-                    candidate_name = f"{base}_{uid}.{ext_parts[1]}"
-                else:
-                    candidate_name = f"{base}_{uid}"
-            else:
-                candidate_name = f"{candidate_name}_{uid}"
-            path = UPLOAD_DIR / candidate_name
 
-        try:
+    try:
+        with UPLOAD_SECONDS.time():
             with open(path, "wb") as buffer:
                 shutil.copyfileobj(file.file, buffer)
+        size = path.stat().st_size
+        UPLOAD_BYTES.inc(size)
+        record_upload(str(path), file.filename, size, owner=owner)
+    finally:
+        file.file.close()
+    return path
+
+@app.post("/upload")
+async def upload_endpoint(request: Request, files: list[UploadFile]):
+    owner = request.query_params.get("token") or None
+    saved_files = []
+    for file in files:
+        path = _save_upload(file, owner)
+        if path:
             saved_files.append(str(path))
-        finally:
-            file.file.close()
     return {"uploaded": saved_files}
 
+# --- Analysis Jobs (REST, e.g. for CI) ---
+def api_user_required(request: Request):
+    user = get_current_user(request)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user
+
+def _is_admin(user: str) -> bool:
+    u_info = user_manager.get_user(user)
+    return bool(u_info and u_info.get("role") == "admin") or auth_manager.load_config().get("auth_disabled", False)
+
+def _job_view(job: dict) -> dict:
+    """Job status as returned by the API (without the result document)."""
+    return {
+        "id": job["id"],
+        "owner": job["owner"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "progress": job["progress"],
+        "message": job["message"],
+        "error": job["error"],
+        "file_name": job["payload"].get("file_name"),
+        "created": job["created"],
+        "started": job["started"],
+        "finished": job["finished"],
+    }
+
+def _get_own_job(job_id: str, user: str) -> dict:
+    job = job_queue.get(job_id)
+    if not job or (job["owner"] != user and not _is_admin(user)):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(file: UploadFile, priority: int = Form(0), user: str = Depends(api_user_required)):
+    path = _save_upload(file)
+    if not path:
+        raise HTTPException(status_code=400, detail="No file uploaded")
+    job = job_queue.submit(user, {"path": str(path), "file_name": file.filename, "cleanup": True}, priority=priority)
+    return _job_view(job)
+
+@app.get("/api/jobs")
+async def list_jobs(status: str = None, user: str = Depends(api_user_required)):
+    owner = None if _is_admin(user) else user
+    return {"jobs": [_job_view(j) for j in job_queue.list(owner=owner, status=status)]}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, user: str = Depends(api_user_required)):
+    return _job_view(_get_own_job(job_id, user))
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str, user: str = Depends(api_user_required)):
+    job = _get_own_job(job_id, user)
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str, user: str = Depends(api_user_required)):
+    job = _get_own_job(job_id, user)
+    if not job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Only queued jobs can be cancelled")
+    if job["payload"].get("cleanup"):
+        Path(job["payload"]["path"]).unlink(missing_ok=True)
+    return {"id": job_id, "status": "cancelled"}
+
+# --- Metrics (Prometheus text format) ---
+def _metrics_allowed(request: Request) -> bool:
+    """Admins (session cookie) or scrapers presenting SC_METRICS_TOKEN as a bearer token."""
+    token = os.environ.get("SC_METRICS_TOKEN")
+    auth = request.headers.get("authorization", "")
+    if token and auth.startswith("Bearer ") and secrets.compare_digest(auth[len("Bearer "):], token):
+        return True
+    user = get_current_user(request)
+    return bool(user) and _is_admin(user)
+
+def _job_metrics() -> dict:
+    """Queue depth per status; read at scrape time, so it is not summed across workers."""
+    registry = metrics.MetricsRegistry()
+    jobs = registry.gauge("switchcraft_jobs", "Analysis jobs per status", ["status"])
+    for job_status, count in job_queue.counts().items():
+        jobs.set(count, status=job_status)
+    return registry.snapshot()
+
+@app.get("/metrics")
+async def metrics_endpoint(request: Request):
+    if not _metrics_allowed(request):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    snapshot = await asyncio.to_thread(metrics.collect_published, get_shared_store())
+    snapshot.update(await asyncio.to_thread(_job_metrics))
+    return PlainTextResponse(metrics.render_prometheus(snapshot), media_type="text/plain; version=0.0.4")
+
 # --- Flet App Integration ---
 async def before_main(page: ft.Page):
     """
@@ -1309,13 +1571,13 @@ async def before_main(page: ft.Page):
             cookies = request.cookies
             token = cookies.get("sc_session")
             if token:
-                try:
-                    data = serializer.loads(token, max_age=86400)
+                data = _load_session(token)
+                if data:
                     username = data.get("username", "User")
                     page.switchcraft_session['username'] = username
                     logger.info(f"Injected username '{username}' into Flet session")
-                except Exception as e:
-                    logger.warning(f"Failed to decode session token: {e}")
+                else:
+                    logger.warning("Session token invalid, expired or revoked")
                     page.switchcraft_session['username'] = "User"
 
             # Detect browser language from Accept-Language header
@@ -1331,10 +1593,10 @@ async def before_main(page: ft.Page):
                     if primary_lang.startswith("de"):
                         page.switchcraft_session['browser_language'] = "de"
                         logger.info("Flet before_main: Setting language to 'de'")
-                        # Set i18n language directly
+                        # Bind i18n language to this session (not process-wide)
                         try:
                             from switchcraft.utils.i18n import i18n
-                            i18n.set_language("de")
+                            i18n.bind_language("de")
                         except Exception:
                             pass
                         logger.info("Detected browser language: German")
@@ -1342,7 +1604,7 @@ async def before_main(page: ft.Page):
                         page.switchcraft_session['browser_language'] = "en"
                         try:
                             from switchcraft.utils.i18n import i18n
-                            i18n.set_language("en")
+                            i18n.bind_language("en")
                         except Exception:
                             pass
                         logger.info(f"Detected browser language: English (from {primary_lang})")
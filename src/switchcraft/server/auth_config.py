@@ -1,4 +1,6 @@
 import json
+import os
+import threading
 import secrets
 from pathlib import Path
 from typing import Optional, Dict
@@ -85,8 +87,11 @@ class AuthConfigManager:
             return self._create_default_config()
 
     def save_config(self, config: Dict):
-        with open(self.config_file, "w") as f:
+        # Write-then-rename so other server workers never read a half-written file
+        tmp = self.config_file.with_name(f"{self.config_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w") as f:
             json.dump(config, f, indent=4)
+        os.replace(tmp, self.config_file)
 
     def _create_default_config(self) -> Dict:
         # User requested default "admin"
@@ -105,7 +110,25 @@ class AuthConfigManager:
             "webauthn_credentials": [], # List of registered credentials
             "first_run": True
         }
-        self.save_config(config)
+        # Several workers may start at once: only the first one creates the file (and the
+        # secret key), the others use what it wrote so session cookies stay valid everywhere
+        tmp = self.config_file.with_name(f"{self.config_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "w") as f:
+                json.dump(config, f, indent=4)
+            os.link(tmp, self.config_file)
+        except FileExistsError:
+            try:
+                with open(self.config_file, "r") as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"Existing auth config unreadable, overwriting: {e}")
+                self.save_config(config)
+        except OSError:
+            # Filesystem without hard links
+            self.save_config(config)
+        finally:
+            tmp.unlink(missing_ok=True)
         return config
 
     def get_secret_key(self) -> str:
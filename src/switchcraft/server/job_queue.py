@@ -0,0 +1,410 @@
+"""
+Persistent analysis job queue for the web server.
+
+Analyses used to run inside the Flet session thread of the user who uploaded the file, so a
+large nested extraction blocked that session and competed with every websocket served by the
+same interpreter. Jobs are now stored in a SQLite queue (next to the server config, so they
+survive restarts and are visible to every uvicorn worker) and executed in separate worker
+processes:
+
+    JobQueue   - submit / claim / progress / complete, priorities and per-user limits
+    JobRunner  - per server process: claims jobs and runs them on a process pool
+
+A claimed job holds a lease that the runner renews while it is running. If the server dies,
+the lease expires and the job is queued again on the next start.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from switchcraft.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+DEFAULT_WORKERS = 2
+DEFAULT_USER_LIMIT = 2
+MIN_PRIORITY, MAX_PRIORITY = 0, 9
+LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3
+# Finished jobs (and their results) are kept this long
+RETENTION_SECONDS = 7 * 86400
+PROGRESS_INTERVAL = 0.5
+
+
+class JobQueue:
+    """
+    Usage:
+        queue = JobQueue(config_dir / "jobs.db")
+        job = queue.submit("alice", {"path": "/uploads/setup.exe"}, priority=5)
+        queue.get(job["id"])["status"]  # queued -> running -> done
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, owner TEXT NOT NULL, payload TEXT NOT NULL,"
+            " priority INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL,"
+            " progress REAL NOT NULL DEFAULT 0, message TEXT, result TEXT, error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0, worker TEXT, lease_until REAL,"
+            " created REAL NOT NULL, started REAL, finished REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority DESC, created)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def submit(self, owner: str, payload: Dict, priority: int = 0) -> Dict:
+        """Queues a job. Higher priority runs first; equal priorities run in submission order."""
+        job_id = uuid.uuid4().hex
+        priority = max(MIN_PRIORITY, min(MAX_PRIORITY, int(priority)))
+        self._conn().execute(
+            "INSERT INTO jobs (id, owner, payload, priority, status, created) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, owner, json.dumps(payload), priority, STATUS_QUEUED, time.time()),
+        )
+        logger.info(f"Queued job {job_id} for '{owner}' (priority {priority})")
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, owner: Optional[str] = None, status: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        sql, args = "SELECT * FROM jobs WHERE 1=1", []
+        if owner is not None:
+            sql += " AND owner = ?"
+            args.append(owner)
+        if status is not None:
+            sql += " AND status = ?"
+            args.append(status)
+        sql += " ORDER BY created DESC LIMIT ?"
+        args.append(limit)
+        return [self._to_dict(r) for r in self._conn().execute(sql, args)]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    def claim(self, worker: str, user_limit: int = DEFAULT_USER_LIMIT) -> Optional[Dict]:
+        """
+        Atomically takes the next runnable job: highest priority first, skipping owners that
+        already have user_limit jobs running (on any server process).
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT j.id FROM jobs j WHERE j.status = ? AND"
+                " (SELECT COUNT(*) FROM jobs r WHERE r.owner = j.owner AND r.status = ?) < ?"
+                " ORDER BY j.priority DESC, j.created LIMIT 1",
+                (STATUS_QUEUED, STATUS_RUNNING, user_limit),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, started = ?, lease_until = ?,"
+                " attempts = attempts + 1, progress = 0, message = NULL WHERE id = ?",
+                (STATUS_RUNNING, worker, now, now + LEASE_SECONDS, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row["id"])
+
+    def renew(self, job_ids: List[str]):
+        if job_ids:
+            marks = ",".join("?" * len(job_ids))
+            self._conn().execute(
+                f"UPDATE jobs SET lease_until = ? WHERE status = ? AND id IN ({marks})",
+                (time.time() + LEASE_SECONDS, STATUS_RUNNING, *job_ids),
+            )
+
+    def update_progress(self, job_id: str, progress: float, message: str = None):
+        self._conn().execute(
+            "UPDATE jobs SET progress = ?, message = ? WHERE id = ? AND status = ?",
+            (progress, message, job_id, STATUS_RUNNING),
+        )
+
+    def complete(self, job_id: str, result: Dict):
+        self._finish(job_id, STATUS_DONE, result=json.dumps(result), progress=1.0)
+
+    def fail(self, job_id: str, error: str):
+        self._finish(job_id, STATUS_FAILED, error=error)
+
+    def _finish(self, job_id, status, result=None, error=None, progress=None):
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, progress = COALESCE(?, progress),"
+            " finished = ?, lease_until = NULL WHERE id = ? AND status = ?",
+            (status, result, error, progress, time.time(), job_id, STATUS_RUNNING),
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a queued job. Running jobs finish; returns False for them."""
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = ?, finished = ? WHERE id = ? AND status = ?",
+            (STATUS_CANCELLED, time.time(), job_id, STATUS_QUEUED),
+        )
+        return cur.rowcount == 1
+
+    def requeue_stale(self) -> int:
+        """Returns jobs whose runner stopped renewing its lease to the queue (or fails them after MAX_ATTEMPTS)."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = 'Worker stopped repeatedly while running this job',"
+                " finished = ?, lease_until = NULL WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                (STATUS_FAILED, now, STATUS_RUNNING, now, MAX_ATTEMPTS),
+            )
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL WHERE status = ? AND lease_until < ?",
+                (STATUS_QUEUED, STATUS_RUNNING, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if cur.rowcount:
+            logger.info(f"Requeued {cur.rowcount} interrupted jobs")
+        return cur.rowcount
+
+    def purge_finished(self, max_age: float = RETENTION_SECONDS) -> int:
+        marks = ",".join("?" * len(FINISHED_STATUSES))
+        cur = self._conn().execute(
+            f"DELETE FROM jobs WHERE status IN ({marks}) AND finished < ?",
+            (*FINISHED_STATUSES, time.time() - max_age),
+        )
+        return cur.rowcount
+
+    def wait(self, job_id: str, on_update: Optional[Callable[[Dict], None]] = None, interval: float = 0.5,
+             timeout: Optional[float] = None, cancelled: Callable[[], bool] = lambda: False) -> Optional[Dict]:
+        """
+        Polls a job until it finishes, calling on_update(job) whenever its status or progress
+        changes. Returns the finished job, or the last seen state on timeout/cancellation.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        last = None
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                return None
+            state = (job["status"], job["progress"], job["message"])
+            if state != last:
+                last = state
+                if on_update:
+                    on_update(job)
+            if job["status"] in FINISHED_STATUSES or cancelled():
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(interval)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def run_analysis_job(db_path: str, job_id: str, payload: Dict) -> Dict:
+    """Worker process entry point: analyzes payload['path'] and reports progress to the queue."""
+    from switchcraft.controllers.analysis_controller import AnalysisController
+
+    queue = JobQueue(db_path)
+    last = [0.0]
+
+    def on_progress(pct, msg, eta=None):
+        now = time.monotonic()
+        if now - last[0] >= PROGRESS_INTERVAL or pct >= 1.0:
+            last[0] = now
+            queue.update_progress(job_id, pct, msg)
+
+    try:
+        result = AnalysisController().analyze_file(payload["path"], progress_callback=on_progress)
+        return result.to_dict()
+    finally:
+        queue.close()
+        _publish_metrics(Path(db_path).parent)
+
+
+def _publish_metrics(base_dir: Path):
+    """Makes this worker process' analysis timings visible to /metrics and 'switchcraft stats'."""
+    from switchcraft.server.shared_store import default_store_url, open_store
+    try:
+        store = open_store(default_store_url(base_dir))
+        try:
+            metrics.publish(store)
+        finally:
+            store.close()
+    except Exception as e:
+        logger.debug(f"Failed to publish worker metrics: {e}")
+
+
+class JobRunner:
+    """
+    Claims jobs from the queue and runs them on a process pool. One runner per server
+    process; several runners (uvicorn workers) can share one queue.
+    """
+
+    def __init__(self, queue: JobQueue, workers: int = DEFAULT_WORKERS, user_limit: int = DEFAULT_USER_LIMIT,
+                 job_target: Callable = run_analysis_job, executor=None, poll_interval: float = 1.0):
+        self.queue = queue
+        self.workers = max(1, workers)
+        self.user_limit = max(1, user_limit)
+        self.job_target = job_target
+        self.poll_interval = poll_interval
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._executor = executor
+        self._own_executor = executor is None
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: workers must not inherit the server's event loop, sockets or Flet state
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def dispatch_once(self) -> int:
+        """Claims jobs until the pool is full or nothing is runnable. Returns how many were started."""
+        started = 0
+        while True:
+            with self._lock:
+                if len(self._in_flight) >= self.workers:
+                    break
+            job = self.queue.claim(self.worker_id, self.user_limit)
+            if job is None:
+                break
+            try:
+                future = self._get_executor().submit(self.job_target, str(self.queue.path), job["id"], job["payload"])
+            except (BrokenProcessPool, RuntimeError) as e:
+                self.queue.fail(job["id"], f"Worker pool unavailable: {e}")
+                self._reset_executor()
+                break
+            with self._lock:
+                self._in_flight[job["id"]] = future
+            future.add_done_callback(lambda f, job=job: self._on_done(job, f))
+            started += 1
+        return started
+
+    def _on_done(self, job: Dict, future: Future):
+        job_id = job["id"]
+        try:
+            result = future.result()
+            if isinstance(result, dict) and result.get("error") and not result.get("info"):
+                self.queue.fail(job_id, result["error"])
+            else:
+                self.queue.complete(job_id, result)
+            logger.info(f"Job {job_id} finished")
+        except BrokenProcessPool as e:
+            self.queue.fail(job_id, f"Worker process died: {e}")
+            self._reset_executor()
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            self.queue.fail(job_id, str(e))
+        finally:
+            with self._lock:
+                self._in_flight.pop(job_id, None)
+            if job["payload"].get("cleanup"):
+                try:
+                    os.remove(job["payload"]["path"])
+                except OSError:
+                    pass
+
+    def _reset_executor(self):
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def in_flight(self) -> List[str]:
+        with self._lock:
+            return list(self._in_flight)
+
+    def _loop(self):
+        last_maintenance = 0.0
+        while not self._stop.is_set():
+            try:
+                now = time.monotonic()
+                if now - last_maintenance >= LEASE_SECONDS / 2:
+                    last_maintenance = now
+                    self.queue.renew(self.in_flight())
+                    self.queue.requeue_stale()
+                self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Job dispatcher error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.queue.requeue_stale()
+        purged = self.queue.purge_finished()
+        if purged:
+            logger.info(f"Purged {purged} old jobs")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="sc-job-dispatcher")
+        self._thread.start()
+        logger.info(f"Job runner {self.worker_id} started ({self.workers} worker processes)")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        # Running jobs are abandoned; their leases expire and they are queued again
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_queue_instance: Optional[JobQueue] = None
+
+
+def get_job_queue() -> Optional[JobQueue]:
+    """The server's job queue, or None outside the web server (analysis then runs in-process)."""
+    return _queue_instance
+
+
+def set_job_queue(queue: Optional[JobQueue]):
+    global _queue_instance
+    _queue_instance = queue
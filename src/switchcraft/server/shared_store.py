@@ -0,0 +1,285 @@
+"""
+Key/value store shared by all web server workers.
+
+Everything that has to survive a request landing on a different uvicorn worker
+(login sessions, upload metadata, job state, caches) goes through this store instead
+of module globals. Backends are chosen by URL (env SC_SHARED_STORE):
+
+    sqlite:////abs/path/shared_state.db (default, WAL mode - safe for N local workers)
+    memory://                            (single process only; tests and development)
+
+Other backends (e.g. an external KV service for multi-host setups) plug in through
+register_backend(scheme, factory).
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_NAME = "shared_state.db"
+
+
+class SharedStore(ABC):
+    """Namespaced JSON values with optional expiry (ttl in seconds)."""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        pass
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        pass
+
+    @abstractmethod
+    def add(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Sets the value only if the key is absent (or expired). Returns True if it was set."""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str):
+        pass
+
+    @abstractmethod
+    def items(self, namespace: str) -> Dict[str, Any]:
+        """All live entries of a namespace."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        pass
+
+    def close(self):
+        pass
+
+    def namespace(self, namespace: str) -> "StoreNamespace":
+        return StoreNamespace(self, namespace)
+
+
+class StoreNamespace:
+    """A SharedStore bound to one namespace."""
+
+    def __init__(self, store: SharedStore, namespace: str):
+        self.store = store
+        self.name = namespace
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.store.get(self.name, key, default)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.store.set(self.name, key, value, ttl)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return self.store.add(self.name, key, value, ttl)
+
+    def delete(self, key: str):
+        self.store.delete(self.name, key)
+
+    def items(self) -> Dict[str, Any]:
+        return self.store.items(self.name)
+
+
+class MemoryStore(SharedStore):
+    def __init__(self):
+        self._data: Dict[tuple, tuple] = {}  # (ns, key) -> (value, expires)
+        self._lock = threading.Lock()
+
+    def _live(self, entry, now) -> bool:
+        return entry is not None and (entry[1] is None or entry[1] > now)
+
+    def get(self, namespace, key, default=None):
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if not self._live(entry, time.time()):
+                return default
+            return json.loads(entry[0])
+
+    def set(self, namespace, key, value, ttl=None):
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[(namespace, key)] = (json.dumps(value), expires)
+
+    def add(self, namespace, key, value, ttl=None):
+        now = time.time()
+        with self._lock:
+            if self._live(self._data.get((namespace, key)), now):
+                return False
+            self._data[(namespace, key)] = (json.dumps(value), now + ttl if ttl else None)
+            return True
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._data.pop((namespace, key), None)
+
+    def items(self, namespace):
+        now = time.time()
+        with self._lock:
+            return {k: json.loads(e[0]) for (ns, k), e in self._data.items() if ns == namespace and self._live(e, now)}
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            dead = [k for k, e in self._data.items() if not self._live(e, now)]
+            for k in dead:
+                del self._data[k]
+        return len(dead)
+
+
+class SqliteStore(SharedStore):
+    """
+    SQLite file in WAL mode: readers never block and each worker process/thread uses its
+    own connection. Expired rows are ignored on read and removed by purge_expired().
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            " ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires REAL,"
+            " PRIMARY KEY (ns, key))"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; writes that need atomicity use explicit BEGIN IMMEDIATE
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, key, default=None):
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE ns = ? AND key = ? AND (expires IS NULL OR expires > ?)",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, namespace, key, value, ttl=None):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO kv (ns, key, value, expires) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), time.time() + ttl if ttl else None),
+        )
+
+    def add(self, namespace, key, value, ttl=None):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM kv WHERE ns = ? AND key = ? AND expires IS NOT NULL AND expires <= ?", (namespace, key, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO kv (ns, key, value, expires) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), now + ttl if ttl else None),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cur.rowcount == 1
+
+    def delete(self, namespace, key):
+        self._conn().execute("DELETE FROM kv WHERE ns = ? AND key = ?", (namespace, key))
+
+    def items(self, namespace):
+        rows = self._conn().execute(
+            "SELECT key, value FROM kv WHERE ns = ? AND (expires IS NULL OR expires > ?)",
+            (namespace, time.time()),
+        ).fetchall()
+        return {k: json.loads(v) for k, v in rows}
+
+    def purge_expired(self):
+        cur = self._conn().execute("DELETE FROM kv WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+        return cur.rowcount
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_BACKENDS: Dict[str, Callable[[str], SharedStore]] = {
+    "sqlite": lambda url: SqliteStore(url[len("sqlite:///"):] if url.startswith("sqlite:///") else url[len("sqlite://"):]),
+    "memory": lambda url: MemoryStore(),
+}
+
+
+def register_backend(scheme: str, factory: Callable[[str], SharedStore]):
+    """Registers a store backend for URLs of the form '<scheme>://...'."""
+    _BACKENDS[scheme] = factory
+
+
+def open_store(url: str) -> SharedStore:
+    scheme = url.split("://", 1)[0] if "://" in url else ""
+    factory = _BACKENDS.get(scheme)
+    if factory is None:
+        raise ValueError(f"Unsupported shared store backend: {url}")
+    return factory(url)
+
+
+def default_store_url(base_dir: Optional[Path] = None) -> str:
+    """SC_SHARED_STORE if set, else a SQLite file next to the server config."""
+    url = os.environ.get("SC_SHARED_STORE")
+    if url:
+        return url
+    base_dir = Path(base_dir) if base_dir else Path.home() / ".switchcraft" / "server"
+    return f"sqlite:///{base_dir / DEFAULT_DB_NAME}"
+
+
+_store_instance: Optional[SharedStore] = None
+_store_lock = threading.Lock()
+
+
+def get_shared_store() -> SharedStore:
+    global _store_instance
+    if _store_instance is None:
+        with _store_lock:
+            if _store_instance is None:
+                url = default_store_url()
+                _store_instance = open_store(url)
+                logger.info(f"Shared store: {url.split('://', 1)[0]}")
+    return _store_instance
+
+
+def set_shared_store(store: Optional[SharedStore]):
+    """Replaces the process-wide store (tests, or embedding apps with their own backend)."""
+    global _store_instance
+    with _store_lock:
+        _store_instance = store
+
+
+# --- Upload registry ---
+# Uploads are written by whichever worker receives the POST, while the Flet session that
+# asked for it may live on another worker; the registry maps the browser file name to the
+# stored path for that case. Every entry carries the uploading session's token (a secret
+# the session puts in its upload URL), so a session only ever finds its own uploads.
+UPLOADS_NAMESPACE = "uploads"
+UPLOAD_TTL = 86400
+
+
+def record_upload(stored_path: str, original_name: str, size: int = 0, owner: Optional[str] = None):
+    get_shared_store().set(
+        UPLOADS_NAMESPACE, Path(stored_path).name,
+        {"path": str(stored_path), "original_name": original_name, "size": size, "owner": owner,
+         "uploaded_at": time.time()},
+        ttl=UPLOAD_TTL,
+    )
+
+
+def find_upload(original_name: str, owner: Optional[str]) -> Optional[str]:
+    """Stored path of the most recent upload of a file with this browser-side name by `owner`."""
+    if not owner:
+        return None
+    matches = [m for m in get_shared_store().items(UPLOADS_NAMESPACE).values()
+               if m.get("original_name") == original_name and m.get("owner") == owner]
+    if not matches:
+        return None
+    return max(matches, key=lambda m: m.get("uploaded_at", 0))["path"]
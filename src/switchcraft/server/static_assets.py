@@ -0,0 +1,201 @@
+"""
+Static asset index for the web server.
+
+The Flet engine (main.dart.js, canvaskit, wasm, fonts) and our own assets are resolved once
+at startup into a manifest of URL path -> file, content hash ETag and precompressed variants.
+Requests for these paths are answered straight from the manifest (no filesystem probing, no
+auth middleware) with long-lived Cache-Control, 304 revalidation and gzip/brotli bodies when
+the client accepts them.
+
+Variants are built ahead of time, in the Docker image:
+
+    python -m switchcraft.server.static_assets <dir> [<dir> ...]
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip variants only
+    brotli = None
+
+# Public file types (no login needed; the Flet engine loads them before the app starts)
+STATIC_EXTENSIONS = (
+    ".js", ".mjs", ".json", ".wasm", ".png", ".ico", ".txt",
+    ".webmanifest", ".woff", ".woff2", ".ttf", ".svg", ".jpg",
+    ".jpeg", ".map", ".otf", ".cur",
+)
+# Formats that are already compressed gain nothing from gzip/brotli
+COMPRESSIBLE_EXTENSIONS = (
+    ".js", ".mjs", ".wasm", ".json", ".svg", ".txt", ".map", ".ttf", ".otf", ".webmanifest",
+)
+MIN_COMPRESS_SIZE = 1024
+# Preferred first
+ENCODINGS: List[Tuple[str, str]] = [("br", ".br"), ("gzip", ".gz")]
+
+DEFAULT_MAX_AGE = 86400
+# Entry points are small and must pick up a new engine build right away
+REVALIDATE_NAMES = {
+    "flutter_bootstrap.js", "flutter_service_worker.js", "flutter.js", "manifest.json",
+    "version.json", "python.js", "python-worker.js",
+}
+
+
+@dataclass
+class AssetEntry:
+    path: Path
+    stat: os.stat_result
+    etag: str
+    media_type: str
+    cache_control: str
+    variants: Dict[str, Tuple[Path, os.stat_result]] = field(default_factory=dict)
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()[:20]
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def _iter_files(root: Path) -> Iterable[Path]:
+    for dirpath, dirnames, filenames in os.walk(root, followlinks=True):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            if name.startswith(".") or not name.lower().endswith(STATIC_EXTENSIONS):
+                continue  # .gz/.br variants are attached to their source; HTML is rendered by Flet
+            yield Path(dirpath) / name
+
+
+class AssetIndex:
+    """
+    URL path -> AssetEntry. Mounts are (url_prefix, directory) pairs; when two mounts provide
+    the same URL, the first one wins (same precedence the request handlers used to probe in).
+    """
+
+    def __init__(self, mounts: List[Tuple[str, Path]], max_age: int = DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self.entries: Dict[str, AssetEntry] = {}
+        for prefix, root in mounts:
+            if root and Path(root).is_dir():
+                self._add_mount(prefix.rstrip("/"), Path(root))
+
+    def _add_mount(self, prefix: str, root: Path):
+        for path in _iter_files(root):
+            url = f"{prefix}/{path.relative_to(root).as_posix()}"
+            if url in self.entries:
+                continue
+            try:
+                self.entries[url] = self._entry(path)
+            except OSError as e:
+                logger.debug(f"Skipping asset {path}: {e}")
+
+    def _entry(self, path: Path) -> AssetEntry:
+        st = path.stat()
+        variants = {}
+        for encoding, suffix in ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            try:
+                vst = variant.stat()
+            except OSError:
+                continue
+            if vst.st_mtime >= st.st_mtime:  # ignore variants older than their source
+                variants[encoding] = (variant, vst)
+        if path.name in REVALIDATE_NAMES:
+            cache_control = "no-cache"
+        else:
+            cache_control = f"public, max-age={self.max_age}, stale-while-revalidate={self.max_age}"
+        return AssetEntry(
+            path=path,
+            stat=st,
+            etag=f'"{_file_hash(path)}"',
+            media_type=mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+            cache_control=cache_control,
+            variants=variants,
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, url_path: str) -> Optional[AssetEntry]:
+        return self.entries.get(url_path)
+
+    def response(self, request: Request, entry: AssetEntry) -> Response:
+        headers = {"Cache-Control": entry.cache_control, "Vary": "Accept-Encoding"}
+        path, st, etag = entry.path, entry.stat, entry.etag
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding, _ in ENCODINGS:
+            variant = entry.variants.get(encoding)
+            if variant and encoding in accepted:
+                path, st = variant
+                # Each representation needs its own validator
+                etag = f'{entry.etag[:-1]}-{encoding}"'
+                headers["Content-Encoding"] = encoding
+                break
+        headers["ETag"] = etag
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+            if etag in tags or "*" in tags:
+                headers.pop("Content-Encoding", None)
+                return Response(status_code=304, headers=headers)
+        return FileResponse(path, stat_result=st, media_type=entry.media_type, headers=headers)
+
+
+def precompress(root: Path, min_size: int = MIN_COMPRESS_SIZE) -> int:
+    """Writes .gz (and .br, when brotli is installed) next to every compressible file. Returns files written."""
+    written = 0
+    for path in _iter_files(Path(root)):
+        if not path.name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            continue
+        data = path.read_bytes()
+        if len(data) < min_size:
+            continue
+        candidates = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            candidates.append((".br", brotli.compress(data, quality=11)))
+        for suffix, compressed in candidates:
+            if len(compressed) >= len(data) * 0.95:
+                continue  # not worth a Content-Encoding
+            path.with_name(path.name + suffix).write_bytes(compressed)
+            written += 1
+    return written
+
+
+def main(argv: List[str]) -> int:
+    if not argv:
+        print("Usage: python -m switchcraft.server.static_assets <dir> [<dir> ...]")
+        return 2
+    if brotli is None:
+        print("brotli not installed - writing gzip variants only")
+    for root in argv:
+        print(f"{root}: {precompress(Path(root))} compressed variants written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
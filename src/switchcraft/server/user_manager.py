@@ -1,12 +1,17 @@
 import json
 import logging
+import os
+import threading
 from pathlib import Path
 from typing import Optional, Dict, List
 import bcrypt
 from switchcraft.utils.crypto import SimpleCrypto
+from switchcraft.utils import metrics
 
 logger = logging.getLogger("UserManager")
 
+BCRYPT_SECONDS = metrics.histogram("switchcraft_bcrypt_seconds", "Password hashing and verification", ["op"])
+
 class UserManager:
     """Manages users for the SwitchCraft Server (stored in users.json)."""
 
@@ -29,7 +34,8 @@ class UserManager:
         # Encode to bytes and hash
         pw_bytes = password.encode('utf-8')
         salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(pw_bytes, salt)
+        with BCRYPT_SECONDS.time(op="hash"):
+            hashed = bcrypt.hashpw(pw_bytes, salt)
         return hashed.decode('utf-8')
 
     def _verify_password(self, password: str, password_hash: str) -> bool:
@@ -39,7 +45,8 @@ class UserManager:
         try:
             pw_bytes = password.encode('utf-8')
             hash_bytes = password_hash.encode('utf-8')
-            return bcrypt.checkpw(pw_bytes, hash_bytes)
+            with BCRYPT_SECONDS.time(op="verify"):
+                return bcrypt.checkpw(pw_bytes, hash_bytes)
         except Exception as e:
             logger.error(f"Password verification failed: {e}")
             return False
@@ -78,8 +85,11 @@ class UserManager:
         return {"users": {}}
 
     def _save_data(self, data: Dict):
-        with open(self.users_file, "w") as f:
+        # Write-then-rename so other server workers never read a half-written file
+        tmp = self.users_file.with_name(f"{self.users_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w") as f:
             json.dump(data, f, indent=4)
+        os.replace(tmp, self.users_file)
 
     def get_user(self, username: str) -> Optional[Dict]:
         data = self._load_data()
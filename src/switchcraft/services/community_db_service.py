@@ -1,40 +1,351 @@
+import hashlib
 import json
 import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
 from pathlib import Path
-import hashlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from switchcraft.services.fingerprint_service import get_fingerprint_service
 
 logger = logging.getLogger(__name__)
 
+# Bundled database, resolved relative to the package (not the CWD)
+BUNDLED_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "community" / "switches.json"
+
+# Seed with some known tricky apps (used in addition to the bundled/delta data)
+SEED_ENTRIES = [
+    {"id": "seed-empty-hash", "sha256": ["e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"],
+     "switches": ["/S", "/AllUsers"]},
+    {"id": "seed-vlc", "app_name": "vlc", "switches": ["/L=1033", "/S"]},
+    {"id": "seed-notepad++", "app_name": "notepad++", "switches": ["/S"]},
+    {"id": "seed-firefox", "app_name": "firefox", "switches": ["-ms"]},
+    {"id": "seed-chrome", "app_name": "chrome", "switches": ["/silent", "/install"]},
+    {"id": "seed-adobe-reader", "app_name": "adobe reader", "switches": ["/sAll", "/rs", "/msi", "EULA_ACCEPT=YES"]},
+]
+
+# Tokens that say nothing about the product itself (stripped before fuzzy matching)
+_NOISE_TOKENS = {
+    "setup", "install", "installer", "x64", "x86", "x86_64", "amd64", "arm64", "win32", "win64",
+    "win", "windows", "full", "offline", "online", "silent", "en", "us", "enu", "multi", "release",
+    "stable", "latest", "portable", "exe", "msi", "64bit", "32bit", "64", "32",
+}
+_VERSION_RE = re.compile(r"^v?\d+([._-]\d+)*[a-z]?$")
+_SPLIT_RE = re.compile(r"[^a-z0-9+#]+")
+
+_community_db_instance = None
+_community_db_lock = threading.Lock()
+
+
+def get_community_db():
+    """Returns the process-wide CommunityDBService (loaded once, shared by all controllers)."""
+    global _community_db_instance
+    with _community_db_lock:
+        if _community_db_instance is None:
+            _community_db_instance = CommunityDBService()
+        return _community_db_instance
+
+
+def normalize_name(name: str) -> str:
+    """Lowercases a file or product name and drops extensions, versions and noise tokens."""
+    name = name.lower()
+    name = re.sub(r"\.(exe|msi|msix|appx|zip|dmg|pkg)$", "", name)
+    tokens = [t for t in _SPLIT_RE.split(name) if t]
+    kept = [t for t in tokens if t not in _NOISE_TOKENS and not _VERSION_RE.match(t)]
+    return " ".join(kept or tokens)
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _normalize_product_code(code: str) -> str:
+    return "{" + code.strip().strip("{}").upper() + "}"
+
 
 class CommunityDBService:
-    def __init__(self):
-        # In a real scenario, this would fetch from a CDN or API.
-        # For now, we simulate a local DB.
-        self.db_path = Path("src/switchcraft/data/community/switches.json")
-        self.db = self._load_db()
+    """
+    Indexed, in-memory community switch database.
+
+    Entries come from the bundled switches.json (list format, or the legacy
+    {"hash_map", "name_map"} format), built-in seeds and a local delta journal.
+    Lookups go through hash, product-code, vendor and normalized-name indexes; fuzzy
+    name matching ranks candidates by trigram similarity instead of scanning every entry.
+
+    Updates from a feed are applied incrementally (apply_delta) and appended to the
+    journal, so the bundled file is never rewritten. Data is loaded lazily on first use;
+    deltas that other processes (`switchcraft community pull`, server workers) append to
+    the journal later are picked up within JOURNAL_CHECK_SECONDS.
+
+    Entries with a "rule" object carry installer signature rules for ExeAnalyzer (see
+    switchcraft.analyzers.rules), which picks them up when the feed changes them.
+    """
+
+    MIN_FUZZY_SCORE = 0.5
+    JOURNAL_CHECK_SECONDS = 5.0
+
+    def __init__(self, db_path=None, journal_path=None):
+        self.db_path = Path(db_path) if db_path else BUNDLED_DB_PATH
+        self.journal_path = Path(journal_path) if journal_path else self._get_journal_path()
+        self._lock = threading.RLock()
+        self.entries: Dict[str, Dict] = {}
+        self.feed_version = 0
+
+        self._by_hash: Dict[str, Set[str]] = {}
+        self._by_product_code: Dict[str, Set[str]] = {}
+        self._by_vendor: Dict[str, Set[str]] = {}
+        self._by_name: Dict[str, Set[str]] = {}
+        self._by_trigram: Dict[str, Set[str]] = {}
+        self._trigram_counts: Dict[str, int] = {}
+        self._rules_revision = 0
+        self._journal_offset = 0
+        self._journal_checked = 0.0
+        self._loaded = False
+
+    @staticmethod
+    def _get_journal_path() -> Path:
+        app_data = os.getenv('APPDATA')
+        if app_data:
+            path = Path(app_data) / "FaserF" / "SwitchCraft" / "communitydb.jsonl"
+        else:
+            path = Path.home() / ".switchcraft" / "communitydb.jsonl"
+        return path
+
+    # --- Loading ---
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            if time.monotonic() - self._journal_checked >= self.JOURNAL_CHECK_SECONDS:
+                with self._lock:
+                    self._replay_journal()
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load_db()
+                self._loaded = True
 
     def _load_db(self):
-        if not self.db_path.exists():
-            # Seed with some known tricky apps
-            return {
-                "hash_map": {
-                    # Example Hash -> Switches
-                    "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855": ["/S", "/AllUsers"],
-                },
-                "name_map": {
-                    "vlc": ["/L=1033", "/S"],
-                    "notepad++": ["/S"],
-                    "firefox": ["-ms"],
-                    "chrome": ["/silent", "/install"],
-                    "adobe reader": ["/sAll", "/rs", "/msi", "EULA_ACCEPT=YES"]
-                }
-            }
+        for entry in SEED_ENTRIES:
+            self._add(entry)
+
+        if self.db_path.exists():
+            try:
+                with open(self.db_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for entry in self._iter_entries(data):
+                    self._add(entry)
+            except Exception as e:
+                logger.error(f"Failed to load DB: {e}")
+
+        self._replay_journal(initial=True)
+
+        logger.debug(f"Community DB loaded: {len(self.entries)} entries (feed version {self.feed_version})")
+
+    def _replay_journal(self, initial: bool = False):
+        """Applies the journal lines added since the last replay (all of them on the initial load)."""
+        self._journal_checked = time.monotonic()
+        try:
+            size = self.journal_path.stat().st_size
+        except OSError:
+            return
+        if size < self._journal_offset:
+            # Journal was replaced; its deltas are filtered by version below
+            self._journal_offset = 0
+        if size == self._journal_offset:
+            return
         try:
-            with open(self.db_path, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load DB: {e}")
-            return {}
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._journal_offset)
+                data = f.read(size - self._journal_offset)
+        except OSError as e:
+            logger.error(f"Failed to replay community DB journal: {e}")
+            return
+
+        # A line another process is still writing is read on the next replay
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                delta = json.loads(line)
+            except ValueError as e:
+                logger.error(f"Skipping invalid community DB journal line: {e}")
+                continue
+            version = int(delta.get("version") or 0)
+            # Later replays skip what this process applied itself (apply_delta, pull_updates)
+            if not initial and version and version <= self.feed_version:
+                continue
+            self._apply(delta)
+        self._journal_offset += end
+
+    @staticmethod
+    def _iter_entries(data) -> Iterable[Dict]:
+        if isinstance(data, list):
+            yield from (e for e in data if isinstance(e, dict))
+        elif isinstance(data, dict):
+            # Legacy format
+            for sha, switches in data.get("hash_map", {}).items():
+                yield {"sha256": [sha], "switches": switches}
+            for name, switches in data.get("name_map", {}).items():
+                yield {"app_name": name, "switches": switches}
+            yield from (e for e in data.get("entries", []) if isinstance(e, dict))
+
+    @staticmethod
+    def _entry_id(entry: Dict) -> str:
+        if entry.get("id"):
+            return str(entry["id"])
+        basis = "|".join(str(entry.get(k) or "") for k in ("app_name", "product_name", "version", "installer_type", "sha256"))
+        return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _switches(entry: Dict) -> List[str]:
+        switches = entry.get("switches")
+        if switches:
+            return list(switches)
+        silent = entry.get("silent_switch")
+        return silent.split() if isinstance(silent, str) and silent.strip() else []
+
+    @staticmethod
+    def _as_list(value) -> List[str]:
+        if not value:
+            return []
+        return [value] if isinstance(value, str) else list(value)
+
+    # --- Index maintenance ---
+
+    def _index_keys(self, entry: Dict) -> Tuple[List[str], List[str], List[str], List[str]]:
+        hashes = [h.lower() for h in self._as_list(entry.get("sha256"))]
+        codes = [_normalize_product_code(c) for c in self._as_list(entry.get("product_code"))]
+        vendor = (entry.get("vendor") or entry.get("publisher") or "").strip().lower()
+        names = {normalize_name(n) for n in (entry.get("app_name"), entry.get("product_name")) if n}
+        return hashes, codes, [vendor] if vendor else [], [n for n in names if n]
+
+    def _add(self, entry: Dict):
+        entry_id = self._entry_id(entry)
+        if entry_id in self.entries:
+            self._remove(entry_id)
+        entry = dict(entry, id=entry_id)
+        self.entries[entry_id] = entry
+        if entry.get("rule"):
+            self._rules_revision += 1
+
+        hashes, codes, vendors, names = self._index_keys(entry)
+        for h in hashes:
+            self._by_hash.setdefault(h, set()).add(entry_id)
+        for c in codes:
+            self._by_product_code.setdefault(c, set()).add(entry_id)
+        for v in vendors:
+            self._by_vendor.setdefault(v, set()).add(entry_id)
+        grams = set()
+        for n in names:
+            self._by_name.setdefault(n, set()).add(entry_id)
+            grams |= trigrams(n)
+        for g in grams:
+            self._by_trigram.setdefault(g, set()).add(entry_id)
+        self._trigram_counts[entry_id] = len(grams)
+
+    def _remove(self, entry_id: str):
+        entry = self.entries.pop(entry_id, None)
+        if not entry:
+            return
+        if entry.get("rule"):
+            self._rules_revision += 1
+        hashes, codes, vendors, names = self._index_keys(entry)
+        grams = set()
+        for n in names:
+            grams |= trigrams(n)
+        for index, keys in ((self._by_hash, hashes), (self._by_product_code, codes),
+                            (self._by_vendor, vendors), (self._by_name, names), (self._by_trigram, grams)):
+            for k in keys:
+                bucket = index.get(k)
+                if bucket:
+                    bucket.discard(entry_id)
+                    if not bucket:
+                        del index[k]
+        self._trigram_counts.pop(entry_id, None)
+
+    # --- Delta updates ---
+
+    def _apply(self, delta: Dict):
+        for entry in delta.get("upserts", []):
+            self._add(entry)
+        for entry_id in delta.get("deletes", []):
+            self._remove(str(entry_id))
+        self.feed_version = max(self.feed_version, int(delta.get("version") or 0))
+
+    def apply_delta(self, delta: Dict) -> bool:
+        """
+        Applies an incremental update {"version": n, "upserts": [...], "deletes": [ids]}.
+        Deltas at or below the current feed version are ignored. Applied deltas are appended
+        to the local journal so they survive restarts.
+        """
+        version = int(delta.get("version") or 0)
+        self._ensure_loaded()
+        with self._lock:
+            if version and version <= self.feed_version:
+                return False
+            self._apply(delta)
+            try:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(delta) + "\n")
+            except OSError as e:
+                logger.warning(f"Failed to persist community DB delta: {e}")
+        return True
+
+    def pull_updates(self, feed_url: Optional[str] = None, timeout: int = 30) -> int:
+        """
+        Fetches deltas newer than the current version from the feed and applies them.
+        The feed returns either a single delta or {"deltas": [...]} for GET <url>?since=<version>.
+        Returns the number of applied deltas.
+        """
+        if not feed_url:
+            from switchcraft.utils.config import SwitchCraftConfig
+            feed_url = SwitchCraftConfig.get_value("CommunityDBFeedUrl")
+        if not feed_url:
+            return 0
+
+        self._ensure_loaded()
+        import requests
+        resp = requests.get(feed_url, params={"since": self.feed_version}, timeout=timeout)
+        resp.raise_for_status()
+        payload = resp.json()
+        deltas = payload.get("deltas", [payload]) if isinstance(payload, dict) else payload
+        applied = 0
+        for delta in sorted(deltas, key=lambda d: int(d.get("version") or 0)):
+            if self.apply_delta(delta):
+                applied += 1
+        return applied
+
+    # --- Installer rules ---
+
+    def rules_revision(self) -> int:
+        """Changes whenever a rule entry is added, replaced or deleted."""
+        self._ensure_loaded()
+        return self._rules_revision
+
+    def get_rules(self) -> List[Dict]:
+        """Rule definitions from entries with a "rule" object; the entry id is the default rule id."""
+        self._ensure_loaded()
+        with self._lock:
+            return [
+                dict(entry["rule"], id=entry["rule"].get("id") or entry_id)
+                for entry_id, entry in sorted(self.entries.items())
+                if isinstance(entry.get("rule"), dict)
+            ]
+
+    # --- Lookups ---
+
+    def _first_switches(self, ids: Optional[Set[str]]) -> Optional[List[str]]:
+        for entry_id in sorted(ids or ()):
+            switches = self._switches(self.entries[entry_id])
+            if switches:
+                return switches
+        return None
 
     def get_switches_by_hash(self, file_path):
         """Calculate hash and lookup."""
@@ -42,24 +353,66 @@ class CommunityDBService:
             return None
 
         sha256 = self._get_hash(file_path)
-        return self.db.get("hash_map", {}).get(sha256)
+        if not sha256:
+            return None
+        self._ensure_loaded()
+        with self._lock:
+            return self._first_switches(self._by_hash.get(sha256.lower()))
+
+    def get_switches_by_product_code(self, product_code: str):
+        self._ensure_loaded()
+        with self._lock:
+            return self._first_switches(self._by_product_code.get(_normalize_product_code(product_code)))
+
+    def get_entries_by_vendor(self, vendor: str) -> List[Dict]:
+        self._ensure_loaded()
+        with self._lock:
+            return [self.entries[i] for i in sorted(self._by_vendor.get(vendor.strip().lower(), ()))]
+
+    def search(self, name: str, limit: int = 10, min_score: float = 0.0) -> List[Tuple[Dict, float]]:
+        """
+        Ranked fuzzy lookup. Scores are trigram Dice similarity (0..1) between the normalized
+        query and entry names; exact normalized matches score 1.0 and whole-word containment
+        (e.g. "vlc" in "vlc media player") gets a floor of 0.75.
+        """
+        query = normalize_name(name)
+        if not query:
+            return []
+        self._ensure_loaded()
+        with self._lock:
+            scores: Dict[str, float] = {}
+            for entry_id in self._by_name.get(query, ()):
+                scores[entry_id] = 1.0
+
+            query_grams = trigrams(query)
+            hits: Counter = Counter()
+            for g in query_grams:
+                hits.update(self._by_trigram.get(g, ()))
+            query_words = set(query.split())
+            for entry_id, shared in hits.items():
+                if entry_id in scores:
+                    continue
+                score = 2 * shared / (len(query_grams) + self._trigram_counts[entry_id])
+                entry = self.entries[entry_id]
+                for n in (entry.get("app_name"), entry.get("product_name")):
+                    if n and set(normalize_name(n).split()) <= query_words:
+                        score = max(score, 0.75)
+                scores[entry_id] = score
+
+            ranked = sorted(
+                ((self.entries[i], s) for i, s in scores.items() if s >= min_score),
+                key=lambda pair: (-pair[1], pair[0]["id"])
+            )
+        return ranked[:limit]
 
     def get_switches_by_name(self, filename):
-        """Fuzzy lookup by filename."""
-        name = Path(filename).stem.lower()
-        # Very basic partial match
-        for key, val in self.db.get("name_map", {}).items():
-            if key in name:
-                return val
+        """Fuzzy lookup by filename (best ranked match with switches)."""
+        for entry, _score in self.search(Path(filename).name, limit=5, min_score=self.MIN_FUZZY_SCORE):
+            switches = self._switches(entry)
+            if switches:
+                return switches
         return None
 
     def _get_hash(self, filepath):
-        try:
-            h = hashlib.sha256()
-            with open(filepath, "rb") as f:
-                while chunk := f.read(8192):
-                    h.update(chunk)
-            return h.hexdigest()
-        except (OSError, IOError) as e:
-            logger.warning(f"Could not hash file {filepath}: {e}")
-            return None
+        # Shared with the other pipeline stages, so the installer is hashed once per session
+        return get_fingerprint_service().sha256(filepath)
@@ -0,0 +1,367 @@
+import logging
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from switchcraft.utils.msi_database import MsiDatabase, MsiDatabaseError
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_CODE_RULE = "#microsoft.graph.win32LobAppProductCodeDetectionRule"
+FILE_RULE = "#microsoft.graph.win32LobAppFileSystemDetectionRule"
+REGISTRY_RULE = "#microsoft.graph.win32LobAppRegistryDetectionRule"
+
+UNINSTALL_KEY = "HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Uninstall"
+
+# Well-known MSI directory properties -> (Intune path, check32BitOn64System, shared location)
+_STANDARD_DIRS = {
+    "ProgramFiles64Folder": ("%ProgramFiles%", False, False),
+    "ProgramFilesFolder": ("%ProgramFiles%", True, False),
+    "CommonFiles64Folder": ("%CommonProgramFiles%", False, True),
+    "CommonFilesFolder": ("%CommonProgramFiles%", True, True),
+    "CommonAppDataFolder": ("%ProgramData%", False, False),
+    "WindowsFolder": ("%SystemRoot%", False, True),
+    "System64Folder": ("%SystemRoot%\\System32", False, True),
+    "SystemFolder": ("%SystemRoot%\\System32", True, True),
+}
+# HKCR/HKCU/HKU are not visible to (or not stable for) the system-context detection run
+_REGISTRY_ROOTS = {-1: "HKEY_LOCAL_MACHINE", 2: "HKEY_LOCAL_MACHINE"}
+
+_GENERIC_FILES = re.compile(r"^(unins\d*|uninstall|uninst|setup|install|update|updater|helper|crashreporter|vcredist.*)\.exe$", re.I)
+_VERSION_RE = re.compile(r"^\d+(\.\d+){1,3}$")
+_PROPERTY_REF = re.compile(r"\[([A-Za-z_][\w.]*)\]")
+
+
+@dataclass
+class DetectionCandidate:
+    """A proposed Intune detection rule with a uniqueness score (0..1)."""
+    kind: str  # msi | file | registry
+    score: float
+    rule: Dict
+    reason: str
+    warnings: List[str] = field(default_factory=list)
+
+    def test_args(self) -> List[str]:
+        """Arguments for 'switchcraft detection test' to verify the rule on a client."""
+        if self.kind == "msi":
+            return ["--type", "msi", "--product-code", self.rule["productCode"]]
+        if self.kind == "file":
+            args = ["--type", "file", "--path", f"{self.rule['path']}\\{self.rule['fileOrFolderName']}"]
+            if self.rule.get("comparisonValue"):
+                args += ["--version", self.rule["comparisonValue"]]
+            return args
+        args = ["--type", "registry", "--key", self.rule["keyPath"], "--value", self.rule.get("valueName") or ""]
+        if self.rule.get("operationType") == "string":
+            args += ["--expected", self.rule["comparisonValue"]]
+        return args
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "score": round(self.score, 2),
+            "reason": self.reason,
+            "warnings": self.warnings,
+            "rule": self.rule,
+            "verify": "switchcraft detection test " + " ".join(
+                f'"{a}"' if " " in a else a for a in self.test_args()
+            ),
+        }
+
+
+def _tokens(text: Optional[str]) -> set:
+    return {t for t in re.split(r"[^a-z0-9]+", (text or "").lower()) if len(t) > 2}
+
+
+def _long_name(default_dir: str) -> str:
+    """Target long name from a Directory.DefaultDir / File.FileName value ('short|long[:source]')."""
+    target = default_dir.split(":", 1)[0]
+    return target.split("|", 1)[-1]
+
+
+class DetectionRuleSynthesizer:
+    """
+    Proposes ranked Intune detection rules for installers.
+
+    MSI packages are mined through the native table reader (Property, Directory, Component,
+    File and Registry tables); EXE installers fall back to their PE version resource.
+    Candidates are scored by how uniquely they identify this product: an MSI product code is
+    globally unique, a versioned key file in a product-specific folder is close behind, and
+    generic or shared files/keys are penalized.
+    """
+
+    MAX_PER_KIND = 3
+
+    def synthesize(self, file_path) -> List[DetectionCandidate]:
+        path = Path(file_path)
+        suffix = path.suffix.lower()
+        try:
+            if suffix == ".msi":
+                candidates = self._from_msi(path)
+            elif suffix == ".exe":
+                candidates = self._from_exe(path)
+            else:
+                return []
+        except Exception as e:
+            logger.warning(f"Detection rule synthesis failed for {path}: {e}")
+            return []
+        return sorted(candidates, key=lambda c: (-c.score, c.kind))
+
+    def synthesize_folder(self, folder, recursive: bool = True, max_workers: int = 4,
+                          progress_callback: Optional[Callable[[int, int, str], None]] = None
+                          ) -> Dict[str, List[DetectionCandidate]]:
+        """Runs synthesize() over every .msi/.exe in a folder. Returns {path: candidates}."""
+        root = Path(folder)
+        pattern = "**/*" if recursive else "*"
+        files = sorted(p for p in root.glob(pattern) if p.is_file() and p.suffix.lower() in (".msi", ".exe"))
+        results: Dict[str, List[DetectionCandidate]] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for done, (path, candidates) in enumerate(
+                zip(files, pool.map(self.synthesize, files)), start=1
+            ):
+                results[str(path)] = candidates
+                if progress_callback:
+                    progress_callback(done, len(files), str(path))
+        return results
+
+    # --- MSI ---
+
+    def _from_msi(self, path: Path) -> List[DetectionCandidate]:
+        try:
+            db = MsiDatabase(path)
+        except MsiDatabaseError as e:
+            logger.debug(f"{path} is not a readable MSI: {e}")
+            return []
+        with db:
+            return self.candidates_from_msi(db)
+
+    def candidates_from_msi(self, db: MsiDatabase) -> List[DetectionCandidate]:
+        props = db.get_properties()
+        candidates = []
+
+        product_code = props.get("ProductCode")
+        version = props.get("ProductVersion")
+        if product_code:
+            candidates.append(DetectionCandidate(
+                kind="msi",
+                score=0.95,
+                rule={
+                    "@odata.type": PRODUCT_CODE_RULE,
+                    "productCode": product_code,
+                    "productVersionOperator": "greaterThanOrEqual" if version else "notConfigured",
+                    "productVersion": version,
+                },
+                reason="MSI ProductCode is globally unique",
+                warnings=[] if props.get("UpgradeCode") else ["No UpgradeCode: major upgrades will change the ProductCode"],
+            ))
+
+        product_tokens = _tokens(props.get("ProductName")) | _tokens(props.get("Manufacturer"))
+        candidates += self._msi_file_candidates(db, product_tokens)
+        candidates += self._msi_registry_candidates(db, props, product_tokens)
+        return candidates
+
+    @staticmethod
+    def _is_64bit_package(db: MsiDatabase) -> bool:
+        """Platform from the summary Template ('x64;1033'); 32-bit packages write to WOW6432Node."""
+        try:
+            meta = db.get_summary()
+            template = meta.template if meta else None
+        except Exception:
+            template = None
+        if isinstance(template, bytes):
+            template = template.decode("latin-1", errors="ignore")
+        platform = (template or "").split(";", 1)[0].lower()
+        return platform in ("x64", "intel64", "arm64", "amd64")
+
+    def _resolve_directories(self, db: MsiDatabase) -> Dict[str, Tuple[str, bool, bool]]:
+        rows = {r["Directory"]: r for r in db.iter_rows("Directory")}
+        resolved: Dict[str, Optional[Tuple[str, bool, bool]]] = {}
+
+        def resolve(key: str, depth: int = 0):
+            if key in resolved:
+                return resolved[key]
+            resolved[key] = None  # guards against cycles
+            result = None
+            if key in _STANDARD_DIRS:
+                result = _STANDARD_DIRS[key]
+            elif key in rows and depth < 32:
+                row = rows[key]
+                parent = row.get("Directory_Parent")
+                if parent and parent != key:
+                    base = resolve(parent, depth + 1)
+                    if base:
+                        name = _long_name(row.get("DefaultDir") or ".")
+                        path = base[0] if name in (".", "") else f"{base[0]}\\{name}"
+                        result = (path, base[1], base[2])
+            resolved[key] = result
+            return result
+
+        for key in rows:
+            resolve(key)
+        return {k: v for k, v in resolved.items() if v}
+
+    def _msi_file_candidates(self, db: MsiDatabase, product_tokens: set) -> List[DetectionCandidate]:
+        if not db.has_table("File") or not db.has_table("Component"):
+            return []
+        directories = self._resolve_directories(db)
+        components = {c["Component"]: c for c in db.iter_rows("Component")}
+        files = list(db.iter_rows("File"))
+        name_counts = Counter(_long_name(f.get("FileName") or "").lower() for f in files)
+
+        candidates = []
+        for f in files:
+            name = _long_name(f.get("FileName") or "")
+            component = components.get(f.get("Component_"))
+            if not name or not component:
+                continue
+            location = directories.get(component.get("Directory_"))
+            if not location:
+                continue
+            dir_path, check32, shared = location
+            version = f.get("Version") if _VERSION_RE.match(f.get("Version") or "") else None
+
+            score = 0.5
+            reasons = []
+            if version:
+                score += 0.15
+                reasons.append("versioned")
+            if name.lower().endswith(".exe"):
+                score += 0.1
+            if product_tokens & _tokens(name):
+                score += 0.1
+                reasons.append("name matches product")
+            if component.get("KeyPath") == f.get("File"):
+                score += 0.05
+                reasons.append("component key path")
+            if _GENERIC_FILES.match(name):
+                score -= 0.3
+            if shared:
+                score -= 0.25
+            if name_counts[name.lower()] > 1:
+                score -= 0.1
+            if dir_path.count("\\") < 1:
+                # Directly in Program Files etc. - not product specific
+                score -= 0.2
+
+            rule = {
+                "@odata.type": FILE_RULE,
+                "path": dir_path,
+                "fileOrFolderName": name,
+                "check32BitOn64System": check32,
+                "operationType": "version" if version else "exists",
+                "operator": "greaterThanOrEqual" if version else "notConfigured",
+                "comparisonValue": version,
+            }
+            candidates.append(DetectionCandidate(
+                kind="file",
+                score=max(0.0, min(score, 0.9)),
+                rule=rule,
+                reason="Installed file" + (f" ({', '.join(reasons)})" if reasons else ""),
+            ))
+        candidates.sort(key=lambda c: -c.score)
+        return candidates[:self.MAX_PER_KIND]
+
+    def _msi_registry_candidates(self, db: MsiDatabase, props: Dict[str, str],
+                                 product_tokens: set) -> List[DetectionCandidate]:
+        def expand(text: Optional[str]) -> Optional[str]:
+            if text is None:
+                return None
+            expanded = _PROPERTY_REF.sub(lambda m: props.get(m.group(1), m.group(0)), text)
+            return None if _PROPERTY_REF.search(expanded) else expanded
+
+        is_64bit = self._is_64bit_package(db)
+        candidates = []
+        for row in db.iter_rows("Registry"):
+            hive = _REGISTRY_ROOTS.get(row.get("Root"))
+            value_name = row.get("Name")
+            if not hive or value_name in ("+", "-", "*"):
+                continue
+            raw_value = row.get("Value") or ""
+            key = expand(row.get("Key"))
+            if not key:
+                continue
+
+            score = 0.55
+            reasons = []
+            if "[ProductVersion]" in raw_value:
+                rule_op = {"operationType": "version", "operator": "greaterThanOrEqual",
+                           "comparisonValue": props.get("ProductVersion")}
+                score += 0.2
+                reasons.append("value tracks ProductVersion")
+            else:
+                value = expand(raw_value)
+                if value and not value.startswith("#") and len(value) < 256:
+                    rule_op = {"operationType": "string", "operator": "equal", "comparisonValue": value}
+                else:
+                    rule_op = {"operationType": "exists", "operator": "notConfigured", "comparisonValue": None}
+            if product_tokens & _tokens(key):
+                score += 0.1
+                reasons.append("key names the product")
+            if not key.lower().startswith("software\\"):
+                score -= 0.2
+
+            candidates.append(DetectionCandidate(
+                kind="registry",
+                score=max(0.0, min(score, 0.9)),
+                rule={
+                    "@odata.type": REGISTRY_RULE,
+                    "keyPath": f"{hive}\\{key}",
+                    "valueName": value_name or "",
+                    "check32BitOn64System": not is_64bit,
+                    **rule_op,
+                },
+                reason="Registry value written by the package" + (f" ({', '.join(reasons)})" if reasons else ""),
+            ))
+        candidates.sort(key=lambda c: -c.score)
+        return candidates[:self.MAX_PER_KIND]
+
+    # --- EXE ---
+
+    def _from_exe(self, path: Path) -> List[DetectionCandidate]:
+        import pefile
+        from switchcraft.analyzers.exe import ExeAnalyzer
+        from switchcraft.models import InstallerInfo
+
+        info = InstallerInfo(file_path=str(path))
+        pe = pefile.PE(str(path))
+        try:
+            ExeAnalyzer()._extract_pe_metadata(pe, info)
+        finally:
+            pe.close()
+        return self.candidates_from_pe_info(info)
+
+    def candidates_from_pe_info(self, info) -> List[DetectionCandidate]:
+        """
+        EXE installers do not declare what they install; propose the conventional Uninstall
+        key named after the product. These are guesses and are scored accordingly.
+        """
+        name = (info.product_name or "").strip()
+        if not name:
+            return []
+        version = (info.product_version or "").strip()
+        version = version if _VERSION_RE.match(version) else None
+        candidates = []
+        for suffix, score, reason in (("", 0.4, "Conventional Uninstall key (NSIS, most EXE installers)"),
+                                      ("_is1", 0.35, "Inno Setup Uninstall key (AppId may differ)")):
+            rule = {
+                "@odata.type": REGISTRY_RULE,
+                "keyPath": f"{UNINSTALL_KEY}\\{name}{suffix}",
+                "valueName": "DisplayVersion" if version else "DisplayName",
+                "check32BitOn64System": False,
+                "operationType": "version" if version else "exists",
+                "operator": "greaterThanOrEqual" if version else "notConfigured",
+                "comparisonValue": version,
+            }
+            candidates.append(DetectionCandidate(
+                kind="registry", score=score, rule=rule, reason=reason,
+                warnings=["Derived from PE version info; verify with 'switchcraft detection test'"],
+            ))
+        return candidates
+
+
+def best_rule(candidates: Iterable[DetectionCandidate], min_score: float = 0.6) -> Optional[Dict]:
+    """Returns the highest-scoring rule if it is confident enough to deploy unattended."""
+    ranked = sorted(candidates, key=lambda c: -c.score)
+    return ranked[0].rule if ranked and ranked[0].score >= min_score else None
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_fingerprint_instance = None
+_fingerprint_lock = threading.Lock()
+
+
+def get_fingerprint_service():
+    """Returns the session-wide FingerprintService."""
+    global _fingerprint_instance
+    with _fingerprint_lock:
+        if _fingerprint_instance is None:
+            _fingerprint_instance = FingerprintService()
+        return _fingerprint_instance
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: Optional[str] = None
+    quick_hash: Optional[str] = None
+
+
+class FingerprintService:
+    """
+    Computes file fingerprints once per session and shares them across pipeline stages.
+
+    A full fingerprint (SHA-256, head/tail sample hash, size, mtime) is computed in a single
+    streaming pass with a large buffer and cached by (device, inode, size, mtime), so a
+    changed file is rehashed while an unchanged one never is. Concurrent requests for the
+    same file wait for the pass already in flight.
+
+    read_head() serves the leading bytes of a file from a small LRU so analyzers that probe
+    overlapping prefixes share one read.
+    """
+
+    BUFFER_SIZE = 4 * 1024 * 1024
+    SAMPLE_SIZE = 64 * 1024
+    HEAD_PREFETCH_BYTES = 2 * 1024 * 1024
+    HEAD_CACHE_MAX_BYTES = 8 * 1024 * 1024
+    HEAD_CACHE_FILES = 8
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[Tuple, Fingerprint] = {}
+        self._in_flight: Dict[Tuple, threading.Event] = {}
+        self._heads: "OrderedDict[Tuple, bytes]" = OrderedDict()
+
+    @staticmethod
+    def _key(path: Path) -> Tuple[Tuple, os.stat_result]:
+        st = path.stat()
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, str(path.resolve())), st
+
+    def _quick_hash(self, f, size: int, head: bytes) -> str:
+        h = hashlib.sha256()
+        h.update(size.to_bytes(8, "little"))
+        h.update(head[:self.SAMPLE_SIZE])
+        if size > self.SAMPLE_SIZE:
+            f.seek(max(self.SAMPLE_SIZE, size - self.SAMPLE_SIZE))
+            h.update(f.read(self.SAMPLE_SIZE))
+        return h.hexdigest()
+
+    def quick_fingerprint(self, file_path: Union[str, Path]) -> Fingerprint:
+        """Size, mtime and head/tail sample hash without reading the whole file."""
+        path = Path(file_path)
+        key, st = self._key(path)
+        with self._lock:
+            cached = self._fingerprints.get(key)
+        if cached:
+            return cached
+        with open(path, "rb") as f:
+            head = f.read(self.SAMPLE_SIZE)
+            quick = self._quick_hash(f, st.st_size, head)
+        return Fingerprint(str(path), st.st_size, st.st_mtime_ns, None, quick)
+
+    def fingerprint(self, file_path: Union[str, Path]) -> Fingerprint:
+        """Full fingerprint; the file is read at most once per (inode, size, mtime)."""
+        path = Path(file_path)
+        key, st = self._key(path)
+
+        while True:
+            with self._lock:
+                cached = self._fingerprints.get(key)
+                if cached:
+                    return cached
+                event = self._in_flight.get(key)
+                if event is None:
+                    event = self._in_flight[key] = threading.Event()
+                    break
+            # Another thread is hashing this file; wait and re-check the cache
+            event.wait()
+
+        try:
+            fp = self._compute(path, st)
+            with self._lock:
+                self._fingerprints[key] = fp
+            return fp
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            event.set()
+
+    def _compute(self, path: Path, st: os.stat_result) -> Fingerprint:
+        h = hashlib.sha256()
+        head = b""
+        buf = bytearray(self.BUFFER_SIZE)
+        view = memoryview(buf)
+        with open(path, "rb", buffering=0) as f:
+            while n := f.readinto(buf):
+                chunk = view[:n]
+                h.update(chunk)
+                if len(head) < self.SAMPLE_SIZE:
+                    head += bytes(chunk[:self.SAMPLE_SIZE - len(head)])
+            quick = self._quick_hash(f, st.st_size, head)
+        logger.debug(f"Fingerprinted {path} ({st.st_size} bytes)")
+        return Fingerprint(str(path), st.st_size, st.st_mtime_ns, h.hexdigest(), quick)
+
+    def sha256(self, file_path: Union[str, Path]) -> Optional[str]:
+        """Cached SHA-256 hex digest, or None if the file cannot be read."""
+        try:
+            return self.fingerprint(file_path).sha256
+        except OSError as e:
+            logger.warning(f"Could not hash file {file_path}: {e}")
+            return None
+
+    def read_head(self, file_path: Union[str, Path], size: int) -> bytes:
+        """Returns up to `size` leading bytes of the file, served from cache where possible."""
+        path = Path(file_path)
+        key, _ = self._key(path)
+        with self._lock:
+            head = self._heads.get(key)
+            if head is not None and (len(head) >= size or len(head) == key[2]):
+                self._heads.move_to_end(key)
+                return head[:size]
+
+        cacheable = size <= self.HEAD_CACHE_MAX_BYTES
+        with open(path, "rb") as f:
+            # Read ahead so the next, slightly larger probe is a cache hit too
+            data = f.read(max(size, self.HEAD_PREFETCH_BYTES) if cacheable else size)
+
+        if cacheable:
+            with self._lock:
+                self._heads[key] = data
+                self._heads.move_to_end(key)
+                while len(self._heads) > self.HEAD_CACHE_FILES:
+                    self._heads.popitem(last=False)
+        return data[:size]
+
+    def clear(self):
+        with self._lock:
+            self._fingerprints.clear()
+            self._heads.clear()
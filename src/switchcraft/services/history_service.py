@@ -1,6 +1,7 @@
 import json
 import logging
 import os
+import uuid
 from datetime import datetime
 from pathlib import Path
 
@@ -68,13 +69,68 @@ class HistoryService:
 
         # Limit size (e.g. last 100)
         if len(history) > 100:
+            for dropped in history[100:]:
+                self._remove_trace(dropped)
             history = history[:100]
 
         self._save(history)
 
     def clear(self):
+        for item in self.get_history():
+            self._remove_trace(item)
         self._save([])
 
+    # --- Traces ---
+    # Full analysis traces can hold thousands of spans, so they are kept in side files
+    # (traces/<trace id>.json next to history.json) and the entry only stores the path.
+
+    def _get_traces_dir(self):
+        return self.history_file.parent / "traces"
+
+    def save_trace(self, otlp):
+        """Writes an OTLP/JSON trace to a side file; returns its path for the entry's trace_file (or None)."""
+        if not otlp:
+            return None
+        try:
+            name = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"]
+        except (KeyError, IndexError, TypeError):
+            name = uuid.uuid4().hex
+        try:
+            traces_dir = self._get_traces_dir()
+            traces_dir.mkdir(parents=True, exist_ok=True)
+            path = traces_dir / f"{name}.json"
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(otlp, f)
+            return str(path)
+        except Exception:
+            logger.exception("Failed to save analysis trace")
+            return None
+
+    def load_trace(self, entry):
+        """Full trace of a history entry: its trace_file, or the trace stored in a watch folder result_file."""
+        for key in ("trace_file", "result_file"):
+            path = entry.get(key)
+            if not path:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Failed to read trace from {path}: {e}")
+                continue
+            return data if key == "trace_file" else data.get("trace")
+        return None
+
+    def _remove_trace(self, entry):
+        # Only our own side files; watch folder result files belong to the user
+        path = entry.get("trace_file")
+        if not path or Path(path).parent != self._get_traces_dir():
+            return
+        try:
+            Path(path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.debug(f"Failed to remove trace file {path}: {e}")
+
     def _save(self, data):
         try:
             with open(self.history_file, 'w', encoding='utf-8') as f:
@@ -0,0 +1,175 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_icon_cache_instance = None
+_icon_cache_lock = threading.Lock()
+
+
+def get_icon_cache():
+    """Returns the shared IconCacheService instance."""
+    global _icon_cache_instance
+    with _icon_cache_lock:
+        if _icon_cache_instance is None:
+            _icon_cache_instance = IconCacheService()
+        return _icon_cache_instance
+
+
+class IconCacheService:
+    """
+    Decodes app icons once, downscales them to tile-sized PNG thumbnails and caches them
+    in memory (LRU) and on disk, keyed by app id and icon content hash.
+
+    Work runs on a small bounded thread pool; concurrent requests for the same key are
+    coalesced into a single job. Without Pillow, icons are only passed through when they
+    are already small; large icons are dropped so full-resolution payloads never reach
+    the UI (and the Flet websocket).
+    """
+
+    THUMBNAIL_SIZE = 64
+    MAX_PASSTHROUGH_BYTES = 32 * 1024
+    MEMORY_ENTRIES = 1024
+
+    def __init__(self, cache_dir=None, size: int = THUMBNAIL_SIZE, max_workers: int = 4):
+        self.cache_dir = Path(cache_dir) if cache_dir else self._get_cache_dir()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="IconCache")
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Optional[bytes]]" = OrderedDict()
+        self._pending: Dict[str, List[Callable[[Optional[bytes]], None]]] = {}
+
+    @staticmethod
+    def _get_cache_dir() -> Path:
+        app_data = os.getenv('APPDATA')
+        if app_data:
+            return Path(app_data) / "FaserF" / "SwitchCraft" / "cache" / "icons"
+        return Path.home() / ".switchcraft" / "cache" / "icons"
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- Synchronous API ---
+
+    @staticmethod
+    def _decode(data: Union[str, bytes, None]) -> Optional[bytes]:
+        if not data:
+            return None
+        if isinstance(data, bytes):
+            return data
+        if data.startswith("data:"):
+            data = data.split(",", 1)[-1]
+        try:
+            return base64.b64decode(data)
+        except (ValueError, TypeError) as e:
+            logger.debug(f"Invalid base64 icon payload: {e}")
+            return None
+
+    def _disk_path(self, key: str, digest: str) -> Path:
+        safe_key = re.sub(r"[^A-Za-z0-9.-]", "-", key)[:80]
+        return self.cache_dir / f"{safe_key}-{digest}-{self.size}.png"
+
+    def _make_thumbnail(self, raw: bytes) -> Optional[bytes]:
+        try:
+            from PIL import Image
+        except ImportError:
+            return raw if len(raw) <= self.MAX_PASSTHROUGH_BYTES else None
+
+        try:
+            with Image.open(io.BytesIO(raw)) as img:
+                img.thumbnail((self.size, self.size), Image.LANCZOS)
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA")
+                out = io.BytesIO()
+                img.save(out, format="PNG", optimize=True)
+                return out.getvalue()
+        except Exception as e:
+            # e.g. SVG icons, which Pillow cannot rasterize
+            logger.debug(f"Could not thumbnail icon: {e}")
+            return raw if len(raw) <= self.MAX_PASSTHROUGH_BYTES else None
+
+    def get_thumbnail(self, key: str, data: Union[str, bytes, None]) -> Optional[bytes]:
+        """
+        Returns PNG thumbnail bytes for an icon payload (raw bytes, base64 or data URL).
+        The result is cached in memory and on disk; repeated calls are dictionary lookups.
+        """
+        raw = self._decode(data)
+        if not raw:
+            return None
+        digest = hashlib.sha1(raw).hexdigest()[:16]
+        mem_key = f"{key}:{digest}"
+
+        with self._lock:
+            if mem_key in self._memory:
+                self._memory.move_to_end(mem_key)
+                return self._memory[mem_key]
+
+        path = self._disk_path(key, digest)
+        thumb = None
+        if path.exists():
+            try:
+                thumb = path.read_bytes()
+            except OSError as e:
+                logger.debug(f"Failed to read cached icon {path}: {e}")
+        if thumb is None:
+            thumb = self._make_thumbnail(raw)
+            if thumb:
+                try:
+                    tmp = path.with_suffix(".tmp")
+                    tmp.write_bytes(thumb)
+                    os.replace(tmp, path)
+                except OSError as e:
+                    logger.debug(f"Failed to write icon cache {path}: {e}")
+
+        self._remember(mem_key, thumb)
+        return thumb
+
+    def _remember(self, mem_key: str, thumb: Optional[bytes]):
+        with self._lock:
+            self._memory[mem_key] = thumb
+            self._memory.move_to_end(mem_key)
+            while len(self._memory) > self.MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    # --- Asynchronous API ---
+
+    def request(self, key: str, loader: Callable[[], Union[str, bytes, None]],
+                callback: Callable[[Optional[bytes]], None]):
+        """
+        Loads an icon in the background and calls callback(thumbnail_bytes_or_None).
+
+        loader returns the icon payload (it may hit the network); it runs on the pool and is
+        only invoked once for concurrent requests with the same key.
+        """
+        with self._lock:
+            waiters = self._pending.get(key)
+            if waiters is not None:
+                waiters.append(callback)
+                return
+            self._pending[key] = [callback]
+
+        def _job():
+            thumb = None
+            try:
+                thumb = self.get_thumbnail(key, loader())
+            except Exception as e:
+                logger.debug(f"Icon load failed for {key}: {e}")
+            with self._lock:
+                callbacks = self._pending.pop(key, [])
+            for cb in callbacks:
+                try:
+                    cb(thumb)
+                except Exception as e:
+                    logger.debug(f"Icon callback failed for {key}: {e}")
+
+        self._executor.submit(_job)
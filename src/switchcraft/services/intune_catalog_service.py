@@ -0,0 +1,331 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# One mirror per tenant, shared by all views/sessions in the process
+_catalog_instances: Dict[str, "IntuneCatalogService"] = {}
+_catalog_instances_lock = threading.Lock()
+
+
+def get_intune_catalog(tenant_id: str, intune_service=None) -> "IntuneCatalogService":
+    """Returns the shared catalog mirror for a tenant."""
+    with _catalog_instances_lock:
+        catalog = _catalog_instances.get(tenant_id)
+        if catalog is None:
+            catalog = IntuneCatalogService(tenant_id, intune_service=intune_service)
+            _catalog_instances[tenant_id] = catalog
+        return catalog
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class IntuneCatalogService:
+    """
+    Local mirror of a tenant's Intune mobileApps catalog.
+
+    Graph has no delta query for mobileApps, so sync is incremental by lastModifiedDateTime:
+    only apps modified after the stored watermark are downloaded, and an id-only listing
+    detects deletions. If the server rejects the lastModifiedDateTime filter, a full listing
+    is used instead and only apps whose lastModifiedDateTime changed are rewritten.
+    Icons are not mirrored; they are fetched lazily per app and cached.
+    """
+
+    # Properties that are not stored in the mirror (large, fetched on demand)
+    _EXCLUDED_FIELDS = ("largeIcon",)
+
+    def __init__(self, tenant_id: str, intune_service=None, db_path=None):
+        if intune_service is None:
+            from switchcraft.services.intune_service import IntuneService
+            intune_service = IntuneService()
+        self.tenant_id = tenant_id
+        self.intune_service = intune_service
+        self.db_path = Path(db_path) if db_path else self._get_db_path()
+
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+        self._bg_thread = None
+        self._bg_stop = threading.Event()
+
+    @staticmethod
+    def _get_db_path() -> Path:
+        app_data = os.getenv('APPDATA')
+        if app_data:
+            path = Path(app_data) / "FaserF" / "SwitchCraft" / "appcatalog.db"
+        else:
+            path = Path.home() / ".switchcraft" / "appcatalog.db"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _init_schema(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS apps (
+                    tenant TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    display_name TEXT COLLATE NOCASE,
+                    publisher TEXT COLLATE NOCASE,
+                    last_modified TEXT,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (tenant, id)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_apps_name ON apps(tenant, display_name)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS icons (
+                    tenant TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    last_modified TEXT,
+                    data TEXT,
+                    PRIMARY KEY (tenant, id)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    tenant TEXT PRIMARY KEY,
+                    watermark TEXT,
+                    last_sync TEXT
+                )
+            """)
+
+    def close(self):
+        self.stop_background_sync()
+        with self._lock:
+            self._conn.close()
+
+    # --- State ---
+
+    def _get_state(self) -> Dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, last_sync FROM sync_state WHERE tenant = ?", (self.tenant_id,)
+            ).fetchone()
+        return dict(row) if row else {"watermark": None, "last_sync": None}
+
+    def last_sync(self) -> Optional[datetime]:
+        """Time of the last successful sync, or None if the mirror was never synced."""
+        value = self._get_state()["last_sync"]
+        return datetime.fromisoformat(value) if value else None
+
+    def is_populated(self) -> bool:
+        return self.last_sync() is not None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM apps WHERE tenant = ?", (self.tenant_id,)).fetchone()[0]
+
+    # --- Sync ---
+
+    def sync(self, token: str, full: bool = False) -> Dict[str, int]:
+        """
+        Brings the mirror up to date. Returns counts of upserted and deleted apps.
+        Concurrent calls are collapsed: if a sync is already running, this returns immediately.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            logger.debug("Intune catalog sync already running, skipping")
+            return {"upserted": 0, "deleted": 0, "skipped": 1}
+        try:
+            return self._sync(token, full)
+        finally:
+            self._sync_lock.release()
+
+    def _sync(self, token: str, full: bool) -> Dict[str, int]:
+        state = self._get_state()
+        watermark = None if full else state["watermark"]
+        with self._lock:
+            known = {
+                r["id"]: r["last_modified"]
+                for r in self._conn.execute("SELECT id, last_modified FROM apps WHERE tenant = ?", (self.tenant_id,))
+            }
+
+        stats = {"upserted": 0, "deleted": 0}
+        new_watermark = watermark
+        remote_ids = None
+
+        changed = None
+        if watermark:
+            try:
+                changed = list(self.intune_service.iter_apps(
+                    token, filter_query=f"lastModifiedDateTime gt {watermark}"
+                ))
+            except requests.exceptions.HTTPError as e:
+                logger.info(f"lastModifiedDateTime filter not supported, using full listing: {e}")
+
+        if changed is None:
+            # Full listing; it also gives us the complete id set for deletion detection
+            apps = list(self.intune_service.iter_apps(token))
+            remote_ids = {a.get("id") for a in apps}
+            changed = [a for a in apps if known.get(a.get("id"), "\0") != a.get("lastModifiedDateTime")]
+        else:
+            remote_ids = {a.get("id") for a in self.intune_service.iter_apps(token, select="id")}
+
+        rows = []
+        for app in changed:
+            app_id = app.get("id")
+            if not app_id:
+                continue
+            modified = app.get("lastModifiedDateTime")
+            if modified and (new_watermark is None or modified > new_watermark):
+                new_watermark = modified
+            rows.append((
+                self.tenant_id, app_id, app.get("displayName"), app.get("publisher"), modified,
+                json.dumps({k: v for k, v in app.items() if k not in self._EXCLUDED_FIELDS})
+            ))
+        deleted = [i for i in known if i not in remote_ids]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO apps (tenant, id, display_name, publisher, last_modified, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            if deleted:
+                self._conn.executemany("DELETE FROM apps WHERE tenant = ? AND id = ?", ((self.tenant_id, i) for i in deleted))
+                self._conn.executemany("DELETE FROM icons WHERE tenant = ? AND id = ?", ((self.tenant_id, i) for i in deleted))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (tenant, watermark, last_sync) VALUES (?, ?, ?)",
+                (self.tenant_id, new_watermark, datetime.now(timezone.utc).isoformat())
+            )
+
+        stats["upserted"] = len(rows)
+        stats["deleted"] = len(deleted)
+        logger.info(f"Intune catalog sync for tenant {self.tenant_id}: {stats}")
+        return stats
+
+    def sync_in_background(self, token_provider: Callable[[], Optional[str]],
+                           on_synced: Optional[Callable[[Dict[str, int]], None]] = None):
+        """Runs a single sync on a daemon thread (no-op if one is already running)."""
+        def _run():
+            try:
+                token = token_provider()
+                if not token:
+                    return
+                stats = self.sync(token)
+                if on_synced and not stats.get("skipped"):
+                    on_synced(stats)
+            except Exception as e:
+                logger.warning(f"Background Intune catalog sync failed: {e}")
+
+        if self._sync_lock.locked():
+            return
+        threading.Thread(target=_run, daemon=True, name="IntuneCatalogSync").start()
+
+    def start_background_sync(self, token_provider: Callable[[], Optional[str]], interval: float = 600.0,
+                              on_synced: Optional[Callable[[Dict[str, int]], None]] = None):
+        """Syncs immediately and then every interval seconds until stop_background_sync()."""
+        self.stop_background_sync()
+        self._bg_stop = threading.Event()
+        stop = self._bg_stop
+
+        def _loop():
+            while True:
+                try:
+                    token = token_provider()
+                    if token:
+                        stats = self.sync(token)
+                        if on_synced and not stats.get("skipped") and (stats["upserted"] or stats["deleted"]):
+                            on_synced(stats)
+                except Exception as e:
+                    logger.warning(f"Background Intune catalog sync failed: {e}")
+                if stop.wait(interval):
+                    return
+
+        self._bg_thread = threading.Thread(target=_loop, daemon=True, name="IntuneCatalogSyncLoop")
+        self._bg_thread.start()
+
+    def stop_background_sync(self):
+        if self._bg_thread:
+            self._bg_stop.set()
+            self._bg_thread = None
+
+    # --- Local queries ---
+
+    def search(self, query: str = "", limit: Optional[int] = None) -> List[Dict]:
+        """
+        Case-insensitive substring search over display name and publisher, sorted by name.
+        An empty query returns the whole catalog.
+        """
+        sql = "SELECT data FROM apps WHERE tenant = ?"
+        params: list = [self.tenant_id]
+        query = (query or "").strip()
+        if query:
+            like = f"%{_escape_like(query)}%"
+            sql += " AND (display_name LIKE ? ESCAPE '\\' OR publisher LIKE ? ESCAPE '\\')"
+            params.extend([like, like])
+        sql += " ORDER BY display_name"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(r["data"]) for r in rows]
+
+    def get_app(self, app_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM apps WHERE tenant = ? AND id = ?", (self.tenant_id, app_id)
+            ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def upsert_app(self, app: Dict):
+        """Writes a single app into the mirror (e.g. after a local edit was saved to Graph)."""
+        if not app.get("id"):
+            return
+        data = json.dumps({k: v for k, v in app.items() if k not in self._EXCLUDED_FIELDS})
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO apps (tenant, id, display_name, publisher, last_modified, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.tenant_id, app["id"], app.get("displayName"), app.get("publisher"),
+                 app.get("lastModifiedDateTime"), data)
+            )
+
+    def _cached_icon_row(self, app_id: str):
+        with self._lock:
+            app_row = self._conn.execute(
+                "SELECT last_modified FROM apps WHERE tenant = ? AND id = ?", (self.tenant_id, app_id)
+            ).fetchone()
+            icon_row = self._conn.execute(
+                "SELECT last_modified, data FROM icons WHERE tenant = ? AND id = ?", (self.tenant_id, app_id)
+            ).fetchone()
+        app_modified = app_row["last_modified"] if app_row else None
+        fresh = bool(icon_row) and icon_row["last_modified"] == app_modified
+        return app_modified, (icon_row if fresh else None)
+
+    def get_cached_icon(self, app_id: str) -> Optional[Dict]:
+        """Returns the cached largeIcon dict without touching Graph (None if not cached yet)."""
+        _, icon_row = self._cached_icon_row(app_id)
+        if icon_row and icon_row["data"]:
+            return json.loads(icon_row["data"])
+        return None
+
+    def get_icon(self, token: str, app_id: str) -> Optional[Dict]:
+        """
+        Returns the app's largeIcon dict, fetching it from Graph only on first use
+        (or when the app changed since the icon was cached).
+        """
+        app_modified, icon_row = self._cached_icon_row(app_id)
+        if icon_row:
+            return json.loads(icon_row["data"]) if icon_row["data"] else None
+
+        icon = self.intune_service.get_app_icon(token, app_id)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO icons (tenant, id, last_modified, data) VALUES (?, ?, ?, ?)",
+                (self.tenant_id, app_id, app_modified, json.dumps(icon) if icon else None)
+            )
+        return icon
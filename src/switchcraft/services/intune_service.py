@@ -10,9 +10,13 @@ import zipfile
 from typing import Optional, Callable
 from switchcraft.utils.i18n import i18n
 from switchcraft.utils.shell_utils import ShellUtils
+from switchcraft.utils.metrics import InstrumentedRequests
 from defusedxml import ElementTree as DefusedET
 import jwt
 
+# Times every Graph/download call (switchcraft_http_client_seconds)
+requests = InstrumentedRequests(requests, "intune")
+
 logger = logging.getLogger(__name__)
 
 class IntuneService:
@@ -597,6 +601,40 @@ class IntuneService:
             logger.error(f"Failed to list apps: {e}")
             raise e
 
+    def iter_apps(self, token, filter_query=None, select=None, page_size=999):
+        """
+        Yield all apps from Intune, following @odata.nextLink paging.
+
+        Unlike list_apps this is not capped, and callers can pass a narrow $select
+        (e.g. without largeIcon) to keep pages small.
+        """
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        url = "https://graph.microsoft.com/beta/deviceAppManagement/mobileApps"
+        params = {"$top": str(page_size)}
+        if filter_query:
+            params["$filter"] = filter_query
+        if select:
+            params["$select"] = select
+
+        while url:
+            resp = requests.get(url, headers=headers, params=params, timeout=60)
+            resp.raise_for_status()
+            data = resp.json()
+            yield from data.get("value", [])
+            url = data.get("@odata.nextLink")
+            params = None  # Query params are part of nextLink
+
+    def get_app_icon(self, token, app_id):
+        """
+        Fetch only the largeIcon of an app (lazy icon loading).
+        Returns the largeIcon dict ({"type": ..., "value": <base64>}) or None.
+        """
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        url = f"https://graph.microsoft.com/beta/deviceAppManagement/mobileApps/{app_id}"
+        resp = requests.get(url, headers=headers, params={"$select": "id,largeIcon"}, timeout=30)
+        resp.raise_for_status()
+        return resp.json().get("largeIcon")
+
     def search_apps(self, token, query):
         """
         Finds Intune apps whose displayName contains the provided query using case-insensitive matching.
@@ -826,6 +864,36 @@ class IntuneService:
             logger.error(f"Failed to upload PS script: {e}")
             raise
 
+    # Graph collections for script uploads: PowerShell (Windows) and shell (macOS)
+    SCRIPT_COLLECTIONS = {
+        "powershell": "https://graph.microsoft.com/beta/deviceManagement/deviceManagementScripts",
+        "shell": "https://graph.microsoft.com/beta/deviceManagement/deviceShellScripts",
+    }
+
+    def iter_scripts(self, token, kind="powershell", page_size=999):
+        """
+        Yield id/displayName of all device scripts of the given kind, following @odata.nextLink paging.
+        scriptContent is not part of the list response, see get_script_content().
+        """
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        url = self.SCRIPT_COLLECTIONS[kind]
+        params = {"$select": "id,displayName", "$top": str(page_size)}
+
+        while url:
+            resp = requests.get(url, headers=headers, params=params, timeout=60)
+            resp.raise_for_status()
+            data = resp.json()
+            yield from data.get("value", [])
+            url = data.get("@odata.nextLink")
+            params = None  # Query params are part of nextLink
+
+    def get_script_content(self, token, script_id, kind="powershell") -> bytes:
+        """Returns the decoded scriptContent of a device script."""
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        resp = requests.get(f"{self.SCRIPT_COLLECTIONS[kind]}/{script_id}", headers=headers, timeout=30)
+        resp.raise_for_status()
+        return base64.b64decode(resp.json().get("scriptContent") or "")
+
     def upload_remediation_script(self, token, name, description, detection_content, remediation_content, run_as_account="system"):
         """
         Uploads a Remediation Script (Proactive Remediation) to Intune.
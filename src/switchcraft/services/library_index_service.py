@@ -0,0 +1,389 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from defusedxml import ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+# Legacy-style shared instance so the GUI views and CLI of one process reuse one connection.
+# Each view owns its watcher; the app/server closes the instance on shutdown.
+_library_index_instance = None
+_library_index_lock = threading.Lock()
+
+
+def get_library_index():
+    """Returns the shared LibraryIndexService instance."""
+    global _library_index_instance
+    with _library_index_lock:
+        if _library_index_instance is None:
+            _library_index_instance = LibraryIndexService()
+        return _library_index_instance
+
+
+def close_library_index():
+    """Stops all watchers and closes the shared instance (a later get_library_index() reopens it)."""
+    global _library_index_instance
+    with _library_index_lock:
+        instance, _library_index_instance = _library_index_instance, None
+    if instance is not None:
+        instance.close()
+
+
+def read_intunewin_metadata(path) -> Dict:
+    """
+    Reads Detection.xml from an .intunewin package.
+
+    Only the (small) Detection.xml member is inflated; the encrypted payload is never touched.
+    Returns a dict with name, setup_file, product_code, product_version, upgrade_code and publisher.
+    """
+    meta = {
+        "name": None,
+        "setup_file": None,
+        "product_code": None,
+        "product_version": None,
+        "upgrade_code": None,
+        "publisher": None,
+    }
+    with zipfile.ZipFile(path, 'r') as zf:
+        for member in zf.namelist():
+            if not member.endswith('Detection.xml'):
+                continue
+            with zf.open(member) as f:
+                root = ET.parse(f).getroot()
+            for key, tag in (
+                ("name", "Name"),
+                ("setup_file", "SetupFile"),
+                ("product_code", "MsiProductCode"),
+                ("product_version", "MsiProductVersion"),
+                ("upgrade_code", "MsiUpgradeCode"),
+                ("publisher", "MsiPublisher"),
+            ):
+                elem = root.find(f'.//{tag}')
+                if elem is not None and elem.text:
+                    meta[key] = elem.text.strip()
+            break
+    return meta
+
+
+class _IndexClosed(Exception):
+    """Raised inside scan() once close() was called from another thread."""
+
+
+def _normalize_product_code(code: str) -> str:
+    code = code.strip().strip("{}").upper()
+    return f"{{{code}}}"
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class LibraryIndexService:
+    """
+    Persistent SQLite index of .intunewin packages.
+
+    Scans are incremental: every file is stat()ed, but Detection.xml is only parsed for
+    files whose size or mtime changed since the last scan. Files that disappeared from a
+    scanned directory are dropped from the index. There is no depth or result cap.
+    """
+
+    SCHEMA_VERSION = 1
+
+    _COLUMNS = (
+        "path", "filename", "directory", "size", "mtime", "name", "setup_file",
+        "product_code", "product_version", "upgrade_code", "publisher", "error", "indexed_at",
+    )
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path) if db_path else self._get_db_path()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._closed = False
+        self._init_schema()
+
+        # id(owner) -> stop event of that owner's watcher thread
+        self._watchers: Dict[int, threading.Event] = {}
+
+    @staticmethod
+    def _get_db_path() -> Path:
+        app_data = os.getenv('APPDATA')
+        if app_data:
+            path = Path(app_data) / "FaserF" / "SwitchCraft" / "library.db"
+        else:
+            path = Path.home() / ".switchcraft" / "library.db"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _init_schema(self):
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS packages")
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS packages (
+                    path TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL COLLATE NOCASE,
+                    directory TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    name TEXT COLLATE NOCASE,
+                    setup_file TEXT,
+                    product_code TEXT COLLATE NOCASE,
+                    product_version TEXT,
+                    upgrade_code TEXT COLLATE NOCASE,
+                    publisher TEXT,
+                    error TEXT,
+                    indexed_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_packages_mtime ON packages(mtime DESC)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_packages_name ON packages(name)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_packages_product_code ON packages(product_code)")
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def close(self):
+        """Stops the watchers and closes the connection; a scan running on another thread stops at its next step."""
+        self.stop_all_watchers()
+        with self._lock:
+            self._closed = True
+            self._conn.close()
+
+    def _ensure_open(self):
+        # Called with _lock held, before touching the connection during a scan
+        if self._closed:
+            raise _IndexClosed()
+
+    # --- Scanning ---
+
+    @staticmethod
+    def _walk(root: str) -> Iterator[Tuple[str, os.stat_result]]:
+        """Yields (path, stat) for every .intunewin file below root (no depth limit)."""
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.name.lower().endswith(".intunewin") and entry.is_file():
+                                yield entry.path, entry.stat()
+                        except OSError as e:
+                            logger.debug(f"Skipping {entry.path}: {e}")
+            except PermissionError:
+                logger.debug(f"Permission denied scanning {current}")
+            except OSError as e:
+                logger.debug(f"Failed to scan {current}: {e}")
+
+    def _known_under(self, root: str) -> Dict[str, Tuple[int, float]]:
+        prefix = root.rstrip("\\/") + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        rows = self._conn.execute(
+            "SELECT path, size, mtime FROM packages WHERE path >= ? AND path < ?",
+            (prefix, upper)
+        ).fetchall()
+        return {r["path"]: (r["size"], r["mtime"]) for r in rows}
+
+    def _build_row(self, path: str, st: os.stat_result) -> Tuple:
+        try:
+            meta = read_intunewin_metadata(path)
+            error = None
+        except Exception as e:
+            logger.debug(f"Failed to read Detection.xml from {path}: {e}")
+            meta = {}
+            error = str(e)
+        code = meta.get("product_code")
+        return (
+            path, os.path.basename(path), os.path.dirname(path), st.st_size, st.st_mtime,
+            meta.get("name"), meta.get("setup_file"),
+            _normalize_product_code(code) if code else None,
+            meta.get("product_version"), meta.get("upgrade_code"), meta.get("publisher"),
+            error, time.time(),
+        )
+
+    def scan(self, dirs: Iterable[str], progress_callback: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+        """
+        Incrementally brings the index up to date for the given directories.
+
+        Returns counts of added, updated, removed and unchanged packages.
+        progress_callback (optional) receives the number of files seen so far.
+        A scan running while close() is called stops early and returns the counts so far.
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        try:
+            seen = self._scan_dirs(dirs, stats, progress_callback)
+        except _IndexClosed:
+            logger.debug("Library index was closed during a scan; scan aborted")
+            return stats
+
+        if progress_callback:
+            progress_callback(seen)
+        logger.info(f"Library index scan finished: {stats}")
+        return stats
+
+    def _scan_dirs(self, dirs: Iterable[str], stats: Dict[str, int],
+                   progress_callback: Optional[Callable[[int], None]]) -> int:
+        seen = 0
+        for d in dirs:
+            root = os.path.abspath(d)
+            if not os.path.isdir(root):
+                logger.debug(f"Scan directory does not exist: {root}")
+                continue
+
+            with self._lock:
+                self._ensure_open()
+                known = self._known_under(root)
+
+            pending = []
+            for path, st in self._walk(root):
+                if self._closed:
+                    raise _IndexClosed()
+                seen += 1
+                previous = known.pop(path, None)
+                if previous == (st.st_size, st.st_mtime):
+                    stats["unchanged"] += 1
+                else:
+                    stats["updated" if previous else "added"] += 1
+                    pending.append(self._build_row(path, st))
+
+                if len(pending) >= 500:
+                    self._upsert(pending)
+                    pending = []
+                if progress_callback and seen % 500 == 0:
+                    progress_callback(seen)
+
+            if pending:
+                self._upsert(pending)
+            if known:
+                stats["removed"] += len(known)
+                with self._lock:
+                    self._ensure_open()
+                    with self._conn:
+                        self._conn.executemany("DELETE FROM packages WHERE path = ?", ((p,) for p in known))
+        return seen
+
+    def _upsert(self, rows: List[Tuple]):
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        with self._lock:
+            self._ensure_open()
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO packages ({', '.join(self._COLUMNS)}) VALUES ({placeholders})",
+                    rows
+                )
+
+    # --- Watching ---
+
+    def start_watching(self, dirs: Iterable[str], interval: float = 30.0,
+                       on_change: Optional[Callable[[Dict[str, int]], None]] = None, owner: Any = None):
+        """
+        Keeps the index fresh by re-running the (stat-only) incremental scan every interval seconds.
+        on_change is called with the scan stats whenever something was added, updated or removed.
+        Every owner (e.g. one library view per session) has its own watcher; starting again
+        replaces only that owner's watcher.
+        """
+        self.stop_watching(owner)
+        dirs = list(dirs)
+        stop = threading.Event()
+        with self._lock:
+            self._watchers[id(owner)] = stop
+
+        def _loop():
+            while not stop.wait(interval):
+                try:
+                    stats = self.scan(dirs)
+                    if on_change and (stats["added"] or stats["updated"] or stats["removed"]):
+                        on_change(stats)
+                except Exception as e:
+                    logger.warning(f"Library watcher scan failed: {e}")
+
+        threading.Thread(target=_loop, daemon=True, name="LibraryIndexWatcher").start()
+
+    def stop_watching(self, owner: Any = None):
+        """Stops the owner's watcher."""
+        with self._lock:
+            stop = self._watchers.pop(id(owner), None)
+        if stop is not None:
+            stop.set()
+
+    def stop_all_watchers(self):
+        with self._lock:
+            stops, self._watchers = list(self._watchers.values()), {}
+        for stop in stops:
+            stop.set()
+
+    # --- Queries ---
+
+    def _where(self, text, name, version, product_code, dirs) -> Tuple[str, List]:
+        clauses, params = [], []
+        if text:
+            like = f"%{_escape_like(text)}%"
+            clauses.append("(filename LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\')")
+            params.extend([like, like])
+        if name:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(name)}%")
+        if version:
+            clauses.append("product_version = ?")
+            params.append(version)
+        if product_code:
+            clauses.append("product_code = ?")
+            params.append(_normalize_product_code(product_code))
+        if dirs:
+            ranges = []
+            for d in dirs:
+                prefix = os.path.abspath(d).rstrip("\\/") + os.sep
+                ranges.append("(path >= ? AND path < ?)")
+                params.extend([prefix, prefix[:-1] + chr(ord(os.sep) + 1)])
+            clauses.append(f"({' OR '.join(ranges)})")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, text: Optional[str] = None, name: Optional[str] = None, version: Optional[str] = None,
+              product_code: Optional[str] = None, dirs: Optional[Iterable[str]] = None,
+              limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """
+        Queries the index, newest first.
+
+        text matches file name or app name, name matches the Detection.xml app name (substring,
+        case-insensitive), version matches MsiProductVersion exactly and product_code matches
+        MsiProductCode with or without braces. dirs restricts results to those directory trees.
+        """
+        where, params = self._where(text, name, version, product_code, list(dirs or []))
+        sql = f"SELECT * FROM packages{where} ORDER BY mtime DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([int(limit), int(offset)])
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_item(r) for r in rows]
+
+    def count(self, text: Optional[str] = None, name: Optional[str] = None, version: Optional[str] = None,
+              product_code: Optional[str] = None, dirs: Optional[Iterable[str]] = None) -> int:
+        """Returns the number of packages matching the same filters as query()."""
+        where, params = self._where(text, name, version, product_code, list(dirs or []))
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM packages{where}", params).fetchone()[0]
+
+    def get(self, path) -> Optional[Dict]:
+        """Returns the indexed entry for a single file, if present."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM packages WHERE path = ?", (os.path.abspath(str(path)),)
+            ).fetchone()
+        return self._row_to_item(row) if row else None
+
+    @staticmethod
+    def _row_to_item(row) -> Dict:
+        item = dict(row)
+        item["modified"] = datetime.fromtimestamp(item["mtime"])
+        return item
@@ -1,24 +1,51 @@
 import logging
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Optional
 import json
 import os
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Retention cap: oldest notifications beyond this are dropped
+MAX_NOTIFICATIONS = 200
+# Similar unread notifications (same title + type) within this window are merged into one
+COALESCE_WINDOW_SECONDS = 120
+# Rewrite the journal once it holds this many ops more than live notifications
+COMPACT_THRESHOLD = 500
+# Listener calls within this window are folded into one dispatch
+DISPATCH_DELAY_SECONDS = 0.05
+
 class NotificationService:
+    """
+    Notification store backed by an append-only JSON-lines journal.
+
+    Each change appends one small op ({"op": "add" | "update" | "read" | "clear"})
+    instead of rewriting the whole file; the journal is compacted once it grows well past the
+    live set. Listeners are called from a dispatcher thread, once per burst of changes.
+    """
     _instance = None
     _listeners: List[Callable] = []
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(NotificationService, cls).__new__(cls)
-            cls._instance.notifications = []
-            cls._instance._load_notifications()
+            cls._instance._init()
         return cls._instance
 
+    def _init(self):
+        self.notifications = []
+        self._lock = threading.RLock()
+        self._journal_ops = 0
+        self._pending_ops: Optional[List[Dict]] = None  # set inside batch()
+        self._dispatch_event = threading.Event()
+        self._dispatcher = None
+        self._load_notifications()
+
     def _get_storage_path(self):
         app_data = os.getenv('APPDATA')
         if app_data:
@@ -30,83 +57,200 @@ class NotificationService:
         path.parent.mkdir(parents=True, exist_ok=True)
         return path
 
+    def _get_journal_path(self):
+        return self._get_storage_path().with_suffix(".jsonl")
+
+    # --- Persistence ---
+
+    @staticmethod
+    def _serialize(n: Dict) -> Dict:
+        item = n.copy()
+        if isinstance(item.get("timestamp"), datetime):
+            item["timestamp"] = item["timestamp"].isoformat()
+        return item
+
+    @staticmethod
+    def _deserialize(n: Dict) -> Dict:
+        # Restore timestamp objects
+        if isinstance(n.get("timestamp"), str):
+            try:
+                n["timestamp"] = datetime.fromisoformat(n["timestamp"])
+            except Exception:
+                n["timestamp"] = datetime.now()
+        return n
+
     def _load_notifications(self):
         try:
-            path = self._get_storage_path()
-            if path.exists():
-                with open(path, "r", encoding="utf-8") as f:
+            journal = self._get_journal_path()
+            if journal.exists():
+                with open(journal, "r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            self._apply(json.loads(line))
+                        except ValueError:
+                            # Torn last line after a crash; everything before it is intact
+                            logger.warning("Skipping corrupt notification journal entry")
+                        self._journal_ops += 1
+                return
+
+            # Migrate the legacy whole-file store
+            legacy = self._get_storage_path()
+            if legacy.exists():
+                with open(legacy, "r", encoding="utf-8") as f:
                     data = json.load(f)
-                    # Restore timestamp objects
-                    for n in data:
-                        if isinstance(n.get("timestamp"), str):
-                            try:
-                                n["timestamp"] = datetime.fromisoformat(n["timestamp"])
-                            except Exception:
-                                n["timestamp"] = datetime.now()
-                    self.notifications = data
+                self.notifications = [self._deserialize(n) for n in data][:MAX_NOTIFICATIONS]
+                self._compact()
+                legacy.unlink()
         except Exception as e:
             logger.error(f"Failed to load notifications: {e}")
 
-    def _save_notifications(self):
-        try:
-            path = self._get_storage_path()
-            # Serialize dates
-            data_to_save = []
+    def _apply(self, op: Dict):
+        """Applies one journal op to the in-memory list."""
+        kind = op.get("op")
+        if kind == "add":
+            self.notifications.insert(0, self._deserialize(dict(op["n"])))
+            del self.notifications[MAX_NOTIFICATIONS:]
+        elif kind == "update":
+            n = self._deserialize(dict(op["n"]))
+            self.notifications = [x for x in self.notifications if x["id"] != n["id"]]
+            self.notifications.insert(0, n)
+        elif kind == "read":
             for n in self.notifications:
-                item = n.copy()
-                if isinstance(item.get("timestamp"), datetime):
-                    item["timestamp"] = item["timestamp"].isoformat()
-                data_to_save.append(item)
+                if op.get("all") or n["id"] == op.get("id"):
+                    n["read"] = True
+                    if not op.get("all"):
+                        break
+        elif kind == "clear":
+            self.notifications.clear()
+
+    def _append(self, *ops: Dict):
+        """Records ops in the journal (buffered while a batch() is open)."""
+        if self._pending_ops is not None:
+            self._pending_ops.extend(ops)
+            return
+        self._write_ops(list(ops))
 
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data_to_save, f, indent=4)
+    def _write_ops(self, ops: List[Dict]):
+        if not ops:
+            return
+        try:
+            with open(self._get_journal_path(), "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(op) + "\n" for op in ops))
+            self._journal_ops += len(ops)
+            if self._journal_ops > len(self.notifications) + COMPACT_THRESHOLD:
+                self._compact()
         except Exception as e:
             logger.error(f"Failed to save notifications: {e}")
 
+    def _compact(self):
+        """Rewrites the journal as one 'add' per live notification (oldest first)."""
+        try:
+            journal = self._get_journal_path()
+            tmp = journal.with_suffix(".jsonl.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for n in reversed(self.notifications):
+                    f.write(json.dumps({"op": "add", "n": self._serialize(n)}) + "\n")
+            os.replace(tmp, journal)
+            self._journal_ops = len(self.notifications)
+        except Exception as e:
+            logger.error(f"Failed to compact notifications: {e}")
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups many changes (e.g. one notification per uploaded app) into a single
+        journal append and a single listener dispatch.
+        """
+        with self._lock:
+            outer = self._pending_ops is None
+            if outer:
+                self._pending_ops = []
+        try:
+            yield self
+        finally:
+            if outer:
+                with self._lock:
+                    ops, self._pending_ops = self._pending_ops, None
+                    self._write_ops(ops)
+                self._notify_listeners()
+
+    # --- Public API ---
+
     def add_notification(self, title: str, message: str, type: str = "info", notify_system: bool = None, data: Dict = None):
         """
         Adds a notification.
         type: info, success, warning, error
         notify_system: If True, triggers OS toast (if supported by GUI).
                        If None, defaults to True for 'error' and 'warning', False otherwise.
+
+        An unread notification with the same title and type from the last
+        COALESCE_WINDOW_SECONDS is updated instead ("count" is incremented).
         """
 
         # Determine priority/system notification
         if notify_system is None:
             notify_system = type in ["error", "warning"]
 
-        notif = {
-            "id": str(uuid.uuid4()),
-            "title": title,
-            "message": message,
-            "type": type,
-            "timestamp": datetime.now(),
-            "read": False,
-            "notify_system": notify_system,
-            "data": data or {}
-        }
-        self.notifications.insert(0, notif)
-        self._save_notifications()
+        now = datetime.now()
+        with self._lock:
+            similar = self._find_similar(title, type, now)
+            if similar is not None:
+                notif = dict(similar, message=message, timestamp=now, count=similar.get("count", 1) + 1)
+                if data:
+                    notif["data"] = data
+                op = {"op": "update", "n": self._serialize(notif)}
+            else:
+                notif = {
+                    "id": str(uuid.uuid4()),
+                    "title": title,
+                    "message": message,
+                    "type": type,
+                    "timestamp": now,
+                    "read": False,
+                    "notify_system": notify_system,
+                    "data": data or {}
+                }
+                op = {"op": "add", "n": self._serialize(notif)}
+            self._apply(op)
+            notif = self.notifications[0]
+            self._append(op)
         self._notify_listeners()
         return notif
 
+    def _find_similar(self, title: str, type: str, now: datetime) -> Optional[Dict]:
+        # Only the newest few are candidates; bulk operations produce runs of similar items
+        for n in self.notifications[:5]:
+            if n["read"] or n["title"] != title or n["type"] != type:
+                continue
+            ts = n.get("timestamp")
+            if isinstance(ts, datetime) and (now - ts).total_seconds() <= COALESCE_WINDOW_SECONDS:
+                return n
+        return None
+
     def mark_read(self, notif_id: str):
-        for n in self.notifications:
-            if n["id"] == notif_id:
-                n["read"] = True
-                break
-        self._save_notifications()
+        with self._lock:
+            op = {"op": "read", "id": notif_id}
+            self._apply(op)
+            self._append(op)
         self._notify_listeners()
 
     def mark_all_read(self):
-        for n in self.notifications:
-            n["read"] = True
-        self._save_notifications()
+        with self._lock:
+            op = {"op": "read", "all": True}
+            self._apply(op)
+            self._append(op)
         self._notify_listeners()
 
     def clear_all(self):
-        self.notifications.clear()
-        self._save_notifications()
+        with self._lock:
+            self.notifications.clear()
+            if self._pending_ops is not None:
+                self._pending_ops.append({"op": "clear"})
+            else:
+                self._compact()
         self._notify_listeners()
 
     def get_unread_count(self) -> int:
@@ -115,6 +259,8 @@ class NotificationService:
     def get_notifications(self) -> List[Dict]:
         return self.notifications
 
+    # --- Listeners ---
+
     def add_listener(self, callback: Callable):
         if callback not in self._listeners:
             self._listeners.append(callback)
@@ -124,11 +270,25 @@ class NotificationService:
             self._listeners.remove(callback)
 
     def _notify_listeners(self):
-        for callback in self._listeners:
-            try:
-                callback()
-            except Exception as e:
-                logger.error(f"Error in notification listener: {e}")
+        """Schedules one listener dispatch; bursts of changes are folded together."""
+        if self._pending_ops is not None:
+            return
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="NotificationDispatcher", daemon=True)
+            self._dispatcher.start()
+        self._dispatch_event.set()
+
+    def _dispatch_loop(self):
+        while True:
+            self._dispatch_event.wait()
+            # Let the rest of a burst arrive before waking up the UI
+            time.sleep(DISPATCH_DELAY_SECONDS)
+            self._dispatch_event.clear()
+            for callback in list(self._listeners):
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Error in notification listener: {e}")
 
     # --- Legacy Static Method ---
     @staticmethod
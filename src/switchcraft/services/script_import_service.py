@@ -0,0 +1,183 @@
+"""
+Imports scripts from a GitHub repository and deploys them to Intune.
+
+The branch is downloaded once as a tarball (a single API request, however many scripts
+are selected) and the selected .ps1/.sh members are read straight from the stream.
+Deployment runs on a bounded worker pool; scripts whose content already matches an
+Intune script of the same name are skipped instead of being uploaded again.
+"""
+import hashlib
+import logging
+import tarfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_EXTENSIONS = (".ps1", ".sh")
+# Intune rejects far smaller scripts; anything larger is not a script we want in memory
+MAX_SCRIPT_SIZE = 1024 * 1024
+DEPLOY_WORKERS = 4
+# Graph throttling (429) and transient gateway errors are retried with backoff
+RETRY_STATUS = (429, 503, 504)
+MAX_RETRIES = 3
+MAX_RETRY_WAIT = 30.0
+
+
+@dataclass
+class DeployResult:
+    path: str
+    status: str  # uploaded | unchanged | failed
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status != "failed"
+
+
+def script_kind(path: str) -> str:
+    """Graph script collection for a file: 'shell' for .sh (macOS), 'powershell' otherwise."""
+    return "shell" if path.lower().endswith(".sh") else "powershell"
+
+
+def _raise_for_github_status(resp):
+    if resp.status_code == 401:
+        raise PermissionError("Authentication failed. Check your PAT for private repos.")
+    if resp.status_code == 403:
+        msg = "GitHub API Rate Limit Exceeded." if resp.headers.get("X-RateLimit-Remaining") == "0" else "Access to repository denied."
+        raise PermissionError(msg)
+    if resp.status_code == 404:
+        raise ValueError("Repository not found. Check URL and branch.")
+    resp.raise_for_status()
+
+
+class ScriptImportService:
+    def __init__(self, intune_service=None):
+        self.intune_service = intune_service
+
+    # --- GitHub ---
+
+    def fetch_repo_scripts(self, owner: str, repo: str, branch: str = "main",
+                           paths: Optional[Iterable[str]] = None, token: Optional[str] = None,
+                           extensions=SCRIPT_EXTENSIONS) -> Dict[str, bytes]:
+        """
+        Streams the branch tarball and returns {repo path: content} for the requested paths,
+        or for every file with one of the given extensions when paths is None.
+        """
+        url = f"https://api.github.com/repos/{owner}/{repo}/tarball/{branch}"
+        headers = {"Accept": "application/vnd.github+json"}
+        if token:
+            headers["Authorization"] = f"token {token}"
+
+        wanted = set(paths) if paths is not None else None
+        found: Dict[str, bytes] = {}
+        with requests.get(url, headers=headers, stream=True, timeout=60) as resp:
+            _raise_for_github_status(resp)
+            with tarfile.open(fileobj=resp.raw, mode="r|gz") as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+                    # Members are prefixed with "<owner>-<repo>-<sha>/"
+                    parts = member.name.split("/", 1)
+                    if len(parts) < 2:
+                        continue
+                    path = parts[1]
+                    if wanted is not None:
+                        if path not in wanted:
+                            continue
+                    elif not path.lower().endswith(extensions):
+                        continue
+                    if member.size > MAX_SCRIPT_SIZE:
+                        logger.warning(f"Skipping {path}: {member.size} bytes exceeds the script size limit")
+                        continue
+                    found[path] = tar.extractfile(member).read()
+                    if wanted is not None and len(found) == len(wanted):
+                        break  # Everything selected is in, no need to read the rest
+
+        if wanted is not None:
+            missing = wanted - found.keys()
+            if missing:
+                logger.warning(f"{len(missing)} selected scripts not found in {owner}/{repo}@{branch}: {sorted(missing)[:5]}")
+        logger.info(f"Read {len(found)} scripts from {owner}/{repo}@{branch} archive")
+        return found
+
+    # --- Intune ---
+
+    def deploy_scripts(self, token: str, scripts: Dict[str, bytes], describe: Callable[[str], str],
+                       run_as_account: str = "system", max_workers: int = DEPLOY_WORKERS,
+                       progress: Optional[Callable[[int, int], None]] = None) -> List[DeployResult]:
+        """
+        Uploads scripts (repo path -> content) to Intune; .ps1 as device management scripts and
+        .sh as macOS shell scripts. Display name is the file stem, description comes from describe(path).
+        Scripts identical to an existing script of the same name are reported as 'unchanged'.
+        """
+        if not scripts:
+            return []
+        kinds = {script_kind(p) for p in scripts}
+        existing = {kind: self._existing_scripts(token, kind) for kind in kinds}
+
+        total = len(scripts)
+        done = [0]
+        lock = threading.Lock()
+
+        def _one(path: str) -> DeployResult:
+            try:
+                return self._deploy_one(token, path, scripts[path], describe(path), run_as_account, existing[script_kind(path)])
+            except Exception as e:
+                logger.error(f"Failed to deploy {path}: {e}")
+                return DeployResult(path, "failed", str(e))
+            finally:
+                if progress:
+                    with lock:
+                        done[0] += 1
+                        count = done[0]
+                    progress(count, total)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total)), thread_name_prefix="sc-script-deploy") as pool:
+            return list(pool.map(_one, scripts))
+
+    def _existing_scripts(self, token: str, kind: str) -> Dict[str, List[str]]:
+        """displayName -> script ids, from one paged listing."""
+        by_name: Dict[str, List[str]] = {}
+        for item in self.intune_service.iter_scripts(token, kind):
+            by_name.setdefault(item.get("displayName"), []).append(item["id"])
+        return by_name
+
+    def _deploy_one(self, token, path, content: bytes, description, run_as_account, existing) -> DeployResult:
+        name = PurePosixPath(path).stem
+        kind = script_kind(path)
+        digest = hashlib.sha256(content).hexdigest()
+
+        for script_id in existing.get(name, []):
+            current = self._with_retry(lambda sid=script_id: self.intune_service.get_script_content(token, sid, kind))
+            if hashlib.sha256(current).hexdigest() == digest:
+                return DeployResult(path, "unchanged", script_id)
+
+        if kind == "shell":
+            text = content.decode("utf-8", errors="replace")
+            result = self._with_retry(lambda: self.intune_service.upload_macos_shell_script(token, name, description, text, run_as_account=run_as_account))
+        else:
+            result = self._with_retry(lambda: self.intune_service.upload_powershell_script(token, name, description, content, run_as_account=run_as_account))
+        return DeployResult(path, "uploaded", (result or {}).get("id", ""))
+
+    @staticmethod
+    def _with_retry(call):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return call()
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status not in RETRY_STATUS or attempt == MAX_RETRIES:
+                    raise
+                try:
+                    wait = float(e.response.headers.get("Retry-After", 2 ** attempt))
+                except (TypeError, ValueError):
+                    wait = 2 ** attempt
+                logger.info(f"Graph returned {status}, retrying in {wait:.0f}s")
+                time.sleep(min(wait, MAX_RETRY_WAIT))
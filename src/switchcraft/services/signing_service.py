@@ -1,11 +1,30 @@
+import json
 import logging
+import os
 import subprocess
+import tempfile
+from dataclasses import dataclass
 from switchcraft.utils.shell_utils import ShellUtils
 from pathlib import Path
+from typing import Iterable, List, Optional
 from switchcraft.utils.config import SwitchCraftConfig
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class SignResult:
+    path: str
+    # Set-AuthenticodeSignature status (Valid, UnknownError, ...) or
+    # AlreadySigned / Disabled / NotFound / Error
+    status: str
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("Valid", "AlreadySigned", "Disabled")
+
+
 class SigningService:
     @staticmethod
     def sign_script(script_path: str) -> bool:
@@ -13,99 +32,147 @@ class SigningService:
         Signs a PowerShell script using the configured certificate.
         Returns True if successful, False otherwise.
         """
-        # User Setting Check
-        if not SwitchCraftConfig.get_value("SignScripts", False):
-            logger.info("Signing is disabled in settings.")
+        result = SigningService.sign_scripts([script_path])[0]
+        if result.ok:
+            if result.status == "Disabled":
+                logger.info("Signing is disabled in settings.")
+            else:
+                logger.info(f"Successfully signed {Path(script_path).name}")
             return True
+        logger.error(f"Signing Failed ({result.status}): {result.message}")
+        return False
 
+    @staticmethod
+    def _cert_command() -> str:
+        """PowerShell snippet that resolves the signing certificate into $cert (once per session)."""
         # Policy Priority: Check for Thumbprint first (ADMX/Intune support)
         cert_thumbprint = SwitchCraftConfig.get_value("CodeSigningCertThumbprint")
         cert_path = SwitchCraftConfig.get_value("CodeSigningCertPath")
         if not cert_path:
              cert_path = SwitchCraftConfig.get_value("CertPath")
 
-        script_path_obj = Path(script_path).resolve()
-
-        if not script_path_obj.exists():
-            logger.error(f"Script to sign not found: {script_path}")
-            return False
-
-        logger.info(f"Attempting to sign: {script_path}")
-
-        ps_command_str = ""
-
         if cert_thumbprint:
-             # Use specific thumbprint from Policy/Config
-             logger.info(f"Using Certificate Thumbprint from Policy: {cert_thumbprint}")
-             ps_command_str = (
+            # Use specific thumbprint from Policy/Config
+            logger.info(f"Using Certificate Thumbprint from Policy: {cert_thumbprint}")
+            return (
                 f'$cert = Get-Item "Cert:\\CurrentUser\\My\\{cert_thumbprint}" -ErrorAction SilentlyContinue; '
                 f'if (-not $cert) {{ $cert = Get-Item "Cert:\\LocalMachine\\My\\{cert_thumbprint}" -ErrorAction SilentlyContinue }}; '
-                f'if ($cert) {{ '
-                f'   $sig = Set-AuthenticodeSignature -FilePath "{script_path_obj}" -Certificate $cert; '
-                f'   if ($sig.Status -eq "Valid") {{ Write-Output "Signed Successfully" }} else {{ Write-Error "Signing Failed: $($sig.StatusMessage)" }} '
-                f'}} '
-                f'else {{ Write-Error "Certificate with thumbprint {cert_thumbprint} not found." }}'
-             )
-
-        elif cert_path and Path(cert_path).exists():
-            # PFX Path Logic - Note: Set-AuthenticodeSignature with PFX usually requires password or import.
-            # However, if the user points to a PFX, we can try to use it.
-            # Since we can't easily prompt for password in headless/automation securely here without UI,
-            # we check if it is imported or if we can use it.
-            # Best Practice: Import to store, point to store. But user wants "Path".
-            # For "File based" signing, we assume passwordless or already handled?
-            # Actually, standard practice is Cert Store.
-            # If "CertPath" is a file, we might warn.
-            # But let's assume the user might have provided a .pfx that needs password?
-            # To avoid password prompt issues, we will fallback to "Auto Detect" if path logic fails,
-            # or try to import it to a temp store? Too complex.
-            # Simpler: If path is provided, try `Get-PfxCertificate` (prompts if needed? No, fails if protected).
+                f'$certError = "Certificate with thumbprint {cert_thumbprint} not found."; '
+            )
 
+        if cert_path and Path(cert_path).exists():
+            # Get-PfxCertificate fails for password protected files; the cert store is preferred.
             logger.warning("Using direct PFX path might require manual password entry which is not supported in this automation yet. Prefer Certificate Store.")
-            # We construct a command that attempts to load it.
-            ps_command_str = (
-                f'$pfx = "{cert_path}"; '
-                f'$cert = Get-PfxCertificate -FilePath $pfx; '
-                f'if ($cert) {{ Set-AuthenticodeSignature -FilePath "{script_path_obj}" -Certificate $cert }} '
-                f'else {{ Write-Error "Could not load certificate from file." }}'
-            )
-        else:
-            # Auto-Detect from Store (CurrentUser mainly, then LocalMachine)
-            ps_command_str = (
-                f'$cert = Get-ChildItem Cert:\\CurrentUser\\My -CodeSigningCert | Select-Object -First 1; '
-                f'if ($cert) {{ Write-Output "Found cert in CurrentUser\\My: $($cert.Subject)" }} '
-                f'else {{ '
-                f'   Write-Output "No cert in CurrentUser, checking LocalMachine..."; '
-                f'   $cert = Get-ChildItem Cert:\\LocalMachine\\My -CodeSigningCert | Select-Object -First 1; '
-                f'   if ($cert) {{ Write-Output "Found cert in LocalMachine\\My: $($cert.Subject)" }} '
-                f'}} '
-                f'if ($cert) {{ '
-                f'   $sig = Set-AuthenticodeSignature -FilePath "{script_path_obj}" -Certificate $cert; '
-                f'   if ($sig.Status -eq "Valid") {{ Write-Output "Signed Successfully" }} else {{ Write-Error "Signing Failed: $($sig.StatusMessage)" }} '
-                f'}} '
-                f'else {{ Write-Error "No CodeSigning certificate found in User or Machine store." }}'
+            pfx = str(cert_path).replace("'", "''")
+            return (
+                f"$cert = Get-PfxCertificate -FilePath '{pfx}' -ErrorAction SilentlyContinue; "
+                f'$certError = "Could not load certificate from file."; '
             )
 
-        cmd = ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", ps_command_str]
+        # Auto-Detect from Store (CurrentUser mainly, then LocalMachine)
+        return (
+            '$cert = Get-ChildItem Cert:\\CurrentUser\\My -CodeSigningCert | Select-Object -First 1; '
+            'if (-not $cert) { $cert = Get-ChildItem Cert:\\LocalMachine\\My -CodeSigningCert | Select-Object -First 1 }; '
+            '$certError = "No CodeSigning certificate found in User or Machine store."; '
+        )
 
+    @staticmethod
+    def _batch_command(list_file: str, timestamp_server: Optional[str]) -> str:
+        ts = ""
+        if timestamp_server:
+            ts = " -TimestampServer '{}'".format(timestamp_server.replace("'", "''"))
+        list_file = list_file.replace("'", "''")
+        return (
+            SigningService._cert_command()
+            + 'if (-not $cert) { ConvertTo-Json -Compress -InputObject @{ error = $certError }; exit 1 }; '
+            + f"$files = Get-Content -Raw -Encoding UTF8 -LiteralPath '{list_file}' | ConvertFrom-Json; "
+            + '$results = foreach ($f in $files) { '
+            + '  try { '
+            # A Valid status means the embedded hash still matches the content, so only
+            # changed (or differently signed) files are sent to the timestamp server.
+            + '    $cur = Get-AuthenticodeSignature -LiteralPath $f; '
+            + '    if ($cur.Status -eq "Valid" -and $cur.SignerCertificate.Thumbprint -eq $cert.Thumbprint) { '
+            + '      [pscustomobject]@{ path = $f; status = "AlreadySigned"; message = "" } '
+            + '    } else { '
+            + f'      $sig = Set-AuthenticodeSignature -LiteralPath $f -Certificate $cert -HashAlgorithm SHA256{ts}; '
+            + '      [pscustomobject]@{ path = $f; status = [string]$sig.Status; message = [string]$sig.StatusMessage } '
+            + '    } '
+            + '  } catch { [pscustomobject]@{ path = $f; status = "Error"; message = $_.Exception.Message } } '
+            + '}; '
+            + 'ConvertTo-Json -Compress -Depth 3 -InputObject @($results)'
+        )
+
+    @staticmethod
+    def sign_scripts(script_paths: Iterable[str], timestamp_server: Optional[str] = None) -> List[SignResult]:
+        """
+        Signs many scripts in a single PowerShell session.
+
+        The certificate is resolved once, every file is signed in the same process (so one
+        connection to the timestamp server is reused) and files that already carry a valid
+        signature from the same certificate are skipped. Returns one SignResult per input
+        path, in input order.
+        """
+        paths = [str(Path(p).resolve()) for p in script_paths]
+
+        # User Setting Check
+        if not SwitchCraftConfig.get_value("SignScripts", False):
+            return [SignResult(p, "Disabled") for p in paths]
+
+        results = {p: SignResult(p, "NotFound", "Script to sign not found") for p in paths if not Path(p).exists()}
+        to_sign = list(dict.fromkeys(p for p in paths if p not in results))
+        if to_sign:
+            timestamp_server = timestamp_server or SwitchCraftConfig.get_value("CodeSigningTimestampServer")
+            for r in SigningService._run_batch(to_sign, timestamp_server):
+                results[r.path] = r
+
+        signed = sum(1 for r in results.values() if r.status == "Valid")
+        skipped = sum(1 for r in results.values() if r.status == "AlreadySigned")
+        logger.info(f"Signing batch: {signed} signed, {skipped} already signed, {len(results) - signed - skipped} failed")
+        return [results.get(p) or SignResult(p, "Error", "No result returned") for p in paths]
+
+    @staticmethod
+    def _run_batch(paths: List[str], timestamp_server: Optional[str]) -> List[SignResult]:
+        # The file list is handed over as JSON to stay clear of command line length limits and quoting issues
+        fd, list_file = tempfile.mkstemp(suffix=".json", prefix="switchcraft_sign_")
         try:
-            # Run PowerShell
-            completed = ShellUtils.run_command(
-                cmd,
-                check=True
-            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(paths, f)
 
-            if completed.returncode == 0 and "Signed Successfully" in completed.stdout:
-                logger.info(f"Successfully signed {script_path_obj.name}")
-                return True
-            else:
-                logger.error(f"Signing Failed. Return Code: {completed.returncode}")
-                if completed.stderr:
-                    logger.error(f"STDERR: {completed.stderr.strip()}")
-                if completed.stdout:
-                    logger.warning(f"STDOUT: {completed.stdout.strip()}")
-                return False
-
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Signing failed exception: {e}")
-            return False
+            ps_command_str = SigningService._batch_command(list_file, timestamp_server)
+            cmd = ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-Command", ps_command_str]
+            logger.info(f"Signing {len(paths)} script(s) in one PowerShell session")
+            try:
+                completed = ShellUtils.run_command(cmd)
+            except (subprocess.SubprocessError, OSError) as e:
+                logger.error(f"Signing failed exception: {e}")
+                return [SignResult(p, "Error", str(e)) for p in paths]
+        finally:
+            try:
+                os.unlink(list_file)
+            except OSError:
+                pass
+
+        if completed is None:
+            return [SignResult(p, "Error", "PowerShell could not be started") for p in paths]
+        return SigningService._parse_batch_output(paths, completed)
+
+    @staticmethod
+    def _parse_batch_output(paths: List[str], completed) -> List[SignResult]:
+        stdout = (completed.stdout or "").strip()
+        try:
+            # The JSON document is the last line; anything before it is stray host output
+            data = json.loads(stdout.splitlines()[-1]) if stdout else None
+        except ValueError:
+            data = None
+
+        if isinstance(data, dict):
+            message = data.get("error") or "Signing failed"
+            return [SignResult(p, "Error", message) for p in paths]
+        if not isinstance(data, list):
+            message = (completed.stderr or "").strip() or f"Unexpected PowerShell output (exit code {completed.returncode})"
+            return [SignResult(p, "Error", message) for p in paths]
+
+        return [
+            SignResult(str(item.get("path", "")), str(item.get("status", "Error")), str(item.get("message") or ""))
+            for item in data if isinstance(item, dict)
+        ]
@@ -0,0 +1,464 @@
+import ctypes
+import ctypes.util
+import json
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from switchcraft.services.fingerprint_service import get_fingerprint_service
+from switchcraft.utils.tracing import summarize
+
+logger = logging.getLogger(__name__)
+
+INSTALLER_EXTENSIONS = {".msi", ".exe", ".dmg", ".pkg", ".msix", ".msixbundle", ".appx", ".zip", ".ipa"}
+# Browser/copy tools write to these first and rename when done
+_PARTIAL_SUFFIXES = {".part", ".partial", ".crdownload", ".tmp", ".download", ".filepart"}
+STATE_FILE = "watch_state.json"
+
+
+# --- Change sources ---
+
+class _InotifySource:
+    """Linux inotify watches on the folder tree; reports paths that were written or moved in."""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root: Path, recursive: bool):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._recursive = recursive
+        self._dirs: Dict[int, Path] = {}
+        self._add_tree(root)
+
+    def _add_watch(self, directory: Path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), self.MASK)
+        if wd < 0:
+            logger.warning(f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+            return
+        self._dirs[wd] = directory
+
+    def _add_tree(self, root: Path):
+        self._add_watch(root)
+        if self._recursive:
+            for dirpath, dirnames, _ in os.walk(root):
+                for d in dirnames:
+                    self._add_watch(Path(dirpath) / d)
+
+    def poll(self, timeout: float) -> Tuple[List[Path], bool]:
+        """Returns (changed paths, rescan needed)."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return [], False
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return [], False
+
+        changed, rescan = [], False
+        offset = 0
+        while offset + self._EVENT.size <= len(buf):
+            wd, mask, _, name_len = self._EVENT.unpack_from(buf, offset)
+            offset += self._EVENT.size
+            name = buf[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+
+            if mask & self.IN_Q_OVERFLOW:
+                rescan = True
+                continue
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                if self._recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    # Files may already be inside a directory that was moved/copied in
+                    self._add_tree(path)
+                    rescan = True
+                continue
+            changed.append(path)
+        return changed, rescan
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class _PollingSource:
+    """Portable fallback: periodic directory scans compared by (size, mtime)."""
+
+    def __init__(self, root: Path, recursive: bool, interval: float = 2.0):
+        self._root = root
+        self._recursive = recursive
+        self._interval = interval
+        self._next_scan = 0.0
+        self._seen: Dict[Path, Tuple[int, int]] = {}
+
+    def poll(self, timeout: float) -> Tuple[List[Path], bool]:
+        now = time.monotonic()
+        if now < self._next_scan:
+            time.sleep(min(timeout, self._next_scan - now))
+            return [], False
+        self._next_scan = now + self._interval
+
+        current = {}
+        for path in _iter_files(self._root, self._recursive):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            current[path] = (st.st_size, st.st_mtime_ns)
+        changed = [p for p, sig in current.items() if self._seen.get(p) != sig]
+        self._seen = current
+        return changed, False
+
+    def close(self):
+        pass
+
+
+def _iter_files(root: Path, recursive: bool) -> Iterable[Path]:
+    if recursive:
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                yield Path(dirpath) / name
+    else:
+        for entry in os.scandir(root):
+            if entry.is_file():
+                yield Path(entry.path)
+
+
+# --- Daemon ---
+
+@dataclass
+class _Pending:
+    last_event: float
+    size: int = -1
+    mtime_ns: int = -1
+
+
+@dataclass
+class WatchStats:
+    analyzed: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    skipped: int = 0
+    results: List[Path] = field(default_factory=list)
+
+
+class HotFolderWatcher:
+    """
+    Watches an inbox folder and analyzes every installer that lands in it.
+
+    New or changed files are debounced until their size and mtime stop changing for
+    `settle_seconds`, deduplicated by SHA-256 and analyzed by a bounded worker pool.
+    When `max_in_flight` jobs are running, ready files stay pending (backpressure)
+    instead of piling up in memory. Each result is written to `output_dir` as JSON and
+    to the analysis history; the processed files/hashes are kept in watch_state.json
+    so a restarted daemon neither loses nor repeats work.
+    """
+
+    def __init__(self, watch_dir, output_dir=None, workers: int = 2, max_in_flight: int = None,
+                 settle_seconds: float = 2.0, recursive: bool = True, record_history: bool = True,
+                 analyze: Callable[[str], object] = None, on_result: Callable[[Path, dict], None] = None,
+                 use_inotify: bool = True):
+        self.watch_dir = Path(watch_dir).resolve()
+        self.output_dir = Path(output_dir).resolve() if output_dir else self.watch_dir / ".switchcraft"
+        self.workers = max(1, workers)
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.settle_seconds = settle_seconds
+        self.recursive = recursive
+        self.record_history = record_history
+        self.on_result = on_result
+        self._use_inotify = use_inotify
+        self._analyze = analyze or self._default_analyze
+        self._controller = None
+
+        self.stats = WatchStats()
+        self._pending: Dict[Path, _Pending] = {}
+        self._in_flight: Set[Path] = set()
+        self._hashes_in_flight: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self._state_path = self.output_dir / STATE_FILE
+        self._state = {"files": {}, "hashes": {}}
+        self._state_dirty = False
+        self._last_state_save = 0.0
+
+    # --- State ---
+
+    def _load_state(self):
+        try:
+            if self._state_path.exists():
+                with open(self._state_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._state = {"files": data.get("files", {}), "hashes": data.get("hashes", {})}
+        except Exception as e:
+            logger.warning(f"Could not read watch state {self._state_path}, starting fresh: {e}")
+
+    def _save_state(self, force: bool = False):
+        with self._lock:
+            if not self._state_dirty or (not force and time.monotonic() - self._last_state_save < 1.0):
+                return
+            data = json.dumps(self._state, indent=2)
+            self._state_dirty = False
+            self._last_state_save = time.monotonic()
+        tmp = self._state_path.with_suffix(".tmp")
+        try:
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, self._state_path)
+        except Exception as e:
+            logger.error(f"Failed to save watch state: {e}")
+
+    def _is_processed(self, path: Path, st: os.stat_result) -> bool:
+        rec = self._state["files"].get(str(path))
+        return bool(rec) and rec.get("size") == st.st_size and rec.get("mtime_ns") == st.st_mtime_ns
+
+    # --- Event handling ---
+
+    def _is_candidate(self, path: Path) -> bool:
+        name = path.name
+        if name.startswith(".") or name.startswith("~$"):
+            return False
+        if self.output_dir in path.parents:
+            return False
+        suffix = path.suffix.lower()
+        if suffix in _PARTIAL_SUFFIXES:
+            return False
+        return suffix in INSTALLER_EXTENSIONS
+
+    def _touch(self, path: Path):
+        if not self._is_candidate(path):
+            return
+        with self._lock:
+            pending = self._pending.get(path)
+            if pending is None:
+                self._pending[path] = _Pending(last_event=time.monotonic())
+            else:
+                pending.last_event = time.monotonic()
+
+    def _scan(self):
+        for path in _iter_files(self.watch_dir, self.recursive):
+            self._touch(path)
+
+    def _ready_files(self) -> List[Path]:
+        """Pending files whose size/mtime have been stable for settle_seconds."""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            items = list(self._pending.items())
+        for path, pending in items:
+            if now - pending.last_event < self.settle_seconds:
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                # Deleted or renamed away before it settled
+                with self._lock:
+                    self._pending.pop(path, None)
+                continue
+            if (st.st_size, st.st_mtime_ns) != (pending.size, pending.mtime_ns):
+                # Still being written (or first check): wait another settle period
+                pending.size, pending.mtime_ns, pending.last_event = st.st_size, st.st_mtime_ns, now
+                if self.settle_seconds > 0:
+                    continue
+            if self._is_processed(path, st):
+                with self._lock:
+                    self._pending.pop(path, None)
+                    self.stats.skipped += 1
+                continue
+            try:
+                # Writers on Windows keep an exclusive lock until they are done
+                with open(path, "rb"):
+                    pass
+            except OSError:
+                pending.last_event = now
+                continue
+            ready.append(path)
+        return ready
+
+    def _dispatch(self, pool: ThreadPoolExecutor):
+        for path in self._ready_files():
+            with self._lock:
+                if path in self._in_flight:
+                    continue
+                if len(self._in_flight) >= self.max_in_flight:
+                    # Backpressure: leave the rest pending until a worker frees up
+                    break
+                self._pending.pop(path, None)
+                self._in_flight.add(path)
+            pool.submit(self._process, path)
+
+    # --- Work ---
+
+    def _default_analyze(self, file_path: str):
+        if self._controller is None:
+            from switchcraft.controllers.analysis_controller import AnalysisController
+            self._controller = AnalysisController()
+        return self._controller.analyze_file(file_path)
+
+    def _process(self, path: Path):
+        try:
+            st = path.stat()
+            sha = get_fingerprint_service().sha256(path)
+            if not sha:
+                raise OSError("could not hash file")
+
+            with self._lock:
+                known = self._state["hashes"].get(sha)
+                duplicate = known is not None or sha in self._hashes_in_flight
+                if not duplicate:
+                    self._hashes_in_flight.add(sha)
+            if duplicate:
+                logger.info(f"Skipping {path.name}: same content as {known['file'] if known else 'a file in progress'}")
+                self._record(path, st, sha, known["result"] if known else None)
+                with self._lock:
+                    self.stats.duplicates += 1
+                return
+
+            try:
+                result = self._analyze(str(path))
+                document = self._to_document(path, sha, result)
+                out_file = self.output_dir / f"{path.stem}_{sha[:12]}.json"
+                out_file.write_text(json.dumps(document, indent=2, default=str), encoding="utf-8")
+                if document.get("error"):
+                    logger.warning(f"Analysis of {path.name} failed: {document['error']}")
+                    with self._lock:
+                        self.stats.failed += 1
+                else:
+                    self._add_history(path, document, out_file)
+                    with self._lock:
+                        self.stats.analyzed += 1
+                        self.stats.results.append(out_file)
+                        self._state["hashes"][sha] = {"file": str(path), "result": out_file.name}
+                self._record(path, st, sha, out_file.name)
+                if self.on_result:
+                    self.on_result(path, document)
+            finally:
+                with self._lock:
+                    self._hashes_in_flight.discard(sha)
+        except Exception as e:
+            logger.error(f"Failed to process {path}: {e}")
+            with self._lock:
+                self.stats.failed += 1
+        finally:
+            with self._lock:
+                self._in_flight.discard(path)
+
+    def _record(self, path: Path, st: os.stat_result, sha: str, result: Optional[str]):
+        with self._lock:
+            self._state["files"][str(path)] = {
+                "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha, "result": result
+            }
+            self._state_dirty = True
+
+    @staticmethod
+    def _to_document(path: Path, sha: str, result) -> dict:
+        info = getattr(result, "info", None)
+        return {
+            "source": str(path),
+            "sha256": sha,
+            "analyzed_at": datetime.now().isoformat(),
+            "info": info.to_dict() if info is not None else None,
+            "winget_url": getattr(result, "winget_url", None),
+            "winget_id": getattr(result, "winget_id", None),
+            "community_match": getattr(result, "community_match", False),
+            "error": getattr(result, "error", None),
+            "trace": getattr(result, "trace", None),
+        }
+
+    def _add_history(self, path: Path, document: dict, out_file: Path):
+        if not self.record_history:
+            return
+        try:
+            from switchcraft.services.history_service import HistoryService
+            info = document.get("info") or {}
+            HistoryService().add_entry({
+                "filename": path.name,
+                "filepath": str(path),
+                "product": info.get("product_name") or "Unknown",
+                "version": info.get("product_version") or "Unknown",
+                "type": info.get("installer_type"),
+                "status": "Watched",
+                # The full trace stays in the result file; history keeps a summary and the reference
+                "trace_summary": summarize(document.get("trace")),
+                "result_file": str(out_file),
+            })
+        except Exception as e:
+            logger.error(f"Failed to save history: {e}")
+
+    # --- Lifecycle ---
+
+    def _open_source(self):
+        if self._use_inotify and sys.platform.startswith("linux"):
+            try:
+                return _InotifySource(self.watch_dir, self.recursive)
+            except Exception as e:
+                logger.warning(f"inotify unavailable ({e}), falling back to polling")
+        return _PollingSource(self.watch_dir, self.recursive)
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, once: bool = False, poll_interval: float = 0.5) -> WatchStats:
+        """
+        Runs until stop() is called (or, with once=True, until every file currently
+        in the folder has been handled).
+        """
+        if not self.watch_dir.is_dir():
+            raise NotADirectoryError(str(self.watch_dir))
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._load_state()
+
+        source = None if once else self._open_source()
+        # Files that arrived while the daemon was down
+        self._scan()
+        logger.info(f"Watching {self.watch_dir} -> {self.output_dir} ({self.workers} workers)")
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="watch") as pool:
+                while not self._stop.is_set():
+                    if source is not None:
+                        changed, rescan = source.poll(poll_interval)
+                        for path in changed:
+                            self._touch(path)
+                        if rescan:
+                            self._scan()
+                    else:
+                        self._stop.wait(min(poll_interval, max(self.settle_seconds, 0.05)))
+
+                    self._dispatch(pool)
+                    self._save_state()
+
+                    if once:
+                        with self._lock:
+                            if not self._pending and not self._in_flight:
+                                break
+        finally:
+            if source is not None:
+                source.close()
+            self._save_state(force=True)
+        return self.stats
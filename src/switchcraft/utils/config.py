@@ -1,7 +1,9 @@
 import sys
 import logging
 import os
-from typing import Optional, Any, Dict
+import threading
+import time
+from typing import Optional, Any, Callable, Dict, List, Tuple
 from contextvars import ContextVar
 from abc import ABC, abstractmethod
 
@@ -10,6 +12,10 @@ logger = logging.getLogger(__name__)
 # --- Configuration Backends ---
 
 class ConfigBackend(ABC):
+    # UI language of this backend's user, resolved once when the backend is bound
+    # (None = not resolved yet, "" = no preference stored)
+    ui_language: Optional[str] = None
+
     @abstractmethod
     def get_value(self, value_name: str, default: Any = None) -> Any:
         pass
@@ -43,13 +49,173 @@ class ConfigBackend(ABC):
         """Returns { 'value': any, 'source': str } or None."""
         pass
 
+    def invalidate(self):
+        """Drops cached values so the next read goes to the underlying store."""
+        pass
+
+# --- Read-through cache ---
+
+_MISSING = object()
+
+class ConfigSnapshot:
+    """
+    Thread-safe read-through cache of resolved config lookups.
+
+    Reads are plain dict lookups; a miss resolves the value once via the loader and
+    stores it (including "not set"). invalidate() drops everything; a fill that raced
+    with an invalidation is discarded instead of resurrecting the stale value.
+    With a ttl the whole snapshot also expires, for stores without change notification.
+    """
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._values: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._since = time.monotonic()
+
+    def get(self, key, loader: Callable[[], Any]) -> Any:
+        if self.ttl is not None and time.monotonic() - self._since > self.ttl:
+            self.invalidate()
+        val = self._values.get(key, _MISSING)
+        if val is not _MISSING:
+            return val
+
+        generation = self._generation
+        val = loader()
+        with self._lock:
+            if generation == self._generation:
+                self._values[key] = val
+        return val
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._values = {}
+            self._since = time.monotonic()
+
+class _RegistryWatcher(threading.Thread):
+    """
+    Waits on RegNotifyChangeKeyValue for the SwitchCraft policy/preference keys and calls
+    `on_change` whenever anything below them changes. Keys that do not exist yet are
+    watched through their nearest existing parent, so newly deployed policies are seen too;
+    such a parent (e.g. HKLM\\Software) is only watched for its own subkeys being created or
+    deleted, not recursively, so unrelated registry writes do not invalidate the snapshot.
+    """
+    REG_NOTIFY_CHANGE_NAME = 0x1
+    REG_NOTIFY_CHANGE_LAST_SET = 0x4
+    KEY_NOTIFY = 0x0010
+    INFINITE = 0xFFFFFFFF
+
+    def __init__(self, keys: List[Tuple[int, str]], on_change: Callable[[], None], on_error: Callable[[], None]):
+        super().__init__(name="RegistryConfigWatcher", daemon=True)
+        self._keys = keys
+        self._on_change = on_change
+        self._on_error = on_error
+
+    def run(self):
+        try:
+            import ctypes
+            from ctypes import wintypes
+            self._advapi32 = ctypes.WinDLL("advapi32")
+            self._kernel32 = ctypes.WinDLL("kernel32")
+            self._kernel32.CreateEventW.restype = wintypes.HANDLE
+            while True:
+                opened, events = [], []
+                try:
+                    for root, path in self._keys:
+                        hkey, exact = self._open_nearest(ctypes, wintypes, root, path)
+                        if hkey is None:
+                            continue
+                        opened.append(hkey)
+                        event = self._kernel32.CreateEventW(None, True, False, None)
+                        if exact:
+                            subtree, flags = True, self.REG_NOTIFY_CHANGE_NAME | self.REG_NOTIFY_CHANGE_LAST_SET
+                        else:
+                            # Wakes up when the next key of the path appears; the loop then reopens
+                            subtree, flags = False, self.REG_NOTIFY_CHANGE_NAME
+                        if self._advapi32.RegNotifyChangeKeyValue(hkey, subtree, flags, wintypes.HANDLE(event), True) == 0:
+                            events.append(event)
+                        else:
+                            self._kernel32.CloseHandle(wintypes.HANDLE(event))
+                    if not events:
+                        raise OSError("No registry key could be watched")
+
+                    handles = (wintypes.HANDLE * len(events))(*events)
+                    self._kernel32.WaitForMultipleObjects(len(events), handles, False, self.INFINITE)
+                finally:
+                    for event in events:
+                        self._kernel32.CloseHandle(wintypes.HANDLE(event))
+                    for hkey in opened:
+                        self._advapi32.RegCloseKey(hkey)
+                self._on_change()
+        except Exception as e:
+            logger.debug(f"Registry change notification unavailable: {e}")
+            self._on_error()
+
+    def _open_nearest(self, ctypes, wintypes, root: int, path: str):
+        """Handle of the key or its nearest existing parent, and whether it is the key itself."""
+        parts = path.split("\\")
+        depth = len(parts)
+        while parts:
+            hkey = wintypes.HKEY()
+            rc = self._advapi32.RegOpenKeyExW(wintypes.HKEY(root), "\\".join(parts), 0, self.KEY_NOTIFY, ctypes.byref(hkey))
+            if rc == 0:
+                return hkey, len(parts) == depth
+            parts.pop()
+        return None, False
+
 class RegistryBackend(ConfigBackend):
     """Windows Registry Backend for Desktop App"""
     POLICY_PATH = r"Software\Policies\FaserF\SwitchCraft"
     PREFERENCE_PATH = r"Software\FaserF\SwitchCraft"
     INTUNE_OMA_PATH = r"Software\Microsoft\PolicyManager\current\device\FaserF~SwitchCraft"
+    # Snapshot lifetime when registry change notification is not available
+    UNWATCHED_TTL = 5.0
+
+    def __init__(self, watch: bool = True):
+        self._snapshot = ConfigSnapshot(ttl=self.UNWATCHED_TTL)
+        self._watch = watch
+        self._watcher: Optional[_RegistryWatcher] = None
+
+    def invalidate(self):
+        self._snapshot.invalidate()
+
+    def _cached(self, key, loader: Callable[[], Any]) -> Any:
+        if self._watch and self._watcher is None:
+            self._start_watcher()
+        return self._snapshot.get(key, loader)
+
+    def _start_watcher(self):
+        if sys.platform != 'win32':
+            self._watch = False
+            return
+        try:
+            import winreg
+            keys = [
+                (winreg.HKEY_LOCAL_MACHINE, self.POLICY_PATH),
+                (winreg.HKEY_CURRENT_USER, self.POLICY_PATH),
+                (winreg.HKEY_LOCAL_MACHINE, self.INTUNE_OMA_PATH),
+                (winreg.HKEY_CURRENT_USER, self.PREFERENCE_PATH),
+                (winreg.HKEY_LOCAL_MACHINE, self.PREFERENCE_PATH),
+            ]
+            self._watcher = _RegistryWatcher(keys, self.invalidate, self._on_watcher_error)
+            # Notifications keep the snapshot fresh; no need to expire it
+            self._snapshot.ttl = None
+            self._watcher.start()
+        except Exception as e:
+            self._on_watcher_error()
+            logger.debug(f"Could not start registry watcher: {e}")
+
+    def _on_watcher_error(self):
+        self._watch = False
+        self._snapshot.ttl = self.UNWATCHED_TTL
+        self._snapshot.invalidate()
 
     def get_value(self, value_name: str, default: Any = None) -> Any:
+        val = self._cached(("value", value_name), lambda: self._lookup_value(value_name))
+        return default if val is None else val
+
+    def _lookup_value(self, value_name: str) -> Any:
         # Alias mapping for GPO
         key_map = {
             "IntuneTenantID": "GraphTenantId",
@@ -62,12 +228,12 @@ class RegistryBackend(ConfigBackend):
                  return alias_val
 
         if sys.platform != 'win32':
-            return default
+            return None
 
         try:
             import winreg
         except ImportError:
-            return default
+            return None
 
         # 1. HKLM Policy
         val = self._read_registry(winreg.HKEY_LOCAL_MACHINE, self.POLICY_PATH, value_name)
@@ -82,9 +248,12 @@ class RegistryBackend(ConfigBackend):
         val = self._read_registry(winreg.HKEY_LOCAL_MACHINE, self.PREFERENCE_PATH, value_name)
         if val is not None: return val
 
-        return default
+        return None
 
     def get_value_with_source(self, value_name: str) -> Optional[Dict[str, Any]]:
+        return self._cached(("source", value_name), lambda: self._lookup_value_with_source(value_name))
+
+    def _lookup_value_with_source(self, value_name: str) -> Optional[Dict[str, Any]]:
         if sys.platform != 'win32':
             return None
 
@@ -117,6 +286,9 @@ class RegistryBackend(ConfigBackend):
 
     def is_managed(self, key: str = None) -> bool:
         """Check if a specific key (or any key) is managed by GPO."""
+        return self._cached(("managed", key), lambda: self._lookup_managed(key))
+
+    def _lookup_managed(self, key: str = None) -> bool:
         if sys.platform != 'win32': return False
         try:
             import winreg
@@ -167,8 +339,14 @@ class RegistryBackend(ConfigBackend):
                 winreg.SetValueEx(key, value_name, 0, value_type, value)
         except Exception as e:
             logger.error(f"Registry set failed: {e}")
+        finally:
+            # Don't wait for the change notification; the caller may read the value right away
+            self.invalidate()
 
     def get_secure_value(self, value_name: str) -> Optional[str]:
+        return self._cached(("secure", value_name), lambda: self._lookup_secure_value(value_name))
+
+    def _lookup_secure_value(self, value_name: str) -> Optional[str]:
         # Check policies first (legacy GPO support)
         if sys.platform == 'win32':
              try:
@@ -238,6 +416,10 @@ class RegistryBackend(ConfigBackend):
              keyring.set_password("SwitchCraft", value_name, value)
         except Exception as e:
             logger.error(f"Keyring set failed: {e}")
+        finally:
+            # Keyring changes are not covered by registry notifications. Only after the write,
+            # so a concurrent read cannot re-cache the old secret.
+            self.invalidate()
 
     def delete_secure_value(self, value_name: str):
         try:
@@ -245,6 +427,8 @@ class RegistryBackend(ConfigBackend):
             keyring.delete_password("SwitchCraft", value_name)
         except:
             pass
+        finally:
+            self.invalidate()
 
     def export_all(self) -> Dict[str, Any]:
         if sys.platform != 'win32': return {}
@@ -290,22 +474,38 @@ class JsonFileBackend(ConfigBackend):
     filesystem is protected. For production environments requiring high security,
     consider using a dedicated secrets manager (e.g., HashiCorp Vault).
     """
+    # How often (seconds) reads check whether another process rewrote the file
+    RELOAD_CHECK_INTERVAL = 1.0
+
     def __init__(self, file_path: str):
         self.file_path = file_path
         self._cache = {}
+        self._lock = threading.RLock()
+        self._file_state = None
+        self._next_check = 0.0
         self._load()
 
-    def _load(self):
+    def _stat(self):
         try:
-            import json
-            if os.path.exists(self.file_path):
-                with open(self.file_path, "r", encoding="utf-8") as f:
-                    self._cache = json.load(f)
-            else:
+            st = os.stat(self.file_path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _load(self):
+        with self._lock:
+            try:
+                import json
+                self._file_state = self._stat()
+                if os.path.exists(self.file_path):
+                    with open(self.file_path, "r", encoding="utf-8") as f:
+                        self._cache = json.load(f)
+                else:
+                    self._cache = {}
+            except Exception as e:
+                logger.error(f"Failed to load config from {self.file_path}: {e}")
                 self._cache = {}
-        except Exception as e:
-            logger.error(f"Failed to load config from {self.file_path}: {e}")
-            self._cache = {}
+            self._next_check = time.monotonic() + self.RELOAD_CHECK_INTERVAL
 
     def _save(self):
         try:
@@ -313,15 +513,32 @@ class JsonFileBackend(ConfigBackend):
             os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
             with open(self.file_path, "w", encoding="utf-8") as f:
                 json.dump(self._cache, f, indent=4)
+            # Our own write must not trigger a reload
+            self._file_state = self._stat()
         except Exception as e:
             logger.error(f"Failed to save config to {self.file_path}: {e}")
 
+    def _check_reload(self):
+        """Picks up edits made by other workers/processes; at most one stat() per interval."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.RELOAD_CHECK_INTERVAL
+        if self._stat() != self._file_state:
+            logger.debug(f"Config file {self.file_path} changed on disk, reloading")
+            self._load()
+
+    def invalidate(self):
+        self._load()
+
     def get_value(self, value_name: str, default: Any = None) -> Any:
+        self._check_reload()
         return self._cache.get(value_name, default)
 
     def set_value(self, value_name: str, value: Any, value_type: int = None):
-        self._cache[value_name] = value
-        self._save()
+        with self._lock:
+            self._cache[value_name] = value
+            self._save()
 
     def get_secure_value(self, value_name: str) -> Optional[str]:
         # JSON is not secure for secrets unless encrypted, but for server-side
@@ -340,14 +557,16 @@ class JsonFileBackend(ConfigBackend):
 
     def delete_secure_value(self, value_name: str):
         key = f"SECURE_{value_name}"
-        if key in self._cache:
-            del self._cache[key]
-            self._save()
+        with self._lock:
+            if key in self._cache:
+                del self._cache[key]
+                self._save()
 
     def is_managed(self, key: str = None) -> bool:
         return False
 
     def export_all(self) -> Dict[str, Any]:
+        self._check_reload()
         return self._cache.copy()
 
     def get_value_with_source(self, value_name: str) -> Optional[Dict[str, Any]]:
@@ -523,8 +742,29 @@ _config_context: ContextVar[Optional[ConfigBackend]] = ContextVar("config_contex
 class SwitchCraftConfig:
     @staticmethod
     def set_backend(backend: ConfigBackend):
-        """Sets the backend for the current context (thread/task)."""
+        """Sets the backend for the current context (thread/task) and binds its UI language."""
         _config_context.set(backend)
+        SwitchCraftConfig._bind_language(backend)
+
+    @staticmethod
+    def _bind_language(backend: Optional[ConfigBackend], language: Optional[str] = None):
+        """Binds the backend's language for i18n lookups in the current context. Reads the store at most once per backend."""
+        if backend is None:
+            language = ""
+        elif language is None:
+            language = backend.ui_language
+        if language is None:
+            try:
+                language = backend.get_value("Language") or ""
+            except Exception:
+                language = ""
+        if backend is not None:
+            backend.ui_language = str(language)
+        try:
+            from switchcraft.utils.i18n import i18n
+            i18n.bind_language(str(language) or None)
+        except Exception as e:
+            logger.debug(f"Could not bind UI language: {e}")
 
     @staticmethod
     def _get_active_backend() -> ConfigBackend:
@@ -559,7 +799,10 @@ class SwitchCraftConfig:
 
     @classmethod
     def set_user_preference(cls, value_name: str, value: Any, value_type: int = None):
-        cls._get_active_backend().set_value(value_name, value, value_type)
+        backend = cls._get_active_backend()
+        backend.set_value(value_name, value, value_type)
+        if value_name == "Language":
+            cls._bind_language(backend, value or "")
 
     @classmethod
     def get_secure_value(cls, value_name: str) -> Optional[str]:
@@ -598,12 +841,19 @@ class SwitchCraftConfig:
         """Returns the value and its source (GPO, Registry, etc.)."""
         return cls._get_active_backend().get_value_with_source(value_name)
 
+    @classmethod
+    def invalidate_cache(cls):
+        """Forces the next reads to go to the backing store (registry, file, ...)."""
+        cls._get_active_backend().invalidate()
+
     @classmethod
     def import_preferences(cls, data: dict):
         # Import to current backend
         backend = cls._get_active_backend()
         for k, v in data.items():
             backend.set_value(k, v)
+        if "Language" in data:
+            cls._bind_language(backend, data["Language"] or "")
 
     @classmethod
     def delete_all_application_data(cls):
@@ -663,6 +913,8 @@ class SwitchCraftConfig:
                      except Exception as e:
                          logger.error(f"Failed to delete .switchcraft: {e}")
 
+        backend.invalidate()
+        backend.ui_language = None
         logger.info(f"Factory Reset Complete. Cleared: {', '.join(cleaned_up)}")
 
     # --- Helpers ---
@@ -1,9 +1,18 @@
 import locale
 import json
 import logging
+import string
+import sys
+from contextvars import ContextVar, Token
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Language bound to the current session/context (set via SwitchCraftConfig.set_backend).
+# None means "use the process-wide default language".
+_session_language: ContextVar[Optional[str]] = ContextVar("i18n_language", default=None)
+
 # Known parameter explanations (used in GUI for parameter list)
 KNOWN_PARAMS = {
     "/S": ("Silent mode", "Stiller Modus - Keine Benutzerinteraktion"),
@@ -84,11 +93,78 @@ KNOWN_PARAMS = {
 }
 
 
+@lru_cache(maxsize=1024)
+def _parse_format(template: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    """
+    Splits a format template into (literal, field name) pairs once.
+    Returns None for templates that need full str.format semantics (positional fields, specs, conversions).
+    """
+    parts = []
+    try:
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            if field is not None and (spec or conversion or not field.isidentifier()):
+                return None
+            parts.append((literal, field))
+    except ValueError:
+        return None
+    return tuple(parts)
+
+
+def _format(template: str, kwargs: dict) -> str:
+    parts = _parse_format(template)
+    if parts is None:
+        return template.format(**kwargs)
+    out = []
+    for literal, field in parts:
+        out.append(literal)
+        if field is not None:
+            out.append(format(kwargs[field]))
+    return "".join(out)
+
+
 class I18n:
     def __init__(self):
-        self.language = self._detect_language()
+        self._language = self._detect_language()
         self.translations = {}
+        self._catalogs: Dict[str, Dict[str, str]] = {}
         self._load_translations()
+        self._compile_catalogs()
+
+    @property
+    def language(self) -> str:
+        """Language of the current session, or the process-wide default."""
+        return _session_language.get() or self._language
+
+    @language.setter
+    def language(self, value: str):
+        self._language = value
+
+    def _compile_catalogs(self):
+        """
+        Flattens each language into one dict with the English fallbacks already merged in,
+        so a lookup is a single dict access. Keys are interned to match call-site literals.
+        """
+        english = {sys.intern(k): v for k, v in self.translations.get("en", {}).items()}
+        self._catalogs = {"en": english}
+        for lang_code, table in self.translations.items():
+            if lang_code == "en":
+                continue
+            catalog = dict(english)
+            catalog.update((sys.intern(k), v) for k, v in table.items() if v is not None)
+            self._catalogs[lang_code] = catalog
+
+    def bind_language(self, lang_code: Optional[str]) -> Token:
+        """
+        Binds a language to the current context (web session, callback thread) without
+        touching the process-wide default. Unknown codes and None unbind.
+        Returns a token for reset_language().
+        """
+        if lang_code not in self._catalogs:
+            lang_code = None
+        return _session_language.set(lang_code)
+
+    def reset_language(self, token: Token):
+        _session_language.reset(token)
 
     def _load_translations(self):
         """Load translations from JSON files in assets/lang."""
@@ -210,37 +286,23 @@ class I18n:
     def get(self, key, lang=None, default=None, **kwargs):
         """
         Get translated string.
-        Supports explicit language override 'lang'.
+        Supports explicit language override 'lang'; otherwise the session-bound language
+        (bind_language) or the process-wide default is used - no config reads per lookup.
         Supports format arguments explicitly passed as kwargs.
         """
-        # Try to get language from current config context (SessionStoreBackend)
-        try:
-            from switchcraft.utils.config import SwitchCraftConfig
-            ctx_lang = SwitchCraftConfig.get_value("Language")
-            if ctx_lang and ctx_lang != self.language and ctx_lang in self.translations:
-                 # Use the language from the current context (User Session)
-                 # This allows multi-user language support despite Singleton pattern
-                 lang = ctx_lang
-        except:
-            pass
-
-        target_lang = lang if lang else self.language
-
-        # Get dictionary for target language, fallback to EN
-        lang_dict = self.translations.get(target_lang, self.translations.get("en", {}))
-
-        # Get value, fallback to English value, then to default (if provided), else key
-        val = lang_dict.get(key)
-        if val is None:
-             val = self.translations.get("en", {}).get(key)
+        catalog = self._catalogs.get(lang or _session_language.get() or self._language)
+        if catalog is None:
+            catalog = self._catalogs.get("en", {})
 
+        # Value (with English fallback already merged in), then default (if provided), else key
+        val = catalog.get(key)
         if val is None:
             val = default if default is not None else key
 
         # Format if kwargs provided
         if kwargs and isinstance(val, str):
             try:
-                return val.format(**kwargs)
+                return _format(val, kwargs)
             except Exception as e:
                 logger.warning(f"Failed to format string '{key}': {e}")
                 return val
@@ -1,7 +1,12 @@
+import copy
+import gzip
+import json
 import logging
 import os
+import queue
 import sys
 import shutil
+import threading
 from pathlib import Path
 from datetime import datetime
 
@@ -11,27 +16,66 @@ logger = logging.getLogger(__name__)
 # Constants
 MAX_LOG_FILES = 7
 MAX_LOG_SIZE_BYTES = 10 * 1024 * 1024  # 10 MB
+# Records written per batch by the listener thread
+MAX_BATCH = 512
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class _FlushRequest:
+    """Queue marker; the listener sets the event once everything before it is on disk."""
+    def __init__(self):
+        self.done = threading.Event()
+
+_STOP = object()
 
 class SessionLogHandler(logging.Handler):
     """
-    Proxy handler that ensures all logs go to the current session's file handler.
+    Proxy handler that ensures all logs go to the current session's log file.
+
+    emit() only enqueues the record; a listener thread formats and writes records in
+    batches, tracks the file size with a running byte counter and rotates the file, so
+    callers (UI, analyzers, winget parser) never block on disk.
+
+    The file streams are owned by this handler rather than by a registered FileHandler:
+    logging.shutdown() would close such a handler before this one drains its queue and
+    the last records (typically the crash) would be lost.
     """
     def __init__(self):
         super().__init__()
-        self.file_handler = None
+        self.file_level = logging.DEBUG
         self.current_log_path = None
+        self._stream = None
+        self._file_formatter = logging.Formatter(LOG_FORMAT)
+        self.structured_log_path = None
+        self._structured_stream = None
+        self._bytes_written = 0
+        self._queue = queue.SimpleQueue()
+        self._listener = None
 
     def close(self):
-        """Ensures the internal file handler is closed when this handler is closed."""
-        if self.file_handler:
+        """Writes everything still queued, then closes the session files."""
+        self._stop_listener()
+        self._close_files()
+        super().close()
+
+    def _close_files(self):
+        if self._stream:
             try:
-                self.file_handler.close()
+                self._stream.close()
             except Exception:
                 pass
-        super().close()
+            self._stream = None
+        if self._structured_stream:
+            try:
+                self._structured_stream.close()
+            except Exception:
+                pass
+            self._structured_stream = None
 
-    def setup_file_logging(self, log_dir):
-        """Sets up the file handler for the current session."""
+    def setup_file_logging(self, log_dir, structured: bool = False):
+        """
+        Opens the log file for the current session.
+        structured: additionally write gzip-compressed JSON lines (one object per record).
+        """
         try:
             log_dir = Path(log_dir)
             log_dir.mkdir(parents=True, exist_ok=True)
@@ -42,69 +86,165 @@ class SessionLogHandler(logging.Handler):
             # Create new log file for this session
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"SwitchCraft_Session_{timestamp}.log"
-            self.current_log_path = log_dir / filename
 
-            # Close existing handler if it exists
-            if self.file_handler:
-                try:
-                    self.file_handler.close()
-                except Exception:
-                    pass
+            # Pending records still belong to the previous file
+            self._stop_listener()
+            self._close_files()
+            self.current_log_path = log_dir / filename
+            self.structured_log_path = log_dir / f"SwitchCraft_Session_{timestamp}.jsonl.gz" if structured else None
 
-            # Create FileHandler
-            self.file_handler = logging.FileHandler(self.current_log_path, encoding='utf-8')
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            self.file_handler.setFormatter(formatter)
-            # Set the file handler level to match the session handler level (default INFO)
-            self.file_handler.setLevel(self.level if self.level else logging.DEBUG)
+            self._open_files()
 
             # Write initial log entry to ensure file is created with content
-            self.file_handler.stream.write(f"# SwitchCraft Log Session Started: {datetime.now().isoformat()}\n")
-            self.file_handler.stream.flush()
+            header = f"# SwitchCraft Log Session Started: {datetime.now().isoformat()}\n"
+            self._stream.write(header)
+            self._stream.flush()
+            self._bytes_written = len(header.encode("utf-8"))
+
+            self._listener = threading.Thread(target=self._run_listener, name="SessionLogWriter", daemon=True)
+            self._listener.start()
 
         except Exception as e:
             print(f"Failed to setup file logging: {e}")
 
+    def _open_files(self):
+        self._stream = open(self.current_log_path, "a", encoding="utf-8")
+        if self.structured_log_path:
+            self._structured_stream = gzip.open(self.structured_log_path, "at", encoding="utf-8")
+
     def _cleanup_old_logs(self, log_dir):
         """Keeps only the latest MAX_LOG_FILES."""
         try:
-            # Keep only the newest MAX_LOG_FILES
-            files = sorted(log_dir.glob("SwitchCraft_Session_*.log"), key=os.path.getmtime, reverse=True)
-            existing_to_keep = MAX_LOG_FILES - 1
-            if len(files) > existing_to_keep:
-                 for f in files[existing_to_keep:]:
-                     try:
-                         f.unlink()
-                     except Exception:
-                         pass
+            for pattern in ("SwitchCraft_Session_*.log", "SwitchCraft_Session_*.jsonl.gz"):
+                # Keep only the newest MAX_LOG_FILES
+                files = sorted(log_dir.glob(pattern), key=os.path.getmtime, reverse=True)
+                existing_to_keep = MAX_LOG_FILES - 1
+                if len(files) > existing_to_keep:
+                     for f in files[existing_to_keep:]:
+                         try:
+                             f.unlink()
+                         except Exception:
+                             pass
 
         except Exception as e:
             # We use print here because logging might be broken or recursive
             print(f"Error cleaning old logs: {e}")
 
+    # --- Calling thread ---
+
     def emit(self, record):
-        if self.file_handler:
-            # Check size limit
-            try:
-                if self.current_log_path.stat().st_size > MAX_LOG_SIZE_BYTES:
-                     # Rotate: Rename to .bak (overwrite) and restart
-                     self.file_handler.close()
-                     self.file_handler = None
-
-                     bak = self.current_log_path.with_suffix(".log.bak")
-                     if bak.exists():
-                        bak.unlink()
-                     self.current_log_path.rename(bak)
-
-                     # Re-init
-                     self.file_handler = logging.FileHandler(self.current_log_path, encoding='utf-8')
-                     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-                     self.file_handler.setFormatter(formatter)
-                     self.file_handler.setLevel(self.level)
-            except Exception:
-                pass
+        if self._listener is None:
+            return
+        try:
+            # Like QueueHandler.prepare, but without formatting: resolve args now (they may be
+            # mutated later) and drop references the listener does not need. The record is
+            # shared with the other handlers, so only the copy is changed.
+            record = copy.copy(record)
+            if record.args:
+                record.msg = record.getMessage()
+                record.args = None
+            if record.exc_info:
+                if not record.exc_text:
+                    record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self._queue.put(record)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self, timeout: float = 5.0):
+        """Blocks until all records queued so far are written to disk."""
+        listener = self._listener
+        if listener is None or not listener.is_alive() or threading.current_thread() is listener:
+            return
+        request = _FlushRequest()
+        self._queue.put(request)
+        request.done.wait(timeout)
+
+    def _stop_listener(self):
+        listener = self._listener
+        if listener is None:
+            return
+        self._listener = None
+        if listener.is_alive() and threading.current_thread() is not listener:
+            self._queue.put(_STOP)
+            listener.join(timeout=5.0)
+
+    # --- Listener thread ---
+
+    def _run_listener(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
 
-            self.file_handler.emit(record)
+            records = [r for r in batch if isinstance(r, logging.LogRecord)]
+            if records:
+                try:
+                    self._write_batch(records)
+                except Exception as e:
+                    print(f"Failed to write log batch: {e}")
+
+            for item in batch:
+                if isinstance(item, _FlushRequest):
+                    item.done.set()
+            if any(item is _STOP for item in batch):
+                return
+
+    def _write_batch(self, records):
+        if self._stream is None:
+            return
+        records = [r for r in records if r.levelno >= self.file_level]
+        if records:
+            text = "".join(self._file_formatter.format(r) + "\n" for r in records)
+            self._stream.write(text)
+            self._stream.flush()
+            self._bytes_written += len(text.encode("utf-8"))
+
+        if self._structured_stream:
+            self._structured_stream.write("".join(self._to_json(r) for r in records))
+            self._structured_stream.flush()
+
+        if self._bytes_written > MAX_LOG_SIZE_BYTES:
+            self._rotate()
+
+    @staticmethod
+    def _to_json(record) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False) + "\n"
+
+    def _rotate(self):
+        """Rename to .bak (overwrite) and restart; runs on the listener thread only."""
+        try:
+            self._close_files()
+
+            bak = self.current_log_path.with_suffix(".log.bak")
+            if bak.exists():
+                bak.unlink()
+            self.current_log_path.rename(bak)
+            if self.structured_log_path and self.structured_log_path.exists():
+                s_bak = self.structured_log_path.with_name(self.structured_log_path.name + ".bak")
+                if s_bak.exists():
+                    s_bak.unlink()
+                self.structured_log_path.rename(s_bak)
+
+            # Re-init
+            self._open_files()
+        except Exception as e:
+            print(f"Log rotation failed: {e}")
+            if self._stream is None:
+                self._open_files()
+        self._bytes_written = 0
 
     def export_logs(self, target_path):
         """Exports the current session log file."""
@@ -112,8 +252,7 @@ class SessionLogHandler(logging.Handler):
             return False
 
         try:
-            if self.file_handler:
-                self.file_handler.flush()
+            self.flush()
             shutil.copy2(self.current_log_path, target_path)
             return True
         except Exception as e:
@@ -126,8 +265,7 @@ class SessionLogHandler(logging.Handler):
         root_logger.setLevel(level)
         # Also update our handlers
         self.setLevel(level)
-        if self.file_handler:
-            self.file_handler.setLevel(level)
+        self.file_level = level
         # Update all existing handlers to ensure they capture all levels
         for handler in root_logger.handlers:
             if hasattr(handler, 'setLevel'):
@@ -218,7 +356,12 @@ def setup_session_logging(root_logger=None):
     else:
         log_dir = Path.home() / ".switchcraft" / "logs"
 
-    handler.setup_file_logging(log_dir)
+    try:
+        from switchcraft.utils.config import SwitchCraftConfig
+        structured = bool(SwitchCraftConfig.get_value("StructuredLogging", False))
+    except Exception:
+        structured = False
+    handler.setup_file_logging(log_dir, structured=structured)
 
     if handler not in root_logger.handlers:
         root_logger.addHandler(handler)
@@ -0,0 +1,369 @@
+"""
+In-process metrics: counters, gauges and histograms with labels.
+
+Modules declare what they measure next to the code that produces it:
+
+    ANALYSIS_SECONDS = metrics.histogram("switchcraft_analysis_phase_seconds", "Analysis phase duration", ["phase"])
+
+    with ANALYSIS_SECONDS.time(phase="nested"):
+        ...
+
+The registry renders the Prometheus text format (server /metrics) and plain snapshots that
+can be published to the server's shared store, so the metrics of all server workers and
+analysis processes can be merged (/metrics, `switchcraft stats`).
+"""
+import math
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; covers bcrypt checks (~0.2s) up to multi-minute extractions and uploads
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+SNAPSHOT_NAMESPACE = "metrics"
+SNAPSHOT_TTL = 3600
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Dict]:
+        with self._lock:
+            return [{"labels": dict(zip(self.labelnames, k)), "value": v} for k, v in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                idx = i
+                break
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][idx] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def samples(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {"labels": dict(zip(self.labelnames, k)), "counts": list(v[0]), "sum": v[1], "count": v[2]}
+                for k, v in self._values.items()
+            ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str = "", labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """JSON-serializable state of all metrics that have samples."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snap = {}
+        for m in metrics:
+            samples = m.samples()
+            if samples:
+                snap[m.name] = {"type": m.kind, "help": m.help, "samples": samples}
+                if isinstance(m, Histogram):
+                    snap[m.name]["buckets"] = list(m.buckets)
+        return snap
+
+    def reset(self):
+        """Clears all recorded values (metrics stay registered)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for m in metrics:
+            with m._lock:
+                m._values.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, help: str = "", labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.counter(name, help, labelnames)
+
+
+def gauge(name: str, help: str = "", labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.gauge(name, help, labelnames)
+
+
+def histogram(name: str, help: str = "", labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.histogram(name, help, labelnames, buckets)
+
+
+def timed(name: str, help: str = "", **labels):
+    """Times a block into histogram `name` (created on first use with these label names)."""
+    return REGISTRY.histogram(name, help, sorted(labels)).time(**labels)
+
+
+# --- HTTP client ---
+
+HTTP_CLIENT_SECONDS = histogram(
+    "switchcraft_http_client_seconds", "Outgoing HTTP request duration", ["service", "host", "method", "status"]
+)
+
+
+def _host_label(url) -> str:
+    from urllib.parse import urlsplit
+    host = urlsplit(str(url)).hostname or "unknown"
+    # Upload targets are per storage account; keep the label set small
+    if host.endswith(".blob.core.windows.net"):
+        return "blob.core.windows.net"
+    return host
+
+
+class InstrumentedRequests:
+    """
+    Stand-in for the `requests` module that times get/post/put/patch/delete calls.
+    Everything else (exceptions, Session, ...) is passed through, so a service module can
+    rebind its `requests` name to one of these.
+    """
+
+    def __init__(self, module, service: str):
+        self._module = module
+        self._service = service
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def _call(self, method: str, url, *args, **kwargs):
+        started = time.perf_counter()
+        status = "error"
+        try:
+            resp = getattr(self._module, method)(url, *args, **kwargs)
+            code = getattr(resp, "status_code", None)
+            status = str(code) if isinstance(code, int) else "unknown"
+            return resp
+        finally:
+            HTTP_CLIENT_SECONDS.observe(
+                time.perf_counter() - started,
+                service=self._service, host=_host_label(url), method=method.upper(), status=status,
+            )
+
+    def get(self, url, *args, **kwargs):
+        return self._call("get", url, *args, **kwargs)
+
+    def post(self, url, *args, **kwargs):
+        return self._call("post", url, *args, **kwargs)
+
+    def put(self, url, *args, **kwargs):
+        return self._call("put", url, *args, **kwargs)
+
+    def patch(self, url, *args, **kwargs):
+        return self._call("patch", url, *args, **kwargs)
+
+    def delete(self, url, *args, **kwargs):
+        return self._call("delete", url, *args, **kwargs)
+
+
+# --- Snapshots ---
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """Sums samples with identical labels (counters, gauges and histogram buckets)."""
+    merged: Dict[str, Dict] = {}
+    for snap in snapshots:
+        for name, metric in snap.items():
+            target = merged.setdefault(name, {**metric, "samples": []})
+            index = {tuple(sorted(s["labels"].items())): s for s in target["samples"]}
+            for sample in metric["samples"]:
+                key = tuple(sorted(sample["labels"].items()))
+                existing = index.get(key)
+                if existing is None:
+                    copy = {**sample, "labels": dict(sample["labels"])}
+                    if "counts" in copy:
+                        copy["counts"] = list(copy["counts"])
+                    target["samples"].append(copy)
+                    index[key] = copy
+                elif "counts" in sample and len(existing["counts"]) == len(sample["counts"]):
+                    existing["counts"] = [a + b for a, b in zip(existing["counts"], sample["counts"])]
+                    existing["sum"] += sample["sum"]
+                    existing["count"] += sample["count"]
+                elif "value" in sample:
+                    existing["value"] += sample["value"]
+    return merged
+
+
+def process_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def publish(store, registry: MetricsRegistry = REGISTRY):
+    """Stores this process' snapshot in a SharedStore so other processes can merge it."""
+    store.set(SNAPSHOT_NAMESPACE, process_id(), registry.snapshot(), ttl=SNAPSHOT_TTL)
+
+
+def collect_published(store, registry: Optional[MetricsRegistry] = REGISTRY) -> Dict[str, Dict]:
+    """Merged snapshot of all published processes, with this process' live values replacing its published ones."""
+    snapshots = store.items(SNAPSHOT_NAMESPACE)
+    if registry is not None:
+        snapshots[process_id()] = registry.snapshot()
+    return merge_snapshots(snapshots.values())
+
+
+# --- Output ---
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')  # noqa: E731
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+def render_prometheus(snapshot: Dict[str, Dict]) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        if metric.get("help"):
+            lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for sample in metric["samples"]:
+            labels = sample["labels"]
+            if metric["type"] == "histogram":
+                cumulative = 0
+                for bound, count in zip(list(metric["buckets"]) + [math.inf], sample["counts"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels, ('le', _fmt(bound)))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_fmt(sample['sum'])}")
+                lines.append(f"{name}_count{_labels(labels)} {sample['count']}")
+            else:
+                lines.append(f"{name}{_labels(labels)} {_fmt(sample['value'])}")
+    return "\n".join(lines) + "\n"
+
+
+def quantile(buckets: Sequence[float], counts: Sequence[int], q: float) -> Optional[float]:
+    """Estimates a quantile from bucket counts (upper bound of the bucket that contains it)."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bound, count in zip(list(buckets) + [math.inf], counts):
+        seen += count
+        if seen >= rank:
+            return bound
+    return math.inf
+
+
+def summarize(snapshot: Dict[str, Dict]) -> List[Dict]:
+    """Flat rows for display: one per metric and label set."""
+    rows = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        for sample in metric["samples"]:
+            row = {"metric": name, "labels": ",".join(f"{k}={v}" for k, v in sorted(sample["labels"].items()))}
+            if metric["type"] == "histogram":
+                count = sample["count"]
+                row.update({
+                    "count": count,
+                    "total_s": round(sample["sum"], 3),
+                    "avg_s": round(sample["sum"] / count, 4) if count else None,
+                    "p50_s": quantile(metric["buckets"], sample["counts"], 0.5),
+                    "p95_s": quantile(metric["buckets"], sample["counts"], 0.95),
+                })
+            else:
+                row["value"] = sample["value"]
+            rows.append(row)
+    return rows
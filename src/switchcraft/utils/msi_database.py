@@ -0,0 +1,274 @@
+"""
+Pure-Python reader for Windows Installer (MSI) databases.
+
+MSI files are OLE compound documents. Each table is stored column-major in its own
+stream, strings live in a shared pool (_StringPool/_StringData) and the schema is
+described by the _Tables/_Columns system tables. This module decodes that layout on
+top of olefile, so full table access works on every platform (msilib is Windows-only
+and was removed in Python 3.13).
+
+Tables are materialized lazily: opening a database reads nothing but the directory,
+and only the tables you iterate are decoded.
+"""
+import logging
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import olefile
+
+logger = logging.getLogger(__name__)
+
+# Column type bits (msiquery.h)
+MSITYPE_VALID = 0x0100
+MSITYPE_LOCALIZABLE = 0x0200
+MSITYPE_STRING = 0x0800
+MSITYPE_NULLABLE = 0x1000
+MSITYPE_KEY = 0x2000
+MSITYPE_TEMPORARY = 0x4000
+
+_NAME_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz._"
+_TABLE_PREFIX = 0x4840
+
+# Hard-coded schema of _Columns, which describes every other table
+_COLUMNS_SCHEMA = [
+    ("Table", MSITYPE_VALID | MSITYPE_STRING | MSITYPE_KEY | 64),
+    ("Number", MSITYPE_VALID | MSITYPE_KEY | 2),
+    ("Name", MSITYPE_VALID | MSITYPE_STRING | 64),
+    ("Type", MSITYPE_VALID | 2),
+]
+
+
+class MsiDatabaseError(Exception):
+    """Raised when a file is not a readable MSI database."""
+
+
+def decode_stream_name(name: str) -> str:
+    """Decodes an MSI-compressed OLE stream name; table streams are prefixed with '!'."""
+    out = []
+    for ch in name:
+        c = ord(ch)
+        if c == _TABLE_PREFIX:
+            out.append("!")
+        elif 0x3800 <= c < 0x4800:
+            c -= 0x3800
+            out.append(_NAME_CHARSET[c & 0x3F])
+            out.append(_NAME_CHARSET[(c >> 6) & 0x3F])
+        elif 0x4800 <= c < 0x4840:
+            out.append(_NAME_CHARSET[c - 0x4800])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _codec_for(codepage: int) -> str:
+    if codepage in (0, 1200):
+        return "cp1252"
+    if codepage == 65001:
+        return "utf-8"
+    return f"cp{codepage}"
+
+
+@dataclass(frozen=True)
+class MsiColumn:
+    name: str
+    type: int
+
+    @property
+    def is_string(self) -> bool:
+        return bool(self.type & MSITYPE_STRING)
+
+    @property
+    def is_binary(self) -> bool:
+        return (self.type & ~MSITYPE_NULLABLE) == (MSITYPE_STRING | MSITYPE_VALID)
+
+    @property
+    def is_key(self) -> bool:
+        return bool(self.type & MSITYPE_KEY)
+
+    @property
+    def is_stored(self) -> bool:
+        return not self.type & MSITYPE_TEMPORARY
+
+    def width(self, strref_bytes: int) -> int:
+        if self.is_binary:
+            return 2
+        if self.is_string:
+            return strref_bytes
+        return 4 if (self.type & 0xFF) == 4 else 2
+
+
+class MsiDatabase:
+    """
+    Read-only view of an MSI database.
+
+    Usage:
+        with MsiDatabase(path) as db:
+            props = db.get_properties()
+            for row in db.iter_rows("File"):
+                ...
+    """
+
+    def __init__(self, source: Union[str, Path, "olefile.OleFileIO"]):
+        if isinstance(source, (str, Path)):
+            if not olefile.isOleFile(str(source)):
+                raise MsiDatabaseError(f"Not an OLE compound file: {source}")
+            self._ole = olefile.OleFileIO(str(source))
+            self._owns_ole = True
+        else:
+            self._ole = source
+            self._owns_ole = False
+
+        # decoded name -> raw OLE entry path
+        self._streams: Dict[str, List[str]] = {}
+        for entry in self._ole.listdir(streams=True, storages=False):
+            self._streams["/".join(decode_stream_name(part) for part in entry)] = entry
+
+        if "!_StringPool" not in self._streams or "!_StringData" not in self._streams:
+            self.close()
+            raise MsiDatabaseError("Missing string pool; not an MSI database")
+
+        self._strings: Optional[List[str]] = None
+        self._strref_bytes = 2
+        self._schema: Optional[Dict[str, List[MsiColumn]]] = None
+        self._cache: Dict[str, List[Dict[str, Any]]] = {}
+
+    def close(self):
+        if self._owns_ole and self._ole is not None:
+            self._ole.close()
+            self._ole = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Low level ---
+
+    def _read_stream(self, name: str) -> bytes:
+        entry = self._streams.get(name)
+        if entry is None:
+            return b""
+        with self._ole.openstream(entry) as stream:
+            return stream.read()
+
+    def _load_strings(self):
+        if self._strings is not None:
+            return
+        pool = self._read_stream("!_StringPool")
+        data = self._read_stream("!_StringData")
+        if len(pool) < 4:
+            raise MsiDatabaseError("Truncated string pool")
+
+        words = struct.unpack_from(f"<{len(pool) // 2}H", pool)
+        self._strref_bytes = 3 if words[1] & 0x8000 else 2
+        codec = _codec_for(words[0] | ((words[1] & 0x7FFF) << 16))
+
+        strings = [""]  # string id 0 is NULL
+        offset = 0
+        i = 1
+        count = len(words) // 2
+        while i < count:
+            length, refs = words[i * 2], words[i * 2 + 1]
+            if length == 0 and refs == 0:
+                strings.append("")
+                i += 1
+                continue
+            if length == 0:
+                # Strings over 64k: the length is stored in the following entry
+                if i + 1 >= count:
+                    break
+                length = (words[i * 2 + 3] << 16) | words[i * 2 + 2]
+                i += 2
+            else:
+                i += 1
+            strings.append(data[offset:offset + length].decode(codec, errors="replace"))
+            offset += length
+        self._strings = strings
+
+    def _string(self, ref: int) -> Optional[str]:
+        if not ref:
+            return None
+        return self._strings[ref] if ref < len(self._strings) else None
+
+    def _decode_table(self, name: str, columns: List[MsiColumn]) -> List[List[Any]]:
+        self._load_strings()
+        stored = [c for c in columns if c.is_stored]
+        raw = self._read_stream("!" + name)
+        row_size = sum(c.width(self._strref_bytes) for c in stored)
+        if not raw or not row_size:
+            return []
+        rows = len(raw) // row_size
+
+        values_by_column = []
+        offset = 0
+        for col in stored:
+            width = col.width(self._strref_bytes)
+            if width == 3:
+                block = raw[offset:offset + rows * 3]
+                values = [block[j] | (block[j + 1] << 8) | (block[j + 2] << 16) for j in range(0, rows * 3, 3)]
+            else:
+                values = struct.unpack_from(f"<{rows}{'I' if width == 4 else 'H'}", raw, offset)
+            offset += rows * width
+
+            if col.is_binary:
+                # Binary data lives in a separate stream named <Table>.<Key>
+                values = [None] * rows
+            elif col.is_string:
+                values = [self._string(v) for v in values]
+            else:
+                bias = 0x80000000 if width == 4 else 0x8000
+                values = [v - bias if v else None for v in values]
+            values_by_column.append(values)
+        return [list(row) for row in zip(*values_by_column)]
+
+    # --- Schema ---
+
+    def _load_schema(self):
+        if self._schema is not None:
+            return
+        columns = [MsiColumn(n, t) for n, t in _COLUMNS_SCHEMA]
+        schema: Dict[str, List] = {}
+        for table, number, col_name, col_type in self._decode_table("_Columns", columns):
+            if table and number is not None:
+                schema.setdefault(table, []).append((number, MsiColumn(col_name, col_type & 0xFFFF)))
+        self._schema = {t: [c for _, c in sorted(cols, key=lambda x: x[0])] for t, cols in schema.items()}
+
+    @property
+    def tables(self) -> List[str]:
+        self._load_schema()
+        return sorted(self._schema)
+
+    def columns(self, table: str) -> List[MsiColumn]:
+        self._load_schema()
+        if table not in self._schema:
+            raise KeyError(table)
+        return list(self._schema[table])
+
+    def has_table(self, table: str) -> bool:
+        self._load_schema()
+        return table in self._schema
+
+    # --- Rows ---
+
+    def iter_rows(self, table: str) -> Iterator[Dict[str, Any]]:
+        """Yields rows of `table` as {column: value} dicts (decoded on first access)."""
+        if table not in self._cache:
+            if not self.has_table(table):
+                return
+            cols = [c for c in self._schema[table] if c.is_stored]
+            names = [c.name for c in cols]
+            self._cache[table] = [dict(zip(names, row)) for row in self._decode_table(table, cols)]
+        yield from self._cache[table]
+
+    def table(self, table: str) -> List[Dict[str, Any]]:
+        return list(self.iter_rows(table))
+
+    def get_properties(self) -> Dict[str, str]:
+        return {row["Property"]: row["Value"] or "" for row in self.iter_rows("Property") if row.get("Property")}
+
+    def get_summary(self):
+        """OLE summary information (title, author, comments, template, ...)."""
+        return self._ole.get_metadata()
@@ -2,10 +2,15 @@ import subprocess
 import sys
 import os
 import logging
+from pathlib import PureWindowsPath
 from typing import List, Optional, Union
 
+from switchcraft.utils import metrics
+
 logger = logging.getLogger(__name__)
 
+SUBPROCESS_SECONDS = metrics.histogram("switchcraft_subprocess_seconds", "External command duration", ["tool"])
+
 class ShellUtils:
     """Utility for running system commands with cross-platform and environment awareness (Windows, Linux/Wine, Web)."""
 
@@ -83,8 +88,10 @@ class ShellUtils:
             kwargs["creationflags"] = creationflags
 
         # 5. Execute
+        program = cmd_list[1] if cmd_list[0] == "wine" and len(cmd_list) > 1 else cmd_list[0]
         try:
-            return subprocess.run(cmd_list, capture_output=capture_output, text=text, timeout=timeout, **kwargs)
+            with SUBPROCESS_SECONDS.time(tool=PureWindowsPath(program).stem.lower()):
+                return subprocess.run(cmd_list, capture_output=capture_output, text=text, timeout=timeout, **kwargs)
         except subprocess.TimeoutExpired as e:
             logger.error(f"Command timed out: {cmd_list}")
             raise e
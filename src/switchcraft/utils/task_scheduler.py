@@ -0,0 +1,286 @@
+"""
+Shared, bounded scheduler for GUI background work.
+
+Views used to start a fresh daemon thread per click/search/icon. Work now goes to one of
+three bounded pools instead:
+
+    interactive - user-triggered actions the user is waiting on (search, load, save)
+    background  - housekeeping that may queue behind everything else (scans, prefetch)
+    io          - small network/disk fetches (icons, logos)
+
+Tasks can carry a key: submitting a new task with the same owner and key cancels the
+previous one (an older search query is dropped before it starts, or its token is flagged
+so it can stop early and must not touch the UI). Per-view counters are kept for metrics.
+"""
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+POOL_INTERACTIVE = "interactive"
+POOL_BACKGROUND = "background"
+POOL_IO = "io"
+
+DEFAULT_POOL_SIZES = {
+    POOL_INTERACTIVE: 4,
+    POOL_BACKGROUND: 2,
+    POOL_IO: 4,
+}
+
+
+class TaskCancelled(Exception):
+    """Raised by CancelToken.raise_if_cancelled() inside a superseded or cancelled task."""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise TaskCancelled()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleeps up to timeout; returns True early if the task was cancelled."""
+        return self._event.wait(timeout)
+
+
+# Token that is never cancelled, returned by current_token() outside scheduled tasks
+_NEVER_CANCELLED = CancelToken()
+_current_token: contextvars.ContextVar[CancelToken] = contextvars.ContextVar("task_token", default=_NEVER_CANCELLED)
+
+
+def current_token() -> CancelToken:
+    """Cancellation token of the task running in this thread (a never-cancelled token elsewhere)."""
+    return _current_token.get()
+
+
+def join_or_cancel(thread: threading.Thread, timeout: float, poll: float = 0.2) -> bool:
+    """
+    Waits up to timeout for thread while polling the current task's token.
+
+    Returns False as soon as the task is cancelled; the thread is left to finish on its own
+    and its result must be discarded. Returns True once the thread ended or timed out.
+    """
+    token = current_token()
+    for _ in range(max(1, int(timeout / poll))):
+        if token.cancelled:
+            return False
+        thread.join(poll)
+        if not thread.is_alive():
+            break
+    return not token.cancelled
+
+
+@dataclass
+class TaskHandle:
+    name: str
+    pool: str
+    owner_label: str
+    key: Optional[str] = None
+    token: CancelToken = field(default_factory=CancelToken)
+    future: Optional[Future] = None
+
+    def cancel(self):
+        """Flags the token and drops the task if it has not started yet."""
+        self.token.cancel()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return self.future.result(timeout)
+
+
+@dataclass
+class _Counters:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    superseded: int = 0
+    running: int = 0
+    busy_seconds: float = 0.0
+
+    def to_dict(self, queued: int) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "superseded": self.superseded,
+            "running": self.running,
+            "queued": queued,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+class TaskScheduler:
+    """
+    Usage:
+        scheduler = get_scheduler()
+        scheduler.submit(self._search, query, owner=self, key="search")
+
+        def _search(query):
+            results = winget.search_packages(query)
+            if current_token().cancelled:
+                return  # a newer search replaced this one
+            ...
+    """
+
+    def __init__(self, pool_sizes: Optional[Dict[str, int]] = None):
+        self._pool_sizes = dict(DEFAULT_POOL_SIZES)
+        if pool_sizes:
+            self._pool_sizes.update(pool_sizes)
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+        # (id(owner), key) -> handle of the latest task for that key
+        self._keyed: Dict[Tuple[int, str], TaskHandle] = {}
+        # id(owner) -> live handles (queued or running)
+        self._by_owner: Dict[int, Dict[int, TaskHandle]] = {}
+        self._counters: Dict[str, _Counters] = {}
+        self._shutdown = False
+
+    def _pool(self, name: str) -> ThreadPoolExecutor:
+        pool = self._pools.get(name)
+        if pool is None:
+            if name not in self._pool_sizes:
+                raise ValueError(f"Unknown task pool: {name}")
+            pool = ThreadPoolExecutor(max_workers=self._pool_sizes[name], thread_name_prefix=f"sc-{name}")
+            self._pools[name] = pool
+        return pool
+
+    def submit(self, target: Callable, *args, owner: Any = None, key: Optional[str] = None,
+               pool: str = POOL_INTERACTIVE, **kwargs) -> TaskHandle:
+        """
+        Queues target(*args, **kwargs) on the given pool.
+
+        With a key, an earlier task of the same owner and key is superseded: dropped if it is
+        still queued, otherwise its token is cancelled. The caller's context (config backend,
+        bound language) is carried over to the worker thread.
+        """
+        owner_label = type(owner).__name__ if owner is not None else "global"
+        owner_id = id(owner)
+        handle = TaskHandle(name=getattr(target, "__name__", repr(target)), pool=pool, owner_label=owner_label, key=key)
+        ctx = contextvars.copy_context()
+
+        previous = None
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Task scheduler is shut down")
+            counters = self._counters.setdefault(owner_label, _Counters())
+            counters.submitted += 1
+            if key is not None:
+                previous = self._keyed.get((owner_id, key))
+                if previous is not None and not previous.done():
+                    counters.superseded += 1
+                self._keyed[(owner_id, key)] = handle
+            self._by_owner.setdefault(owner_id, {})[id(handle)] = handle
+            handle.future = self._pool(pool).submit(ctx.run, self._run, handle, target, args, kwargs)
+        # Outside the lock: cancelling a queued future and registering the callback
+        # on a finished one both run _on_done inline
+        if previous is not None:
+            previous.cancel()
+        handle.future.add_done_callback(lambda f: self._on_done(handle, owner_id))
+        return handle
+
+    def _run(self, handle: TaskHandle, target: Callable, args, kwargs):
+        counters = self._counters[handle.owner_label]
+        if handle.token.cancelled:
+            return None
+        with self._lock:
+            counters.running += 1
+        _current_token.set(handle.token)
+        started = time.perf_counter()
+        try:
+            return target(*args, **kwargs)
+        except TaskCancelled:
+            return None
+        except Exception as e:
+            logger.error(f"Error in background task '{handle.name}' ({handle.owner_label}): {e}", exc_info=True)
+            raise
+        finally:
+            with self._lock:
+                counters.running -= 1
+                counters.busy_seconds += time.perf_counter() - started
+
+    def _on_done(self, handle: TaskHandle, owner_id: int):
+        with self._lock:
+            counters = self._counters[handle.owner_label]
+            future = handle.future
+            if future.cancelled() or handle.token.cancelled:
+                counters.cancelled += 1
+            elif future.exception() is not None:
+                counters.failed += 1
+            else:
+                counters.completed += 1
+            live = self._by_owner.get(owner_id)
+            if live is not None:
+                live.pop(id(handle), None)
+                if not live:
+                    del self._by_owner[owner_id]
+            if handle.key is not None and self._keyed.get((owner_id, handle.key)) is handle:
+                del self._keyed[(owner_id, handle.key)]
+
+    def cancel(self, owner: Any, key: Optional[str] = None) -> int:
+        """Cancels the owner's task for key, or all of the owner's tasks. Returns how many were cancelled."""
+        with self._lock:
+            if key is not None:
+                handle = self._keyed.get((id(owner), key))
+                handles = [handle] if handle is not None else []
+            else:
+                handles = list(self._by_owner.get(id(owner), {}).values())
+        for handle in handles:
+            handle.cancel()
+        return len(handles)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-view counters: submitted, completed, failed, cancelled, superseded, running, queued, busy_seconds."""
+        with self._lock:
+            queued: Dict[str, int] = {}
+            for live in self._by_owner.values():
+                for handle in live.values():
+                    if handle.future is not None and not handle.future.running() and not handle.future.done():
+                        queued[handle.owner_label] = queued.get(handle.owner_label, 0) + 1
+            return {label: c.to_dict(queued.get(label, 0)) for label, c in self._counters.items()}
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            self._shutdown = True
+            pools = list(self._pools.values())
+            handles = [h for live in self._by_owner.values() for h in live.values()]
+        for handle in handles:
+            handle.cancel()
+        for pool in pools:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_scheduler_instance: Optional[TaskScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> TaskScheduler:
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        with _scheduler_lock:
+            if _scheduler_instance is None:
+                _scheduler_instance = TaskScheduler()
+    return _scheduler_instance
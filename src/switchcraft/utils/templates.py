@@ -1,10 +1,123 @@
 import re
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Enterprise template: (pattern, context key, default). Group 2 of each pattern is the value
+# that gets replaced by the context; patterns run in order (the Publisher pattern relies on
+# the NameFilter value already being a slot).
+_ENTERPRISE_SLOTS = [
+    # $Installer = Join-Path -Path $PSScriptRoot -ChildPath "Setup.exe"
+    (re.compile(r'(\$Installer\s*=\s*Join-Path\s*-Path\s*\$PSScriptRoot\s*-ChildPath\s*")(.+?)(")'), "INSTALLER_FILE", ""),
+    # $Arguments = "..."
+    (re.compile(r'(\$Arguments\s*=\s*")(.+?)(")'), "INSTALL_ARGS", ""),
+    # Inline -ArgumentList "..." just in case
+    (re.compile(r'(Start-Process-Function\s*-FilePath\s*\$Installer\s*-ArgumentList\s*")(.+?)(")'), "INSTALL_ARGS", ""),
+    # Uninstall-SoftwareByFilter -NameFilter "MySoftware" -Publisher "MyPublisher"
+    (re.compile(r'(Uninstall-SoftwareByFilter\s*-NameFilter\s*")(.+?)(")'), "APP_NAME", "MySoftware"),
+    (re.compile(r'(Uninstall-SoftwareByFilter\s*-NameFilter\s*".+?"\s*-Publisher\s*")(.+?)(")'), "PUBLISHER", "MyPublisher"),
+]
+# Marks enterprise slots during compilation; NUL never appears in a PowerShell script
+_SLOT_MARK = "\x00"
+_TOKEN_RE = re.compile(r'\x00(\d+)\x00|\{\{([^{}]+?)\}\}')
+
+# (key, default) for enterprise slots; default None means "keep the {{KEY}} text if missing"
+Slot = Tuple[str, Optional[str]]
+
+
+class CompiledTemplate:
+    """
+    A template parsed once into literal segments and placeholder slots.
+
+    Rendering is a single join over the segment list, so the cost no longer grows
+    with the number of context keys and no regex runs per script.
+    """
+
+    def __init__(self, text: str):
+        self.is_enterprise = "Start-Process-Function" in text and "Uninstall-SoftwareByFilter" in text
+        enterprise: List[Slot] = []
+        if self.is_enterprise:
+            for pattern, key, default in _ENTERPRISE_SLOTS:
+                def mark(m, key=key, default=default):
+                    enterprise.append((key, default))
+                    return f"{m.group(1)}{_SLOT_MARK}{len(enterprise) - 1}{_SLOT_MARK}{m.group(3)}"
+                text = pattern.sub(mark, text)
+
+        self.segments: List[Union[str, Slot]] = []
+        pos = 0
+        for m in _TOKEN_RE.finditer(text):
+            if m.start() > pos:
+                self.segments.append(text[pos:m.start()])
+            if m.group(1) is not None:
+                self.segments.append(enterprise[int(m.group(1))])
+            else:
+                self.segments.append((m.group(2), None))
+            pos = m.end()
+        if pos < len(text):
+            self.segments.append(text[pos:])
+
+    @property
+    def placeholders(self) -> List[str]:
+        return sorted({s[0] for s in self.segments if isinstance(s, tuple)})
+
+    def render(self, context: Dict[str, str]) -> str:
+        out = []
+        for seg in self.segments:
+            if isinstance(seg, str):
+                out.append(seg)
+                continue
+            key, default = seg
+            value = context.get(key)
+            if value is None:
+                out.append(f"{{{{{key}}}}}" if default is None else default)
+            else:
+                out.append(str(value))
+        return "".join(out)
+
+
+@lru_cache(maxsize=32)
+def compile_template(text: str) -> CompiledTemplate:
+    """Compiles template text; identical text is only parsed once."""
+    compiled = CompiledTemplate(text)
+    if compiled.is_enterprise:
+        logger.info("Detected Enterprise Intune Template structure.")
+    return compiled
+
+
+# path -> (mtime_ns, size, compiled)
+_file_cache: Dict[str, Tuple[int, int, CompiledTemplate]] = {}
+_file_cache_lock = threading.Lock()
+
+
+def load_template(path: Path) -> Optional[CompiledTemplate]:
+    """
+    Returns the compiled template at `path`, re-reading the file only when its
+    mtime or size changed. Returns None for missing or empty templates.
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    key = str(path.resolve())
+    with _file_cache_lock:
+        cached = _file_cache.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+
+    text = path.read_text(encoding="utf-8")
+    if not text.strip():
+        return None
+    compiled = compile_template(text)
+    with _file_cache_lock:
+        _file_cache[key] = (st.st_mtime_ns, st.st_size, compiled)
+    return compiled
+
+
 class TemplateGenerator:
     """Generates PowerShell scripts from templates."""
 
@@ -37,6 +150,60 @@ class TemplateGenerator:
         self.template_path = self.DEFAULT_TEMPLATE_PATH
         self.is_custom = False
 
+    def compile(self) -> Optional[CompiledTemplate]:
+        """Returns the compiled template, falling back to the internal default for missing/empty templates."""
+        if self.template_content:
+            compiled = compile_template(self.template_content) if self.template_content.strip() else None
+        elif self.template_path.exists():
+            compiled = load_template(self.template_path)
+        else:
+            logger.error(f"Template not found: {self.template_path}")
+            compiled = None
+
+        # Safety fallback for empty content
+        if compiled is None:
+            logger.warning("Empty template content detected. Falling back to internal default.")
+            compiled = load_template(self.DEFAULT_TEMPLATE_PATH)
+            if compiled is None:
+                logger.error(f"Default template missing at {self.DEFAULT_TEMPLATE_PATH}")
+        return compiled
+
+    @staticmethod
+    def _base_context() -> Dict[str, str]:
+        """Global values shared by every script of a run (version, company, user)."""
+        from switchcraft import __version__
+        from switchcraft.utils.config import SwitchCraftConfig
+        import os
+
+        return {
+            "SWITCHCRAFT_VERSION": __version__,
+            "SWITCHCRAFT_GITHUB": "https://github.com/FaserF/SwitchCraft",
+            "COMPANY_NAME": SwitchCraftConfig.get_company_name() or "",
+            "USER": os.environ.get("USERNAME", "System"),
+        }
+
+    @staticmethod
+    def _apply_base(context: Dict[str, str], base: Dict[str, str]) -> Dict[str, str]:
+        for key, value in base.items():
+            if key not in context:
+                context[key] = value
+
+        # Conditional Header
+        user = context["USER"]
+        company = context["COMPANY_NAME"]
+        if company and company != "Unknown Company":
+            context["HEADER_CREATED_BY"] = f'Created by "{user}" company "{company}" with SwitchCraft automatically.'
+        else:
+            context["HEADER_CREATED_BY"] = f'Created by "{user}" with SwitchCraft automatically.'
+        return context
+
+    def render(self, context: Dict[str, str]) -> Optional[str]:
+        """Renders the script for `context` without writing it. Returns None if no template is available."""
+        compiled = self.compile()
+        if compiled is None:
+            return None
+        return compiled.render(self._apply_base(context, self._base_context()))
+
     def generate(self, context: Dict[str, str], output_path: str) -> bool:
         """
         Generates the script.
@@ -47,101 +214,9 @@ class TemplateGenerator:
         - PUBLISHER (Company Name)
         """
         try:
-            if self.template_content:
-                content = self.template_content
-            elif self.template_path.exists():
-                content = self.template_path.read_text(encoding="utf-8")
-            else:
-                logger.error(f"Template not found: {self.template_path}")
-                content = "" # trigger fallback
-
-            # Safety fallback for empty content
-            if not content or not content.strip():
-                logger.warning("Empty template content detected. Falling back to internal default.")
-                if self.DEFAULT_TEMPLATE_PATH.exists():
-                     content = self.DEFAULT_TEMPLATE_PATH.read_text(encoding="utf-8")
-                else:
-                     logger.error(f"Default template missing at {self.DEFAULT_TEMPLATE_PATH}")
-                     return False
-
-            # Add global SwitchCraft metadata
-            from switchcraft import __version__
-            if "SWITCHCRAFT_VERSION" not in context:
-                 context["SWITCHCRAFT_VERSION"] = __version__
-            if "SWITCHCRAFT_GITHUB" not in context:
-                 context["SWITCHCRAFT_GITHUB"] = "https://github.com/FaserF/SwitchCraft"
-
-            # --- New Context Variables ---
-            from switchcraft.utils.config import SwitchCraftConfig
-            import os
-
-            if "COMPANY_NAME" not in context:
-                context["COMPANY_NAME"] = SwitchCraftConfig.get_company_name() or ""
-
-            if "USER" not in context:
-                context["USER"] = os.environ.get("USERNAME", "System")
-
-            # Conditional Header
-            user = context["USER"]
-            company = context["COMPANY_NAME"]
-            if company and company != "Unknown Company":
-                context["HEADER_CREATED_BY"] = f'Created by "{user}" company "{company}" with SwitchCraft automatically.'
-            else:
-                 context["HEADER_CREATED_BY"] = f'Created by "{user}" with SwitchCraft automatically.'
-
-            # 1. Enterprise Template Specific Logic (Regex Replacement)
-            # Detect if it's the specific enterprise template by looking for unique function names
-            # User requested anonymization of company name "PARI"
-            is_enterprise_template = "Start-Process-Function" in content and "Uninstall-SoftwareByFilter" in content
-
-            if is_enterprise_template:
-                logger.info("Detected Enterprise Intune Template structure.")
-
-                # Replace Installer Path
-                # Pattern: $Installer = Join-Path -Path $PSScriptRoot -ChildPath "Setup.exe"
-                content = re.sub(
-                    r'(\$Installer\s*=\s*Join-Path\s*-Path\s*\$PSScriptRoot\s*-ChildPath\s*")(.+?)(")',
-                    f'\\1{context.get("INSTALLER_FILE")}\\3',
-                    content
-                )
-
-                # Replace Install Args
-                # Check for $Arguments = "..." style
-                content = re.sub(
-                    r'(\$Arguments\s*=\s*")(.+?)(")',
-                    f'\\1{context.get("INSTALL_ARGS")}\\3',
-                    content
-                )
-
-                # Also check for inline -ArgumentList "..." just in case
-                content = re.sub(
-                    r'(Start-Process-Function\s*-FilePath\s*\$Installer\s*-ArgumentList\s*")(.+?)(")',
-                    f'\\1{context.get("INSTALL_ARGS")}\\3',
-                    content
-                )
-
-                # Replace Uninstall Logic if possible
-                # The template has: Uninstall-SoftwareByFilter -NameFilter "MySoftware" -Publisher "MyPublisher"
-                app_name = context.get("APP_NAME", "MySoftware")
-                publisher = context.get("PUBLISHER", "MyPublisher")
-
-                content = re.sub(
-                    r'(Uninstall-SoftwareByFilter\s*-NameFilter\s*")(.+?)(")',
-                    f'\\1{app_name}\\3',
-                    content
-                )
-
-                content = re.sub(
-                    r'(Uninstall-SoftwareByFilter\s*-NameFilter\s*".+?"\s*-Publisher\s*")(.+?)(")',
-                    f'\\1{publisher}\\3',
-                    content
-                )
-
-            # 2. Generic Placeholder Replacement (Always try this too)
-            for key, value in context.items():
-                placeholder = f"{{{{{key}}}}}" # {{KEY}}
-                if placeholder in content:
-                    content = content.replace(placeholder, str(value))
+            content = self.render(context)
+            if content is None:
+                return False
 
             # Write output
             Path(output_path).write_text(content, encoding="utf-8")
@@ -150,3 +225,43 @@ class TemplateGenerator:
         except Exception as e:
             logger.error(f"Failed to generate template: {e}")
             return False
+
+    def generate_many(self, jobs: Iterable[Tuple[Dict[str, str], str]], max_workers: int = 0) -> List[bool]:
+        """
+        Generates many scripts from one compiled template, e.g. to regenerate a whole
+        catalog after the corporate template changed.
+
+        jobs: (context, output_path) pairs.
+        max_workers: > 1 renders and writes from a thread pool. The template is
+                     compiled and the company name read once, before any job runs.
+        Returns one success flag per job, in input order.
+        """
+        jobs = list(jobs)
+        try:
+            compiled = self.compile()
+            base = self._base_context()
+        except Exception as e:
+            logger.error(f"Failed to prepare template: {e}")
+            return [False] * len(jobs)
+        if compiled is None:
+            return [False] * len(jobs)
+
+        def write(job) -> bool:
+            context, output_path = job
+            try:
+                content = compiled.render(self._apply_base(dict(context), base))
+                Path(output_path).write_text(content, encoding="utf-8")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to generate {output_path}: {e}")
+                return False
+
+        if max_workers and max_workers > 1 and len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(write, jobs))
+        else:
+            results = [write(job) for job in jobs]
+
+        failed = results.count(False)
+        logger.info(f"Generated {len(jobs) - failed}/{len(jobs)} scripts from {self.template_path.name}")
+        return results
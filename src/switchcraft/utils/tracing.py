@@ -0,0 +1,227 @@
+"""
+Span-based tracing of the analysis pipeline.
+
+The controller opens a trace per analysis; everything it calls (analyzers, the advanced
+addon's probes and 7-Zip runs, community lookup, Winget backends) just wraps its work in
+span():
+
+    with tracing.start_trace("AnalysisController.analyze_file", file=path.name) as trace:
+        with tracing.span("analyzer.analyze", analyzer="ExeAnalyzer"):
+            ...
+    result.trace = trace.to_otlp()
+
+Spans nest through a context variable, so nothing has to be passed down; outside a trace
+span() does nothing. Traces export in the OTLP/JSON layout (resourceSpans -> scopeSpans ->
+spans), which OpenTelemetry tooling can import, and timeline() flattens one for display.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+SERVICE_NAME = "switchcraft"
+SCOPE_NAME = "switchcraft.analysis"
+# Brute force on a wrapper with many nested installers can produce hundreds of spans
+MAX_SPANS = 2000
+
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+SPAN_KIND_INTERNAL = 1
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("switchcraft_trace", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("switchcraft_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "message")
+
+    def __init__(self, name: str, span_id: str, parent_id: Optional[str], start_ns: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.message = ""
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_otlp(self, trace_id: str) -> Dict:
+        data = {
+            "traceId": trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            # OTLP/JSON encodes 64-bit integers as strings
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns if self.end_ns is not None else self.start_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": {"code": self.status},
+        }
+        if self.message:
+            data["status"]["message"] = self.message
+        return data
+
+
+class Trace:
+    """Collects the spans of one operation. Thread-safe; spans started in other threads need copy_context()."""
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        # Wall clock for the export, monotonic clock for durations
+        self._offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def now_ns(self) -> int:
+        return self._offset_ns + time.perf_counter_ns()
+
+    def _add(self, name: str, parent: Optional[Span], attributes: Dict[str, Any]) -> Optional[Span]:
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS:
+                self.dropped += 1
+                return None
+            span = Span(name, os.urandom(8).hex(), parent.span_id if parent else None, self.now_ns(), attributes)
+            self.spans.append(span)
+            return span
+
+    def to_otlp(self) -> Dict:
+        with self._lock:
+            spans = [s.to_otlp(self.trace_id) for s in self.spans]
+        if self.dropped and spans:
+            spans[0]["attributes"].append(_attribute("switchcraft.dropped_spans", self.dropped))
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": spans}],
+            }]
+        }
+
+
+def _attribute(key: str, value: Any) -> Dict:
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def _attribute_value(value: Dict) -> Any:
+    if "intValue" in value:
+        return int(value["intValue"])
+    for kind in ("boolValue", "doubleValue", "stringValue"):
+        if kind in value:
+            return value[kind]
+    return None
+
+
+@contextmanager
+def start_trace(name: str, **attributes):
+    """Opens a new trace with a root span; nested start_trace() calls join the outer trace instead."""
+    if _current_trace.get() is not None:
+        with span(name, **attributes):
+            yield _current_trace.get()
+        return
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        with span(name, **attributes):
+            yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Times the block as a child of the current span. Yields the Span, or None outside a trace."""
+    trace = _current_trace.get()
+    current = trace._add(name, _current_span.get(), attributes) if trace is not None else None
+    if current is None:
+        yield None
+        return
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = STATUS_ERROR
+        current.message = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = trace.now_ns()
+        _current_span.reset(token)
+
+
+def annotate(**attributes):
+    """Adds attributes to the current span (no-op outside a trace)."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def timeline(otlp: Optional[Dict]) -> List[Dict]:
+    """
+    Flattens an exported trace into rows in call order (depth-first):
+    name, depth, start_ms (relative to the trace start), duration_ms, attributes, error.
+    """
+    spans = [s for rs in (otlp or {}).get("resourceSpans", [])
+             for ss in rs.get("scopeSpans", []) for s in ss.get("spans", [])]
+    if not spans:
+        return []
+    origin = min(int(s["startTimeUnixNano"]) for s in spans)
+    ids = {s["spanId"] for s in spans}
+    children: Dict[str, List[Dict]] = {}
+    for s in spans:
+        parent = s.get("parentSpanId") if s.get("parentSpanId") in ids else ""
+        children.setdefault(parent, []).append(s)
+
+    rows = []
+
+    def visit(parent_id: str, depth: int):
+        for s in sorted(children.get(parent_id, []), key=lambda x: int(x["startTimeUnixNano"])):
+            start = int(s["startTimeUnixNano"])
+            status = s.get("status") or {}
+            rows.append({
+                "name": s["name"],
+                "depth": depth,
+                "start_ms": (start - origin) / 1e6,
+                "duration_ms": (int(s["endTimeUnixNano"]) - start) / 1e6,
+                "attributes": {a["key"]: _attribute_value(a["value"]) for a in s.get("attributes", [])},
+                "error": status.get("message") if status.get("code") == STATUS_ERROR else None,
+            })
+            visit(s["spanId"], depth + 1)
+
+    visit("", 0)
+    return rows
+
+
+def summarize(otlp: Optional[Dict], top: int = 5) -> Optional[Dict]:
+    """
+    Compact form of an exported trace for history entries: trace id, total duration, span and
+    error counts, the duration of each top-level step and the slowest spans below them.
+    """
+    rows = timeline(otlp)
+    if not rows:
+        return None
+    steps: Dict[str, float] = {}
+    for r in rows:
+        if r["depth"] == 1:
+            steps[r["name"]] = round(steps.get(r["name"], 0.0) + r["duration_ms"], 3)
+    slowest = sorted((r for r in rows if r["depth"] > 1), key=lambda r: r["duration_ms"], reverse=True)[:top]
+    return {
+        "trace_id": otlp["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"],
+        "name": rows[0]["name"],
+        "duration_ms": round(rows[0]["duration_ms"], 3),
+        "spans": len(rows),
+        "errors": sum(1 for r in rows if r["error"]),
+        "steps": steps,
+        "slowest": [{"name": r["name"], "duration_ms": round(r["duration_ms"], 3)} for r in slowest],
+    }
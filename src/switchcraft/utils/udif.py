@@ -0,0 +1,434 @@
+"""
+Range-reading parser for Apple disk images (UDIF .dmg) with HFS+ volumes.
+
+A UDIF image ends with a 512-byte 'koly' trailer that points at an XML plist. Its
+'blkx' entries map every partition onto chunks of the data fork, each stored raw,
+zero-filled or compressed. UdifImage exposes the decoded disk as random-access reads
+and only inflates the chunks a read touches, so walking the HFS+ catalog to find
+*.app/Contents/Info.plist reads a few megabytes even from multi-gigabyte images.
+
+Chunk codecs are pluggable (register_codec); zlib, bzip2, xz/lzma and ADC are built in,
+LZFSE is used when the optional 'lzfse' module is installed. APFS volumes are detected
+but not parsed (callers fall back to other tools).
+"""
+import bisect
+import bz2
+import io
+import logging
+import lzma
+import plistlib
+import struct
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+SECTOR_SIZE = 512
+KOLY_MAGIC = b"koly"
+
+# blkx chunk entry types
+CHUNK_ZERO = 0x00000000
+CHUNK_RAW = 0x00000001
+CHUNK_IGNORE = 0x00000002
+CHUNK_ADC = 0x80000004
+CHUNK_ZLIB = 0x80000005
+CHUNK_BZIP2 = 0x80000006
+CHUNK_LZFSE = 0x80000007
+CHUNK_LZMA = 0x80000008
+CHUNK_COMMENT = 0x7FFFFFFE
+CHUNK_END = 0xFFFFFFFF
+
+_KOLY = struct.Struct(">4sIII QQQQQ II16s II128s QQ")
+_MISH_HEADER = struct.Struct(">4sIQQQII24s136sI")
+_MISH_CHUNK = struct.Struct(">IIQQQQ")
+
+
+class UdifError(Exception):
+    """Raised for images that are not UDIF or use unsupported features."""
+
+
+def _adc_decompress(data: bytes, size: int) -> bytes:
+    """Apple Data Compression (UDCO), a small LZ77 variant."""
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n and len(out) < size:
+        b = data[i]
+        if b & 0x80:
+            count = (b & 0x7F) + 1
+            out += data[i + 1:i + 1 + count]
+            i += 1 + count
+            continue
+        if b & 0x40:
+            count = (b & 0x3F) + 4
+            offset = (data[i + 1] << 8) | data[i + 2]
+            i += 3
+        else:
+            count = ((b & 0x3C) >> 2) + 3
+            offset = ((b & 0x03) << 8) | data[i + 1]
+            i += 2
+        start = len(out) - offset - 1
+        if start < 0:
+            raise UdifError("Corrupt ADC stream")
+        for k in range(count):
+            out.append(out[start + k])
+    return bytes(out)
+
+
+CODECS: Dict[int, Callable[[bytes, int], bytes]] = {
+    CHUNK_ZLIB: lambda data, size: zlib.decompress(data),
+    CHUNK_BZIP2: lambda data, size: bz2.decompress(data),
+    CHUNK_LZMA: lambda data, size: lzma.decompress(data),
+    CHUNK_ADC: _adc_decompress,
+}
+
+try:
+    import lzfse  # optional (pyliblzfse)
+    CODECS[CHUNK_LZFSE] = lambda data, size: lzfse.decompress(data)
+except ImportError:
+    pass
+
+
+def register_codec(entry_type: int, decompress: Callable[[bytes, int], bytes]):
+    """Registers a decompressor for a blkx chunk type: decompress(data, expected_size) -> bytes."""
+    CODECS[entry_type] = decompress
+
+
+@dataclass(frozen=True)
+class Chunk:
+    type: int
+    sector: int  # absolute sector on the virtual disk
+    sector_count: int
+    offset: int  # absolute offset in the image file
+    length: int
+
+
+@dataclass
+class Partition:
+    name: str
+    start_sector: int
+    sector_count: int
+    chunks: List[Chunk] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return self.sector_count * SECTOR_SIZE
+
+
+class UdifImage:
+    """Random-access view of the decoded disk inside a UDIF image."""
+
+    CACHE_CHUNKS = 16
+
+    def __init__(self, source: Union[str, Path, BinaryIO]):
+        if isinstance(source, (str, Path)):
+            self._f = open(source, "rb")
+            self._owns_file = True
+        else:
+            self._f = source
+            self._owns_file = False
+        self._cache: "OrderedDict[Chunk, bytes]" = OrderedDict()
+        try:
+            self._parse()
+        except UdifError:
+            self.close()
+            raise
+        except Exception as e:
+            self.close()
+            raise UdifError(f"Unreadable disk image: {e}")
+
+    def close(self):
+        if self._owns_file and self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _parse(self):
+        self._f.seek(0, io.SEEK_END)
+        file_size = self._f.tell()
+        if file_size < 512:
+            raise UdifError("File too small for a UDIF trailer")
+        self._f.seek(file_size - 512)
+        koly = self._f.read(512)
+        fields = _KOLY.unpack_from(koly)
+        if fields[0] != KOLY_MAGIC:
+            raise UdifError("No koly trailer (not a UDIF image)")
+        data_fork_offset = fields[5]
+        xml_offset, xml_length = fields[15], fields[16]
+        if not xml_length:
+            raise UdifError("Image has no blkx plist")
+
+        self._f.seek(xml_offset)
+        plist = plistlib.loads(self._f.read(xml_length))
+        blkx = plist.get("resource-fork", {}).get("blkx", [])
+
+        self.partitions: List[Partition] = []
+        for entry in blkx:
+            data = entry.get("Data")
+            if not data or data[:4] != b"mish":
+                continue
+            (_, _, first_sector, sector_count, data_offset, _, _, _, _,
+             chunk_count) = _MISH_HEADER.unpack_from(data)
+            partition = Partition(entry.get("Name") or entry.get("CFName") or "", first_sector, sector_count)
+            for i in range(chunk_count):
+                ctype, _, sector, count, comp_offset, comp_length = _MISH_CHUNK.unpack_from(
+                    data, _MISH_HEADER.size + i * _MISH_CHUNK.size)
+                if ctype in (CHUNK_END, CHUNK_COMMENT):
+                    continue
+                partition.chunks.append(Chunk(
+                    ctype, first_sector + sector, count,
+                    data_fork_offset + data_offset + comp_offset, comp_length,
+                ))
+            partition.chunks.sort(key=lambda c: c.sector)
+            self.partitions.append(partition)
+
+        self._chunks = sorted((c for p in self.partitions for c in p.chunks), key=lambda c: c.sector)
+        self._starts = [c.sector for c in self._chunks]
+
+    def _chunk_data(self, chunk: Chunk) -> bytes:
+        cached = self._cache.get(chunk)
+        if cached is not None:
+            self._cache.move_to_end(chunk)
+            return cached
+
+        size = chunk.sector_count * SECTOR_SIZE
+        if chunk.type in (CHUNK_ZERO, CHUNK_IGNORE):
+            return bytes(size)
+        self._f.seek(chunk.offset)
+        raw = self._f.read(chunk.length)
+        if chunk.type == CHUNK_RAW:
+            data = raw
+        else:
+            codec = CODECS.get(chunk.type)
+            if codec is None:
+                raise UdifError(f"Unsupported chunk compression 0x{chunk.type:08x}")
+            data = codec(raw, size)
+
+        self._cache[chunk] = data
+        while len(self._cache) > self.CACHE_CHUNKS:
+            self._cache.popitem(last=False)
+        return data
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Reads `size` bytes at a byte offset of the virtual disk, inflating only the chunks touched."""
+        out = bytearray()
+        pos = offset
+        end = offset + size
+        while pos < end:
+            sector = pos // SECTOR_SIZE
+            idx = bisect.bisect_right(self._starts, sector) - 1
+            chunk = self._chunks[idx] if idx >= 0 else None
+            if chunk is None or sector >= chunk.sector + chunk.sector_count:
+                # Unmapped area reads as zeros up to the next chunk
+                next_start = self._starts[idx + 1] * SECTOR_SIZE if idx + 1 < len(self._starts) else end
+                n = min(end, max(next_start, pos + 1)) - pos
+                out += bytes(n)
+                pos += n
+                continue
+            data = self._chunk_data(chunk)
+            start_in_chunk = pos - chunk.sector * SECTOR_SIZE
+            piece = data[start_in_chunk:start_in_chunk + (end - pos)]
+            if not piece:
+                break
+            out += piece
+            pos += len(piece)
+        return bytes(out)
+
+    def partition_reader(self, partition: Partition) -> Callable[[int, int], bytes]:
+        base = partition.start_sector * SECTOR_SIZE
+        return lambda offset, size: self.read(base + offset, size)
+
+
+# --- HFS+ ---
+
+_HFS_ROOT_FOLDER_ID = 2
+_REC_FOLDER = 1
+_REC_FILE = 2
+_FILE_COMPRESSED = 0x20  # UF_COMPRESSED in bsdInfo.ownerFlags
+
+
+@dataclass(frozen=True)
+class HfsFork:
+    logical_size: int
+    extents: Tuple[Tuple[int, int], ...]  # (start_block, block_count)
+
+
+@dataclass
+class HfsEntry:
+    cnid: int
+    parent_id: int
+    name: str
+    is_folder: bool
+    fork: Optional[HfsFork] = None
+    compressed: bool = False
+
+
+def _parse_fork(data: bytes, offset: int) -> HfsFork:
+    logical_size = struct.unpack_from(">Q", data, offset)[0]
+    extents = tuple(
+        struct.unpack_from(">II", data, offset + 16 + i * 8) for i in range(8)
+    )
+    return HfsFork(logical_size, tuple(e for e in extents if e[1]))
+
+
+class HfsPlusVolume:
+    """Minimal read-only HFS+/HFSX catalog walker."""
+
+    def __init__(self, read: Callable[[int, int], bytes]):
+        self._read = read
+        header = read(1024, 512)
+        if header[:2] not in (b"H+", b"HX"):
+            raise UdifError("No HFS+ volume header")
+        self.block_size = struct.unpack_from(">I", header, 40)[0]
+        self._catalog = _parse_fork(header, 272)
+        self._check_extents(self._catalog, "catalog")
+        node0 = self.read_fork(self._catalog, 0, 512)
+        (_, self._root_node, _, self._first_leaf, _, self._node_size) = struct.unpack_from(">HIIIIH", node0, 14)
+        self._entries: Optional[Dict[int, HfsEntry]] = None
+
+    @staticmethod
+    def probe(read: Callable[[int, int], bytes]) -> Optional[str]:
+        """Returns 'hfs', 'apfs' or None for the filesystem at the start of a partition."""
+        head = read(0, 2048)
+        if head[1024:1026] in (b"H+", b"HX"):
+            return "hfs"
+        if head[32:36] == b"NXSB":
+            return "apfs"
+        return None
+
+    def _check_extents(self, fork: HfsFork, name: str):
+        # Forks with more than eight extents continue in the extents overflow file (not parsed)
+        if sum(count for _, count in fork.extents) * self.block_size < fork.logical_size:
+            raise UdifError(f"{name} is fragmented beyond its inline extents")
+
+    def read_fork(self, fork: HfsFork, offset: int, size: int) -> bytes:
+        size = max(0, min(size, fork.logical_size - offset))
+        out = bytearray()
+        fork_pos = 0
+        for start_block, block_count in fork.extents:
+            extent_bytes = block_count * self.block_size
+            if offset < fork_pos + extent_bytes and len(out) < size:
+                inner = max(0, offset + len(out) - fork_pos)
+                n = min(extent_bytes - inner, size - len(out))
+                out += self._read(start_block * self.block_size + inner, n)
+            fork_pos += extent_bytes
+            if len(out) >= size:
+                break
+        return bytes(out)
+
+    def _iter_leaf_records(self) -> Iterator[bytes]:
+        node_id = self._first_leaf
+        seen = set()
+        while node_id and node_id not in seen:
+            seen.add(node_id)
+            node = self.read_fork(self._catalog, node_id * self._node_size, self._node_size)
+            if len(node) < self._node_size:
+                break
+            f_link, _, kind, _, num_records = struct.unpack_from(">IIbBH", node, 0)
+            if kind != -1:
+                break
+            offsets = struct.unpack_from(f">{num_records + 1}H", node, self._node_size - 2 * (num_records + 1))
+            # Offsets are stored back to front; the first entry is the free-space offset
+            bounds = sorted(offsets)
+            for start, end in zip(bounds, bounds[1:]):
+                yield node[start:end]
+            node_id = f_link
+
+    def entries(self) -> Dict[int, HfsEntry]:
+        """All folders and files in the catalog keyed by CNID (read once, then cached)."""
+        if self._entries is not None:
+            return self._entries
+        entries: Dict[int, HfsEntry] = {}
+        for record in self._iter_leaf_records():
+            key_length, parent_id, name_length = struct.unpack_from(">HIH", record, 0)
+            name = record[8:8 + name_length * 2].decode("utf-16-be", errors="replace")
+            data_start = 2 + key_length
+            data_start += data_start & 1
+            rec_type = struct.unpack_from(">h", record, data_start)[0]
+            if rec_type == _REC_FOLDER:
+                cnid = struct.unpack_from(">I", record, data_start + 8)[0]
+                entries[cnid] = HfsEntry(cnid, parent_id, name, True)
+            elif rec_type == _REC_FILE:
+                cnid = struct.unpack_from(">I", record, data_start + 8)[0]
+                owner_flags = record[data_start + 41]
+                entries[cnid] = HfsEntry(
+                    cnid, parent_id, name, False,
+                    fork=_parse_fork(record, data_start + 88),
+                    compressed=bool(owner_flags & _FILE_COMPRESSED),
+                )
+        self._entries = entries
+        return entries
+
+    def path_of(self, entry: HfsEntry) -> str:
+        entries = self.entries()
+        parts = [entry.name]
+        parent = entry.parent_id
+        while parent != _HFS_ROOT_FOLDER_ID and parent in entries and len(parts) < 64:
+            parts.append(entries[parent].name)
+            parent = entries[parent].parent_id
+        return "/".join(reversed(parts))
+
+    def find_files(self, predicate: Callable[[str], bool]) -> List[Tuple[str, HfsEntry]]:
+        files = [(self.path_of(e), e) for e in self.entries().values() if not e.is_folder]
+        return sorted(((p, e) for p, e in files if predicate(p)), key=lambda pe: (pe[0].count("/"), pe[0]))
+
+    def read_file(self, entry: HfsEntry) -> bytes:
+        if entry.compressed:
+            raise UdifError(f"{entry.name} uses HFS+ compression")
+        self._check_extents(entry.fork, entry.name)
+        return self.read_fork(entry.fork, 0, entry.fork.logical_size)
+
+    def open_file(self, entry: HfsEntry) -> BinaryIO:
+        """Seekable file object over a file's data fork (reads ranges on demand)."""
+        self._check_extents(entry.fork, entry.name)
+        return io.BufferedReader(_ForkReader(self, entry.fork))
+
+
+class _ForkReader(io.RawIOBase):
+    def __init__(self, volume: HfsPlusVolume, fork: HfsFork):
+        self._volume, self._fork, self._pos = volume, fork, 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, pos, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._fork.logical_size}[whence]
+        self._pos = max(0, base + pos)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def readinto(self, b):
+        data = self._volume.read_fork(self._fork, self._pos, len(b))
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+def open_hfs_volume(image: UdifImage) -> HfsPlusVolume:
+    """Returns the first HFS+ volume of the image; raises UdifError for APFS-only images."""
+    found_apfs = False
+    for partition in sorted(image.partitions, key=lambda p: -p.sector_count):
+        read = image.partition_reader(partition)
+        kind = HfsPlusVolume.probe(read)
+        if kind == "hfs":
+            return HfsPlusVolume(read)
+        found_apfs = found_apfs or kind == "apfs"
+    raise UdifError("APFS volumes are not supported" if found_apfs else "No HFS+ volume found")
+
+
+def is_app_info_plist(path: str) -> bool:
+    parts = path.split("/")
+    return len(parts) >= 3 and parts[-1] == "Info.plist" and parts[-2] == "Contents" and parts[-3].endswith(".app")
@@ -0,0 +1,213 @@
+"""
+Pure-Python reader for XAR archives (macOS flat .pkg installers).
+
+A XAR file is a fixed header, a zlib-compressed XML table of contents and a heap.
+The TOC records each member's heap offset, stored length and encoding, so single
+members can be read with one seek and inflated in memory - no 7-Zip, subprocess or
+temp files needed.
+"""
+import bz2
+import io
+import logging
+import lzma
+import struct
+import zlib
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
+
+from defusedxml import ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+XAR_MAGIC = b"xar!"
+_HEADER = struct.Struct(">4sHHQQI")
+# Header + TOC of typical installer packages fit in one read
+_INITIAL_READ = 64 * 1024
+
+
+class XarError(Exception):
+    """Raised for files that are not valid XAR archives."""
+
+
+@dataclass(frozen=True)
+class XarMember:
+    name: str  # full path inside the archive, '/'-separated
+    type: str  # file | directory | symlink ...
+    offset: int = 0  # relative to the heap
+    length: int = 0  # stored (compressed) length
+    size: int = 0  # extracted size
+    encoding: str = "application/octet-stream"
+
+    @property
+    def is_file(self) -> bool:
+        return self.type == "file"
+
+
+class _Window(io.RawIOBase):
+    """Read-only view of [start, start+length) of another file object."""
+
+    def __init__(self, f: BinaryIO, start: int, length: int):
+        self._f, self._start, self._length, self._pos = f, start, length, 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, pos, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._length}[whence]
+        self._pos = max(0, base + pos)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def read(self, n=-1):
+        remaining = self._length - self._pos
+        if n is None or n < 0 or n > remaining:
+            n = remaining
+        if n <= 0:
+            return b""
+        self._f.seek(self._start + self._pos)
+        data = self._f.read(n)
+        self._pos += len(data)
+        return data
+
+
+class XarArchive:
+    """
+    Usage:
+        with XarArchive("Installer.pkg") as xar:
+            dist = xar.read("Distribution")
+            for m in xar.find("*.pkg/PackageInfo"):
+                info = xar.read(m)
+    """
+
+    def __init__(self, source: Union[str, Path, BinaryIO]):
+        if isinstance(source, (str, Path)):
+            self._f = open(source, "rb")
+            self._owns_file = True
+        else:
+            self._f = source
+            self._owns_file = False
+        try:
+            self._read_toc()
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self._owns_file and self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- TOC ---
+
+    def _read_toc(self):
+        self._f.seek(0)
+        head = self._f.read(_INITIAL_READ)
+        if len(head) < _HEADER.size or head[:4] != XAR_MAGIC:
+            raise XarError("Not a XAR archive")
+        _, header_size, _, toc_compressed, toc_size, _ = _HEADER.unpack_from(head)
+
+        toc_end = header_size + toc_compressed
+        if len(head) < toc_end:
+            head += self._f.read(toc_end - len(head))
+        try:
+            toc_xml = zlib.decompress(head[header_size:toc_end])
+        except zlib.error as e:
+            raise XarError(f"Corrupt TOC: {e}")
+
+        self._heap_start = toc_end
+        # Small members that follow the TOC are usually already in this buffer
+        self._head = head
+        self.members: List[XarMember] = []
+        root = ET.fromstring(toc_xml)
+        toc = root.find("toc")
+        if toc is None:
+            raise XarError("TOC element missing")
+        self._collect(toc, "")
+
+    def _collect(self, parent, prefix: str):
+        for node in parent.findall("file"):
+            name = (node.findtext("name") or "").strip()
+            path = f"{prefix}{name}"
+            data = node.find("data")
+            if data is not None:
+                encoding = data.find("encoding")
+                member = XarMember(
+                    name=path,
+                    type=(node.findtext("type") or "file").strip(),
+                    offset=int(data.findtext("offset") or 0),
+                    length=int(data.findtext("length") or 0),
+                    size=int(data.findtext("size") or 0),
+                    encoding=encoding.get("style") if encoding is not None else "application/octet-stream",
+                )
+            else:
+                member = XarMember(name=path, type=(node.findtext("type") or "file").strip())
+            self.members.append(member)
+            self._collect(node, f"{path}/")
+
+    # --- Members ---
+
+    def names(self) -> List[str]:
+        return [m.name for m in self.members]
+
+    def get(self, name: str) -> Optional[XarMember]:
+        for m in self.members:
+            if m.name == name:
+                return m
+        return None
+
+    def find(self, pattern: str) -> List[XarMember]:
+        """Members whose full path matches a glob pattern (e.g. '*.pkg/PackageInfo')."""
+        return [m for m in self.members if fnmatch(m.name, pattern)]
+
+    def read(self, member: Union[str, XarMember], max_size: int = 64 * 1024 * 1024) -> bytes:
+        """Reads and decodes a single member into memory."""
+        if isinstance(member, str):
+            found = self.get(member)
+            if found is None:
+                raise KeyError(member)
+            member = found
+        if not member.is_file:
+            raise XarError(f"{member.name} is not a file")
+        if member.size > max_size:
+            raise XarError(f"{member.name} is too large to read into memory ({member.size} bytes)")
+
+        start = self._heap_start + member.offset
+        end = start + member.length
+        if end <= len(self._head):
+            raw = self._head[start:end]
+        else:
+            self._f.seek(start)
+            raw = self._f.read(member.length)
+        style = member.encoding
+        if style == "application/x-gzip":
+            # XAR labels zlib streams as gzip
+            return zlib.decompress(raw, zlib.MAX_WBITS | 32)
+        if style == "application/x-bzip2":
+            return bz2.decompress(raw)
+        if style in ("application/x-lzma", "application/x-xz"):
+            return lzma.decompress(raw)
+        return raw
+
+    def open_package(self, member: Union[str, XarMember]) -> "XarArchive":
+        """Opens a nested .pkg member (itself a XAR archive) without extracting it to disk."""
+        if isinstance(member, str):
+            found = self.get(member)
+            if found is None:
+                raise KeyError(member)
+            member = found
+        if member.encoding == "application/octet-stream":
+            return XarArchive(_Window(self._f, self._heap_start + member.offset, member.length))
+        return XarArchive(io.BytesIO(self.read(member)))
@@ -11,6 +11,17 @@ try:
     PY7ZR_AVAILABLE = True
 except ImportError:
     PY7ZR_AVAILABLE = False
+try:
+    from switchcraft.utils.metrics import timed
+    from switchcraft.utils.tracing import span
+except ImportError:  # Addon loaded without the core package
+    from contextlib import nullcontext
+
+    def timed(name, help="", **labels):
+        return nullcontext()
+
+    def span(name, **attributes):
+        return nullcontext()
 
 logger = logging.getLogger(__name__)
 
@@ -96,14 +107,14 @@ class UniversalAnalyzer:
 
             # 2. Simple binary scan for embedded MSI markers
             try:
-                with open(file_path, 'rb') as f:
-                    data = f.read(1024 * 1024 * 5)  # Read 5MB
-
-                    # Check for MSI file signature embedded
-                    if b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1" in data:  # OLE signature
-                        # Check if it contains MSI-like properties
-                        if b"ProductCode" in data or b"UpgradeCode" in data:
-                            return "MSI Wrapper (embedded MSI detected)"
+                from switchcraft.services.fingerprint_service import get_fingerprint_service
+                data = get_fingerprint_service().read_head(file_path, 1024 * 1024 * 5)  # Read 5MB
+
+                # Check for MSI file signature embedded
+                if b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1" in data:  # OLE signature
+                    # Check if it contains MSI-like properties
+                    if b"ProductCode" in data or b"UpgradeCode" in data:
+                        return "MSI Wrapper (embedded MSI detected)"
             except Exception:
                 pass
 
@@ -154,15 +165,17 @@ class UniversalAnalyzer:
                  startupinfo = subprocess.STARTUPINFO()
                  startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
 
-             proc = subprocess.run(
-                 [str(file_path)] + cmd_args,
-                 capture_output=True,
-                 text=True,
-                 timeout=5,
-                 startupinfo=startupinfo,
-                 encoding='cp1252' if os.name == 'nt' else 'utf-8',
-                 errors='ignore'
-             )
+             with span("probe", args=" ".join(cmd_args)), \
+                     timed("switchcraft_subprocess_seconds", "External command duration", tool="installer"):
+                 proc = subprocess.run(
+                     [str(file_path)] + cmd_args,
+                     capture_output=True,
+                     text=True,
+                     timeout=5,
+                     startupinfo=startupinfo,
+                     encoding='cp1252' if os.name == 'nt' else 'utf-8',
+                     errors='ignore'
+                 )
              output = proc.stdout + "\n" + proc.stderr
 
              if output.strip():
@@ -188,15 +201,17 @@ class UniversalAnalyzer:
                     startupinfo = subprocess.STARTUPINFO()
                     startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
 
-                proc = subprocess.run(
-                    [str(file_path)] + cmd_args,
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                    startupinfo=startupinfo,
-                    encoding='cp1252' if os.name == 'nt' else 'utf-8',
-                    errors='ignore'
-                )
+                with span("probe", args=" ".join(cmd_args)), \
+                        timed("switchcraft_subprocess_seconds", "External command duration", tool="installer"):
+                    proc = subprocess.run(
+                        [str(file_path)] + cmd_args,
+                        capture_output=True,
+                        text=True,
+                        timeout=5,
+                        startupinfo=startupinfo,
+                        encoding='cp1252' if os.name == 'nt' else 'utf-8',
+                        errors='ignore'
+                    )
 
                 output = proc.stdout + "\n" + proc.stderr
                 attempt_info = {
@@ -401,13 +416,15 @@ class UniversalAnalyzer:
             if progress_callback:
                 progress_callback(10, f"Listing archive content ({file_path.name})...")
 
-            list_proc = subprocess.run(
-                [seven_zip, "l", str(file_path)],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                startupinfo=startupinfo
-            )
+            with span("7z.list", file=file_path.name, depth=depth), \
+                    timed("switchcraft_subprocess_seconds", "External command duration", tool="7z"):
+                list_proc = subprocess.run(
+                    [seven_zip, "l", str(file_path)],
+                    capture_output=True,
+                    text=True,
+                    timeout=30,
+                    startupinfo=startupinfo
+                )
 
             if list_proc.returncode != 0:
                 result["error"] = "Cannot read archive - may not be extractable"
@@ -429,13 +446,15 @@ class UniversalAnalyzer:
             # Extract to temp directory
             if progress_callback:
                 progress_callback(20, f"Extracting {file_path.name}...")
-            extract_proc = subprocess.run(
-                [seven_zip, "x", "-y", f"-o{temp_dir}", str(file_path)],
-                capture_output=True,
-                text=True,
-                timeout=120,  # 2 minutes for large files
-                startupinfo=startupinfo
-            )
+            with span("7z.extract", file=file_path.name, depth=depth), \
+                    timed("switchcraft_subprocess_seconds", "External command duration", tool="7z"):
+                extract_proc = subprocess.run(
+                    [seven_zip, "x", "-y", f"-o{temp_dir}", str(file_path)],
+                    capture_output=True,
+                    text=True,
+                    timeout=120,  # 2 minutes for large files
+                    startupinfo=startupinfo
+                )
 
             if extract_proc.returncode != 0:
                 result["error"] = f"Extraction failed: {extract_proc.stderr[:200]}"
@@ -474,18 +493,19 @@ class UniversalAnalyzer:
 
                         # Analyze the nested executable
                         try:
-                            if ext == '.msi' and msi_analyzer.can_analyze(full_path):
-                                nested_info["analysis"] = msi_analyzer.analyze(full_path)
-                            elif ext == '.exe' and exe_analyzer.can_analyze(full_path):
-                                nested_info["analysis"] = exe_analyzer.analyze(full_path)
-
-                                # If EXE analysis returns unknown, try brute force
-                                if nested_info["analysis"] and "Unknown" in nested_info["analysis"].installer_type:
-                                    bf_result = self.brute_force_help(full_path)
-                                    if bf_result.get("detected_type"):
-                                        nested_info["analysis"].installer_type = bf_result["detected_type"]
-                                        nested_info["analysis"].install_switches = bf_result.get("suggested_switches", [])
-                                    nested_info["brute_force_output"] = bf_result.get("output", "")
+                            with span("nested_file", file=rel_path, depth=depth):
+                                if ext == '.msi' and msi_analyzer.can_analyze(full_path):
+                                    nested_info["analysis"] = msi_analyzer.analyze(full_path)
+                                elif ext == '.exe' and exe_analyzer.can_analyze(full_path):
+                                    nested_info["analysis"] = exe_analyzer.analyze(full_path)
+
+                                    # If EXE analysis returns unknown, try brute force
+                                    if nested_info["analysis"] and "Unknown" in nested_info["analysis"].installer_type:
+                                        bf_result = self.brute_force_help(full_path)
+                                        if bf_result.get("detected_type"):
+                                            nested_info["analysis"].installer_type = bf_result["detected_type"]
+                                            nested_info["analysis"].install_switches = bf_result.get("suggested_switches", [])
+                                        nested_info["brute_force_output"] = bf_result.get("output", "")
                         except Exception as e:
                             nested_info["error"] = str(e)
 
@@ -7,6 +7,20 @@ from pathlib import Path
 from typing import Optional, List, Dict
 import re
 
+try:
+    from switchcraft.utils.metrics import counter, timed
+    from switchcraft.utils.tracing import span
+except ImportError:  # Addon loaded without the core package
+    from contextlib import nullcontext
+
+    counter = None
+
+    def timed(name, help="", **labels):
+        return nullcontext()
+
+    def span(name, **attributes):
+        return nullcontext()
+
 logger = logging.getLogger(__name__)
 
 # API Configuration - using winget.run v2 API which is more reliable and comprehensive
@@ -17,6 +31,9 @@ class WingetHelper:
     # Class-level cache for search results
     _search_cache: Dict[str, tuple] = {}  # {query: (timestamp, results)}
     _cache_ttl = 300  # 5 minutes
+    # Optional cross-process cache (a shared store namespace with get/set(key, value, ttl)),
+    # set by the web server so all workers reuse each other's search results
+    shared_cache = None
 
     def __init__(self, auto_install_winget: bool = True, github_token: str = None):
         # Detect WASM environment
@@ -78,37 +95,66 @@ class WingetHelper:
             timestamp, cached_results = self._search_cache[cache_key]
             if time.time() - timestamp < self._cache_ttl:
                 logger.debug(f"Winget cache hit for '{query}'")
+                self._count_cache("local")
                 return cached_results
+        if self.shared_cache is not None:
+            try:
+                cached_results = self.shared_cache.get(cache_key)
+            except Exception as e:
+                logger.debug(f"Shared winget cache unavailable: {e}")
+                cached_results = None
+            if cached_results:
+                logger.debug(f"Winget shared cache hit for '{query}'")
+                self._count_cache("shared")
+                self._search_cache[cache_key] = (time.time(), cached_results)
+                return cached_results
+        self._count_cache("miss")
 
         # 1. Try PowerShell first (most reliable on Desktop)
-        results = self._search_via_powershell(query)
+        results = self._timed_search("powershell", self._search_via_powershell, query)
 
         # 2. If PowerShell fails, try GitHub API (Official Source) IF token is available
         if not results and self.github_token:
             logger.info(f"PowerShell search failed. specific token provided. Using GitHub Official Source for '{query}'...")
-            results = self._search_via_github(query)
+            results = self._timed_search("github", self._search_via_github, query)
 
         # 3. If GitHub unavailable/failed, try Winget.run API (Official Mirror)
         if not results:
             logger.info(f"Trying Winget.run API (Official Mirror) for '{query}'...")
-            results = self._search_via_api(query)
+            results = self._timed_search("api", self._search_via_api, query)
 
         # 4. If API also fails, try CLI directly as last resort
         if not results:
             logger.info(f"API returned no results for '{query}', trying CLI as fallback...")
-            results = self._search_via_cli(query)
+            results = self._timed_search("cli", self._search_via_cli, query)
 
         # 5. If CLI also fails, use static dataset (always available)
         if not results:
             logger.info(f"CLI returned no results for '{query}', using static dataset...")
-            results = self._search_via_static_dataset(query)
+            results = self._timed_search("static", self._search_via_static_dataset, query)
 
         # Cache results
         if results:
             self._search_cache[cache_key] = (time.time(), results)
+            if self.shared_cache is not None:
+                try:
+                    self.shared_cache.set(cache_key, results, ttl=self._cache_ttl)
+                except Exception as e:
+                    logger.debug(f"Failed to share winget results: {e}")
 
         return results
 
+    @staticmethod
+    def _timed_search(backend: str, search, query: str) -> List[Dict[str, str]]:
+        with span(f"winget.{backend}", query=query), \
+                timed("switchcraft_winget_search_seconds", "Winget search duration per backend", backend=backend):
+            return search(query)
+
+    @staticmethod
+    def _count_cache(result: str):
+        if counter is not None:
+            counter("switchcraft_winget_cache_total", "Winget search cache lookups", ["result"]).inc(result=result)
+
     def _search_via_github(self, query: str) -> List[Dict[str, str]]:
         """
         Search the official microsoft/winget-pkgs repository via GitHub API.
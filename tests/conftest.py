@@ -217,7 +217,7 @@ def _create_mock_page():
 
 
 @pytest.fixture(autouse=True)
-def mock_blocking_calls(monkeypatch, request):
+def mock_blocking_calls(monkeypatch, request, tmp_path):
     """Global fixture to mock all blocking OS/UI/Network calls."""
     import os
     import webbrowser
@@ -269,6 +269,12 @@ def mock_blocking_calls(monkeypatch, request):
         monkeypatch.setattr(SwitchCraftConfig, "set_secure_value", MagicMock())
         monkeypatch.setattr(SwitchCraftConfig, "is_managed", MagicMock(return_value=False))
 
+    # Keep the Intune catalog mirror out of the user's profile: the mocked tenant id is shared by
+    # every test, so a mirror synced by one run would serve the searches of the next
+    from switchcraft.services import intune_catalog_service
+    monkeypatch.setattr(intune_catalog_service, "_catalog_instances", {})
+    monkeypatch.setattr(intune_catalog_service.IntuneCatalogService, "_get_db_path",
+                        staticmethod(lambda: tmp_path / "appcatalog.db"))
 
     # Mock UpdateChecker to prevent real update checks
     from switchcraft.utils.app_updater import UpdateChecker
@@ -316,6 +322,17 @@ def mock_blocking_calls(monkeypatch, request):
     monkeypatch.setattr(threading, "Thread", MockThread)
 
 
+@pytest.fixture
+def tmp_dir(request, tmp_path):
+    """
+    Per-test temporary directory (pytest's tmp_path, cleaned up by pytest).
+    unittest.TestCase classes get it as self.tmp_dir via @pytest.mark.usefixtures("tmp_dir").
+    """
+    if request.instance is not None:
+        request.instance.tmp_dir = tmp_path
+    return tmp_path
+
+
 @pytest.fixture
 def mock_page():
     """
@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+import unittest
+
+import olefile
+import pytest
+from click.testing import CliRunner
+
+from switchcraft.analyzers.exe import ExeAnalyzer
+from switchcraft.analyzers.macos import MacOSAnalyzer
+from switchcraft.analyzers.msi import MsiAnalyzer
+from switchcraft.benchmarks import corpus, runner
+from switchcraft.benchmarks.corpus import CorpusCase
+from switchcraft.cli.commands import cli
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class BenchTestCase(unittest.TestCase):
+    pass
+
+
+class TestCorpus(BenchTestCase):
+    def test_compound_file_round_trip(self):
+        streams = {"Small": b"abc", "Medium": b"m" * 5000, "Tiny": b"", "Big": os.urandom(9 * 1024 * 1024)}
+        path = self.tmp_dir / "test.ole"
+        path.write_bytes(corpus.build_compound_file(streams))
+
+        # 9 MB needs more FAT sectors than the header holds (DIFAT chain)
+        with olefile.OleFileIO(str(path)) as ole:
+            self.assertEqual(sorted(e[0] for e in ole.listdir()), sorted(streams))
+            for name, data in streams.items():
+                self.assertEqual(ole.openstream(name).read(), data)
+
+    def test_samples_are_detected(self):
+        cases = {c.name: c for c in corpus.generate_corpus(self.tmp_dir, "quick")}
+        exe = ExeAnalyzer()
+        for family, expected in (("nsis", "NSIS"), ("inno", "Inno Setup"), ("installshield", "InstallShield"),
+                                 ("wix", "WiX Burn Bundle"), ("7zsfx", "7-Zip SFX")):
+            case = cases[f"exe-{family}-head-1m"]
+            self.assertEqual(case.size, corpus.MB)
+            self.assertEqual(exe.analyze(self.tmp_dir / case.file).installer_type, expected)
+
+        info = MsiAnalyzer().analyze(self.tmp_dir / cases["msi-small"].file)
+        self.assertEqual(info.product_code, corpus.SAMPLE_PROPERTIES["ProductCode"])
+        for name in ("pkg-small", "dmg-app-1m", "zip-app-1m"):
+            self.assertEqual(MacOSAnalyzer().analyze(self.tmp_dir / cases[name].file).bundle_id, "com.contoso.bench")
+
+    def test_sparse_pe_markers(self):
+        path = self.tmp_dir / "big.exe"
+        size = 64 * corpus.MB
+        corpus.write_pe(path, size, (".text",), [("mid", b"Inno Setup"), ("tail", b"InstallShield")])
+        self.assertEqual(path.stat().st_size, size)
+        with open(path, "rb") as f:
+            f.seek(size // 2)
+            self.assertEqual(f.read(10), b"Inno Setup")
+            f.seek(size - 4096)
+            self.assertEqual(f.read(13), b"InstallShield")
+
+    def test_generation_is_reproducible(self):
+        first = corpus.generate_corpus(self.tmp_dir / "a", "quick")
+        corpus.generate_corpus(self.tmp_dir / "b", "quick")
+        for case in first:
+            a, b = self.tmp_dir / "a" / case.file, self.tmp_dir / "b" / case.file
+            if not case.file.endswith(".zip"):  # zip entries carry the build time
+                self.assertEqual(a.read_bytes(), b.read_bytes(), case.file)
+
+
+class TestRunner(BenchTestCase):
+    def test_measure_case_in_process(self):
+        cases = [c for c in corpus.generate_corpus(self.tmp_dir, "quick") if c.name == "msi-small"]
+        result = runner.run_benchmarks(cases, self.tmp_dir, repeat=2, isolate=False)[0]
+        self.assertEqual(result.result, "MSI Database|Contoso Bench|1.2.3")
+        self.assertEqual(result.runs, 2)
+        self.assertGreater(result.wall_ms, 0)
+        if sys.platform.startswith("linux"):
+            self.assertGreater(result.bytes_read, 0)
+
+    def test_compare_statuses(self):
+        baseline = {"results": {
+            "a": {"result": "NSIS", "wall_ms": 100.0, "bytes_read": 1_000_000},
+            "b": {"result": "NSIS", "wall_ms": 100.0, "bytes_read": 1_000_000},
+        }}
+        results = [
+            runner.CaseResult("a", "exe", 0, "NSIS", wall_ms=400.0, bytes_read=200_000),
+            runner.CaseResult("b", "exe", 0, "Unknown EXE", wall_ms=101.0, bytes_read=1_000_000),
+            runner.CaseResult("c", "exe", 0, "NSIS", wall_ms=1.0),
+            runner.CaseResult("d", "universal", 0, "skipped: advanced addon not installed"),
+        ]
+        rows = {(r["case"], r["metric"]): r["status"] for r in runner.compare(results, baseline)}
+        self.assertEqual(rows[("a", "wall_ms")], "regression")
+        self.assertEqual(rows[("a", "bytes_read")], "improved")
+        self.assertEqual(rows[("b", "result")], "changed")
+        self.assertEqual(rows[("b", "wall_ms")], "ok")
+        self.assertEqual(rows[("c", "")], "new")
+        self.assertNotIn("d", {case for case, _ in rows})
+        self.assertTrue(runner.has_failures(runner.compare(results, baseline)))
+
+    def test_skipped_analyzer(self):
+        def unavailable():
+            raise runner.BenchSkip("addon missing")
+
+        original = runner.ANALYZERS["universal"]
+        runner.ANALYZERS["universal"] = unavailable
+        try:
+            result = runner.measure_case(CorpusCase("u", "universal", "x.exe"), str(self.tmp_dir), repeat=1)
+        finally:
+            runner.ANALYZERS["universal"] = original
+        self.assertEqual(result.result, "skipped: addon missing")
+        self.assertIsNone(result.wall_ms)
+
+
+class TestBenchCli(BenchTestCase):
+    def test_baseline_and_check(self):
+        cli_runner = CliRunner()
+        baseline = self.tmp_dir / "baseline.json"
+        args = ["bench", "run", "--corpus", str(self.tmp_dir / "corpus"), "-k", "msi-small", "--repeat", "1",
+                "--in-process", "--baseline", str(baseline)]
+
+        result = cli_runner.invoke(cli, args + ["--save-baseline"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        data = json.loads(baseline.read_text())
+        self.assertIn("msi-small", data["results"])
+
+        result = cli_runner.invoke(cli, args + ["--check", "--json"])
+        self.assertEqual(result.exit_code, 0, result.output)
+
+        data["results"]["msi-small"]["result"] = "MSI Database|Someone Else|0.0"
+        baseline.write_text(json.dumps(data))
+        result = cli_runner.invoke(cli, args + ["--check"])
+        self.assertEqual(result.exit_code, 1)
+
+    def test_check_requires_baseline(self):
+        result = CliRunner().invoke(cli, ["bench", "run", "--check"])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn("--baseline", result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import json
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from switchcraft.services.community_db_service import CommunityDBService, normalize_name
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestCommunityDBService(unittest.TestCase):
+    def setUp(self):
+        self.db_path = os.path.join(self.tmp_dir, "switches.json")
+        self.journal = os.path.join(self.tmp_dir, "communitydb.jsonl")
+        with open(self.db_path, "w", encoding="utf-8") as f:
+            json.dump([
+                {"id": "vlc", "app_name": "VLC media player", "vendor": "VideoLAN", "silent_switch": "/L=1033 /S"},
+                {"id": "7zip", "app_name": "7-Zip", "vendor": "Igor Pavlov", "silent_switch": "/S",
+                 "product_code": "23170F69-40C1-2702-2301-000001000000"},
+                {"id": "greenshot", "app_name": "Greenshot", "silent_switch": "/VERYSILENT /NORESTART"},
+            ], f)
+        self.db = CommunityDBService(db_path=self.db_path, journal_path=self.journal)
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("Greenshot-INSTALLER-1.2.10.6-RELEASE.exe"), "greenshot")
+        self.assertEqual(normalize_name("vlc-3.0.20-win64.exe"), "vlc")
+
+    def test_fuzzy_name_lookup(self):
+        self.assertEqual(self.db.get_switches_by_name("Greenshot-INSTALLER-1.2.10.6-RELEASE.exe"),
+                         ["/VERYSILENT", "/NORESTART"])
+        self.assertEqual(self.db.get_switches_by_name("vlc-3.0.20-win64.exe"), ["/L=1033", "/S"])
+        self.assertIsNone(self.db.get_switches_by_name("totally-unknown-tool.exe"))
+
+    def test_search_is_ranked(self):
+        results = self.db.search("greenshot")
+        self.assertEqual(results[0][0]["id"], "greenshot")
+        self.assertEqual(results[0][1], 1.0)
+
+    def test_hash_lookup(self):
+        installer = os.path.join(self.tmp_dir, "app.exe")
+        with open(installer, "wb") as f:
+            f.write(b"payload")
+        sha = self.db._get_hash(installer)
+        self.db.apply_delta({"version": 1, "upserts": [{"id": "h", "sha256": sha, "switches": ["/q"]}]})
+        self.assertEqual(self.db.get_switches_by_hash(installer), ["/q"])
+
+    def test_product_code_and_vendor(self):
+        self.assertEqual(self.db.get_switches_by_product_code("{23170f69-40c1-2702-2301-000001000000}"), ["/S"])
+        self.assertEqual([e["id"] for e in self.db.get_entries_by_vendor("videolan")], ["vlc"])
+
+    def test_delta_is_incremental_and_persisted(self):
+        self.assertTrue(self.db.apply_delta({
+            "version": 2,
+            "upserts": [{"id": "greenshot", "app_name": "Greenshot", "switches": ["/SILENT"]}],
+            "deletes": ["vlc"],
+        }))
+        # Stale deltas are ignored
+        self.assertFalse(self.db.apply_delta({"version": 1, "deletes": ["7zip"]}))
+
+        reopened = CommunityDBService(db_path=self.db_path, journal_path=self.journal)
+        self.assertEqual(reopened.get_switches_by_name("greenshot.exe"), ["/SILENT"])
+        self.assertEqual(reopened.get_entries_by_vendor("videolan"), [])
+        self.assertEqual(reopened.get_switches_by_product_code("23170F69-40C1-2702-2301-000001000000"), ["/S"])
+        self.assertEqual(reopened.feed_version, 2)
+
+    def test_journal_written_by_other_process_is_replayed(self):
+        self.assertEqual(self.db.rules_revision(), 0)
+        other = CommunityDBService(db_path=self.db_path, journal_path=self.journal)
+        other.apply_delta({"version": 7, "upserts": [
+            {"id": "fabrikam", "app_name": "Fabrikam Agent", "switches": ["-silent"],
+             "rule": {"installer_type": "Fabrikam Installer", "conditions": [{"marker": "Fabrikam"}]}},
+        ]})
+        with open(self.journal, "a", encoding="utf-8") as f:
+            f.write('{"version": 8, "deletes": ["vlc"]')  # still being written
+
+        with patch.object(CommunityDBService, "JOURNAL_CHECK_SECONDS", 0):
+            self.assertEqual(self.db.rules_revision(), 1)
+            self.assertEqual(self.db.get_switches_by_name("Fabrikam-Agent-Setup.exe"), ["-silent"])
+            self.assertEqual(self.db.feed_version, 7)
+            self.assertEqual([e["id"] for e in self.db.get_entries_by_vendor("videolan")], ["vlc"])
+
+            with open(self.journal, "a", encoding="utf-8") as f:
+                f.write('}\n')
+            self.assertEqual(self.db.get_entries_by_vendor("videolan"), [])
+            self.assertEqual(self.db.feed_version, 8)
+
+    def test_pull_updates(self):
+        resp = MagicMock()
+        resp.json.return_value = {"deltas": [
+            {"version": 4, "deletes": ["7zip"]},
+            {"version": 3, "upserts": [{"id": "new", "app_name": "New Tool", "switches": ["/s"]}]},
+        ]}
+        with patch("requests.get", return_value=resp) as mock_get:
+            self.assertEqual(self.db.pull_updates("https://example.invalid/feed"), 2)
+        self.assertEqual(mock_get.call_args.kwargs["params"], {"since": 0})
+        self.assertEqual(self.db.feed_version, 4)
+        self.assertEqual(self.db.get_switches_by_name("New-Tool-Setup.exe"), ["/s"])
+
+    def test_cli_pull_feeds_entries_and_rules(self):
+        from click.testing import CliRunner
+        from switchcraft.analyzers.rules import RuleSet
+        from switchcraft.cli.commands import cli
+
+        resp = MagicMock()
+        resp.json.return_value = {"version": 5, "upserts": [
+            {"id": "fabrikam", "app_name": "Fabrikam Agent", "switches": ["-silent"],
+             "rule": {"installer_type": "Fabrikam Installer", "conditions": [{"marker": "Fabrikam"}]}},
+        ]}
+        rule_set = RuleSet(bundled_path=None, community_db=self.db)
+        self.assertEqual(rule_set.engine().rules, [])
+        with patch("switchcraft.services.community_db_service.get_community_db", return_value=self.db), \
+                patch("switchcraft.cli.commands.SwitchCraftConfig.get_value", return_value="https://example.invalid/feed"), \
+                patch("requests.get", return_value=resp) as mock_get, \
+                patch("switchcraft.analyzers.rules.RELOAD_CHECK_SECONDS", 0):
+            result = CliRunner().invoke(cli, ["community", "pull", "--json"])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertEqual(json.loads(result.output), {"applied": 1, "version": 5, "entries": len(self.db.entries), "rules": 1})
+            self.assertEqual(mock_get.call_args.args[0], "https://example.invalid/feed")
+            # The community rule reaches the EXE rule engine without a restart
+            self.assertEqual([r.id for r in rule_set.engine().rules], ["fabrikam"])
+        self.assertEqual(self.db.get_switches_by_name("Fabrikam-Agent-Setup.exe"), ["-silent"])
+
+    def test_cli_pull_without_feed(self):
+        from click.testing import CliRunner
+        from switchcraft.cli.commands import cli
+
+        with patch("switchcraft.cli.commands.SwitchCraftConfig.get_value", return_value=None):
+            result = CliRunner().invoke(cli, ["community", "pull"])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("CommunityDBFeedUrl", result.output)
+
+    def test_legacy_format(self):
+        with open(self.db_path, "w", encoding="utf-8") as f:
+            json.dump({"hash_map": {}, "name_map": {"putty": ["/VERYSILENT"]}}, f)
+        db = CommunityDBService(db_path=self.db_path, journal_path=os.path.join(self.tmp_dir, "other.jsonl"))
+        self.assertEqual(db.get_switches_by_name("putty-64bit-0.80-installer.msi"), ["/VERYSILENT"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from switchcraft.utils.config import JsonFileBackend, RegistryBackend, SessionStoreBackend, SwitchCraftConfig
+
+HKLM = -2147483646
+HKCU = -2147483647
+
+
+class FakeRegistry:
+    """In-memory stand-in for the four hives RegistryBackend reads; counts lookups."""
+
+    def __init__(self):
+        self.values = {}
+        self.reads = 0
+        self._lock = threading.Lock()
+
+    def set(self, root, path, name, value):
+        self.values[(root, path, name)] = value
+
+    def read(self, root, path, name):
+        with self._lock:
+            self.reads += 1
+        return self.values.get((root, path, name))
+
+
+class FakeWatcher:
+    instances = []
+
+    def __init__(self, keys, on_change, on_error):
+        self.keys, self.on_change, self.on_error = keys, on_change, on_error
+        FakeWatcher.instances.append(self)
+
+    def start(self):
+        pass
+
+
+class TestRegistrySnapshot(unittest.TestCase):
+
+    def setUp(self):
+        winreg = MagicMock()
+        winreg.HKEY_LOCAL_MACHINE = HKLM
+        winreg.HKEY_CURRENT_USER = HKCU
+        FakeWatcher.instances = []
+        self.registry = FakeRegistry()
+        self.patchers = [
+            patch('sys.platform', 'win32'),
+            patch.dict(sys.modules, {'winreg': winreg}),
+            patch('switchcraft.utils.config.RegistryBackend._read_registry', side_effect=self.registry.read),
+            patch('switchcraft.utils.config._RegistryWatcher', FakeWatcher),
+        ]
+        for p in self.patchers:
+            p.start()
+        self.backend = RegistryBackend()
+
+    def tearDown(self):
+        for p in reversed(self.patchers):
+            p.stop()
+
+    def test_reads_are_served_from_snapshot(self):
+        self.registry.set(HKCU, RegistryBackend.PREFERENCE_PATH, "CompanyName", "Contoso")
+        self.assertEqual(self.backend.get_value("CompanyName"), "Contoso")
+        reads = self.registry.reads
+        for _ in range(100):
+            self.assertEqual(self.backend.get_value("CompanyName"), "Contoso")
+            self.assertEqual(self.backend.get_value("Missing", "dflt"), "dflt")
+        # Only the first lookup of "Missing" touched the registry
+        self.assertEqual(self.registry.reads, reads + 4)
+
+    def test_change_notification_invalidates(self):
+        self.registry.set(HKCU, RegistryBackend.PREFERENCE_PATH, "DebugMode", 0)
+        self.assertEqual(self.backend.get_value("DebugMode"), 0)
+        self.assertEqual(len(FakeWatcher.instances), 1)
+
+        # Policy deployed by GPO: invisible until the watcher fires
+        self.registry.set(HKLM, RegistryBackend.POLICY_PATH, "DebugMode", 1)
+        self.assertEqual(self.backend.get_value("DebugMode"), 0)
+        FakeWatcher.instances[0].on_change()
+        self.assertEqual(self.backend.get_value("DebugMode"), 1)
+        self.assertEqual(self.backend.get_value_with_source("DebugMode")["source"], "GPO (Local Machine)")
+
+    def test_set_value_invalidates(self):
+        self.assertIsNone(self.backend.get_value("UpdateChannel"))
+        self.registry.set(HKCU, RegistryBackend.PREFERENCE_PATH, "UpdateChannel", "beta")
+        self.backend.set_value("UpdateChannel", "beta")
+        self.assertEqual(self.backend.get_value("UpdateChannel"), "beta")
+
+    def test_secure_write_invalidates_after_keyring_write(self):
+        secrets = {"GraphClientSecret": "old"}
+
+        def write(service, name, value):
+            # A concurrent read lands while the keyring write is in flight
+            self.assertEqual(self.backend.get_secure_value(name), "old")
+            secrets[name] = value
+
+        keyring = MagicMock()
+        keyring.get_password.side_effect = lambda service, name: secrets.get(name)
+        keyring.set_password.side_effect = write
+        keyring.delete_password.side_effect = lambda service, name: secrets.pop(name)
+        with patch.dict(sys.modules, {"keyring": keyring}):
+            self.assertEqual(self.backend.get_secure_value("GraphClientSecret"), "old")
+            self.backend.set_secure_value("GraphClientSecret", "new")
+            self.assertEqual(self.backend.get_secure_value("GraphClientSecret"), "new")
+            self.backend.delete_secure_value("GraphClientSecret")
+            self.assertIsNone(self.backend.get_secure_value("GraphClientSecret"))
+
+    def test_watcher_failure_falls_back_to_ttl(self):
+        self.backend.get_value("X")
+        FakeWatcher.instances[0].on_error()
+        self.assertEqual(self.backend._snapshot.ttl, RegistryBackend.UNWATCHED_TTL)
+
+        self.backend._snapshot.ttl = 0
+        self.registry.set(HKCU, RegistryBackend.PREFERENCE_PATH, "X", "new")
+        self.assertEqual(self.backend.get_value("X"), "new")
+
+    def test_concurrent_reads(self):
+        self.registry.set(HKCU, RegistryBackend.PREFERENCE_PATH, "CompanyName", "Contoso")
+        errors = []
+
+        def reader():
+            for _ in range(500):
+                if self.backend.get_value("CompanyName") != "Contoso":
+                    errors.append("stale")
+
+        threads = [threading.Thread(target=reader) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for _ in range(20):
+            self.backend.invalidate()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+    def test_switchcraft_config_invalidate_cache(self):
+        SwitchCraftConfig.set_backend(self.backend)
+        try:
+            self.assertEqual(SwitchCraftConfig.get_company_name(), "")
+            self.registry.set(HKLM, RegistryBackend.POLICY_PATH, "CompanyName", "Fabrikam")
+            SwitchCraftConfig.invalidate_cache()
+            self.assertEqual(SwitchCraftConfig.get_company_name(), "Fabrikam")
+        finally:
+            SwitchCraftConfig.set_backend(None)
+
+
+class TestRegistryWatcherKeys(unittest.TestCase):
+    def test_missing_key_is_watched_through_parent_non_recursively(self):
+        from switchcraft.utils.config import _RegistryWatcher
+
+        existing = {r"Software", r"Software\Policies"}
+        advapi32, kernel32 = MagicMock(), MagicMock()
+        advapi32.RegOpenKeyExW.side_effect = lambda root, path, *args: 0 if path in existing else 2
+        advapi32.RegNotifyChangeKeyValue.return_value = 0
+        kernel32.CreateEventW.return_value = 1
+        kernel32.WaitForMultipleObjects.side_effect = RuntimeError("stop")
+        on_error = MagicMock()
+        watcher = _RegistryWatcher([(HKLM, r"Software\Policies\FaserF\SwitchCraft"), (HKCU, "Software")],
+                                   MagicMock(), on_error)
+        with patch("ctypes.WinDLL", side_effect=lambda name: advapi32 if name == "advapi32" else kernel32,
+                   create=True):
+            watcher.run()
+
+        on_error.assert_called_once()
+        opened = [c.args[1] for c in advapi32.RegOpenKeyExW.call_args_list if c.args[1] in existing]
+        self.assertEqual(opened, [r"Software\Policies", "Software"])
+        (parent, existing_key) = advapi32.RegNotifyChangeKeyValue.call_args_list
+        # Missing key: only subkeys of the nearest parent appearing, not the whole tree below it
+        self.assertEqual(parent.args[1:3], (False, _RegistryWatcher.REG_NOTIFY_CHANGE_NAME))
+        self.assertEqual(existing_key.args[1:3], (True, _RegistryWatcher.REG_NOTIFY_CHANGE_NAME |
+                                                  _RegistryWatcher.REG_NOTIFY_CHANGE_LAST_SET))
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestJsonFileReload(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(self.tmp_dir, "config.json")
+        self.interval_patcher = patch.object(JsonFileBackend, "RELOAD_CHECK_INTERVAL", 0)
+        self.interval_patcher.start()
+
+    def tearDown(self):
+        self.interval_patcher.stop()
+
+    def test_external_edit_is_picked_up(self):
+        backend = JsonFileBackend(self.path)
+        backend.set_value("CompanyName", "Contoso")
+        self.assertEqual(backend.get_value("CompanyName"), "Contoso")
+
+        # Another worker rewrites the file
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"CompanyName": "Fabrikam", "Extra": 1}, f)
+        self.assertEqual(backend.get_value("CompanyName"), "Fabrikam")
+        self.assertEqual(backend.get_value("Extra"), 1)
+
+    def test_own_write_does_not_reload(self):
+        backend = JsonFileBackend(self.path)
+        with patch.object(backend, "_load", wraps=backend._load) as load:
+            backend.set_value("A", 1)
+            self.assertEqual(backend.get_value("A"), 1)
+            load.assert_not_called()
+
+
+class TestLanguageBinding(unittest.TestCase):
+    def test_set_backend_binds_language_once(self):
+        from switchcraft.utils.i18n import i18n
+
+        def session():
+            backend = SessionStoreBackend(object())
+            backend.store["Language"] = "de"
+            with patch.object(backend, "get_value", wraps=backend.get_value) as get_value:
+                SwitchCraftConfig.set_backend(backend)
+                SwitchCraftConfig.set_backend(backend)
+                self.assertEqual(get_value.call_count, 1)
+            bound = i18n.language
+            SwitchCraftConfig.set_user_preference("Language", "en")
+            return bound, i18n.language
+
+        self.assertEqual(contextvars.copy_context().run(session), ("de", "en"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+try:
+    from .test_msi_database import build_msi, STR_KEY, STR, INT2, INT4
+except ImportError:
+    from tests.test_msi_database import build_msi, STR_KEY, STR, INT2, INT4
+
+from switchcraft.models import InstallerInfo
+from switchcraft.services.detection_rule_service import (
+    DetectionRuleSynthesizer, best_rule, PRODUCT_CODE_RULE, FILE_RULE, REGISTRY_RULE
+)
+from switchcraft.utils.msi_database import MsiDatabase
+
+PRODUCT_CODE = "{11111111-2222-3333-4444-555555555555}"
+
+TABLES = {
+    "Property": ([("Property", STR_KEY), ("Value", STR)], [
+        ("ProductName", "Contoso Tool"),
+        ("ProductVersion", "2.4.1"),
+        ("Manufacturer", "Contoso"),
+        ("ProductCode", PRODUCT_CODE),
+        ("UpgradeCode", "{AAAAAAAA-BBBB-CCCC-DDDD-EEEEEEEEEEEE}"),
+    ]),
+    "Directory": ([("Directory", STR_KEY), ("Directory_Parent", STR), ("DefaultDir", STR)], [
+        ("TARGETDIR", None, "SourceDir"),
+        ("ProgramFiles64Folder", "TARGETDIR", "."),
+        ("INSTALLDIR", "ProgramFiles64Folder", "CONTOSO|Contoso Tool"),
+        ("SystemFolder", "TARGETDIR", "."),
+    ]),
+    "Component": ([("Component", STR_KEY), ("ComponentId", STR), ("Directory_", STR), ("Attributes", INT2),
+                   ("Condition", STR), ("KeyPath", STR)], [
+        ("Main", "{C0000000-0000-0000-0000-000000000001}", "INSTALLDIR", 256, None, "tool.exe"),
+        ("Uninst", "{C0000000-0000-0000-0000-000000000002}", "INSTALLDIR", 256, None, "unins"),
+        ("Shared", "{C0000000-0000-0000-0000-000000000003}", "SystemFolder", 256, None, "dll"),
+    ]),
+    "File": ([("File", STR_KEY), ("Component_", STR), ("FileName", STR), ("FileSize", INT4),
+              ("Version", STR), ("Language", STR), ("Attributes", INT2), ("Sequence", INT2)], [
+        ("tool.exe", "Main", "CONTOS~1.EXE|ContosoTool.exe", 1000, "2.4.1.0", "0", 512, 1),
+        ("unins", "Uninst", "uninstall.exe", 100, "1.0.0.0", "0", 512, 2),
+        ("dll", "Shared", "msvcp140.dll", 100, "14.0.0.0", "0", 512, 3),
+    ]),
+    "Registry": ([("Registry", STR_KEY), ("Root", INT2), ("Key", STR), ("Name", STR), ("Value", STR),
+                  ("Component_", STR)], [
+        ("reg1", 2, "SOFTWARE\\[Manufacturer]\\[ProductName]", "Version", "[ProductVersion]", "Main"),
+        ("reg2", 1, "SOFTWARE\\Contoso", "User", "1", "Main"),
+        ("reg3", 2, "SOFTWARE\\[Unresolved]", "X", "1", "Main"),
+    ]),
+}
+
+
+class TestDetectionRuleSynthesizer(unittest.TestCase):
+    def setUp(self):
+        self.synth = DetectionRuleSynthesizer()
+        self.candidates = self.synth.candidates_from_msi(MsiDatabase(build_msi(TABLES)))
+
+    def test_product_code_ranks_first(self):
+        ranked = sorted(self.candidates, key=lambda c: -c.score)
+        self.assertEqual(ranked[0].rule["@odata.type"], PRODUCT_CODE_RULE)
+        self.assertEqual(ranked[0].rule["productVersion"], "2.4.1")
+        self.assertEqual(best_rule(self.candidates)["productCode"], PRODUCT_CODE)
+
+    def test_file_candidates_resolve_paths_and_rank_generic_files_lower(self):
+        files = [c for c in self.candidates if c.rule["@odata.type"] == FILE_RULE]
+        self.assertEqual(files[0].rule["path"], "%ProgramFiles%\\Contoso Tool")
+        self.assertEqual(files[0].rule["fileOrFolderName"], "ContosoTool.exe")
+        self.assertEqual(files[0].rule["comparisonValue"], "2.4.1.0")
+        self.assertFalse(files[0].rule["check32BitOn64System"])
+        by_name = {c.rule["fileOrFolderName"]: c.score for c in files}
+        self.assertLess(by_name["uninstall.exe"], by_name["ContosoTool.exe"])
+        self.assertLess(by_name["msvcp140.dll"], by_name["ContosoTool.exe"])
+
+    def test_registry_candidates_expand_properties(self):
+        regs = [c for c in self.candidates if c.rule["@odata.type"] == REGISTRY_RULE]
+        self.assertEqual(len(regs), 1)  # HKCU and unresolved keys are skipped
+        rule = regs[0].rule
+        self.assertEqual(rule["keyPath"], "HKEY_LOCAL_MACHINE\\SOFTWARE\\Contoso\\Contoso Tool")
+        self.assertEqual(rule["operationType"], "version")
+        self.assertEqual(rule["comparisonValue"], "2.4.1")
+
+    def test_test_args_match_detection_test(self):
+        msi = next(c for c in self.candidates if c.kind == "msi")
+        self.assertEqual(msi.test_args(), ["--type", "msi", "--product-code", PRODUCT_CODE])
+        self.assertIn("switchcraft detection test --type msi", msi.to_dict()["verify"])
+
+    def test_exe_candidates_are_low_confidence(self):
+        info = InstallerInfo(file_path="setup.exe", product_name="Contoso Tool", product_version="2.4.1")
+        candidates = self.synth.candidates_from_pe_info(info)
+        self.assertTrue(candidates)
+        self.assertTrue(all(c.score < 0.6 for c in candidates))
+        self.assertIsNone(best_rule(candidates))
+        self.assertTrue(candidates[0].rule["keyPath"].endswith("\\Uninstall\\Contoso Tool"))
+
+    @pytest.mark.usefixtures("tmp_dir")
+    def test_synthesize_folder(self):
+        for name in ("a.msi", "b.exe", "readme.txt"):
+            open(os.path.join(self.tmp_dir, name), "wb").close()
+        with patch.object(self.synth, "synthesize", side_effect=lambda p: [p.name]) as mock_synth:
+            results = self.synth.synthesize_folder(str(self.tmp_dir))
+        self.assertEqual(sorted(os.path.basename(p) for p in results), ["a.msi", "b.exe"])
+        self.assertEqual(mock_synth.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import json
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from switchcraft.analyzers import rules
+from switchcraft.analyzers.exe import ExeAnalyzer
+from switchcraft.services.community_db_service import CommunityDBService
+
+
+def _engine(*definitions, bundled=False):
+    pairs = [("bundled", d) for d in rules.load_rule_file(rules.BUNDLED_RULES_PATH)] if bundled else []
+    return rules.compile_rules(pairs + [("test", d) for d in definitions])
+
+
+def _pe(sections=(), version=None):
+    pe = MagicMock()
+    pe.sections = [MagicMock(Name=name.encode().ljust(8, b"\x00")) for name in sections]
+    entries = {k.encode(): v.encode() for k, v in (version or {}).items()}
+    pe.FileInfo = [[MagicMock(StringTable=[MagicMock(entries=entries)])]]
+    return pe
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestRuleEngine(unittest.TestCase):
+    def setUp(self):
+        self.count = 0
+
+    def _file(self, content: bytes, name: str = None) -> Path:
+        self.count += 1
+        path = self.tmp_dir / (name or f"setup{self.count}.exe")
+        path.write_bytes(content)
+        return path
+
+    def _ids(self, engine, path, pe=None):
+        return [m.rule.id for m in engine.evaluate(path, pe)]
+
+    def test_bundled_rules_compile(self):
+        definitions = rules.load_rule_file(rules.BUNDLED_RULES_PATH)
+        engine = _engine(bundled=True)
+        self.assertEqual(len(engine.rules), len(definitions))
+        self.assertEqual(engine.rules[0].id, "nsis")
+
+    def test_ties_keep_file_order(self):
+        engine = _engine(bundled=True)
+        path = self._file(b"MZ" + b"\0" * 100 + b"InstallShield ... NVIDIA Corporation")
+        self.assertEqual(self._ids(engine, path)[:2], ["installshield", "nvidia"])
+
+    def test_more_evidence_scores_higher(self):
+        engine = _engine(bundled=True)
+        # NSIS section and marker outrank a single vendor string earlier in the file
+        path = self._file(b"MZ Lenovo " + b"\0" * 50 + b"NullsoftInst")
+        matches = engine.evaluate(path, _pe([".text", ".ndata"]))
+        self.assertEqual((matches[0].rule.id, matches[0].score), ("nsis", 2.0))
+        self.assertIn("lenovo", [m.rule.id for m in matches])
+
+    def test_weighted_custom_rule_beats_framework(self):
+        engine = _engine({
+            "id": "contoso", "installer_type": "Contoso Setup", "install_switches": ["/quiet"],
+            "conditions": [{"marker": "Contoso Bootstrapper", "weight": 3}],
+        }, bundled=True)
+        path = self._file(b"MZ NullsoftInst Contoso Bootstrapper")
+        self.assertEqual(self._ids(engine, path)[:2], ["contoso", "nsis"])
+
+    def test_marker_window_encoding_and_overlap(self):
+        engine = _engine(
+            {"id": "near", "installer_type": "Near", "conditions": [{"marker": "Needle", "within": 64}]},
+            {"id": "wide", "installer_type": "Wide", "conditions": [{"marker": "Wide", "encoding": "utf-16le"}]},
+            {"id": "long", "installer_type": "Long", "conditions": [{"marker": "Intel Setup"}]},
+            {"id": "overlap", "installer_type": "Overlap", "conditions": [{"marker": "Setup Factory"}]},
+            {"id": "short", "installer_type": "Short", "conditions": [{"marker": "Set"}]},
+        )
+        self.assertEqual(self._ids(engine, self._file(b"x" * 10 + b"Needle")), ["near"])
+        self.assertEqual(self._ids(engine, self._file(b"x" * 100 + b"Needle")), [])
+        self.assertEqual(self._ids(engine, self._file("Wide".encode("utf-16-le"))), ["wide"])
+        self.assertEqual(self._ids(engine, self._file(b"Wide")), [])
+        self.assertEqual(self._ids(engine, self._file(b"Intel Setup Factory")), ["long", "overlap", "short"])
+
+    def test_offsets_and_hex(self):
+        engine = _engine(
+            {"id": "magic", "installer_type": "Magic", "conditions": [{"hex": "4d5a9000", "at": 0}]},
+            {"id": "trailer", "installer_type": "Trailer", "conditions": [{"marker": "END!", "at": -4}]},
+        )
+        self.assertEqual(self._ids(engine, self._file(b"MZ\x90\x00" + b"\0" * 64 + b"END!")), ["magic", "trailer"])
+        self.assertEqual(self._ids(engine, self._file(b"xMZ\x90\x00END!x")), [])
+
+    def test_filename_version_and_section(self):
+        engine = _engine(
+            {"id": "name", "installer_type": "Name", "conditions": [{"filename": r"^contoso-.*\.exe$"}]},
+            {"id": "vendor", "installer_type": "Vendor",
+             "conditions": [{"version": "Contoso", "field": "CompanyName"}]},
+            {"id": "section", "installer_type": "Section", "conditions": [{"section": [".boot", ".wixburn"]}]},
+        )
+        path = self._file(b"MZ", name="Contoso-Agent.exe")
+        self.assertEqual(self._ids(engine, path), ["name"])
+        pe = _pe([".text", ".wixburn"], {"CompanyName": "Contoso Ltd", "ProductName": "Agent"})
+        self.assertEqual(self._ids(engine, self._file(b"MZ"), pe), ["vendor", "section"])
+        self.assertEqual(self._ids(engine, self._file(b"MZ"), _pe([], {"ProductName": "Contoso"})), [])
+
+    def test_groups_and_min_score(self):
+        engine = _engine({
+            "id": "both", "installer_type": "Both", "min_score": 2,
+            "conditions": [{"marker": "Alpha"}, {"any": [{"marker": "Beta"}, {"marker": "Gamma"}], "min": 2}],
+        })
+        self.assertEqual(self._ids(engine, self._file(b"Alpha Beta")), [])
+        self.assertEqual(self._ids(engine, self._file(b"Alpha Beta Gamma")), ["both"])
+
+    def test_overrides_and_invalid_rules(self):
+        with self.assertLogs("switchcraft.analyzers.rules", level="WARNING"):
+            engine = _engine(
+                {"id": "nvidia", "enabled": False},
+                {"id": "inno", "installer_type": "Inno (custom)", "conditions": [{"marker": "Inno Setup"}]},
+                {"id": "broken", "installer_type": "Broken", "conditions": [{"marker": "x", "encoding": "ebcdic"}]},
+                {"id": "empty", "installer_type": "Empty", "conditions": []},
+                bundled=True,
+            )
+        ids = [r.id for r in engine.rules]
+        self.assertNotIn("nvidia", ids)
+        self.assertNotIn("broken", ids)
+        self.assertNotIn("empty", ids)
+        self.assertEqual(ids.index("inno"), 1)  # replaced in place
+        self.assertEqual(engine.rules[1].installer_type, "Inno (custom)")
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestRuleSources(unittest.TestCase):
+    def setUp(self):
+        self.user_dir = self.tmp_dir / "rules"
+        self.user_dir.mkdir()
+
+    def test_user_rules_hot_reload(self):
+        rule_set = rules.RuleSet(user_dir=self.user_dir)
+        with patch.object(rules, "RELOAD_CHECK_SECONDS", 0):
+            first = rule_set.engine()
+            self.assertIs(rule_set.engine(), first)  # unchanged sources keep the compiled engine
+
+            (self.user_dir / "contoso.json").write_text(json.dumps({"rules": [
+                {"id": "contoso", "installer_type": "Contoso Setup", "conditions": [{"marker": "Contoso"}]},
+            ]}), encoding="utf-8")
+            self.assertIn("contoso", [r.id for r in rule_set.engine().rules])
+
+            (self.user_dir / "contoso.json").write_text("not json", encoding="utf-8")
+            with self.assertLogs("switchcraft.analyzers.rules", level="ERROR"):
+                engine = rule_set.engine()
+            self.assertNotIn("contoso", [r.id for r in engine.rules])
+            self.assertEqual(len(engine.rules), len(first.rules))
+
+    def test_community_rules(self):
+        db_path = self.tmp_dir / "switches.json"
+        db_path.write_text("[]", encoding="utf-8")
+        db = CommunityDBService(db_path=db_path, journal_path=self.tmp_dir / "communitydb.jsonl")
+        rule_set = rules.RuleSet(bundled_path=None, user_dir=self.user_dir, community_db=db)
+        with patch.object(rules, "RELOAD_CHECK_SECONDS", 0):
+            self.assertEqual(rule_set.engine().rules, [])
+
+            db.apply_delta({"version": 1, "upserts": [{
+                "id": "fabrikam-rule",
+                "rule": {"installer_type": "Fabrikam Installer", "install_switches": ["-silent"],
+                         "conditions": [{"marker": "Fabrikam"}]},
+            }]})
+            engine = rule_set.engine()
+            self.assertEqual([(r.id, r.source) for r in engine.rules], [("fabrikam-rule", "community")])
+
+            db.apply_delta({"version": 2, "deletes": ["fabrikam-rule"]})
+            self.assertEqual(rule_set.engine().rules, [])
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestExeAnalyzerRules(unittest.TestCase):
+    def test_corpus_families(self):
+        from switchcraft.benchmarks import corpus
+
+        expected = {
+            "nsis": "NSIS", "inno": "Inno Setup", "installshield": "InstallShield",
+            "wix": "WiX Burn Bundle", "7zsfx": "7-Zip SFX", "plain": "Unknown EXE",
+        }
+        for family, installer_type in expected.items():
+            sections, markers = corpus.PE_FAMILIES[family]
+            path = self.tmp_dir / f"{family}.exe"
+            corpus.write_pe(path, 256 * 1024, sections, [("head", m) for m in markers])
+            with self.subTest(family=family):
+                # The random filler may contain switch-like bytes, so "plain" is only checked by prefix
+                self.assertTrue(ExeAnalyzer().analyze(path).installer_type.startswith(installer_type))
+
+    def test_rule_switches_and_confidence(self):
+        from switchcraft.benchmarks import corpus
+
+        path = self.tmp_dir / "vc_redist.x64.exe"
+        corpus.write_pe(path, 64 * 1024)
+        info = ExeAnalyzer().analyze(path)
+        self.assertEqual(info.installer_type, "Visual C++ Redistributable")
+        self.assertEqual(info.install_switches, ["/quiet", "/norestart"])
+        self.assertEqual(info.confidence, 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
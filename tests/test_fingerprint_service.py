@@ -0,0 +1,75 @@
+import hashlib
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from switchcraft.services.fingerprint_service import FingerprintService
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestFingerprintService(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(self.tmp_dir, "setup.exe")
+        self.data = os.urandom(300 * 1024)
+        with open(self.path, "wb") as f:
+            f.write(self.data)
+        self.service = FingerprintService()
+
+    def test_fingerprint_is_computed_once(self):
+        with patch.object(self.service, "_compute", wraps=self.service._compute) as mock_compute:
+            fp = self.service.fingerprint(self.path)
+            self.assertEqual(self.service.sha256(self.path), fp.sha256)
+            self.assertEqual(mock_compute.call_count, 1)
+        self.assertEqual(fp.sha256, hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(fp.size, len(self.data))
+        self.assertEqual(fp.quick_hash, self.service.quick_fingerprint(self.path).quick_hash)
+
+    def test_changed_file_is_rehashed(self):
+        first = self.service.fingerprint(self.path)
+        with open(self.path, "ab") as f:
+            f.write(b"tail")
+        second = self.service.fingerprint(self.path)
+        self.assertNotEqual(first.sha256, second.sha256)
+        self.assertNotEqual(first.quick_hash, second.quick_hash)
+
+    def test_concurrent_requests_share_one_pass(self):
+        calls = []
+        original = self.service._compute
+
+        def slow_compute(path, st):
+            calls.append(1)
+            return original(path, st)
+
+        with patch.object(self.service, "_compute", side_effect=slow_compute):
+            threads = [threading.Thread(target=self.service.fingerprint, args=(self.path,)) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(5)
+        self.assertEqual(len(calls), 1)
+
+    def test_read_head_shares_one_read(self):
+        import builtins
+        real_open = builtins.open
+        opens = []
+
+        def counting_open(*args, **kwargs):
+            opens.append(args[0])
+            return real_open(*args, **kwargs)
+
+        with patch("builtins.open", side_effect=counting_open):
+            self.assertEqual(self.service.read_head(self.path, 4096), self.data[:4096])
+            self.assertEqual(self.service.read_head(self.path, 200 * 1024), self.data[:200 * 1024])
+            # Larger than the file: cached copy is already complete
+            self.assertEqual(self.service.read_head(self.path, 5 * 1024 * 1024), self.data)
+        self.assertEqual(len(opens), 1)
+
+    def test_missing_file(self):
+        self.assertIsNone(self.service.sha256(os.path.join(self.tmp_dir, "missing.exe")))
+
+
+if __name__ == '__main__':
+    unittest.main()
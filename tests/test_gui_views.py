@@ -191,3 +191,27 @@ def test_dashboard_view_renders(page):
     # Check that containers are properly configured
     assert view.chart_container.expand in [True, 1], "Chart container should expand"
     assert view.recent_container.width is not None or view.recent_container.expand in [True, 1], "Recent container should have size"
+
+def test_history_view_opens_trace_timeline(page):
+    """History entries with a trace side file can reopen the analysis timeline."""
+    from switchcraft.gui_modern.views.history_view import HistoryView
+    from switchcraft.utils import tracing
+
+    with tracing.start_trace("root") as trace:
+        with tracing.span("probe"):
+            pass
+
+    with patch("switchcraft.gui_modern.views.history_view.HistoryService") as mock_history, \
+         patch.object(HistoryView, "load_history"):
+        mock_history.return_value.load_trace.return_value = trace.to_otlp()
+        view = HistoryView(page)
+
+    row = view.create_row({"filename": "setup.exe", "trace_file": "trace.json"})
+    actions = row.cells[3].content.controls
+    assert [b.icon for b in actions] == [ft.Icons.PLAY_ARROW, ft.Icons.TIMELINE]
+    assert len(view.create_row({"filename": "old.exe"}).cells[3].content.controls) == 1
+
+    with patch.object(view, "_open_dialog_safe") as open_dialog:
+        view.show_trace({"filename": "setup.exe", "trace_file": "trace.json"})
+    dlg = open_dialog.call_args[0][0]
+    assert isinstance(dlg.content.content, ft.ExpansionTile)
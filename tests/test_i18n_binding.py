@@ -0,0 +1,65 @@
+import contextvars
+import unittest
+from unittest.mock import patch
+
+from switchcraft.utils.i18n import I18n, _parse_format
+from switchcraft.utils.config import SwitchCraftConfig
+
+
+class TestI18nBinding(unittest.TestCase):
+    def setUp(self):
+        self.i18n = I18n()
+        self.i18n.translations = {
+            "en": {"greeting": "Hello {name}", "only_en": "English only", "spec": "{count:>3} items"},
+            "de": {"greeting": "Hallo {name}"},
+        }
+        self.i18n._compile_catalogs()
+        self.i18n.language = "en"
+        # Start unbound, whatever earlier tests bound in this thread
+        self._token = self.i18n.bind_language(None)
+
+    def tearDown(self):
+        self.i18n.reset_language(self._token)
+
+    def test_lookup_does_not_read_config(self):
+        with patch.object(SwitchCraftConfig, "get_value") as get_value:
+            self.assertEqual(self.i18n.get("greeting", name="Ada"), "Hello Ada")
+            get_value.assert_not_called()
+
+    def test_english_fallback_precomputed(self):
+        self.assertEqual(self.i18n.get("only_en", lang="de"), "English only")
+        self.assertEqual(self.i18n.get("missing", default="x"), "x")
+        self.assertEqual(self.i18n.get("missing"), "missing")
+
+    def test_binding_is_per_context(self):
+        def session():
+            self.i18n.bind_language("de")
+            return self.i18n.get("greeting", name="Bob"), self.i18n.language
+
+        self.assertEqual(contextvars.copy_context().run(session), ("Hallo Bob", "de"))
+        # Binding stays inside the session's context
+        self.assertEqual(self.i18n.get("greeting", name="Bob"), "Hello Bob")
+        self.assertEqual(self.i18n.language, "en")
+
+        token = self.i18n.bind_language("xx")  # Unknown codes unbind
+        self.assertEqual(self.i18n.language, "en")
+        self.i18n.reset_language(token)
+
+    def test_explicit_lang_wins(self):
+        def session():
+            self.i18n.bind_language("de")
+            return self.i18n.get("greeting", lang="en", name="Eve")
+
+        self.assertEqual(contextvars.copy_context().run(session), "Hello Eve")
+
+    def test_format_cache(self):
+        self.assertEqual(_parse_format("Hello {name}"), (("Hello ", "name"),))
+        self.assertIsNone(_parse_format("{count:>3} items"))
+        self.assertEqual(self.i18n.get("spec", count=5), "  5 items")
+        # Missing argument keeps the raw template
+        self.assertEqual(self.i18n.get("greeting"), "Hello {name}")
+        self.assertEqual(self.i18n.get("greeting", other=1), "Hello {name}")
+
+
+if __name__ == '__main__':
+    unittest.main()
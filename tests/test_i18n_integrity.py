@@ -79,6 +79,15 @@ class TestI18nIntegrity(unittest.TestCase):
         # Heuristic pattern to find potential keys in string literals: "prefix_something"
         # We look for common prefixes like desc_, nav_, cat_, etc.
         heuristic_pattern = re.compile(r'[\'"]([a-z0-9]+_[a-z0-9_.-]+)[\'"]')
+        # Literals in these positions are data fields, never translation keys; they are blanked
+        # before the heuristic runs (explicit i18n.get calls are caught by get_pattern above)
+        non_i18n_patterns = [
+            re.compile(r'(?<=[\w)\]])\[\s*[\'"][^\'"\n]*[\'"]\s*\]'),  # subscripts: row["start"]
+            re.compile(r'(?<!i18n)\.get\(\s*[\'"][^\'"\n]*[\'"]'),  # dict lookups: entry.get("field")
+            re.compile(r'(?<=[{,])\s*[\'"][^\'"\n]*[\'"]\s*:'),  # dict keys: {"field": value}
+            re.compile(r'\b(?:get|has|set)attr\([^,()]+,\s*[\'"][^\'"\n]*[\'"]'),  # getattr(obj, "attr")
+            re.compile(r'__slots__\s*=\s*\([^)]*\)'),  # attribute names: __slots__ = ("start",)
+        ]
 
         found_keys = set()
 
@@ -100,6 +109,8 @@ class TestI18nIntegrity(unittest.TestCase):
                                 found_keys.add(m)
 
                             # 2. Heuristic: catch things that look like keys in any string literal
+                            for pattern in non_i18n_patterns:
+                                content = pattern.sub("", content)
                             for m in heuristic_pattern.findall(content):
                                 # Only add if it starts with a known prefix
                                 match_prefix = m.split("_")[0] + "_"
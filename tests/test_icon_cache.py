@@ -0,0 +1,87 @@
+import base64
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from switchcraft.services.icon_cache_service import IconCacheService
+
+
+def make_png(size):
+    from PIL import Image
+    import io
+    out = io.BytesIO()
+    Image.new("RGBA", (size, size), (255, 0, 0, 255)).save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestIconCacheService(unittest.TestCase):
+    def setUp(self):
+        self.cache = IconCacheService(cache_dir=self.tmp_dir, size=32, max_workers=2)
+
+    def tearDown(self):
+        self.cache.shutdown()
+
+    def test_thumbnail_is_downscaled_and_cached(self):
+        pytest.importorskip("PIL")
+        from PIL import Image
+        import io
+        b64 = base64.b64encode(make_png(512)).decode()
+
+        thumb = self.cache.get_thumbnail("app1", b64)
+        with Image.open(io.BytesIO(thumb)) as img:
+            self.assertLessEqual(max(img.size), 32)
+        self.assertEqual(len(os.listdir(self.tmp_dir)), 1)
+
+        with patch.object(self.cache, "_make_thumbnail") as mock_make:
+            self.assertEqual(self.cache.get_thumbnail("app1", b64), thumb)
+            mock_make.assert_not_called()
+
+    def test_disk_cache_survives_new_instance(self):
+        pytest.importorskip("PIL")
+        data = make_png(128)
+        thumb = self.cache.get_thumbnail("app1", data)
+        other = IconCacheService(cache_dir=self.tmp_dir, size=32)
+        try:
+            with patch.object(other, "_make_thumbnail") as mock_make:
+                self.assertEqual(other.get_thumbnail("app1", data), thumb)
+                mock_make.assert_not_called()
+        finally:
+            other.shutdown()
+
+    def test_without_pillow_large_icons_are_dropped(self):
+        with patch.dict(sys.modules, {"PIL": None}):
+            self.assertEqual(self.cache.get_thumbnail("small", b"tiny-icon"), b"tiny-icon")
+            self.assertIsNone(self.cache.get_thumbnail("big", b"x" * (IconCacheService.MAX_PASSTHROUGH_BYTES + 1)))
+
+    def test_request_coalesces_concurrent_loads(self):
+        release = threading.Event()
+        calls = []
+        results = []
+        done = threading.Event()
+
+        def loader():
+            calls.append(1)
+            release.wait(5)
+            return b"icon"
+
+        def callback(thumb):
+            results.append(thumb)
+            if len(results) == 3:
+                done.set()
+
+        with patch.dict(sys.modules, {"PIL": None}):
+            for _ in range(3):
+                self.cache.request("app1", loader, callback)
+            release.set()
+            self.assertTrue(done.wait(5))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b"icon"] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
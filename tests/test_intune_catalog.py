@@ -0,0 +1,112 @@
+import os
+import unittest
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from switchcraft.services.intune_catalog_service import IntuneCatalogService
+
+
+class FakeGraph:
+    """Minimal stand-in for IntuneService.iter_apps/get_app_icon."""
+
+    def __init__(self, apps, support_filter=True):
+        self.apps = {a["id"]: a for a in apps}
+        self.support_filter = support_filter
+        self.calls = []
+        self.icon_calls = 0
+
+    def iter_apps(self, token, filter_query=None, select=None, page_size=999):
+        self.calls.append((filter_query, select))
+        if filter_query:
+            if not self.support_filter:
+                raise requests.exceptions.HTTPError("400 Bad Request")
+            watermark = filter_query.split(" gt ")[1]
+            items = [a for a in self.apps.values() if a["lastModifiedDateTime"] > watermark]
+        else:
+            items = list(self.apps.values())
+        if select == "id":
+            items = [{"id": a["id"]} for a in items]
+        return iter(items)
+
+    def get_app_icon(self, token, app_id):
+        self.icon_calls += 1
+        return {"type": "image/png", "value": "aWNvbg=="}
+
+
+def app(app_id, name, modified, publisher="Contoso"):
+    return {"id": app_id, "displayName": name, "publisher": publisher,
+            "lastModifiedDateTime": modified, "largeIcon": {"value": "big"}}
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestIntuneCatalogService(unittest.TestCase):
+    def setUp(self):
+        self.graph = FakeGraph([
+            app("1", "Google Chrome", "2024-01-01T00:00:00Z", "Google"),
+            app("2", "7-Zip", "2024-01-02T00:00:00Z"),
+        ])
+        self.catalog = IntuneCatalogService("tenant", intune_service=self.graph,
+                                            db_path=os.path.join(self.tmp_dir, "catalog.db"))
+
+    def tearDown(self):
+        self.catalog.close()
+
+    def test_initial_sync_is_full_and_strips_icons(self):
+        self.assertFalse(self.catalog.is_populated())
+        stats = self.catalog.sync("token")
+        self.assertEqual(stats["upserted"], 2)
+        self.assertTrue(self.catalog.is_populated())
+        self.assertEqual(self.graph.calls, [(None, None)])
+        self.assertNotIn("largeIcon", self.catalog.get_app("1"))
+
+    def test_incremental_sync_uses_watermark_and_detects_deletes(self):
+        self.catalog.sync("token")
+        self.graph.calls.clear()
+
+        self.graph.apps["2"] = app("2", "7-Zip 23", "2024-02-01T00:00:00Z")
+        self.graph.apps["3"] = app("3", "Notepad++", "2024-02-02T00:00:00Z")
+        del self.graph.apps["1"]
+
+        stats = self.catalog.sync("token")
+        self.assertEqual(self.graph.calls[0], ("lastModifiedDateTime gt 2024-01-02T00:00:00Z", None))
+        self.assertEqual(stats, {"upserted": 2, "deleted": 1})
+        self.assertEqual([a["displayName"] for a in self.catalog.search()], ["7-Zip 23", "Notepad++"])
+
+    def test_fallback_when_filter_unsupported(self):
+        self.graph.support_filter = False
+        self.catalog.sync("token")
+        self.graph.apps["3"] = app("3", "Notepad++", "2024-02-02T00:00:00Z")
+        stats = self.catalog.sync("token")
+        # Only the new app is rewritten
+        self.assertEqual(stats["upserted"], 1)
+        self.assertEqual(self.catalog.count(), 3)
+
+    def test_local_search(self):
+        self.catalog.sync("token")
+        self.assertEqual([a["id"] for a in self.catalog.search("chrome")], ["1"])
+        self.assertEqual([a["id"] for a in self.catalog.search("GOOGLE")], ["1"])
+        self.assertEqual(self.catalog.search("%"), [])
+
+    def test_icon_fetched_lazily_once(self):
+        self.catalog.sync("token")
+        self.assertEqual(self.catalog.get_icon("token", "1")["value"], "aWNvbg==")
+        self.catalog.get_icon("token", "1")
+        self.assertEqual(self.graph.icon_calls, 1)
+
+    def test_concurrent_sync_is_collapsed(self):
+        self.catalog._sync_lock.acquire()
+        try:
+            self.assertEqual(self.catalog.sync("token").get("skipped"), 1)
+        finally:
+            self.catalog._sync_lock.release()
+
+    def test_upsert_app(self):
+        self.catalog.sync("token")
+        self.catalog.upsert_app({"id": "1", "displayName": "Chrome Enterprise", "largeIcon": MagicMock()})
+        self.assertEqual(self.catalog.get_app("1")["displayName"], "Chrome Enterprise")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -275,3 +275,18 @@ def test_intune_search_timeout_mechanism(mock_page, mock_intune_service):
         search_blocker.set()
     finally:
         threading.Thread = original_thread
+
+
+def test_inline_icons_coalesce_by_content(mock_page, mock_intune_service):
+    """Inline icons of apps without an id must not share one icon cache key."""
+    from switchcraft.gui_modern.views.intune_store_view import ModernIntuneStoreView
+
+    view = ModernIntuneStoreView(mock_page)
+    with patch('switchcraft.gui_modern.views.intune_store_view.get_icon_cache') as get_cache:
+        for value in ("aWNvbi1h", "aWNvbi1i", "aWNvbi1h"):
+            view._load_icon({"largeIcon": {"type": "image/png", "value": value}}, 32, lambda img: None)
+
+    keys = [c.args[0] for c in get_cache.return_value.request.call_args_list]
+    assert len(keys) == 3
+    assert keys[0] != keys[1]
+    assert keys[0] == keys[2]
@@ -0,0 +1,138 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from switchcraft.server.job_queue import (
+    LEASE_SECONDS, MAX_ATTEMPTS, JobQueue, JobRunner
+)
+from switchcraft.controllers.analysis_controller import AnalysisResult
+from switchcraft.models import InstallerInfo
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class QueueTestCase(unittest.TestCase):
+    def setUp(self):
+        self.db = self.tmp_dir / "jobs.db"
+        self.queue = JobQueue(self.db)
+
+    def tearDown(self):
+        self.queue.close()
+
+
+class TestJobQueue(QueueTestCase):
+    def test_priority_then_submission_order(self):
+        low = self.queue.submit("alice", {"path": "a"}, priority=1)
+        high = self.queue.submit("bob", {"path": "b"}, priority=7)
+        low2 = self.queue.submit("carol", {"path": "c"}, priority=1)
+        order = [self.queue.claim("w")["id"] for _ in range(3)]
+        self.assertEqual(order, [high["id"], low["id"], low2["id"]])
+        self.assertIsNone(self.queue.claim("w"))
+        self.assertEqual(self.queue.submit("x", {}, priority=99)["priority"], 9)
+
+    def test_per_user_limit(self):
+        for i in range(3):
+            self.queue.submit("alice", {"path": str(i)})
+        bob = self.queue.submit("bob", {"path": "b"})
+        first = self.queue.claim("w", user_limit=1)
+        self.assertEqual(first["owner"], "alice")
+        # Alice is at her limit, so Bob's later job goes next
+        self.assertEqual(self.queue.claim("w", user_limit=1)["id"], bob["id"])
+        self.assertIsNone(self.queue.claim("w", user_limit=1))
+        self.queue.complete(first["id"], {"ok": True})
+        self.assertEqual(self.queue.claim("w", user_limit=1)["owner"], "alice")
+
+    def test_complete_fail_cancel(self):
+        job = self.queue.submit("alice", {"path": "a"})
+        queued = self.queue.submit("alice", {"path": "b"})
+        self.queue.claim("w")
+        self.assertFalse(self.queue.cancel(job["id"]))
+        self.queue.update_progress(job["id"], 0.5, "Extracting")
+        self.assertEqual(self.queue.get(job["id"])["message"], "Extracting")
+        self.queue.complete(job["id"], {"info": {"installer_type": "MSI"}})
+        done = self.queue.get(job["id"])
+        self.assertEqual((done["status"], done["progress"]), ("done", 1.0))
+        self.assertEqual(done["result"]["info"]["installer_type"], "MSI")
+
+        self.assertTrue(self.queue.cancel(queued["id"]))
+        self.assertEqual(self.queue.get(queued["id"])["status"], "cancelled")
+        self.assertEqual([j["status"] for j in self.queue.list(owner="alice")], ["cancelled", "done"])
+
+    def test_jobs_survive_restart(self):
+        queued = self.queue.submit("alice", {"path": "a"})
+        running = self.queue.submit("alice", {"path": "b"}, priority=5)
+        self.queue.claim("w")
+        self.queue.close()
+
+        restarted = JobQueue(self.db)
+        try:
+            self.assertEqual(restarted.get(queued["id"])["status"], "queued")
+            self.assertEqual(restarted.requeue_stale(), 0)  # lease still valid
+            with patch("switchcraft.server.job_queue.time.time", return_value=time.time() + LEASE_SECONDS + 1):
+                self.assertEqual(restarted.requeue_stale(), 1)
+            again = restarted.claim("w2")
+            self.assertEqual((again["id"], again["attempts"]), (running["id"], 2))
+        finally:
+            restarted.close()
+
+    def test_job_failed_after_max_attempts(self):
+        job = self.queue.submit("alice", {"path": "a"})
+        for _ in range(MAX_ATTEMPTS):
+            self.queue.claim("w")
+            with patch("switchcraft.server.job_queue.time.time", return_value=time.time() + LEASE_SECONDS + 1):
+                self.queue.requeue_stale()
+        self.assertEqual(self.queue.get(job["id"])["status"], "failed")
+
+
+def echo_target(db_path, job_id, payload):
+    if payload.get("boom"):
+        raise RuntimeError("analysis crashed")
+    return {"info": {"file_path": payload["path"]}, "error": None}
+
+
+class TestJobRunner(QueueTestCase):
+    def test_runs_jobs_and_cleans_up_uploads(self):
+        upload = self.tmp_dir / "setup.exe"
+        upload.write_bytes(b"MZ")
+        ok = self.queue.submit("alice", {"path": str(upload), "cleanup": True})
+        bad = self.queue.submit("alice", {"path": "x", "boom": True})
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            runner = JobRunner(self.queue, workers=2, job_target=echo_target, executor=pool)
+            self.assertEqual(runner.dispatch_once(), 2)
+            finished = self.queue.wait(ok["id"], timeout=5, interval=0.01)
+            self.queue.wait(bad["id"], timeout=5, interval=0.01)
+
+        self.assertEqual(finished["status"], "done")
+        self.assertEqual(finished["result"]["info"]["file_path"], str(upload))
+        self.assertFalse(upload.exists())
+        failed = self.queue.get(bad["id"])
+        self.assertEqual((failed["status"], failed["error"]), ("failed", "analysis crashed"))
+        self.assertEqual(runner.in_flight(), [])
+
+    def test_dispatch_respects_pool_size(self):
+        for i in range(3):
+            self.queue.submit(f"user{i}", {"path": str(i)})
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            runner = JobRunner(self.queue, workers=1, job_target=lambda *a: time.sleep(0.2) or {}, executor=pool)
+            self.assertEqual(runner.dispatch_once(), 1)
+            self.assertEqual(len(self.queue.list(status="queued")), 2)
+
+
+class TestResultSerialization(unittest.TestCase):
+    def test_round_trip(self):
+        nested = {"nested_executables": [{"name": "inner.msi", "analysis": InstallerInfo("inner.msi", "MSI")}]}
+        result = AnalysisResult(info=InstallerInfo("setup.exe", "Inno Setup", install_switches=["/VERYSILENT"]),
+                                winget_id="Vendor.App", nested_data=nested)
+        data = result.to_dict()
+        self.assertEqual(data["nested_data"]["nested_executables"][0]["analysis"]["installer_type"], "MSI")
+        restored = AnalysisResult.from_dict(data)
+        self.assertEqual(restored.info.install_switches, ["/VERYSILENT"])
+        self.assertEqual(restored.winget_id, "Vendor.App")
+        self.assertIsInstance(restored.nested_data["nested_executables"][0]["analysis"], InstallerInfo)
+
+
+if __name__ == '__main__':
+    unittest.main()
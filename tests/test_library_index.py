@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+import unittest
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from switchcraft.services import library_index_service
+from switchcraft.services.library_index_service import LibraryIndexService, read_intunewin_metadata
+
+DETECTION_XML = """<?xml version="1.0" encoding="utf-8"?>
+<ApplicationInfo>
+  <Name>{name}</Name>
+  <SetupFile>setup.msi</SetupFile>
+  <MsiInfo>
+    <MsiProductCode>{code}</MsiProductCode>
+    <MsiProductVersion>{version}</MsiProductVersion>
+  </MsiInfo>
+</ApplicationInfo>
+"""
+
+
+def make_intunewin(path, name, code="{11111111-2222-3333-4444-555555555555}", version="1.0.0"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("IntuneWinPackage/Metadata/Detection.xml", DETECTION_XML.format(name=name, code=code, version=version))
+        zf.writestr("IntuneWinPackage/Contents/IntunePackage.intunewin", b"\0" * 16)
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestLibraryIndexService(unittest.TestCase):
+    def setUp(self):
+        self.root = os.path.join(self.tmp_dir, "packages")
+        self.index = LibraryIndexService(db_path=os.path.join(self.tmp_dir, "index.db"))
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_read_metadata(self):
+        path = os.path.join(self.root, "app.intunewin")
+        make_intunewin(path, "My App", version="2.1")
+        meta = read_intunewin_metadata(path)
+        self.assertEqual(meta["name"], "My App")
+        self.assertEqual(meta["setup_file"], "setup.msi")
+        self.assertEqual(meta["product_version"], "2.1")
+
+    def test_scan_is_recursive_and_uncapped(self):
+        for i in range(30):
+            make_intunewin(os.path.join(self.root, f"vendor{i}", "deep", "x", f"app{i}.intunewin"), f"App {i}")
+
+        stats = self.index.scan([self.root])
+        self.assertEqual(stats["added"], 30)
+        self.assertEqual(self.index.count(), 30)
+        self.assertEqual(len(self.index.query()), 30)
+
+    def test_incremental_scan_only_rereads_changed(self):
+        a = os.path.join(self.root, "a.intunewin")
+        b = os.path.join(self.root, "b.intunewin")
+        make_intunewin(a, "Alpha")
+        make_intunewin(b, "Beta")
+        self.index.scan([self.root])
+
+        with patch("switchcraft.services.library_index_service.read_intunewin_metadata") as mock_read:
+            stats = self.index.scan([self.root])
+            mock_read.assert_not_called()
+        self.assertEqual(stats["unchanged"], 2)
+
+        make_intunewin(b, "Beta Renamed")
+        os.utime(b, (time.time() + 10, time.time() + 10))
+        os.remove(a)
+        stats = self.index.scan([self.root])
+        self.assertEqual(stats["updated"], 1)
+        self.assertEqual(stats["removed"], 1)
+        self.assertEqual([i["name"] for i in self.index.query()], ["Beta Renamed"])
+
+    def test_query_filters(self):
+        make_intunewin(os.path.join(self.root, "chrome.intunewin"), "Google Chrome",
+                       code="{AAAAAAAA-0000-0000-0000-000000000001}", version="120.0")
+        make_intunewin(os.path.join(self.root, "zip.intunewin"), "7-Zip",
+                       code="{BBBBBBBB-0000-0000-0000-000000000002}", version="22.01")
+        broken = os.path.join(self.root, "broken.intunewin")
+        with open(broken, "wb") as f:
+            f.write(b"not a zip")
+        self.index.scan([self.root])
+
+        self.assertEqual(self.index.count(), 3)
+        self.assertEqual([i["filename"] for i in self.index.query(text="CHROME")], ["chrome.intunewin"])
+        self.assertEqual([i["name"] for i in self.index.query(name="zip")], ["7-Zip"])
+        self.assertEqual([i["name"] for i in self.index.query(version="22.01")], ["7-Zip"])
+        self.assertEqual([i["name"] for i in self.index.query(product_code="aaaaaaaa-0000-0000-0000-000000000001")],
+                         ["Google Chrome"])
+        self.assertIsNotNone(self.index.get(broken)["error"])
+        self.assertEqual(self.index.query(text="%"), [])
+
+    def test_query_restricted_to_dirs(self):
+        other = os.path.join(self.tmp_dir, "other")
+        make_intunewin(os.path.join(self.root, "a.intunewin"), "A")
+        make_intunewin(os.path.join(other, "b.intunewin"), "B")
+        self.index.scan([self.root, other])
+
+        self.assertEqual([i["name"] for i in self.index.query(dirs=[other])], ["B"])
+        self.assertEqual(self.index.count(dirs=[self.root]), 1)
+
+    def test_watchers_are_per_owner(self):
+        first, second = object(), object()
+        changed = {"first": threading.Event(), "second": threading.Event()}
+        self.index.start_watching([self.root], interval=0.05, on_change=lambda s: changed["first"].set(), owner=first)
+        self.index.start_watching([self.root], interval=0.05, on_change=lambda s: changed["second"].set(), owner=second)
+        self.index.stop_watching(first)
+
+        make_intunewin(os.path.join(self.root, "a.intunewin"), "A")
+        self.assertTrue(changed["second"].wait(5))
+        self.assertFalse(changed["first"].is_set())
+
+        self.index.close()
+        self.assertEqual(self.index._watchers, {})
+
+    def test_close_shared_instance(self):
+        with patch.object(LibraryIndexService, "_get_db_path", staticmethod(lambda: os.path.join(self.tmp_dir, "shared.db"))), \
+                patch.object(library_index_service, "_library_index_instance", None):
+            shared = library_index_service.get_library_index()
+            self.assertIs(library_index_service.get_library_index(), shared)
+            shared.start_watching([self.root], interval=60, owner=self)
+
+            library_index_service.close_library_index()
+            self.assertEqual(shared._watchers, {})
+            reopened = library_index_service.get_library_index()
+            self.assertIsNot(reopened, shared)
+            reopened.close()
+
+
+    def test_close_during_scan(self):
+        make_intunewin(os.path.join(self.root, "a.intunewin"), "A")
+        make_intunewin(os.path.join(self.root, "b.intunewin"), "B")
+        reading, release = threading.Event(), threading.Event()
+        build_row = self.index._build_row
+
+        def slow_build_row(path, st):
+            reading.set()
+            release.wait(5)
+            return build_row(path, st)
+
+        result = {}
+        with patch.object(self.index, "_build_row", side_effect=slow_build_row):
+            scan = threading.Thread(target=lambda: result.update(stats=self.index.scan([self.root])))
+            scan.start()
+            self.assertTrue(reading.wait(5))
+            self.index.close()
+            release.set()
+            scan.join(5)
+
+        self.assertFalse(scan.is_alive())
+        self.assertEqual(result["stats"]["removed"], 0)
+
+    def test_cli_scan_without_directories(self):
+        from click.testing import CliRunner
+        from switchcraft.cli.commands import cli
+
+        # No --dirs and no Downloads/Desktop folder: nothing is scanned or listed
+        with patch("switchcraft.cli.commands.Path.home", return_value=self.tmp_dir), \
+                patch.object(library_index_service, "get_library_index") as get_index, \
+                patch.object(library_index_service, "close_library_index"):
+            result = CliRunner().invoke(cli, ["library", "scan", "--json"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.output.strip(), "[]")
+        get_index.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import gzip
+import json
+import logging
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from switchcraft.utils import logging_handler
+from switchcraft.utils.logging_handler import SessionLogHandler
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestSessionLogHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = SessionLogHandler()
+        self.handler.setLevel(logging.DEBUG)
+        self.logger = logging.getLogger("switchcraft.test_session_log")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+
+    def _read_log(self):
+        self.handler.flush()
+        return self.handler.current_log_path.read_text(encoding="utf-8")
+
+    def test_records_written_by_listener(self):
+        self.handler.setup_file_logging(self.tmp_dir)
+        with patch("pathlib.Path.stat", side_effect=AssertionError("stat on hot path")):
+            for i in range(1000):
+                self.logger.debug("line %d", i)
+        content = self._read_log()
+        self.assertTrue(content.startswith("# SwitchCraft Log Session Started"))
+        self.assertIn("line 0", content)
+        self.assertIn("line 999", content)
+        self.assertEqual(content.count("DEBUG - line"), 1000)
+
+    def test_many_threads(self):
+        self.handler.setup_file_logging(self.tmp_dir)
+
+        def work(n):
+            for i in range(200):
+                self.logger.info("t%d-%d", n, i)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self._read_log().count(" - INFO - t"), 1600)
+
+    def test_exception_text_is_kept(self):
+        self.handler.setup_file_logging(self.tmp_dir)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.logger.exception("failed")
+        content = self._read_log()
+        self.assertIn("failed", content)
+        self.assertIn("ValueError: boom", content)
+
+    def test_rotation_uses_byte_counter(self):
+        self.handler.setup_file_logging(self.tmp_dir)
+        with patch.object(logging_handler, "MAX_LOG_SIZE_BYTES", 2000):
+            for i in range(100):
+                self.logger.info("x" * 50)
+            self.handler.flush()
+        bak = self.handler.current_log_path.with_suffix(".log.bak")
+        self.assertTrue(bak.exists())
+        self.assertLess(self.handler.current_log_path.stat().st_size, 2000)
+
+    def test_structured_sink(self):
+        self.handler.setup_file_logging(self.tmp_dir, structured=True)
+        self.logger.warning("disk %s", "full")
+        self.handler.close()
+        with gzip.open(self.handler.structured_log_path, "rt", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(entries[-1]["msg"], "disk full")
+        self.assertEqual(entries[-1]["level"], "WARNING")
+
+    def test_export_logs_flushes_queue(self):
+        self.handler.setup_file_logging(self.tmp_dir)
+        self.logger.info("before export")
+        target = os.path.join(self.tmp_dir, "export.log")
+        self.assertTrue(self.handler.export_logs(target))
+        with open(target, encoding="utf-8") as f:
+            self.assertIn("before export", f.read())
+
+    def test_level_filter(self):
+        self.handler.setup_file_logging(self.tmp_dir)
+        self.handler.file_level = logging.INFO
+        self.logger.debug("hidden")
+        self.logger.info("shown")
+        content = self._read_log()
+        self.assertNotIn("hidden", content)
+        self.assertIn("shown", content)
+
+    def test_other_handlers_see_unchanged_record(self):
+        self.handler.setup_file_logging(self.tmp_dir)
+        seen = []
+
+        class Capture(logging.Handler):
+            def emit(self, record):
+                seen.append((record.args, record.exc_info is not None))
+
+        capture = Capture()
+        self.logger.addHandler(capture)
+        try:
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                self.logger.exception("failed %s", "here")
+        finally:
+            self.logger.removeHandler(capture)
+        self.assertEqual(seen, [(("here",), True)])
+        self.assertIn("failed here", self._read_log())
+
+    def test_records_logged_before_shutdown_are_written(self):
+        # logging.shutdown() flushes and closes every handler created since `start`, newest
+        # first; a file handler registered by the session handler would be closed before
+        # the queue is drained
+        start = len(logging._handlerList)
+        handler = SessionLogHandler()
+        handler.setup_file_logging(self.tmp_dir)
+        self.logger.addHandler(handler)
+        for i in range(5):
+            self.logger.error("fatal %d", i)
+        self.logger.removeHandler(handler)
+        logging.shutdown(handlerList=logging._handlerList[start:])
+        self.assertEqual(handler.current_log_path.read_text(encoding="utf-8").count("ERROR - fatal"), 5)
+
+if __name__ == '__main__':
+    unittest.main()
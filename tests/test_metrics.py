@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import MagicMock
+
+from switchcraft.server.shared_store import MemoryStore
+from switchcraft.utils import metrics
+
+
+class TestMetricTypes(unittest.TestCase):
+    def setUp(self):
+        self.registry = metrics.MetricsRegistry()
+
+    def test_counter_and_gauge(self):
+        c = self.registry.counter("jobs_total", "Jobs", ["outcome"])
+        c.inc(outcome="ok")
+        c.inc(2, outcome="ok")
+        self.assertEqual(c.value(outcome="ok"), 3)
+        self.assertEqual(c.value(outcome="error"), 0)
+        with self.assertRaises(ValueError):
+            c.inc(status="ok")
+        # Same name returns the same metric
+        self.assertIs(self.registry.counter("jobs_total", "Jobs", ["outcome"]), c)
+
+        g = self.registry.gauge("in_progress")
+        with g.track_inprogress():
+            self.assertEqual(g.value(), 1)
+        self.assertEqual(g.value(), 0)
+
+    def test_histogram_buckets(self):
+        h = self.registry.histogram("duration_seconds", "Duration", ["phase"], buckets=(0.1, 1.0))
+        for v in (0.05, 0.5, 0.5, 5.0):
+            h.observe(v, phase="msi")
+        sample = h.samples()[0]
+        self.assertEqual(sample["counts"], [1, 2, 1])
+        self.assertEqual(sample["count"], 4)
+        self.assertAlmostEqual(sample["sum"], 6.05)
+        with h.time(phase="exe"):
+            pass
+        self.assertEqual(h.count(phase="exe"), 1)
+
+    def test_reset_keeps_metrics_registered(self):
+        c = self.registry.counter("resets_total")
+        c.inc()
+        self.registry.reset()
+        self.assertEqual(c.value(), 0)
+        c.inc()
+        self.assertEqual(self.registry.snapshot()["resets_total"]["samples"][0]["value"], 1)
+
+
+class TestOutput(unittest.TestCase):
+    def test_render_prometheus(self):
+        registry = metrics.MetricsRegistry()
+        registry.counter("uploads_total", "Uploads").inc(3)
+        registry.histogram("phase_seconds", "Phases", ["phase"], buckets=(1.0,)).observe(0.5, phase='a"b')
+        text = metrics.render_prometheus(registry.snapshot())
+        self.assertIn("# TYPE uploads_total counter\nuploads_total 3\n", text)
+        self.assertIn('phase_seconds_bucket{phase="a\\"b",le="1"} 1', text)
+        self.assertIn('phase_seconds_bucket{phase="a\\"b",le="+Inf"} 1', text)
+        self.assertIn('phase_seconds_count{phase="a\\"b"} 1', text)
+
+    def test_summarize_quantiles(self):
+        registry = metrics.MetricsRegistry()
+        h = registry.histogram("t_seconds", buckets=(0.1, 1.0, 10.0))
+        for v in [0.05] * 90 + [5.0] * 10:
+            h.observe(v)
+        row = metrics.summarize(registry.snapshot())[0]
+        self.assertEqual(row["count"], 100)
+        self.assertEqual(row["p50_s"], 0.1)
+        self.assertEqual(row["p95_s"], 10.0)
+
+
+class TestPublishing(unittest.TestCase):
+    def test_snapshots_from_processes_are_summed(self):
+        store = MemoryStore()
+        worker = metrics.MetricsRegistry()
+        worker.counter("analyses_total", "", ["outcome"]).inc(2, outcome="ok")
+        store.set(metrics.SNAPSHOT_NAMESPACE, "other-worker", worker.snapshot())
+
+        local = metrics.MetricsRegistry()
+        local.counter("analyses_total", "", ["outcome"]).inc(outcome="ok")
+        metrics.publish(store, local)
+        local.counter("analyses_total", "", ["outcome"]).inc(outcome="ok")
+
+        # Live values of this process replace its published snapshot
+        merged = metrics.collect_published(store, local)
+        self.assertEqual(merged["analyses_total"]["samples"][0]["value"], 4)
+        merged = metrics.collect_published(store, registry=None)
+        self.assertEqual(merged["analyses_total"]["samples"][0]["value"], 3)
+
+
+class TestInstrumentedRequests(unittest.TestCase):
+    def test_times_calls_by_host_and_status(self):
+        module = MagicMock()
+        module.get.return_value = MagicMock(status_code=200)
+        module.exceptions = "passthrough"
+        client = metrics.InstrumentedRequests(module, "test")
+        before = metrics.HTTP_CLIENT_SECONDS.count(service="test", host="graph.microsoft.com", method="GET", status="200")
+
+        resp = client.get("https://graph.microsoft.com/beta/deviceAppManagement/mobileApps/1", timeout=5)
+
+        self.assertEqual(resp.status_code, 200)
+        module.get.assert_called_once_with("https://graph.microsoft.com/beta/deviceAppManagement/mobileApps/1", timeout=5)
+        self.assertEqual(client.exceptions, "passthrough")
+        self.assertEqual(
+            metrics.HTTP_CLIENT_SECONDS.count(service="test", host="graph.microsoft.com", method="GET", status="200"),
+            before + 1,
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
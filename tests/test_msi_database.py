@@ -0,0 +1,168 @@
+import io
+import struct
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from switchcraft.utils.msi_database import (
+    MsiDatabase, MsiDatabaseError, decode_stream_name, MSITYPE_VALID, MSITYPE_STRING, MSITYPE_KEY, MSITYPE_NULLABLE
+)
+
+CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz._"
+STR_KEY = MSITYPE_VALID | MSITYPE_STRING | MSITYPE_KEY | 72
+STR = MSITYPE_VALID | MSITYPE_STRING | MSITYPE_NULLABLE | 255
+INT4 = MSITYPE_VALID | MSITYPE_NULLABLE | 4
+INT2 = MSITYPE_VALID | MSITYPE_NULLABLE | 2
+
+
+def encode_name(name):
+    out = [chr(0x4840)]
+    i = 0
+    while i < len(name):
+        c1 = CHARSET.index(name[i])
+        if i + 1 < len(name):
+            out.append(chr(0x3800 + c1 + (CHARSET.index(name[i + 1]) << 6)))
+            i += 2
+        else:
+            out.append(chr(0x4800 + c1))
+            i += 1
+    return "".join(out)
+
+
+class FakeOle:
+    """In-memory stand-in for olefile.OleFileIO built from decoded table data."""
+
+    def __init__(self, streams):
+        self.streams = streams
+
+    def listdir(self, streams=True, storages=False):
+        return [[name] for name in self.streams]
+
+    def openstream(self, entry):
+        return io.BytesIO(self.streams[entry[0]])
+
+    def get_metadata(self):
+        return None
+
+    def close(self):
+        pass
+
+
+def build_msi(tables, long_refs=False, extra_strings=()):
+    """tables: {name: ([(col, type)], [row tuples])} -> FakeOle"""
+    strings = []
+
+    def ref(s):
+        if s is None:
+            return 0
+        if s not in strings:
+            strings.append(s)
+        return strings.index(s) + 1
+
+    for s in extra_strings:
+        ref(s)
+
+    columns_rows = []
+    for table, (cols, _) in tables.items():
+        for number, (col, col_type) in enumerate(cols, 1):
+            columns_rows.append((table, number, col, col_type))
+
+    strref = 3 if long_refs else 2
+
+    def pack_table(cols, rows):
+        out = b""
+        for idx, (_, col_type) in enumerate(cols):
+            for row in rows:
+                value = row[idx]
+                if col_type & MSITYPE_STRING:
+                    out += ref(value).to_bytes(strref, "little")
+                elif (col_type & 0xFF) == 4:
+                    out += struct.pack("<I", 0 if value is None else value + 0x80000000)
+                else:
+                    out += struct.pack("<H", 0 if value is None else value + 0x8000)
+        return out
+
+    streams = {}
+    column_schema = [("Table", STR_KEY), ("Number", INT2), ("Name", STR), ("Type", INT2)]
+    streams[encode_name("_Columns")] = pack_table(column_schema, columns_rows)
+    for table, (cols, rows) in tables.items():
+        streams[encode_name(table)] = pack_table(cols, rows)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    pool = struct.pack("<HH", 65001, 0x8000 if long_refs else 0)
+    for b in encoded:
+        if len(b) > 0xFFFF:
+            pool += struct.pack("<HHHH", 0, 1, len(b) & 0xFFFF, len(b) >> 16)
+        else:
+            pool += struct.pack("<HH", len(b), 1)
+    streams[encode_name("_StringPool")] = pool
+    streams[encode_name("_StringData")] = b"".join(encoded)
+    return FakeOle(streams)
+
+
+SAMPLE_TABLES = {
+    "Property": ([("Property", STR_KEY), ("Value", STR)], [
+        ("ProductName", "Contoso Tool"),
+        ("ProductVersion", "2.4.1"),
+        ("Manufacturer", "Contoso"),
+        ("ProductCode", "{11111111-2222-3333-4444-555555555555}"),
+        ("UpgradeCode", "{AAAAAAAA-BBBB-CCCC-DDDD-EEEEEEEEEEEE}"),
+    ]),
+    "File": ([("File", STR_KEY), ("FileName", STR), ("FileSize", INT4), ("Sequence", INT2)], [
+        ("tool.exe", "tool.exe", 123456, 1),
+        ("readme", "README~1.TXT|Readme.txt", None, 2),
+    ]),
+}
+
+
+class TestMsiDatabase(unittest.TestCase):
+    def test_decode_stream_name(self):
+        self.assertEqual(decode_stream_name(encode_name("Property")), "!Property")
+        self.assertEqual(decode_stream_name(encode_name("_StringData")), "!_StringData")
+        self.assertEqual(decode_stream_name("\x05SummaryInformation"), "\x05SummaryInformation")
+
+    def test_properties_and_typed_rows(self):
+        with MsiDatabase(build_msi(SAMPLE_TABLES)) as db:
+            self.assertEqual(db.tables, ["File", "Property"])
+            props = db.get_properties()
+            self.assertEqual(props["ProductCode"], "{11111111-2222-3333-4444-555555555555}")
+            self.assertEqual(props["UpgradeCode"], "{AAAAAAAA-BBBB-CCCC-DDDD-EEEEEEEEEEEE}")
+            files = db.table("File")
+            self.assertEqual(files[0], {"File": "tool.exe", "FileName": "tool.exe", "FileSize": 123456, "Sequence": 1})
+            self.assertIsNone(files[1]["FileSize"])
+            self.assertEqual(list(db.iter_rows("Registry")), [])
+
+    def test_tables_are_decoded_lazily(self):
+        db = MsiDatabase(build_msi(SAMPLE_TABLES))
+        with patch.object(db, "_decode_table", wraps=db._decode_table) as mock_decode:
+            db.get_properties()
+            db.get_properties()
+            decoded = [c.args[0] for c in mock_decode.call_args_list]
+        self.assertEqual(decoded, ["_Columns", "Property"])
+
+    def test_long_string_refs_and_long_strings(self):
+        long_value = "x" * 70000
+        tables = {"Property": ([("Property", STR_KEY), ("Value", STR)], [("Big", long_value), ("Small", "1")])}
+        db = MsiDatabase(build_msi(tables, long_refs=True))
+        props = db.get_properties()
+        self.assertEqual(props["Big"], long_value)
+        self.assertEqual(props["Small"], "1")
+
+    def test_rejects_non_msi(self):
+        with self.assertRaises(MsiDatabaseError):
+            MsiDatabase(FakeOle({"WordDocument": b""}))
+
+    def test_msi_analyzer_uses_native_reader(self):
+        from switchcraft.analyzers.msi import MsiAnalyzer
+        fake = build_msi(SAMPLE_TABLES)
+        with patch("switchcraft.analyzers.msi.MsiDatabase", side_effect=lambda p: MsiDatabase(fake)):
+            info = MsiAnalyzer().analyze(Path("contoso.msi"))
+        self.assertEqual(info.product_name, "Contoso Tool")
+        self.assertEqual(info.product_version, "2.4.1")
+        self.assertEqual(info.product_code, "{11111111-2222-3333-4444-555555555555}")
+        self.assertEqual(info.confidence, 1.0)
+        self.assertIn("{11111111-2222-3333-4444-555555555555}", info.uninstall_switches)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,16 @@
 import unittest
 import sys
 import os
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
 
 # Add src to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
+from switchcraft.services import notification_service
 from switchcraft.services.notification_service import NotificationService
 
 
@@ -80,5 +86,100 @@ class TestNotificationService(unittest.TestCase):
         self.assertEqual(all_notifications[0]["title"], "Title 3")
 
 
+@pytest.mark.usefixtures("tmp_dir")
+class TestNotificationJournal(unittest.TestCase):
+    def setUp(self):
+        self.path_patcher = patch.object(NotificationService, "_get_storage_path",
+                                         lambda self_: self.tmp_dir / "notifications.json")
+        self.path_patcher.start()
+        NotificationService._instance = None
+        self.service = NotificationService()
+
+    def tearDown(self):
+        self.path_patcher.stop()
+        NotificationService._instance = None
+
+    def _reload(self):
+        NotificationService._instance = None
+        return NotificationService()
+
+    def _journal_lines(self):
+        with open(self.tmp_dir / "notifications.jsonl", encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_changes_are_appended_and_replayed(self):
+        a = self.service.add_notification("Upload", "A", "success")
+        self.service.add_notification("Package", "B", "info")
+        self.service.mark_read(a["id"])
+        self.assertEqual([json.loads(line)["op"] for line in self._journal_lines()], ["add", "add", "read"])
+
+        reloaded = self._reload()
+        self.assertEqual([n["title"] for n in reloaded.notifications], ["Package", "Upload"])
+        self.assertTrue(reloaded.notifications[1]["read"])
+        self.assertFalse(reloaded.notifications[0]["read"])
+
+    def test_similar_notifications_coalesce(self):
+        for i in range(200):
+            self.service.add_notification("Upload Complete", f"App {i} uploaded", "success")
+        self.assertEqual(len(self.service.notifications), 1)
+        self.assertEqual(self.service.notifications[0]["count"], 200)
+        self.assertEqual(self.service.notifications[0]["message"], "App 199 uploaded")
+
+        reloaded = self._reload()
+        self.assertEqual(len(reloaded.notifications), 1)
+        self.assertEqual(reloaded.notifications[0]["count"], 200)
+
+    def test_batch_writes_once(self):
+        with patch.object(self.service, "_write_ops", wraps=self.service._write_ops) as write:
+            with self.service.batch():
+                for i in range(50):
+                    self.service.add_notification(f"Deploy {i}", "done", "info")
+            self.assertEqual(write.call_count, 1)
+        self.assertEqual(len(self._reload().notifications), 50)
+
+    def test_retention_and_compaction(self):
+        with patch.object(notification_service, "COMPACT_THRESHOLD", 20):
+            for i in range(notification_service.MAX_NOTIFICATIONS + 30):
+                self.service.add_notification(f"Item {i}", "msg", "info")
+        self.assertEqual(len(self.service.notifications), notification_service.MAX_NOTIFICATIONS)
+        self.assertLessEqual(len(self._journal_lines()), notification_service.MAX_NOTIFICATIONS + 21)
+
+        reloaded = self._reload()
+        self.assertEqual(len(reloaded.notifications), notification_service.MAX_NOTIFICATIONS)
+        self.assertEqual(reloaded.notifications[0]["title"], f"Item {notification_service.MAX_NOTIFICATIONS + 29}")
+
+    def test_legacy_file_is_migrated(self):
+        legacy = self.tmp_dir / "notifications.json"
+        legacy.write_text(json.dumps([{
+            "id": "1", "title": "Old", "message": "m", "type": "info",
+            "timestamp": "2025-01-01T10:00:00", "read": False, "notify_system": False, "data": {}
+        }]), encoding="utf-8")
+        (self.tmp_dir / "notifications.jsonl").unlink(missing_ok=True)
+
+        reloaded = self._reload()
+        self.assertEqual(reloaded.notifications[0]["title"], "Old")
+        self.assertFalse(legacy.exists())
+        self.assertEqual(len(self._journal_lines()), 1)
+
+    def test_listeners_dispatched_off_thread_and_coalesced(self):
+        calls = []
+        done = threading.Event()
+
+        def listener():
+            calls.append(threading.current_thread().name)
+            done.set()
+
+        self.service.add_listener(listener)
+        try:
+            for i in range(20):
+                self.service.add_notification(f"N{i}", "msg")
+            self.assertTrue(done.wait(2))
+            threading.Event().wait(notification_service.DISPATCH_DELAY_SECONDS * 3)
+        finally:
+            self.service.remove_listener(listener)
+        self.assertLess(len(calls), 20)
+        self.assertNotIn(threading.current_thread().name, calls)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
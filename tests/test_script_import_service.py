@@ -0,0 +1,118 @@
+import io
+import tarfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from switchcraft.services.script_import_service import ScriptImportService
+
+
+def make_tarball(files):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(f"owner-repo-abc123/{name}")
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    buf.seek(0)
+    return buf
+
+
+class FakeResponse:
+    def __init__(self, raw=None, status_code=200, headers=None):
+        self.raw = raw
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(response=self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TestRepoArchive(unittest.TestCase):
+    FILES = {
+        "Windows/Install.ps1": b"Write-Host install",
+        "macOS/setup.sh": b"#!/bin/sh\necho hi",
+        "README.md": b"docs",
+    }
+
+    def test_reads_selected_members_from_one_download(self):
+        with patch("switchcraft.services.script_import_service.requests.get",
+                   return_value=FakeResponse(make_tarball(self.FILES))) as get:
+            scripts = ScriptImportService().fetch_repo_scripts(
+                "owner", "repo", "main", paths=["Windows/Install.ps1", "Missing.ps1"], token="pat"
+            )
+        self.assertEqual(scripts, {"Windows/Install.ps1": b"Write-Host install"})
+        get.assert_called_once()
+        self.assertIn("/repos/owner/repo/tarball/main", get.call_args[0][0])
+        self.assertEqual(get.call_args[1]["headers"]["Authorization"], "token pat")
+
+    def test_all_scripts_by_extension(self):
+        with patch("switchcraft.services.script_import_service.requests.get",
+                   return_value=FakeResponse(make_tarball(self.FILES))):
+            scripts = ScriptImportService().fetch_repo_scripts("owner", "repo")
+        self.assertEqual(set(scripts), {"Windows/Install.ps1", "macOS/setup.sh"})
+
+    def test_missing_repo(self):
+        with patch("switchcraft.services.script_import_service.requests.get",
+                   return_value=FakeResponse(status_code=404)):
+            with self.assertRaises(ValueError):
+                ScriptImportService().fetch_repo_scripts("owner", "nope")
+
+
+class TestDeployScripts(unittest.TestCase):
+    def setUp(self):
+        self.intune = MagicMock()
+        self.intune.iter_scripts.side_effect = lambda token, kind: iter(
+            [{"id": "ps-1", "displayName": "Same"}, {"id": "ps-2", "displayName": "Changed"}] if kind == "powershell" else []
+        )
+        self.intune.get_script_content.side_effect = lambda token, sid, kind: {"ps-1": b"same", "ps-2": b"old"}[sid]
+        self.intune.upload_powershell_script.return_value = {"id": "new-ps"}
+        self.intune.upload_macos_shell_script.return_value = {"id": "new-sh"}
+
+    def test_skips_identical_and_uploads_rest(self):
+        progress = []
+        results = ScriptImportService(self.intune).deploy_scripts(
+            "tok",
+            {"a/Same.ps1": b"same", "b/Changed.ps1": b"new", "c/New.ps1": b"x", "d/mac.sh": b"echo"},
+            lambda p: f"from {p}",
+            progress=lambda done, total: progress.append((done, total)),
+        )
+        by_path = {r.path: r for r in results}
+        self.assertEqual(by_path["a/Same.ps1"].status, "unchanged")
+        self.assertEqual(by_path["b/Changed.ps1"].status, "uploaded")
+        self.assertEqual(by_path["c/New.ps1"].status, "uploaded")
+        self.assertEqual(by_path["d/mac.sh"].status, "uploaded")
+        self.assertEqual(self.intune.upload_powershell_script.call_count, 2)
+        self.intune.upload_macos_shell_script.assert_called_once_with(
+            "tok", "mac", "from d/mac.sh", "echo", run_as_account="system"
+        )
+        # One listing per script kind, not per script
+        self.assertEqual(self.intune.iter_scripts.call_count, 2)
+        self.assertEqual(sorted(progress)[-1], (4, 4))
+
+    def test_throttling_is_retried_and_failures_reported(self):
+        throttled = FakeResponse(status_code=429, headers={"Retry-After": "0"})
+        self.intune.upload_powershell_script.side_effect = [
+            requests.HTTPError(response=throttled), {"id": "ok"}
+        ]
+        with patch("switchcraft.services.script_import_service.time.sleep") as sleep:
+            results = ScriptImportService(self.intune).deploy_scripts("tok", {"New.ps1": b"x"}, str)
+        self.assertEqual(results[0].status, "uploaded")
+        sleep.assert_called_once_with(0.0)
+
+        self.intune.upload_powershell_script.side_effect = RuntimeError("boom")
+        results = ScriptImportService(self.intune).deploy_scripts("tok", {"New.ps1": b"x"}, str)
+        self.assertFalse(results[0].ok)
+        self.assertIn("boom", results[0].message)
+
+
+if __name__ == '__main__':
+    unittest.main()
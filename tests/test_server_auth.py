@@ -217,3 +217,87 @@ def test_feature_flags(client, managers):
     auth_manager.set_demo_mode(False)
     auth_manager.set_auth_disabled(False)
     switchcraft.IS_DEMO = False
+
+def test_logout_revokes_session_on_all_workers(client):
+    """A logged-out cookie must be rejected even if a client replays it."""
+    resp = client.post("/login", data={"username": "admin", "password": "admin"}, follow_redirects=False)
+    cookie = resp.cookies["sc_session"]
+    client.cookies.set("sc_session", cookie)
+    assert client.get("/api/me").json()["username"] == "admin"
+
+    client.get("/logout", follow_redirects=False)
+    client.cookies.set("sc_session", cookie)
+    assert client.get("/api/me").json()["username"] is None
+
+def test_analysis_job_api(client, managers):
+    """CI can submit an analysis job and poll it without the UI."""
+    _, user_manager = managers
+    resp = client.post("/api/jobs", files={"file": ("setup.exe", b"MZ")})
+    assert resp.status_code == 401
+
+    resp = client.post("/login", data={"username": "admin", "password": "admin"}, follow_redirects=False)
+    client.cookies.set("sc_session", resp.cookies["sc_session"])
+    resp = client.post("/api/jobs", files={"file": ("setup.exe", b"MZ")}, data={"priority": "5"})
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job["status"] == "queued" and job["priority"] == 5 and job["file_name"] == "setup.exe"
+
+    assert client.get(f"/api/jobs/{job['id']}").json()["status"] == "queued"
+    assert job["id"] in [j["id"] for j in client.get("/api/jobs").json()["jobs"]]
+    assert client.get(f"/api/jobs/{job['id']}/result").status_code == 409
+    assert client.delete(f"/api/jobs/{job['id']}").json()["status"] == "cancelled"
+    assert client.delete(f"/api/jobs/{job['id']}").status_code == 409
+
+    # Other (non-admin) users cannot see it
+    user_manager.create_user("ci", "ci-pass", role="user")
+    resp = client.post("/login", data={"username": "ci", "password": "ci-pass"}, follow_redirects=False)
+    client.cookies.set("sc_session", resp.cookies["sc_session"])
+    assert client.get(f"/api/jobs/{job['id']}").status_code == 404
+
+def test_indexed_assets_skip_auth(client, tmp_path):
+    """Indexed engine files are served before the auth middleware, with cache validators."""
+    import switchcraft.server.app as server_app
+    from switchcraft.server.static_assets import AssetIndex
+    (tmp_path / "main.dart.js").write_text("engine")
+    previous = server_app.asset_index
+    server_app.asset_index = AssetIndex([("", tmp_path)])
+    try:
+        resp = client.get("/main.dart.js", follow_redirects=False)
+        assert resp.status_code == 200
+        assert resp.text == "engine"
+        assert resp.headers["etag"]
+        resp = client.get("/main.dart.js", headers={"If-None-Match": resp.headers["etag"]})
+        assert resp.status_code == 304
+    finally:
+        server_app.asset_index = previous
+
+def test_metrics_endpoint(client, monkeypatch):
+    """/metrics needs an admin session or the scrape token and reports server and queue metrics."""
+    assert client.get("/metrics", follow_redirects=False).status_code == 401
+
+    monkeypatch.setenv("SC_METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    resp = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'switchcraft_http_server_request_seconds_count{method="GET",route="/metrics",status="401"}' in resp.text
+    assert "# TYPE switchcraft_jobs gauge" in resp.text
+
+    monkeypatch.delenv("SC_METRICS_TOKEN")
+    resp = client.post("/login", data={"username": "admin", "password": "admin"}, follow_redirects=False)
+    client.cookies.set("sc_session", resp.cookies["sc_session"])
+    assert client.get("/metrics").status_code == 200
+
+def test_upload_registry_is_per_session(client, tmp_path, monkeypatch):
+    """The registry fallback only returns uploads made with the asking session's token."""
+    import switchcraft.server.app as server_app
+    from switchcraft.server.shared_store import find_upload
+    monkeypatch.setattr(server_app, "UPLOAD_DIR", tmp_path)
+    resp = client.post("/login", data={"username": "admin", "password": "admin"}, follow_redirects=False)
+    client.cookies.set("sc_session", resp.cookies["sc_session"])
+
+    resp = client.post("/upload?token=session-a", files={"files": ("shared-name.exe", b"MZ")})
+    assert resp.status_code == 200
+    stored = resp.json()["uploaded"][0]
+    assert find_upload("shared-name.exe", "session-a") == stored
+    assert find_upload("shared-name.exe", "session-b") is None
@@ -0,0 +1,124 @@
+import os
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from switchcraft.server import shared_store
+from switchcraft.server.shared_store import MemoryStore, SqliteStore, open_store
+
+
+class StoreContract:
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.make_store()
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_set_get_delete(self):
+        self.store.set("sessions", "a", {"username": "admin"})
+        self.assertEqual(self.store.get("sessions", "a"), {"username": "admin"})
+        self.assertIsNone(self.store.get("other", "a"))
+        self.store.delete("sessions", "a")
+        self.assertEqual(self.store.get("sessions", "a", "gone"), "gone")
+
+    def test_expiry(self):
+        self.store.set("ns", "short", 1, ttl=60)
+        with patch("switchcraft.server.shared_store.time.time", return_value=time.time() + 120):
+            self.assertIsNone(self.store.get("ns", "short"))
+            self.assertEqual(self.store.items("ns"), {})
+            self.assertTrue(self.store.add("ns", "short", 2))
+            self.assertEqual(self.store.purge_expired(), 0)
+
+    def test_add_only_if_absent(self):
+        ns = self.store.namespace("locks")
+        self.assertTrue(ns.add("job-1", "worker-a"))
+        self.assertFalse(ns.add("job-1", "worker-b"))
+        self.assertEqual(ns.get("job-1"), "worker-a")
+        self.assertEqual(ns.items(), {"job-1": "worker-a"})
+
+
+class TestMemoryStore(StoreContract, unittest.TestCase):
+    def make_store(self):
+        return MemoryStore()
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestSqliteStore(StoreContract, unittest.TestCase):
+    def make_store(self):
+        return open_store(f"sqlite:///{self.tmp_dir / 'state.db'}")
+
+    def test_visible_to_other_connections(self):
+        # A second store on the same file stands in for another worker process
+        other = SqliteStore(self.store.path)
+        try:
+            self.store.set("sessions", "sid", {"username": "admin"}, ttl=60)
+            self.assertEqual(other.get("sessions", "sid"), {"username": "admin"})
+            other.delete("sessions", "sid")
+            self.assertIsNone(self.store.get("sessions", "sid"))
+            self.assertTrue(other.add("locks", "k", 1))
+            self.assertFalse(self.store.add("locks", "k", 2))
+        finally:
+            other.close()
+
+
+class TestStoreConfig(unittest.TestCase):
+    def test_backend_selection(self):
+        self.assertIsInstance(open_store("memory://"), MemoryStore)
+        with self.assertRaises(ValueError):
+            open_store("redis://localhost")
+        with patch.dict(os.environ, {"SC_SHARED_STORE": "memory://"}):
+            self.assertEqual(shared_store.default_store_url(Path("x")), "memory://")
+        with patch.dict(os.environ, {"SC_SHARED_STORE": ""}):
+            self.assertTrue(shared_store.default_store_url(Path("cfg")).endswith(shared_store.DEFAULT_DB_NAME))
+
+    def test_register_backend(self):
+        store = MemoryStore()
+        shared_store.register_backend("test", lambda url: store)
+        self.assertIs(open_store("test://anything"), store)
+
+    def test_upload_registry(self):
+        previous = shared_store._store_instance
+        shared_store.set_shared_store(MemoryStore())
+        try:
+            now = time.time()
+            with patch("switchcraft.server.shared_store.time.time", return_value=now - 10):
+                shared_store.record_upload("/up/setup_ab12.exe", "setup.exe", 10, owner="alice")
+            shared_store.record_upload("/up/setup_cd34.exe", "setup.exe", 12, owner="alice")
+            with patch("switchcraft.server.shared_store.time.time", return_value=now + 10):
+                shared_store.record_upload("/up/setup_ef56.exe", "setup.exe", 14, owner="bob")
+            self.assertEqual(shared_store.find_upload("setup.exe", "alice"), "/up/setup_cd34.exe")
+            self.assertEqual(shared_store.find_upload("setup.exe", "bob"), "/up/setup_ef56.exe")
+            self.assertIsNone(shared_store.find_upload("setup.exe", "mallory"))
+            # Never by file name alone
+            self.assertIsNone(shared_store.find_upload("setup.exe", None))
+            self.assertIsNone(shared_store.find_upload("other.msi", "alice"))
+        finally:
+            shared_store.set_shared_store(previous)
+
+
+class TestWingetSharedCache(unittest.TestCase):
+    def test_results_shared_between_helpers(self):
+        from switchcraft_winget.utils.winget import WingetHelper
+        cache = MemoryStore().namespace("winget")
+        results = [{"Id": "Mozilla.Firefox", "Name": "Firefox"}]
+        with patch.object(WingetHelper, "shared_cache", cache), \
+                patch.object(WingetHelper, "_search_cache", {}):
+            with patch.object(WingetHelper, "_search_via_powershell", return_value=results):
+                WingetHelper(auto_install_winget=False).search_packages("Firefox")
+            self.assertEqual(cache.get("firefox"), results)
+
+            # Another worker starts with an empty local cache and never searches
+            WingetHelper._search_cache.clear()
+            with patch.object(WingetHelper, "_search_via_powershell") as search:
+                self.assertEqual(WingetHelper(auto_install_winget=False).search_packages("firefox"), results)
+            search.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+from switchcraft.services.signing_service import SigningService
+
+
+def _config(values):
+    return lambda key, default=None: values.get(key, default)
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestBatchSigning(unittest.TestCase):
+
+    def setUp(self):
+        self.scripts = []
+        for i in range(3):
+            p = self.tmp_dir / f"Install-{i}.ps1"
+            p.write_text("Write-Output 'hi'", encoding="utf-8")
+            self.scripts.append(str(p.resolve()))
+        self.config = {"SignScripts": True, "CodeSigningCertThumbprint": "ABCDEF0123"}
+        self.calls = []
+
+    def _fake_powershell(self, statuses):
+        def run(cmd, **kwargs):
+            self.calls.append(cmd)
+            script = cmd[-1]
+            list_file = script.split("-LiteralPath '", 1)[1].split("'", 1)[0]
+            with open(list_file, encoding="utf-8") as f:
+                files = json.load(f)
+            out = [{"path": p, "status": statuses.get(p, "Valid"), "message": ""} for p in files]
+            return subprocess.CompletedProcess(cmd, 0, stdout=json.dumps(out), stderr="")
+        return run
+
+    def test_single_session_for_batch(self):
+        statuses = {self.scripts[1]: "AlreadySigned"}
+        with patch("switchcraft.services.signing_service.SwitchCraftConfig.get_value", side_effect=_config(self.config)), \
+             patch("switchcraft.services.signing_service.ShellUtils.run_command", side_effect=self._fake_powershell(statuses)):
+            results = SigningService.sign_scripts(self.scripts + [str(self.tmp_dir / "missing.ps1")],
+                                                  timestamp_server="http://timestamp.example.com")
+
+        self.assertEqual(len(self.calls), 1)
+        script = self.calls[0][-1]
+        # Certificate is resolved once, not per file
+        self.assertEqual(script.count("ABCDEF0123"), 3)
+        self.assertIn("-TimestampServer 'http://timestamp.example.com'", script)
+        self.assertEqual([r.status for r in results], ["Valid", "AlreadySigned", "Valid", "NotFound"])
+        self.assertEqual([r.ok for r in results], [True, True, True, False])
+        # Temp file list is cleaned up
+        list_file = script.split("-LiteralPath '", 1)[1].split("'", 1)[0]
+        self.assertFalse(os.path.exists(list_file))
+
+    def test_missing_certificate(self):
+        def run(cmd, **kwargs):
+            return subprocess.CompletedProcess(cmd, 1, stdout='{"error":"No CodeSigning certificate found."}', stderr="")
+
+        with patch("switchcraft.services.signing_service.SwitchCraftConfig.get_value", side_effect=_config({"SignScripts": True})), \
+             patch("switchcraft.services.signing_service.ShellUtils.run_command", side_effect=run):
+            results = SigningService.sign_scripts(self.scripts)
+
+        self.assertTrue(all(r.status == "Error" for r in results))
+        self.assertEqual(results[0].message, "No CodeSigning certificate found.")
+
+    def test_disabled(self):
+        with patch("switchcraft.services.signing_service.SwitchCraftConfig.get_value", side_effect=_config({})), \
+             patch("switchcraft.services.signing_service.ShellUtils.run_command") as run:
+            self.assertTrue(SigningService.sign_script(self.scripts[0]))
+        run.assert_not_called()
+
+    def test_sign_script_uses_batch(self):
+        with patch("switchcraft.services.signing_service.SwitchCraftConfig.get_value", side_effect=_config(self.config)), \
+             patch("switchcraft.services.signing_service.ShellUtils.run_command",
+                   side_effect=self._fake_powershell({self.scripts[0]: "UnknownError"})):
+            self.assertFalse(SigningService.sign_script(self.scripts[0]))
+            self.assertTrue(SigningService.sign_script(self.scripts[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import gzip
+import unittest
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from switchcraft.server.static_assets import AssetIndex, precompress
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestStaticAssets(unittest.TestCase):
+    def setUp(self):
+        root = self.tmp_dir
+        self.app_assets = root / "app"
+        self.engine = root / "engine"
+        (self.engine / "canvaskit").mkdir(parents=True)
+        self.app_assets.mkdir()
+        self.bundle = b"console.log('engine');\n" * 500
+        (self.engine / "main.dart.js").write_bytes(self.bundle)
+        (self.engine / "canvaskit" / "canvaskit.wasm").write_bytes(b"\0asm" * 2000)
+        (self.engine / "flutter_bootstrap.js").write_bytes(b"bootstrap")
+        (self.engine / "index.html").write_text("<html></html>")
+        (self.engine / "icon.png").write_bytes(b"engine icon")
+        (self.app_assets / "icon.png").write_bytes(b"app icon")
+        (self.app_assets / "script.ps1").write_text("Write-Host")
+
+        self.assertEqual(precompress(self.engine), 4 if self._has_brotli() else 2)
+        self.index = AssetIndex([("", self.app_assets), ("", self.engine)], max_age=600)
+
+        app = FastAPI()
+
+        @app.get("/{path:path}")
+        async def serve(path: str, request: Request):
+            return self.index.response(request, self.index.get(f"/{path}"))
+
+        self.client = TestClient(app)
+
+    @staticmethod
+    def _has_brotli():
+        try:
+            import brotli  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def test_index_contents_and_precedence(self):
+        self.assertEqual(self.index.get("/icon.png").path, self.app_assets / "icon.png")
+        self.assertIsNotNone(self.index.get("/canvaskit/canvaskit.wasm"))
+        self.assertIsNone(self.index.get("/index.html"))
+        self.assertIsNone(self.index.get("/script.ps1"))
+        self.assertIsNone(self.index.get("/main.dart.js.gz"))
+        self.assertIn("gzip", self.index.get("/main.dart.js").variants)
+        # Below the size threshold
+        self.assertEqual(self.index.get("/flutter_bootstrap.js").variants, {})
+
+    def test_compressed_variant_and_revalidation(self):
+        resp = self.client.get("/main.dart.js", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers["content-encoding"], "gzip")
+        self.assertEqual(resp.content, self.bundle)  # transparently decoded by the client
+        self.assertEqual(resp.headers["cache-control"], "public, max-age=600, stale-while-revalidate=600")
+        self.assertEqual(resp.headers["vary"], "Accept-Encoding")
+        etag = resp.headers["etag"]
+        self.assertTrue(etag.endswith('-gzip"'))
+
+        again = self.client.get("/main.dart.js", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+
+        plain = self.client.get("/main.dart.js", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertEqual(plain.headers["etag"], self.index.get("/main.dart.js").etag)
+        self.assertEqual(plain.headers["content-length"], str(len(self.bundle)))
+        refused = self.client.get("/main.dart.js", headers={"Accept-Encoding": "gzip;q=0"})
+        self.assertNotIn("content-encoding", refused.headers)
+
+    def test_entry_points_always_revalidate(self):
+        resp = self.client.get("/flutter_bootstrap.js")
+        self.assertEqual(resp.headers["cache-control"], "no-cache")
+
+    def test_precompressed_files_are_valid(self):
+        data = (self.engine / "main.dart.js.gz").read_bytes()
+        self.assertEqual(gzip.decompress(data), self.bundle)
+
+
+if __name__ == '__main__':
+    unittest.main()
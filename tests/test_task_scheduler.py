@@ -0,0 +1,118 @@
+import threading
+import contextvars
+import time
+import unittest
+
+from switchcraft.utils.task_scheduler import (
+    POOL_BACKGROUND, POOL_IO, TaskScheduler, current_token, join_or_cancel
+)
+
+
+class View:
+    pass
+
+
+class TestTaskScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = TaskScheduler({POOL_BACKGROUND: 1})
+
+    def tearDown(self):
+        self.scheduler.shutdown(wait=True)
+
+    def test_runs_and_counts_per_view(self):
+        view = View()
+        handle = self.scheduler.submit(lambda a, b=0: a + b, 1, b=2, owner=view)
+        self.assertEqual(handle.result(timeout=5), 3)
+        failing = self.scheduler.submit(lambda: 1 / 0, owner=view, pool=POOL_IO)
+        with self.assertRaises(ZeroDivisionError):
+            failing.result(timeout=5)
+
+        stats = self.scheduler.metrics()["View"]
+        self.assertEqual(stats["submitted"], 2)
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["running"], 0)
+
+    def test_superseded_task_is_dropped_or_cancelled(self):
+        view = View()
+        gate = threading.Event()
+        started = threading.Event()
+        seen = []
+
+        def blocker():
+            started.set()
+            gate.wait(5)
+            seen.append(("blocker", current_token().cancelled))
+
+        def search(query):
+            seen.append((query, current_token().cancelled))
+
+        # Single background worker: the first search is running, the second is queued
+        first = self.scheduler.submit(blocker, owner=view, key="search", pool=POOL_BACKGROUND)
+        self.assertTrue(started.wait(5))
+        queued = self.scheduler.submit(search, "old", owner=view, key="search", pool=POOL_BACKGROUND)
+        latest = self.scheduler.submit(search, "new", owner=view, key="search", pool=POOL_BACKGROUND)
+
+        self.assertTrue(first.cancelled)
+        self.assertTrue(queued.cancelled)
+        gate.set()
+        latest.result(timeout=5)
+
+        # Running task saw its token flagged; the queued one never ran
+        self.assertEqual(seen, [("blocker", True), ("new", False)])
+        stats = self.scheduler.metrics()["View"]
+        self.assertEqual(stats["superseded"], 2)
+        self.assertEqual(stats["cancelled"], 2)
+
+    def test_keys_are_per_view_instance(self):
+        a, b = View(), View()
+        gate = threading.Event()
+        h1 = self.scheduler.submit(gate.wait, 5, owner=a, key="search")
+        h2 = self.scheduler.submit(gate.wait, 5, owner=b, key="search")
+        self.assertFalse(h1.cancelled)
+        self.assertEqual(self.scheduler.cancel(a), 1)
+        self.assertTrue(h1.cancelled)
+        self.assertFalse(h2.cancelled)
+        gate.set()
+        h2.result(timeout=5)
+
+    def test_context_is_carried_to_worker(self):
+        var = contextvars.ContextVar("session", default=None)
+        var.set("user-1")
+        handle = self.scheduler.submit(var.get)
+        self.assertEqual(handle.result(timeout=5), "user-1")
+
+    def test_join_or_cancel_returns_when_superseded(self):
+        view = View()
+        release = threading.Event()
+        blocked = threading.Thread(target=release.wait, daemon=True)
+        blocked.start()
+        try:
+            started = threading.Event()
+
+            def _search():
+                started.set()
+                begin = time.monotonic()
+                return join_or_cancel(blocked, timeout=30), time.monotonic() - begin
+
+            handle = self.scheduler.submit(_search, owner=view, key="search")
+            started.wait(5)
+            self.scheduler.submit(lambda: None, owner=view, key="search")
+            finished, elapsed = handle.result(timeout=5)
+            self.assertFalse(finished)
+            self.assertLess(elapsed, 5)
+            self.assertTrue(blocked.is_alive())
+        finally:
+            release.set()
+
+        done = threading.Thread(target=lambda: None)
+        done.start()
+        self.assertTrue(join_or_cancel(done, timeout=5))
+
+    def test_unknown_pool(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.submit(print, pool="gpu")
+
+
+if __name__ == '__main__':
+    unittest.main()
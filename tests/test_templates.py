@@ -2,8 +2,10 @@
 import unittest
 import tempfile
 import shutil
+import os
 from pathlib import Path
-from switchcraft.utils.templates import TemplateGenerator
+from unittest.mock import patch
+from switchcraft.utils.templates import TemplateGenerator, load_template
 
 # Mock context
 CONTEXT = {
@@ -80,5 +82,57 @@ class TestTemplateGenerator(unittest.TestCase):
         # Check that $Arguments was updated
         self.assertIn('$Arguments = "/S /v/qn"', content)
 
+    def test_enterprise_args_with_backslashes(self):
+        """Install args are inserted literally (no regex escape processing)."""
+        gen = TemplateGenerator()
+        gen.template_content = (
+            '$Arguments = "/old"\n'
+            'Start-Process-Function -FilePath $Installer -ArgumentList $Arguments\n'
+            'Uninstall-SoftwareByFilter -NameFilter "Old" -Publisher "OldPub"\n'
+        )
+        ctx = dict(CONTEXT, INSTALL_ARGS=r'/D=C:\Program Files\MyApp')
+        content = gen.render(ctx)
+        self.assertIn(r'$Arguments = "/D=C:\Program Files\MyApp"', content)
+        self.assertIn('-NameFilter "MyApp" -Publisher "MyCompany"', content)
+
+    def test_unknown_placeholder_kept(self):
+        gen = TemplateGenerator()
+        gen.template_content = "{{APP_NAME}} {{NOT_SET}}"
+        self.assertEqual(gen.render(dict(CONTEXT)), "MyApp {{NOT_SET}}")
+
+    def test_compiled_template_cached_by_mtime(self):
+        tmpl = self.test_path / "cached.ps1"
+        tmpl.write_text("v1 {{APP_NAME}}", encoding="utf-8")
+        first = load_template(tmpl)
+        self.assertIs(load_template(tmpl), first)
+
+        tmpl.write_text("v2 {{APP_NAME}}", encoding="utf-8")
+        st = tmpl.stat()
+        os.utime(tmpl, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        second = load_template(tmpl)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.render(CONTEXT), "v2 MyApp")
+
+    def test_generate_many(self):
+        """Bulk generation compiles once and reads the company name once."""
+        tmpl = self.test_path / "bulk.ps1"
+        tmpl.write_text("# {{COMPANY_NAME}}\n& {{INSTALLER_FILE}} {{INSTALL_ARGS}}", encoding="utf-8")
+        gen = TemplateGenerator(str(tmpl))
+
+        jobs = [
+            ({"INSTALLER_FILE": f"app{i}.exe", "INSTALL_ARGS": "/S"}, str(self.test_path / f"Install-{i}.ps1"))
+            for i in range(50)
+        ]
+        jobs.append(({"INSTALLER_FILE": "x.exe"}, str(self.test_path / "missing_dir" / "x.ps1")))
+
+        with patch("switchcraft.utils.config.SwitchCraftConfig.get_company_name", return_value="Contoso") as company:
+            results = gen.generate_many(jobs, max_workers=4)
+
+        self.assertEqual(company.call_count, 1)
+        self.assertEqual(results, [True] * 50 + [False])
+        self.assertEqual((self.test_path / "Install-7.ps1").read_text(encoding="utf-8"), "# Contoso\n& app7.exe /S")
+        # Caller contexts are not modified by bulk generation
+        self.assertNotIn("COMPANY_NAME", jobs[0][0])
+
 if __name__ == '__main__':
     unittest.main()
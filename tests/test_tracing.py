@@ -0,0 +1,191 @@
+import json
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from switchcraft.utils import tracing
+
+
+def _spans(otlp):
+    return otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+
+class TestTracing(unittest.TestCase):
+    def test_spans_nest_and_export_otlp(self):
+        with tracing.start_trace("root", file="setup.exe") as trace:
+            with tracing.span("child", attempt=1):
+                with tracing.span("grandchild"):
+                    tracing.annotate(found=True, ratio=0.5)
+            with tracing.span("sibling"):
+                pass
+
+        spans = {s["name"]: s for s in _spans(trace.to_otlp())}
+        self.assertEqual(set(spans), {"root", "child", "grandchild", "sibling"})
+        self.assertEqual(spans["root"]["parentSpanId"], "")
+        self.assertEqual(spans["child"]["parentSpanId"], spans["root"]["spanId"])
+        self.assertEqual(spans["grandchild"]["parentSpanId"], spans["child"]["spanId"])
+        self.assertEqual(spans["sibling"]["parentSpanId"], spans["root"]["spanId"])
+        self.assertTrue(all(len(s["traceId"]) == 32 and len(s["spanId"]) == 16 for s in spans.values()))
+        self.assertEqual(spans["child"]["attributes"], [{"key": "attempt", "value": {"intValue": "1"}}])
+        self.assertIn({"key": "found", "value": {"boolValue": True}}, spans["grandchild"]["attributes"])
+        self.assertIn({"key": "ratio", "value": {"doubleValue": 0.5}}, spans["grandchild"]["attributes"])
+        for s in spans.values():
+            self.assertGreaterEqual(int(s["endTimeUnixNano"]), int(s["startTimeUnixNano"]))
+
+    def test_span_outside_trace_is_noop(self):
+        with tracing.span("orphan") as span:
+            tracing.annotate(ignored=True)
+        self.assertIsNone(span)
+
+    def test_error_status(self):
+        with self.assertRaises(ValueError):
+            with tracing.start_trace("root") as trace:
+                with tracing.span("probe"):
+                    raise ValueError("boom")
+
+        probe = [s for s in _spans(trace.to_otlp()) if s["name"] == "probe"][0]
+        self.assertEqual(probe["status"], {"code": tracing.STATUS_ERROR, "message": "ValueError: boom"})
+        rows = tracing.timeline(trace.to_otlp())
+        self.assertEqual(rows[1]["error"], "ValueError: boom")
+
+    def test_span_limit(self):
+        with patch.object(tracing, "MAX_SPANS", 3):
+            with tracing.start_trace("root") as trace:
+                for _ in range(5):
+                    with tracing.span("probe"):
+                        pass
+        spans = _spans(trace.to_otlp())
+        self.assertEqual(len(spans), 3)
+        self.assertIn({"key": "switchcraft.dropped_spans", "value": {"intValue": "3"}}, spans[0]["attributes"])
+
+    def test_timeline_order_and_depth(self):
+        with tracing.start_trace("root") as trace:
+            with tracing.span("a"):
+                with tracing.span("a.1"):
+                    pass
+            with tracing.span("b", query="vlc"):
+                pass
+
+        rows = tracing.timeline(trace.to_otlp())
+        self.assertEqual([(r["name"], r["depth"]) for r in rows], [("root", 0), ("a", 1), ("a.1", 2), ("b", 1)])
+        self.assertEqual(rows[0]["start_ms"], 0)
+        self.assertEqual(rows[3]["attributes"], {"query": "vlc"})
+        self.assertEqual(tracing.timeline(None), [])
+
+    def test_summary_is_compact(self):
+        with patch.object(tracing, "MAX_SPANS", 500):
+            with tracing.start_trace("root") as trace:
+                for _ in range(3):
+                    with tracing.span("phase"):
+                        for _ in range(100):
+                            with tracing.span("probe"):
+                                pass
+                with tracing.span("failing"):
+                    with self.assertRaises(ValueError):
+                        with tracing.span("boom"):
+                            raise ValueError("x")
+
+        otlp = trace.to_otlp()
+        summary = tracing.summarize(otlp, top=3)
+        self.assertEqual(summary["trace_id"], trace.trace_id)
+        self.assertEqual((summary["name"], summary["spans"], summary["errors"]), ("root", 306, 1))
+        self.assertEqual(list(summary["steps"]), ["phase", "failing"])
+        self.assertEqual(len(summary["slowest"]), 3)
+        self.assertLess(len(json.dumps(summary)), len(json.dumps(otlp)) / 50)
+        self.assertIsNone(tracing.summarize(None))
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestAnalysisTrace(unittest.TestCase):
+    def test_controller_records_trace(self):
+        from switchcraft.benchmarks import corpus
+        from switchcraft.controllers.analysis_controller import AnalysisController, AnalysisResult
+
+        path = self.tmp_dir / "bench.msi"
+        path.write_bytes(corpus.build_compound_file(corpus.build_msi_streams(corpus.SAMPLE_PROPERTIES)))
+
+        with patch("switchcraft.controllers.analysis_controller.SwitchCraftConfig.get_value", return_value=False):
+            result = AnalysisController().analyze_file(str(path))
+
+        self.assertIsNone(result.error)
+        rows = tracing.timeline(result.trace)
+        names = [r["name"] for r in rows]
+        self.assertEqual(names[0], "AnalysisController.analyze_file")
+        self.assertEqual(rows[0]["attributes"]["installer_type"], result.info.installer_type)
+        for expected in ("phase.analyzers", "MsiAnalyzer.can_analyze", "MsiAnalyzer.analyze",
+                         "phase.universal", "phase.community_db", "community_db.by_hash"):
+            self.assertIn(expected, names)
+        analyze = rows[names.index("MsiAnalyzer.analyze")]
+        self.assertEqual(analyze["depth"], 2)
+        self.assertNotIn("ExeAnalyzer.can_analyze", names)  # MSI matched first
+
+        # Survives the job queue's JSON round trip
+        self.assertEqual(AnalysisResult.from_dict(result.to_dict()).trace, result.trace)
+
+    def test_brute_force_probes_are_spans(self):
+        from switchcraft_advanced.analyzers.universal import UniversalAnalyzer
+
+        outputs = iter([
+            MagicMock(stdout="", stderr="", returncode=1),
+            MagicMock(stdout="", stderr="", returncode=1),
+            MagicMock(stdout="Inno Setup /VERYSILENT", stderr="", returncode=0),
+        ])
+        with patch("switchcraft_advanced.analyzers.universal.subprocess.run", side_effect=lambda *a, **k: next(outputs)):
+            with tracing.start_trace("root") as trace:
+                result = UniversalAnalyzer().brute_force_help(self.tmp_dir / "setup.exe")
+
+        self.assertEqual(result["detected_type"], "Inno Setup")
+        probes = [r for r in tracing.timeline(trace.to_otlp()) if r["name"] == "probe"]
+        self.assertEqual(len(probes), 3)
+        self.assertEqual(probes[1]["attributes"]["args"], "/?")
+        self.assertEqual(probes[2]["attributes"]["args"], "--help")
+
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestHistoryTraces(unittest.TestCase):
+    def setUp(self):
+        from switchcraft.services.history_service import HistoryService
+
+        with patch.object(HistoryService, "_get_history_path", return_value=self.tmp_dir / "history.json"):
+            self.history = HistoryService()
+        with tracing.start_trace("root") as trace:
+            for _ in range(20):
+                with tracing.span("probe"):
+                    pass
+        self.trace = trace.to_otlp()
+
+    def test_trace_kept_in_side_file(self):
+        trace_file = self.history.save_trace(self.trace)
+        self.history.add_entry({"filename": "setup.exe", "trace_file": trace_file})
+
+        self.assertNotIn("resourceSpans", self.history.history_file.read_text(encoding="utf-8"))
+        entry = self.history.get_history()[0]
+        self.assertEqual(self.history.load_trace(entry), self.trace)
+
+        # Watch folder entries read the trace from their result file
+        result_file = self.tmp_dir / "result.json"
+        result_file.write_text(json.dumps({"trace": self.trace}), encoding="utf-8")
+        self.assertEqual(self.history.load_trace({"result_file": str(result_file)}), self.trace)
+        self.assertIsNone(self.history.load_trace({"trace_file": str(self.tmp_dir / "missing.json")}))
+        self.assertIsNone(self.history.save_trace(None))
+
+    def test_trace_files_follow_history(self):
+        first = self.history.save_trace(self.trace)
+        self.history.add_entry({"filename": "first.exe", "trace_file": first})
+        for i in range(100):
+            self.history.add_entry({"filename": f"app{i}.exe"})
+        self.assertFalse(os.path.exists(first))
+
+        result_file = self.tmp_dir / "result.json"
+        result_file.write_text("{}", encoding="utf-8")
+        kept = self.history.save_trace({"resourceSpans": []})
+        self.history.add_entry({"filename": "watched.exe", "trace_file": kept, "result_file": str(result_file)})
+        self.history.clear()
+        self.assertFalse(os.path.exists(kept))
+        self.assertTrue(result_file.exists())
+
+if __name__ == '__main__':
+    unittest.main()
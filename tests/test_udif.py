@@ -0,0 +1,189 @@
+import io
+import os
+import plistlib
+import struct
+import unittest
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from switchcraft.utils import udif
+from switchcraft.utils.udif import UdifImage, UdifError, open_hfs_volume, is_app_info_plist
+
+try:
+    from .test_xar import build_xar, PACKAGE_INFO
+except ImportError:
+    from tests.test_xar import build_xar, PACKAGE_INFO
+
+BLOCK = 4096
+INFO_PLIST = plistlib.dumps({
+    "CFBundleIdentifier": "com.contoso.mac",
+    "CFBundleShortVersionString": "5.2",
+    "CFBundleName": "Contoso",
+    "CFBundlePackageType": "APPL",
+})
+
+
+def build_hfs(files, padding_blocks=0):
+    """files: {path: bytes}. Returns an HFS+ volume image (catalog in blocks 1-2, data after)."""
+    folders = {"": 2}
+    next_cnid = [16]
+    records = [(1, "Volume", "folder", 2, None)]
+    data_blocks = []
+
+    def folder_id(path):
+        if path not in folders:
+            parent, _, name = path.rpartition("/")
+            pid = folder_id(parent)
+            folders[path] = next_cnid[0]
+            next_cnid[0] += 1
+            records.append((pid, name, "folder", folders[path], None))
+        return folders[path]
+
+    first_data_block = 3
+    for path, content in files.items():
+        parent, _, name = path.rpartition("/")
+        pid = folder_id(parent)
+        start = first_data_block + sum(len(b) for b in data_blocks) // BLOCK
+        blocks = max(1, -(-len(content) // BLOCK))
+        data_blocks.append(content.ljust(blocks * BLOCK, b"\0"))
+        records.append((pid, name, "file", next_cnid[0], (len(content), start, blocks)))
+        next_cnid[0] += 1
+
+    # Catalog leaf records are sorted by (parent, name)
+    records.sort(key=lambda r: (r[0], r[1]))
+    leaf = bytearray(BLOCK)
+    offsets = []
+    pos = 14
+    for parent, name, kind, cnid, fork in records:
+        key = struct.pack(">HIH", 6 + 2 * len(name), parent, len(name)) + name.encode("utf-16-be")
+        if kind == "folder":
+            body = struct.pack(">hHII", 1, 0, 0, cnid).ljust(88, b"\0")
+        else:
+            size, start, blocks = fork
+            body = struct.pack(">hHII", 2, 0, 0, cnid).ljust(88, b"\0")
+            body += struct.pack(">QII", size, 0, blocks) + struct.pack(">II", start, blocks) + b"\0" * 56
+            body += b"\0" * 80
+        record = key + body
+        offsets.append(pos)
+        leaf[pos:pos + len(record)] = record
+        pos += len(record)
+    offsets.append(pos)
+    struct.pack_into(">IIbBH", leaf, 0, 0, 0, -1, 1, len(records))
+    for i, off in enumerate(offsets):
+        struct.pack_into(">H", leaf, BLOCK - 2 * (i + 1), off)
+
+    header_node = bytearray(BLOCK)
+    struct.pack_into(">IIbBH", header_node, 0, 0, 0, 1, 0, 3)
+    struct.pack_into(">HIIIIH", header_node, 14, 1, 1, len(records), 1, 1, BLOCK)
+
+    volume_header = bytearray(512)
+    volume_header[0:2] = b"H+"
+    struct.pack_into(">I", volume_header, 40, BLOCK)
+    struct.pack_into(">QII", volume_header, 272, 2 * BLOCK, 0, 2)
+    struct.pack_into(">II", volume_header, 288, 1, 2)
+
+    block0 = bytearray(BLOCK)
+    block0[1024:1536] = volume_header
+    image = bytes(block0) + bytes(header_node) + bytes(leaf) + b"".join(data_blocks)
+    return image + os.urandom(padding_blocks * BLOCK)
+
+
+def build_udif(disk, chunk_sectors=8):
+    data_fork = b""
+    chunks = []
+    total_sectors = len(disk) // 512
+    for sector in range(0, total_sectors, chunk_sectors):
+        count = min(chunk_sectors, total_sectors - sector)
+        piece = disk[sector * 512:(sector + count) * 512]
+        if not piece.strip(b"\0"):
+            chunks.append((udif.CHUNK_ZERO, sector, count, len(data_fork), 0))
+            continue
+        stored = zlib.compress(piece)
+        chunks.append((udif.CHUNK_ZLIB, sector, count, len(data_fork), len(stored)))
+        data_fork += stored
+    chunks.append((udif.CHUNK_END, total_sectors, 0, len(data_fork), 0))
+
+    mish = struct.pack(">4sIQQQII24s136sI", b"mish", 1, 0, total_sectors, 0, 0, 0, b"", b"", len(chunks))
+    for ctype, sector, count, offset, length in chunks:
+        mish += struct.pack(">IIQQQQ", ctype, 0, sector, count, offset, length)
+    xml = plistlib.dumps({"resource-fork": {"blkx": [
+        {"Name": "disk image (Apple_HFS : 1)", "ID": "0", "Attributes": "0x0050", "Data": mish},
+    ]}})
+    koly = struct.pack(">4sIII QQQQQ II16s II128s QQ", b"koly", 4, 512, 1, 0, 0, len(data_fork), 0, 0,
+                       1, 1, b"", 0, 0, b"", len(data_fork), len(xml)).ljust(512, b"\0")
+    return data_fork + xml + koly, len(chunks) - 1
+
+
+class TestUdif(unittest.TestCase):
+    def test_finds_app_info_plist_reading_only_needed_chunks(self):
+        disk = build_hfs({"Contoso.app/Contents/Info.plist": INFO_PLIST,
+                          "Contoso.app/Contents/MacOS/Contoso": b"\xcf\xfa\xed\xfe" * 100},
+                         padding_blocks=64)
+        image_bytes, chunk_count = build_udif(disk)
+
+        calls = []
+        original = udif.CODECS[udif.CHUNK_ZLIB]
+
+        def counting(data, size):
+            calls.append(size)
+            return original(data, size)
+
+        with patch.dict(udif.CODECS, {udif.CHUNK_ZLIB: counting}):
+            with UdifImage(io.BytesIO(image_bytes)) as image:
+                volume = open_hfs_volume(image)
+                plists = volume.find_files(is_app_info_plist)
+                self.assertEqual([p for p, _ in plists], ["Contoso.app/Contents/Info.plist"])
+                self.assertEqual(volume.read_file(plists[0][1]), INFO_PLIST)
+        # Header, catalog and plist chunks only; the 64 random padding blocks stay compressed
+        self.assertLess(len(calls), 8)
+        self.assertGreater(chunk_count, 64)
+
+    def test_adc_codec(self):
+        self.assertEqual(udif._adc_decompress(b"\x82abc\x00\x02", 6), b"abcabc")
+
+    def test_unsupported_codec(self):
+        disk = build_hfs({"A.app/Contents/Info.plist": INFO_PLIST})
+        image_bytes, _ = build_udif(disk)
+        with patch.dict(udif.CODECS, clear=True):
+            with UdifImage(io.BytesIO(image_bytes)) as image:
+                with self.assertRaises(UdifError):
+                    open_hfs_volume(image)
+
+    def test_rejects_non_udif(self):
+        with self.assertRaises(UdifError):
+            UdifImage(io.BytesIO(b"\0" * 4096))
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestMacOSDmgAnalysis(unittest.TestCase):
+    def _analyze(self, disk):
+        from switchcraft.analyzers.macos import MacOSAnalyzer
+        path = self.tmp_dir / "image.dmg"
+        path.write_bytes(build_udif(disk)[0])
+        with patch("subprocess.run") as mock_run:
+            info = MacOSAnalyzer().analyze(path)
+            mock_run.assert_not_called()
+        return info
+
+    def test_dmg_with_app(self):
+        info = self._analyze(build_hfs({
+            "Contoso.app/Contents/Info.plist": INFO_PLIST,
+            "Contoso.app/Contents/Frameworks/Helper.app/Contents/Info.plist": plistlib.dumps(
+                {"CFBundleIdentifier": "com.contoso.helper", "CFBundlePackageType": "APPL"}),
+        }))
+        self.assertEqual(info.installer_type, "MacOS DMG")
+        self.assertEqual(info.bundle_id, "com.contoso.mac")
+        self.assertEqual(info.product_version, "5.2")
+        self.assertEqual(info.confidence, 1.0)
+
+    def test_dmg_with_pkg(self):
+        pkg = build_xar([("PackageInfo", PACKAGE_INFO, True)])
+        info = self._analyze(build_hfs({"Install Contoso.pkg": pkg}))
+        self.assertEqual(info.bundle_id, "com.contoso.app")
+        self.assertEqual(info.confidence, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from switchcraft.controllers.analysis_controller import AnalysisResult
+from switchcraft.models import InstallerInfo
+from switchcraft.services.watch_service import HotFolderWatcher, STATE_FILE
+from switchcraft.utils import tracing
+
+
+class FakeAnalyzer:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, file_path):
+        with self._lock:
+            self.calls.append(Path(file_path).name)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return AnalysisResult(info=InstallerInfo(file_path=file_path, installer_type="MSI", install_switches=["/qn"]))
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestHotFolderWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.inbox = self.tmp_dir / "inbox"
+        self.out = self.tmp_dir / "out"
+        self.inbox.mkdir()
+
+    def _watcher(self, analyzer, **kwargs):
+        kwargs.setdefault("settle_seconds", 0)
+        kwargs.setdefault("record_history", False)
+        return HotFolderWatcher(self.inbox, output_dir=self.out, analyze=analyzer, **kwargs)
+
+    def _drop(self, name, content=b"installer"):
+        path = self.inbox / name
+        path.write_bytes(content)
+        return path
+
+    def test_once_dedupes_by_content(self):
+        self._drop("a.msi", b"same")
+        self._drop("b.msi", b"same")
+        self._drop("c.exe", b"other")
+        self._drop("notes.txt")
+        self._drop("big.msi.part")
+
+        analyzer = FakeAnalyzer()
+        stats = self._watcher(analyzer).run(once=True)
+
+        self.assertEqual(stats.analyzed, 2)
+        self.assertEqual(stats.duplicates, 1)
+        self.assertEqual(len(analyzer.calls), 2)
+        results = sorted(p.name for p in self.out.glob("*.json") if p.name != STATE_FILE)
+        self.assertEqual(len(results), 2)
+        doc = json.loads((self.out / results[0]).read_text(encoding="utf-8"))
+        self.assertEqual(doc["info"]["install_switches"], ["/qn"])
+        self.assertEqual(len(doc["sha256"]), 64)
+
+    def test_state_survives_restart(self):
+        self._drop("a.msi", b"one")
+        self._watcher(FakeAnalyzer()).run(once=True)
+
+        analyzer = FakeAnalyzer()
+        stats = self._watcher(analyzer).run(once=True)
+        self.assertEqual(analyzer.calls, [])
+        self.assertEqual(stats.skipped, 1)
+
+        # Changed content is analyzed again (a different size, so coarse mtimes don't matter)
+        self._drop("a.msi", b"changed")
+        stats = self._watcher(analyzer).run(once=True)
+        self.assertEqual(analyzer.calls, ["a.msi"])
+
+    def test_backpressure_limits_in_flight(self):
+        for i in range(6):
+            self._drop(f"app{i}.msi", f"content {i}".encode())
+        analyzer = FakeAnalyzer(delay=0.05)
+        stats = self._watcher(analyzer, workers=4, max_in_flight=2).run(once=True)
+        self.assertEqual(stats.analyzed, 6)
+        self.assertLessEqual(analyzer.max_active, 2)
+
+    def test_history_keeps_trace_summary(self):
+        def traced(file_path):
+            with tracing.start_trace("root") as trace:
+                for _ in range(50):
+                    with tracing.span("probe"):
+                        pass
+            result = FakeAnalyzer()(file_path)
+            result.trace = trace.to_otlp()
+            return result
+
+        self._drop("a.msi")
+        with patch("switchcraft.services.history_service.HistoryService.add_entry") as add_entry:
+            self._watcher(traced, record_history=True).run(once=True)
+
+        entry = add_entry.call_args[0][0]
+        self.assertNotIn("trace", entry)
+        self.assertEqual(entry["trace_summary"]["spans"], 51)
+        document = json.loads(Path(entry["result_file"]).read_text(encoding="utf-8"))
+        self.assertEqual(len(document["trace"]["resourceSpans"][0]["scopeSpans"][0]["spans"]), 51)
+
+    def test_failed_analysis_is_recorded(self):
+        self._drop("bad.exe")
+
+        def analyzer(path):
+            return AnalysisResult(info=None, error="boom")
+
+        stats = self._watcher(analyzer).run(once=True)
+        self.assertEqual(stats.failed, 1)
+        self.assertEqual(stats.analyzed, 0)
+
+    def test_daemon_picks_up_new_files(self):
+        results = []
+        done = threading.Event()
+
+        def on_result(path, document):
+            results.append(path.name)
+            done.set()
+
+        watcher = self._watcher(FakeAnalyzer(), settle_seconds=0.1, on_result=on_result)
+        thread = threading.Thread(target=watcher.run, kwargs={"poll_interval": 0.05})
+        thread.start()
+        try:
+            time.sleep(0.2)
+            self._drop("late.msi", b"late")
+            self.assertTrue(done.wait(10))
+        finally:
+            watcher.stop()
+            thread.join(10)
+        self.assertEqual(results, ["late.msi"])
+        self.assertTrue((self.out / STATE_FILE).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import io
+import struct
+import unittest
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from switchcraft.utils.xar import XarArchive, XarError
+from switchcraft.analyzers.macos import MacOSAnalyzer
+
+
+def build_xar(entries):
+    """entries: list of (path, bytes or None for directory, compress) -> XAR bytes"""
+    heap = b""
+    tree = {}
+    for path, data, compress in entries:
+        node = tree
+        parts = path.split("/")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {"__children__": {}})["__children__"]
+        entry = node.setdefault(parts[-1], {"__children__": {}})
+        if data is not None:
+            stored = zlib.compress(data) if compress else data
+            entry["data"] = (len(heap), len(stored), len(data),
+                             "application/x-gzip" if compress else "application/octet-stream")
+            heap += stored
+
+    counter = [0]
+
+    def render(nodes):
+        xml = ""
+        for name, entry in nodes.items():
+            counter[0] += 1
+            xml += f'<file id="{counter[0]}"><name>{name}</name>'
+            if "data" in entry:
+                offset, length, size, style = entry["data"]
+                xml += (f'<type>file</type><data><offset>{offset}</offset><length>{length}</length>'
+                        f'<size>{size}</size><encoding style="{style}"/></data>')
+            else:
+                xml += '<type>directory</type>'
+            xml += render(entry["__children__"]) + '</file>'
+        return xml
+
+    toc = f'<?xml version="1.0" encoding="UTF-8"?><xar><toc>{render(tree)}</toc></xar>'.encode()
+    toc_c = zlib.compress(toc)
+    header = struct.pack(">4sHHQQI", b"xar!", 28, 1, len(toc_c), len(toc), 1)
+    return header + toc_c + heap
+
+
+DISTRIBUTION = b"""<?xml version="1.0" encoding="utf-8"?>
+<installer-gui-script minSpecVersion="1"><title>Contoso Mac</title>
+<pkg-ref id="com.contoso.app"/></installer-gui-script>"""
+PACKAGE_INFO = b'<pkg-info identifier="com.contoso.app" version="3.1.0"/>'
+
+
+class TestXarArchive(unittest.TestCase):
+    def test_reads_members_with_and_without_compression(self):
+        data = build_xar([
+            ("Distribution", DISTRIBUTION, True),
+            ("Contoso.pkg/PackageInfo", PACKAGE_INFO, False),
+            ("Contoso.pkg/Payload", b"x" * 200000, True),
+        ])
+        with XarArchive(io.BytesIO(data)) as xar:
+            self.assertIn("Contoso.pkg/PackageInfo", xar.names())
+            self.assertEqual(xar.read("Distribution"), DISTRIBUTION)
+            self.assertEqual(xar.read(xar.find("*.pkg/PackageInfo")[0]), PACKAGE_INFO)
+            self.assertEqual(xar.get("Contoso.pkg").type, "directory")
+            self.assertEqual(len(xar.read("Contoso.pkg/Payload")), 200000)
+
+    def test_nested_flat_package(self):
+        inner = build_xar([("PackageInfo", PACKAGE_INFO, True)])
+        for compress in (False, True):
+            outer = build_xar([("Distribution", DISTRIBUTION, True), ("Inner.pkg", inner, compress)])
+            with XarArchive(io.BytesIO(outer)) as xar:
+                with xar.open_package("Inner.pkg") as nested:
+                    self.assertEqual(nested.read("PackageInfo"), PACKAGE_INFO)
+
+    def test_rejects_non_xar(self):
+        with self.assertRaises(XarError):
+            XarArchive(io.BytesIO(b"PK\x03\x04" + b"\x00" * 100))
+
+
+@pytest.mark.usefixtures("tmp_dir")
+class TestMacOSPkgAnalysis(unittest.TestCase):
+    def _write(self, name, data):
+        path = self.tmp_dir / name
+        path.write_bytes(data)
+        return path
+
+    def test_product_archive_without_7z(self):
+        path = self._write("contoso.pkg", build_xar([
+            ("Distribution", DISTRIBUTION, True),
+            ("Contoso.pkg/PackageInfo", PACKAGE_INFO, True),
+        ]))
+        with patch("subprocess.run") as mock_run, patch("tempfile.TemporaryDirectory") as mock_tmp:
+            info = MacOSAnalyzer().analyze(path)
+            mock_run.assert_not_called()
+            mock_tmp.assert_not_called()
+        self.assertEqual(info.installer_type, "MacOS PKG")
+        self.assertEqual(info.product_name, "Contoso Mac")
+        self.assertEqual(info.bundle_id, "com.contoso.app")
+        self.assertEqual(info.product_version, "3.1.0")
+        self.assertEqual(info.confidence, 1.0)
+
+    def test_component_package(self):
+        path = self._write("component.pkg", build_xar([("PackageInfo", PACKAGE_INFO, True)]))
+        info = MacOSAnalyzer().analyze(path)
+        self.assertEqual(info.bundle_id, "com.contoso.app")
+        self.assertEqual(info.package_ids, ["com.contoso.app"])
+
+
+if __name__ == '__main__':
+    unittest.main()